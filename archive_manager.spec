@@ -65,6 +65,8 @@ hiddenimports = [
     'uuid',
     'tempfile',
     'threading',
+    'tarfile',
+    'zlib',
     
     # ========== Sécurité ==========
     'bcrypt',
@@ -97,6 +99,9 @@ hiddenimports = [
     'database',
     'database.db_manager',
     'database.migrations',
+    'database.audit_writer',
+    'database.audit_archive',
+    'database.object_cache',
     
     # Modèles
     'models',
@@ -104,21 +109,31 @@ hiddenimports = [
     'models.folder',
     'models.file',
     'models.folder_share',
+    'models.user_group',
+    'models.folder_group_share',
+    'models.file_integrity',
     'models.audit_log',
+    'models.rows',
     
     # Contrôleurs
     'controllers',
     'controllers.auth_controller',
     'controllers.audit_controller',
     'controllers.cloud_storage',
+    'controllers.export_controller',
     'controllers.file_controller',
     'controllers.folder_controller',
+    'controllers.group_controller',
+    'controllers.integrity_controller',
+    'controllers.permission_resolver',
     'controllers.search_controller',
     'controllers.sharing_controller',
     
     # Vues
     'views',
+    'views.audit_log_window',
     'views.file_creation_dialog',
+    'views.file_table_model',
     'views.folder_dialog',
     'views.folder_selection_dialog',
     'views.folder_view_window',
@@ -142,10 +157,18 @@ hiddenimports = [
     # Utilitaires
     'utils',
     'utils.alert_dialog',
+    'utils.archive_stream',
     'utils.enums',
     'utils.file_handler',
     'utils.preview_generator',
+    'utils.preview_cache',
+    'utils.text_preview',
+    'utils.preview_prefetcher',
     'utils.scanner',
+    'utils.scan_manifest',
+    'utils.hot_folder',
+    'utils.storage_scrubber',
+    'utils.task_runner',
     'utils.theme_manager',
     'utils.validators',
     'utils.path_config',
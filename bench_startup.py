@@ -0,0 +1,131 @@
+"""
+bench_startup.py - Mesure du coût des imports au démarrage
+
+Chaque scénario est importé dans un interpréteur neuf (plusieurs fois,
+la médiane est retenue), avec -X importtime pour lister les modules les
+plus coûteux. Le script vérifie aussi que le chemin de connexion ne
+charge aucune bibliothèque lourde (magic, PIL, PyPDF2, clients cloud).
+
+Usage:
+    python bench_startup.py                 # tableau récapitulatif
+    python bench_startup.py --top 15        # modules les plus lents du démarrage
+    python bench_startup.py --json          # sortie machine
+    python bench_startup.py --budget 800    # code 1 si le démarrage dépasse 800 ms
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Scénario -> module importé
+SCENARIOS = {
+    'interpreter': None,
+    'startup (main.py)': 'main',
+    'main_window': 'views.main_window',
+    'cli': 'cli',
+}
+
+# Bibliothèques qui ne doivent être chargées qu'au premier usage
+HEAVY_MODULES = ['magic', 'PIL', 'PyPDF2', 'boto3', 'azure', 'google.cloud']
+
+
+def run_python(code, importtime=False):
+    """Exécuter du code dans un interpréteur neuf, retourne (durée ms, stderr, stdout)"""
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', code]
+
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else code)
+    return elapsed, result.stderr, result.stdout
+
+
+def measure(module, repeat):
+    """Durée médiane (ms) de l'import de module dans un interpréteur neuf"""
+    code = f"import {module}" if module else "pass"
+    return statistics.median(run_python(code)[0] for _ in range(repeat))
+
+
+def slowest_imports(module, top):
+    """Modules les plus coûteux (temps propre, en ms) lors de l'import de module"""
+    _, stderr, _ = run_python(f"import {module}", importtime=True)
+
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings.append((int(self_us) / 1000, int(cumulative_us) / 1000, name.strip()))
+
+    timings.sort(reverse=True)
+    return timings[:top]
+
+
+def loaded_heavy_modules(module):
+    """Bibliothèques lourdes présentes dans sys.modules après l'import de module"""
+    code = (
+        f"import sys, json; import {module}; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    _, _, stdout = run_python(code)
+    return json.loads(stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesure du temps d'import au démarrage")
+    parser.add_argument('--repeat', type=int, default=5, help="Mesures par scénario (médiane)")
+    parser.add_argument('--top', type=int, default=10, help="Modules les plus lents à afficher")
+    parser.add_argument('--budget', type=float, help="Durée maximale du démarrage en ms")
+    parser.add_argument('--json', action='store_true', help="Sortie JSON")
+    args = parser.parse_args()
+
+    report = {
+        'python': sys.version.split()[0],
+        'scenarios': {name: round(measure(module, args.repeat), 1)
+                      for name, module in SCENARIOS.items()},
+        'slowest': [
+            {'self_ms': self_ms, 'cumulative_ms': cumulative_ms, 'module': name}
+            for self_ms, cumulative_ms, name in slowest_imports('main', args.top)
+        ],
+        'heavy_at_startup': loaded_heavy_modules('main'),
+    }
+
+    startup = report['scenarios']['startup (main.py)']
+    over_budget = args.budget is not None and startup > args.budget
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Python {report['python']} - médiane sur {args.repeat} lancements\n")
+        for name, elapsed in report['scenarios'].items():
+            print(f"  {name:<22} {elapsed:>8.1f} ms")
+
+        print(f"\nImports les plus lents au démarrage (temps propre / cumulé):")
+        for entry in report['slowest']:
+            print(f"  {entry['self_ms']:>8.1f} ms {entry['cumulative_ms']:>9.1f} ms  {entry['module']}")
+
+        if report['heavy_at_startup']:
+            print(f"\n⚠️  Bibliothèques chargées au démarrage: {', '.join(report['heavy_at_startup'])}")
+        else:
+            print("\n✅ Aucune bibliothèque lourde chargée au démarrage")
+
+        if over_budget:
+            print(f"❌ Démarrage {startup:.1f} ms > budget {args.budget:.1f} ms")
+
+    return 1 if over_budget or report['heavy_at_startup'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,785 @@
+"""
+cli.py - Interface en ligne de commande pour les opérations en masse
+
+Utilisable sans affichage (cron, serveur): ce module n'importe jamais
+PySide6. Les commandes passent par les contrôleurs, au nom d'un
+utilisateur existant désigné par --user.
+
+Chaque événement est écrit sur la sortie standard sous forme d'une ligne
+JSON ({"event": "progress" | "result" | "error", ...}); les messages des
+contrôleurs sont redirigés vers la sortie d'erreur.
+
+Exemples:
+    python cli.py --user admin import /data/scans --folder-id 12
+    python cli.py --user admin import /data/reception/lot-42.tar.gz --folder-id 12
+    python cli.py --user admin export 12 /mnt/backup/scans
+    python cli.py --user admin export 12 /mnt/transfert/scans.zip --format zip
+    python cli.py --user admin verify --folder-id 12
+    python cli.py --user admin verify --hash --max-seconds 3600 --repair
+    python cli.py --user admin reindex
+    python cli.py --user admin share 12 13 --to alice bob --users-file equipe.txt --permission write
+    python cli.py --user admin group add comptabilite --users-file service.txt
+    python cli.py --user admin share 12 --groups comptabilite
+    python cli.py --user admin audit-archive --retention-days 365
+    python cli.py --user admin audit-export audit-2025.csv --since 2025-01-01 --include-archive
+    python cli.py --user admin stats
+    python cli.py --user admin gc --delete
+
+Codes de sortie: 0 succès, 1 erreurs rencontrées, 2 usage incorrect.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from config.settings import Settings
+from database.db_manager import DatabaseManager
+from utils.enums import AccessLevel
+
+EXIT_OK = 0
+EXIT_ERRORS = 1
+EXIT_USAGE = 2
+
+# Nombre de fichiers lus par requête lors des parcours de la table files
+BATCH_SIZE = 1000
+
+
+class CliError(Exception):
+    """Erreur d'utilisation (utilisateur, dossier ou droits invalides)"""
+
+
+class EventWriter:
+    """Émission des événements JSON, une ligne par événement"""
+
+    def __init__(self, stream, command, interval=0.5):
+        self.stream = stream
+        self.command = command
+        self.interval = interval
+        self._last_progress = 0.0
+
+    def emit(self, event, **data):
+        data = {'event': event, 'command': self.command, **data}
+        self.stream.write(json.dumps(data, default=str, ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+    def progress(self, done, total=None, force=False, **data):
+        """Progression, limitée à un événement par intervalle"""
+        now = time.monotonic()
+        if not force and done != total and now - self._last_progress < self.interval:
+            return
+        self._last_progress = now
+        self.emit('progress', done=done, total=total, **data)
+
+    def result(self, **data):
+        self.emit('result', **data)
+
+    def error(self, message, **data):
+        self.emit('error', message=message, **data)
+
+
+# ------------------------------
+# Contexte
+# ------------------------------
+def init_database():
+    """Initialiser la base depuis la configuration de l'application"""
+    db = DatabaseManager()
+    db_config = Settings().get('database') or {}
+    db.initialize(
+        db_type=db_config.get('type', 'sqlite'),
+        db_path=db_config.get('path'),
+        host=db_config.get('host'),
+        port=db_config.get('port'),
+        user=db_config.get('user'),
+        password=db_config.get('password'),
+        database=db_config.get('database')
+    )
+    return db
+
+
+def load_user(db, username):
+    """Utilisateur actif désigné par --user"""
+    from models.user import User
+
+    session = db.get_session()
+    try:
+        user = session.query(User).filter(User.username == username).first()
+        if user is None or not user.is_active:
+            raise CliError(f"Utilisateur inconnu ou inactif: {username}")
+        session.expunge(user)
+        return user
+    finally:
+        session.close()
+
+
+def require_admin(user):
+    if not user.is_admin():
+        raise CliError("Cette commande est réservée aux administrateurs")
+
+
+def check_folder_access(db, user, folder_id, required=AccessLevel.READ):
+    """Vérifier que le dossier existe et que l'utilisateur a le niveau requis"""
+    from controllers.permission_resolver import PermissionResolver
+    from models.folder import Folder
+
+    session = db.get_session()
+    try:
+        folder = session.query(Folder.name).filter(Folder.id == folder_id).first()
+    finally:
+        session.close()
+
+    if folder is None:
+        raise CliError(f"Dossier introuvable: {folder_id}")
+    if not user.is_admin() and not PermissionResolver(db).can(user, folder_id, required):
+        raise CliError(f"Accès refusé au dossier {folder_id}")
+    return folder.name
+
+
+def folder_subtree_ids(session, root_ids):
+    """Ids des dossiers root_ids et de tous leurs descendants"""
+    from models.folder import Folder
+
+    ids = list(root_ids)
+    level = list(root_ids)
+    while level:
+        level = [
+            row[0] for row in
+            session.query(Folder.id).filter(Folder.parent_id.in_(level)).all()
+        ]
+        ids.extend(level)
+    return ids
+
+
+def iter_file_batches(session, folder_ids=None):
+    """Lignes (id, file_path, file_size) par lots, pagination par clé sur l'id"""
+    from models.file import File
+
+    last_id = 0
+    while True:
+        query = session.query(File.id, File.file_path, File.file_size).filter(File.id > last_id)
+        if folder_ids is not None:
+            query = query.filter(File.folder_id.in_(folder_ids))
+        batch = query.order_by(File.id).limit(BATCH_SIZE).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1][0]
+
+
+def default_workers(db):
+    """Parallélisme des accès à la base: SQLite n'accepte qu'une écriture à la fois"""
+    return 1 if db.get_db_type() == 'sqlite' else 4
+
+
+# ------------------------------
+# Commandes
+# ------------------------------
+def cmd_import(args, db, user, events):
+    from controllers.file_controller import FileController
+
+    source = os.path.abspath(args.source)
+    if not os.path.isdir(source) and not os.path.isfile(source):
+        raise CliError(f"Dossier source introuvable: {source}")
+    check_folder_access(db, user, args.folder_id, AccessLevel.WRITE)
+
+    controller = FileController(user, db)
+
+    if os.path.isfile(source):
+        # Archive ZIP/TAR: membres lus en flux, sans extraction sur disque
+        success, result = controller.import_archive(
+            source, args.folder_id,
+            progress_callback=lambda done, total: events.progress(done, total, unit='bytes')
+        )
+        if not success:
+            events.error(result)
+            return EXIT_ERRORS
+        events.result(mode='archive', **result)
+        return EXIT_ERRORS if result['errors'] else EXIT_OK
+
+    if not args.full:
+        stats = controller.sync_folder(
+            source, args.folder_id, recursive=not args.no_recursive,
+            progress_callback=lambda done, total: events.progress(done, total)
+        )
+        events.result(mode='incremental', **stats)
+        return EXIT_ERRORS if stats['errors'] else EXIT_OK
+
+    from utils.scanner import FolderScanner
+
+    scanner = FolderScanner(exclude_hidden=False)
+    paths = [scanned.path for scanned in scanner.iter_files(source, not args.no_recursive)]
+    errors = [f"{path}: {message}" for path, message in scanner.errors]
+    total = len(paths)
+    imported = 0
+    done = 0
+
+    workers = args.workers or default_workers(db)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for path, (success, result) in zip(
+                paths, executor.map(lambda p: controller.add_file(p, args.folder_id), paths)):
+            done += 1
+            if success:
+                imported += 1
+            else:
+                errors.append(f"{path}: {result}")
+            events.progress(done, total)
+
+    events.result(mode='full', imported=imported, errors=errors)
+    return EXIT_ERRORS if errors else EXIT_OK
+
+
+def cmd_export(args, db, user, events):
+    from controllers.export_controller import _unique_name
+    from controllers.file_controller import FileController
+    from controllers.folder_controller import FolderController
+
+    root_name = check_folder_access(db, user, args.folder_id)
+    if args.format != 'dir':
+        return export_archive(args, db, user, events, root_name)
+
+    file_controller = FileController(user, db)
+    folder_controller = FolderController(user, db)
+
+    destination = Path(args.destination)
+    if args.include_root:
+        destination = destination / root_name
+
+    # Parcours de l'arborescence: la base est lue dans ce thread, les
+    # copies sont faites en parallèle. Les noms sont rendus uniques par
+    # dossier, comme dans les archives: deux fichiers de même nom ne
+    # s'écrasent pas
+    jobs = []
+    pending = deque([(args.folder_id, destination)])
+    while pending:
+        folder_id, target = pending.popleft()
+        used = set()
+        for subfolder in folder_controller.get_subfolders(folder_id):
+            pending.append((subfolder.id, target / _unique_name(subfolder.name, used)))
+        for file in file_controller.get_files_in_folder(folder_id):
+            jobs.append((file.file_path, target / _unique_name(file.name, used)))
+
+    def copy(job):
+        source, target = job
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+            return None
+        except OSError as e:
+            return f"{source}: {e}"
+
+    errors = []
+    done = 0
+    with ThreadPoolExecutor(max_workers=args.workers or 8) as executor:
+        for error in executor.map(copy, jobs):
+            done += 1
+            if error:
+                errors.append(error)
+            events.progress(done, len(jobs))
+
+    events.result(destination=str(destination), exported=done - len(errors), errors=errors)
+    return EXIT_ERRORS if errors else EXIT_OK
+
+
+def export_archive(args, db, user, events, root_name):
+    """Export en une seule archive ZIP ou TAR écrite en flux, avec manifeste SHA-256"""
+    from controllers.export_controller import ExportController
+
+    destination = Path(args.destination)
+    if destination.is_dir():
+        destination = destination / f"{root_name}.{args.format}"
+
+    success, result = ExportController(user, db).export_folder(
+        args.folder_id, str(destination), args.format,
+        level=args.level, workers=args.workers,
+        progress_callback=lambda done, total: events.progress(done, total, unit='bytes')
+    )
+    if not success:
+        events.error(result)
+        return EXIT_ERRORS
+
+    events.result(destination=result['path'], format=result['format'], folders=result['folders'],
+                  exported=result['files'], bytes=result['bytes'], errors=result['errors'])
+    return EXIT_ERRORS if result['errors'] else EXIT_OK
+
+
+def cmd_verify(args, db, user, events):
+    from models.file import File
+    from models.folder import Folder
+
+    if args.folder_id is not None:
+        check_folder_access(db, user, args.folder_id)
+    if args.hash or args.report:
+        return verify_integrity(args, db, user, events)
+
+    def check(row):
+        file_id, file_path, file_size = row
+        try:
+            size = os.stat(file_path).st_size
+        except FileNotFoundError:
+            return {'id': file_id, 'path': file_path, 'problem': 'missing'}
+        except OSError as e:
+            return {'id': file_id, 'path': file_path, 'problem': str(e)}
+        if file_size is not None and size != file_size:
+            return {'id': file_id, 'path': file_path, 'problem': 'size_mismatch',
+                    'expected': file_size, 'actual': size}
+        return None
+
+    session = db.get_session()
+    try:
+        if args.folder_id is not None:
+            folder_ids = folder_subtree_ids(session, [args.folder_id])
+        elif user.is_admin():
+            folder_ids = None
+        else:
+            owned = [row[0] for row in session.query(Folder.id).filter(Folder.owner_id == user.id)]
+            folder_ids = folder_subtree_ids(session, owned)
+
+        total_query = session.query(File.id)
+        if folder_ids is not None:
+            total_query = total_query.filter(File.folder_id.in_(folder_ids))
+        total = total_query.count()
+
+        problems = []
+        done = 0
+        with ThreadPoolExecutor(max_workers=args.workers or 8) as executor:
+            for batch in iter_file_batches(session, folder_ids):
+                for problem in executor.map(check, batch):
+                    if problem:
+                        problems.append(problem)
+                        events.emit('problem', **problem)
+                done += len(batch)
+                events.progress(done, total)
+    finally:
+        session.close()
+
+    events.result(checked=done, problems=len(problems))
+    return EXIT_ERRORS if problems else EXIT_OK
+
+
+def verify_integrity(args, db, user, events):
+    """
+    Vérification des empreintes SHA-256 avec point de reprise (--hash), ou
+    rapport des défauts enregistrés (--report)
+
+    Un passage interrompu (--max-seconds, arrêt) reprend au lancement
+    suivant: une tâche cron peut vérifier le stockage par tranches.
+    """
+    from controllers.integrity_controller import IntegrityController
+
+    if args.folder_id is None:
+        require_admin(user)
+        folder_ids = None
+        checkpoint = IntegrityController.DEFAULT_CHECKPOINT
+    else:
+        session = db.get_session()
+        try:
+            folder_ids = folder_subtree_ids(session, [args.folder_id])
+        finally:
+            session.close()
+        checkpoint = f"{IntegrityController.DEFAULT_CHECKPOINT}:folder:{args.folder_id}"
+    if args.repair:
+        require_admin(user)
+
+    controller = IntegrityController(user, db)
+
+    if args.report:
+        problems = controller.get_problems(folder_ids)
+        for row in problems:
+            events.emit('problem', id=row.file_id, name=row.name, path=row.file_path,
+                        problem=row.status.value, detail=row.detail,
+                        since=row.failed_at.isoformat() if row.failed_at else None)
+        events.result(problems=len(problems))
+        return EXIT_ERRORS if problems else EXIT_OK
+
+    rate = Settings().get('integrity.max_mb_per_s', 20) if args.rate is None else args.rate
+    success, result = controller.scrub(
+        checkpoint, folder_ids, rate=rate * 1024 * 1024 or None,
+        max_seconds=args.max_seconds, repair=args.repair, restart=args.restart,
+        progress_callback=lambda done, total: events.progress(done, total),
+        problem_callback=lambda problem: events.emit('problem', **problem)
+    )
+    if not success:
+        events.error(result)
+        return EXIT_ERRORS
+
+    events.result(checked=result['checked'], bytes=result['bytes'], baselined=result['baselined'],
+                  problems=len(result['problems']), repaired=result['repaired'],
+                  completed=result['completed'], position=result['position'])
+    return EXIT_ERRORS if result['problems'] else EXIT_OK
+
+
+def cmd_reindex(args, db, user, events):
+    from sqlalchemy import text
+    from database.db_manager import Base
+
+    require_admin(user)
+
+    # Index déclarés dans les modèles mais absents de la base
+    db._create_missing_indexes()
+
+    db_type = db.get_db_type()
+    if db_type == 'sqlite':
+        statements = ["REINDEX", "ANALYZE"]
+    elif db_type == 'mysql':
+        statements = [f"ANALYZE TABLE {table.name}" for table in Base.metadata.sorted_tables]
+    else:
+        statements = ["ANALYZE"]
+
+    session = db.get_session()
+    try:
+        for done, statement in enumerate(statements, 1):
+            session.execute(text(statement))
+            events.progress(done, len(statements), force=True, statement=statement)
+        session.commit()
+    finally:
+        session.close()
+
+    events.result(db_type=db_type, statements=statements)
+    return EXIT_OK
+
+
+def read_usernames(args):
+    """Noms d'utilisateurs de --to et --users-file (un nom par ligne)"""
+    usernames = set(args.to or [])
+    if args.users_file:
+        with open(args.users_file, encoding='utf-8') as f:
+            usernames.update(line.strip() for line in f if line.strip())
+    return usernames
+
+
+def resolve_ids(db, model, names):
+    """Ids des lignes de model par nom (username ou name), erreur si un nom est inconnu"""
+    column = model.username if hasattr(model, 'username') else model.name
+    ids = {}
+    session = db.get_session()
+    try:
+        names = sorted(names)
+        for start in range(0, len(names), BATCH_SIZE):
+            ids.update(
+                session.query(column, model.id)
+                .filter(column.in_(names[start:start + BATCH_SIZE]))
+                .all()
+            )
+    finally:
+        session.close()
+
+    unknown = set(names) - ids.keys()
+    if unknown:
+        raise CliError(f"Introuvable(s): {', '.join(sorted(unknown))}")
+    return ids
+
+
+def cmd_share(args, db, user, events):
+    from controllers.sharing_controller import SharingController
+    from models.user import User
+    from models.user_group import UserGroup
+    from utils.enums import SharePermission
+
+    usernames = read_usernames(args)
+    if not usernames and not args.groups:
+        raise CliError("Aucun destinataire: utiliser --to, --users-file ou --groups")
+
+    user_ids = resolve_ids(db, User, usernames) if usernames else {}
+    group_ids = resolve_ids(db, UserGroup, args.groups) if args.groups else {}
+
+    success, result = SharingController(user, db).share_folders(
+        args.folder_ids, user_ids.values(), SharePermission(args.permission),
+        group_ids=group_ids.values()
+    )
+    if not success:
+        events.error(result)
+        return EXIT_ERRORS
+
+    events.result(folders=len(set(args.folder_ids)), users=len(user_ids),
+                  groups=len(group_ids), **result)
+    return EXIT_OK
+
+
+def cmd_group(args, db, user, events):
+    from controllers.group_controller import GroupController
+    from models.user import User
+    from models.user_group import UserGroup
+
+    controller = GroupController(user, db)
+
+    if args.action == 'create':
+        success, result = controller.create_group(args.name, args.description)
+        if success:
+            result = {'group_id': result.id}
+    else:
+        group_id = resolve_ids(db, UserGroup, [args.name])[args.name]
+        if args.action == 'delete':
+            success, result = controller.delete_group(group_id)
+        else:
+            usernames = read_usernames(args)
+            if not usernames:
+                raise CliError("Aucun utilisateur: utiliser --to ou --users-file")
+            user_ids = resolve_ids(db, User, usernames).values()
+            if args.action == 'add':
+                success, result = controller.add_members(group_id, user_ids)
+                result = {'added': result} if success else result
+            else:
+                success, result = controller.remove_members(group_id, user_ids)
+                result = {'removed': result} if success else result
+
+    if not success:
+        events.error(result)
+        return EXIT_ERRORS
+
+    events.result(group=args.name, **(result if isinstance(result, dict) else {'message': result}))
+    return EXIT_OK
+
+
+def cmd_audit_archive(args, db, user, events):
+    from controllers.audit_controller import AuditController
+
+    require_admin(user)
+
+    success, result = AuditController(user, db).archive_old_logs(
+        args.retention_days,
+        progress_callback=lambda archived: events.progress(archived, force=True)
+    )
+    if not success:
+        events.error(result)
+        return EXIT_ERRORS
+
+    events.result(**result)
+    return EXIT_OK
+
+
+def cmd_audit_export(args, db, user, events):
+    from datetime import datetime
+    from controllers.audit_controller import AuditController
+
+    def parse_date(value):
+        return datetime.fromisoformat(value) if value else None
+
+    success, result = AuditController(user, db).export_logs(
+        args.destination, args.format,
+        progress_callback=lambda count: events.progress(count),
+        user_id=args.user_id,
+        actions=args.action,
+        entity_type=args.entity_type,
+        since=parse_date(args.since),
+        until=parse_date(args.until),
+        include_archive=args.include_archive
+    )
+    if not success:
+        events.error(result)
+        return EXIT_ERRORS
+
+    events.result(destination=args.destination, rows=result)
+    return EXIT_OK
+
+
+def cmd_stats(args, db, user, events):
+    from controllers.search_controller import SearchController
+
+    stats = SearchController(user).get_statistics()
+    if user.is_admin():
+        from controllers.file_controller import FileController
+        stats['archive'] = FileController(user, db).get_file_stats()
+
+    events.result(**stats)
+    return EXIT_OK
+
+
+def is_referenced(db, path):
+    """Le fichier du stockage est-il référencé par une ligne de files ?"""
+    from models.file import File
+
+    session = db.get_session()
+    try:
+        candidates = list(dict.fromkeys([path, os.path.abspath(path)]))
+        return session.query(File.id).filter(File.file_path.in_(candidates)).first() is not None
+    finally:
+        session.close()
+
+
+def cmd_gc(args, db, user, events):
+    from models.file import File
+    from utils.scanner import FolderScanner
+
+    require_admin(user)
+
+    base_path = Settings().get('storage.base_path', 'storage/files')
+    referenced = set()
+    # Un fichier écrit après le début de la lecture peut ne pas encore être
+    # dans la base (import en cours): il n'est pas un orphelin
+    snapshot_started = time.time()
+    session = db.get_session()
+    try:
+        for batch in iter_file_batches(session):
+            referenced.update(os.path.abspath(row[1]) for row in batch)
+        total_files = session.query(File.id).count()
+    finally:
+        session.close()
+
+    # Fichiers du stockage qu'aucune ligne de la table files ne référence
+    orphans = []
+    orphan_bytes = 0
+    skipped = 0
+    scanner = FolderScanner(exclude_hidden=False)
+    if os.path.isdir(base_path):
+        for scanned in scanner.iter_files(base_path):
+            if os.path.abspath(scanned.path) in referenced:
+                continue
+            # Écriture en cours (.part), ou fichier écrit/renommé depuis la
+            # lecture de la base (la date de changement suit les renommages)
+            if scanned.name.endswith('.part') or \
+                    max(scanned.modified, scanned.created) >= snapshot_started:
+                skipped += 1
+                continue
+            orphans.append(scanned.path)
+            orphan_bytes += scanned.size
+
+    deleted = 0
+    errors = [f"{path}: {message}" for path, message in scanner.errors]
+    for done, path in enumerate(orphans, 1):
+        if args.delete:
+            try:
+                # Dernière vérification: le fichier a pu être enregistré depuis
+                if not is_referenced(db, path):
+                    os.remove(path)
+                    deleted += 1
+            except OSError as e:
+                errors.append(f"{path}: {e}")
+        else:
+            events.emit('orphan', path=path)
+        events.progress(done, len(orphans))
+
+    # Le cache d'aperçus est ramené sous son budget
+    from utils.preview_cache import PreviewCache
+    cache = PreviewCache()
+    cache.evict()
+
+    events.result(
+        referenced=total_files, orphans=len(orphans), orphan_bytes=orphan_bytes,
+        deleted=deleted, skipped_recent=skipped, dry_run=not args.delete, preview_cache=cache.stats(), errors=errors
+    )
+    return EXIT_ERRORS if errors else EXIT_OK
+
+
+# ------------------------------
+# Analyse des arguments
+# ------------------------------
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description="Gestionnaire d'Archives Numériques - opérations en masse sans interface"
+    )
+    parser.add_argument('--user', required=True, help="Nom de l'utilisateur au nom duquel agir")
+    parser.add_argument('--progress-interval', type=float, default=0.5,
+                        help="Secondes minimum entre deux événements de progression")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('import', help="Importer un dossier (incrémental par défaut)")
+    p.add_argument('source', help="Dossier source, ou archive ZIP/TAR à importer sans l'extraire")
+    p.add_argument('--folder-id', type=int, required=True, help="Dossier d'archive de destination")
+    p.add_argument('--full', action='store_true', help="Tout réimporter sans manifeste")
+    p.add_argument('--no-recursive', action='store_true', help="Ignorer les sous-dossiers")
+    p.add_argument('--workers', type=int, help="Imports parallèles (--full, hors SQLite)")
+    p.set_defaults(handler=cmd_import)
+
+    p = subparsers.add_parser('export', help="Copier un dossier d'archive et ses sous-dossiers")
+    p.add_argument('folder_id', type=int)
+    p.add_argument('destination', help="Dossier de destination, ou fichier archive (--format zip/tar)")
+    p.add_argument('--format', choices=['dir', 'zip', 'tar'], default='dir',
+                   help="dir: copie des fichiers; zip/tar: une archive avec MANIFEST.sha256")
+    p.add_argument('--level', type=int, choices=range(0, 10), default=6, metavar='0-9',
+                   help="Niveau de compression ZIP (0 = aucune)")
+    p.add_argument('--include-root', action='store_true',
+                   help="Créer un dossier au nom du dossier exporté (--format dir)")
+    p.add_argument('--workers', type=int, help="Copies ou compressions parallèles")
+    p.set_defaults(handler=cmd_export)
+
+    p = subparsers.add_parser('verify', help="Vérifier la présence et la taille des fichiers archivés")
+    p.add_argument('--folder-id', type=int, help="Limiter à un dossier et ses sous-dossiers")
+    p.add_argument('--workers', type=int, help="Vérifications parallèles (8 par défaut)")
+    p.add_argument('--hash', action='store_true',
+                   help="Relire les fichiers et comparer leur SHA-256 (reprend le passage interrompu)")
+    p.add_argument('--rate', type=float, metavar='MO/S',
+                   help="Débit de lecture maximal (--hash; integrity.max_mb_per_s par défaut, 0 = illimité)")
+    p.add_argument('--max-seconds', type=float, help="Arrêter le passage après cette durée (--hash)")
+    p.add_argument('--restart', action='store_true', help="Recommencer le passage depuis le début (--hash)")
+    p.add_argument('--repair', action='store_true',
+                   help="Restaurer depuis la copie cloud les fichiers absents ou altérés (--hash)")
+    p.add_argument('--report', action='store_true',
+                   help="Lister les défauts enregistrés par les vérifications, sans relire le stockage")
+    p.set_defaults(handler=cmd_verify)
+
+    p = subparsers.add_parser('reindex', help="Créer les index manquants et mettre à jour les statistiques")
+    p.set_defaults(handler=cmd_reindex)
+
+    p = subparsers.add_parser('share', help="Partager des dossiers avec des utilisateurs (une transaction)")
+    p.add_argument('folder_ids', type=int, nargs='+', metavar='folder_id')
+    p.add_argument('--to', nargs='+', metavar='USER', help="Noms des utilisateurs")
+    p.add_argument('--users-file', help="Fichier texte, un nom d'utilisateur par ligne")
+    p.add_argument('--groups', nargs='+', metavar='GROUP', help="Noms des groupes")
+    p.add_argument('--permission', choices=['read', 'write', 'manage'], default='read')
+    p.set_defaults(handler=cmd_share)
+
+    p = subparsers.add_parser('group', help="Gérer les groupes d'utilisateurs (administrateurs)")
+    p.add_argument('action', choices=['create', 'delete', 'add', 'remove'])
+    p.add_argument('name', help="Nom du groupe")
+    p.add_argument('--description', help="Description (create)")
+    p.add_argument('--to', nargs='+', metavar='USER', help="Membres à ajouter ou retirer")
+    p.add_argument('--users-file', help="Fichier texte, un nom d'utilisateur par ligne")
+    p.set_defaults(handler=cmd_group)
+
+    p = subparsers.add_parser('audit-archive',
+                              help="Archiver les mois anciens du journal d'audit (fichiers compressés)")
+    p.add_argument('--retention-days', type=int,
+                   help="Jours conservés en base (audit.retention_days par défaut)")
+    p.set_defaults(handler=cmd_audit_archive)
+
+    p = subparsers.add_parser('audit-export', help="Exporter le journal d'audit en CSV ou JSON lines")
+    p.add_argument('destination')
+    p.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    p.add_argument('--since', help="Date de début incluse (AAAA-MM-JJ, UTC)")
+    p.add_argument('--until', help="Date de fin exclue (AAAA-MM-JJ, UTC)")
+    p.add_argument('--user-id', type=int, help="Limiter à un utilisateur (administrateurs)")
+    p.add_argument('--action', action='append', help="Action à inclure (répétable)")
+    p.add_argument('--entity-type', help="FILE, FOLDER, USER, SHARE...")
+    p.add_argument('--include-archive', action='store_true', help="Inclure les mois archivés")
+    p.set_defaults(handler=cmd_audit_export)
+
+    p = subparsers.add_parser('stats', help="Statistiques des archives")
+    p.set_defaults(handler=cmd_stats)
+
+    p = subparsers.add_parser('gc', help="Rechercher les fichiers orphelins du stockage")
+    p.add_argument('--delete', action='store_true', help="Supprimer les orphelins (sinon simple liste)")
+    p.set_defaults(handler=cmd_gc)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Seuls les événements JSON vont sur la sortie standard
+    out = sys.stdout
+    sys.stdout = sys.stderr
+    events = EventWriter(out, args.command, args.progress_interval)
+
+    try:
+        db = init_database()
+        user = load_user(db, args.user)
+        return args.handler(args, db, user, events)
+    except CliError as e:
+        events.error(str(e))
+        return EXIT_USAGE
+    except Exception as e:
+        events.error(f"{type(e).__name__}: {e}")
+        return EXIT_ERRORS
+    finally:
+        sys.stdout = out
+
+
+if __name__ == "__main__":
+    sys.exit(main())
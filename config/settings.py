@@ -1,13 +1,27 @@
 # config/settings.py
 import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Set
 import copy
 
+# Clé absente (distincte d'une valeur None)
+_MISSING = object()
+
+
 class Settings:
     """
     Gestionnaire de configuration de l'application
     Utilise le pattern Singleton pour assurer une instance unique
+
+    Les modifications sont transactionnelles: plusieurs set() regroupés
+    dans un bloc batch() ne produisent qu'une écriture du fichier, faite
+    de manière atomique (fichier temporaire puis renommage). Après chaque
+    écriture, les abonnés (subscribe) reçoivent l'ensemble des clés
+    modifiées et ne reconstruisent que ce qui en dépend.
     """
     _instance = None
     _config_file = Path.home() / '.archive_manager' / 'config.json'
@@ -57,6 +71,51 @@ class Settings:
             'theme': 'light',
             'language': 'fr'
         },
+        'preview': {
+            'cache_dir': str(Path.home() / '.archive_manager' / 'preview_cache'),
+            'cache_max_mb': 512,
+            'image_max_size': [800, 600],
+            'prefetch_radius': 3,
+            'prefetch_threads': 1,
+            'prefetch_max_file_mb': 100,
+            'prefetch_max_megapixels': 60
+        },
+        'cache': {
+            # Objets lus par id gardés en mémoire (fichiers, arborescences, utilisateurs)
+            'object_entries': 5000,
+            # Secondes pendant lesquelles une entrée est servie sans revalidation
+            'object_ttl': 30
+        },
+        'hot_folders': {
+            'enabled': False,
+            'mode': 'auto',
+            'debounce_seconds': 2,
+            'stable_seconds': 3,
+            'batch_size': 50,
+            'poll_interval': 10,
+            'folders': []
+        },
+        'audit': {
+            'batch_size': 100,
+            'flush_interval': 2.0,
+            # Écrits immédiatement (commit avant de rendre la main)
+            'durable_actions': ['LOGIN', 'LOGOUT', 'DELETE'],
+            'durable_entities': ['SHARE', 'USER', 'GROUP'],
+            # Les mois plus anciens que retention_days sont déplacés vers
+            # des archives compressées (0 = jamais)
+            'retention_days': 365,
+            'archive_dir': str(Path.home() / '.archive_manager' / 'audit_archive')
+        },
+        'integrity': {
+            # Vérification du stockage en arrière-plan pendant que l'interface est ouverte
+            'enabled': False,
+            # Débit de lecture maximal du vérificateur (0 = illimité)
+            'max_mb_per_s': 20,
+            # Heures entre la fin d'un passage complet et le début du suivant
+            'interval_hours': 24,
+            # Restaurer depuis la copie cloud les fichiers absents ou altérés
+            'auto_repair': False
+        },
         'permissions': {
             'allow_file_deletion': True,
             'allow_folder_deletion': True,
@@ -69,6 +128,14 @@ class Settings:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._initialized = False
+            cls._instance._lock = threading.RLock()
+            # Bloc batch() en cours, propre à chaque thread
+            cls._instance._local = threading.local()
+            # Ordre des écritures du fichier (instantanés numérotés)
+            cls._instance._save_lock = threading.Lock()
+            cls._instance._generation = 0
+            cls._instance._saved_generation = 0
+            cls._instance._subscribers = []
         return cls._instance
     
     def __init__(self):
@@ -128,18 +195,218 @@ class Settings:
         return result
     
     def save(self):
-        """Sauvegarder les paramètres dans le fichier"""
+        """
+        Sauvegarder les paramètres dans le fichier (écriture atomique)
+        
+        Un instantané est pris sous le verrou puis écrit hors du verrou;
+        un instantané plus ancien que le dernier écrit est abandonné.
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            data = copy.deepcopy(self.settings)
+        
+        with self._save_lock:
+            if generation < self._saved_generation:
+                return
+            self._saved_generation = generation
+            self._write(data)
+    
+    def _write(self, data):
         try:
             # Créer le répertoire parent s'il n'existe pas
             self._config_file.parent.mkdir(parents=True, exist_ok=True)
             
-            # Sauvegarder avec indentation pour lisibilité
-            with open(self._config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=4, ensure_ascii=False)
+            # Écrire dans un fichier temporaire puis le renommer: un arrêt
+            # brutal laisse l'ancien fichier intact
+            fd, tmp_path = tempfile.mkstemp(dir=self._config_file.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    # Sauvegarder avec indentation pour lisibilité
+                    json.dump(data, f, indent=4, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self._config_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
                 
         except Exception as e:
             print(f"❌ Erreur lors de la sauvegarde des paramètres: {e}")
     
+    @contextmanager
+    def batch(self):
+        """
+        Regrouper plusieurs modifications en une seule écriture
+        
+        Le fichier est écrit et les abonnés notifiés à la sortie du bloc le
+        plus externe, seulement si une valeur a réellement changé. Si une
+        exception sort du bloc, les modifications du bloc sont annulées.
+        
+        Chaque modification est appliquée aussitôt (visible par get()) et
+        notée dans le journal du bloc, propre au thread; le verrou n'est
+        pris que le temps de chaque modification, pas pendant le bloc.
+        Il n'y a pas de temporisation: l'écriture a lieu à la sortie du
+        bloc, ou à chaque set() hors d'un bloc.
+        
+        Exemple:
+            with settings.batch():
+                settings.set('ui.theme', 'dark')
+                settings.set('ui.language', 'en')
+        """
+        local = self._local
+        outermost = getattr(local, 'journal', None) is None
+        if outermost:
+            local.journal = []
+            with self._lock:
+                generation = self._generation
+        
+        try:
+            yield self
+        except BaseException:
+            if outermost:
+                journal, local.journal = local.journal, None
+                self._rollback(journal)
+                # Un autre thread a écrit le fichier pendant le bloc, avec
+                # les modifications annulées: le réécrire sans elles
+                with self._lock:
+                    saved_meanwhile = self._generation != generation
+                if journal and saved_meanwhile:
+                    self.save()
+            raise
+        
+        if not outermost:
+            return
+        
+        journal, local.journal = local.journal, None
+        changed = self._journal_changes(journal)
+        if not changed:
+            return
+        
+        self.save()
+        self._notify(changed)
+    
+    def _apply(self, key: str, value: Any):
+        """
+        Remplacer une valeur (clé pointée, '' pour tous les paramètres)
+        et noter l'ancienne dans le journal du bloc en cours
+        """
+        journal = self._local.journal
+        with self._lock:
+            if not key:
+                journal.append(('', self.settings, False))
+                self.settings = value
+                return
+            
+            keys = key.split('.')
+            settings = self.settings
+            
+            # Naviguer jusqu'à l'avant-dernier niveau
+            for i, k in enumerate(keys[:-1]):
+                if k not in settings:
+                    journal.append(('.'.join(keys[:i + 1]), _MISSING, False))
+                    settings[k] = {}
+                elif not isinstance(settings[k], dict):
+                    # Si ce n'est pas un dict, on ne peut pas continuer
+                    print(f"⚠️  Impossible de définir {key}: {k} n'est pas un dictionnaire")
+                    return
+                settings = settings[k]
+            
+            old = settings.get(keys[-1], _MISSING)
+            # Une liste ou un dict modifié en place avant set() ne diffère
+            # pas de l'ancienne valeur: le marquer comme modifié
+            forced = old is value and isinstance(value, (dict, list))
+            journal.append((key, old, forced))
+            settings[keys[-1]] = value
+    
+    def _lookup(self, key: str):
+        """Valeur brute d'une clé pointée, _MISSING si elle n'existe pas"""
+        value = self.settings
+        for k in key.split('.') if key else []:
+            if not isinstance(value, dict) or k not in value:
+                return _MISSING
+            value = value[k]
+        return value
+    
+    def _journal_changes(self, journal) -> Set[str]:
+        """Clés modifiées par un bloc: valeur d'origine comparée à la valeur finale"""
+        changed = set()
+        seen = set()
+        with self._lock:
+            for key, old, forced in journal:
+                if forced:
+                    changed.add(key)
+                if key in seen:
+                    continue
+                seen.add(key)
+                
+                new = self._lookup(key)
+                if isinstance(old, dict) and isinstance(new, dict):
+                    changed |= self._changed_keys(old, new, f"{key}." if key else '')
+                elif old is _MISSING or new is _MISSING:
+                    if old is not new:
+                        changed.add(key)
+                elif old != new:
+                    changed.add(key)
+        return changed
+    
+    def _rollback(self, journal):
+        """Rétablir les valeurs d'origine, dans l'ordre inverse du journal"""
+        with self._lock:
+            for key, old, _ in reversed(journal):
+                if not key:
+                    self.settings = old
+                    continue
+                
+                *parents, last = key.split('.')
+                container = self._lookup('.'.join(parents))
+                if not isinstance(container, dict):
+                    continue
+                if old is _MISSING:
+                    container.pop(last, None)
+                else:
+                    container[last] = old
+    
+    def subscribe(self, callback: Callable[[Set[str]], None]):
+        """
+        Être notifié des modifications enregistrées
+        
+        callback reçoit l'ensemble des clés modifiées, en notation pointée
+        (ex: {'storage.cloud_type', 'storage.cloud_config.aws_s3.region'}).
+        """
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback: Callable[[Set[str]], None]):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+    
+    def _notify(self, changed: Set[str]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        
+        for callback in subscribers:
+            try:
+                callback(changed)
+            except Exception as e:
+                print(f"⚠️  Erreur dans un abonné aux paramètres: {e}")
+    
+    @classmethod
+    def _changed_keys(cls, old, new, prefix='') -> Set[str]:
+        """Clés (notation pointée) dont la valeur diffère entre old et new"""
+        changed = set()
+        for key in set(old) | set(new):
+            path = f"{prefix}{key}"
+            old_value = old.get(key)
+            new_value = new.get(key)
+            if isinstance(old_value, dict) and isinstance(new_value, dict):
+                changed |= cls._changed_keys(old_value, new_value, f"{path}.")
+            elif old_value != new_value:
+                changed.add(path)
+        return changed
+    
     def get(self, key: str, default=None) -> Any:
         """
         Récupérer une valeur par clé (supporte la notation pointée)
@@ -168,28 +435,16 @@ class Settings:
         Exemples:
             settings.set('database.type', 'postgresql')
             settings.set('storage.cloud_enabled', True)
-        """
-        keys = key.split('.')
-        settings = self.settings
         
-        # Naviguer jusqu'à l'avant-dernier niveau
-        for k in keys[:-1]:
-            if k not in settings:
-                settings[k] = {}
-            elif not isinstance(settings[k], dict):
-                # Si ce n'est pas un dict, on ne peut pas continuer
-                print(f"⚠️  Impossible de définir {key}: {k} n'est pas un dictionnaire")
-                return
-            settings = settings[k]
-        
-        # Définir la valeur finale
-        settings[keys[-1]] = value
-        self.save()
+        Hors d'un bloc batch(), le fichier est écrit immédiatement.
+        """
+        with self.batch():
+            self._apply(key, value)
     
     def reset_to_defaults(self):
         """Réinitialiser tous les paramètres aux valeurs par défaut"""
-        self.settings = copy.deepcopy(self.DEFAULT_SETTINGS)
-        self.save()
+        with self.batch():
+            self._apply('', copy.deepcopy(self.DEFAULT_SETTINGS))
         print("🔄 Paramètres réinitialisés aux valeurs par défaut")
     
     def reset_section(self, section: str):
@@ -201,8 +456,7 @@ class Settings:
             settings.reset_section('storage.cloud_config')
         """
         if section in self.DEFAULT_SETTINGS:
-            self.settings[section] = copy.deepcopy(self.DEFAULT_SETTINGS[section])
-            self.save()
+            self.set(section, copy.deepcopy(self.DEFAULT_SETTINGS[section]))
             print(f"🔄 Section '{section}' réinitialisée")
         else:
             print(f"⚠️  Section '{section}' introuvable dans les paramètres par défaut")
@@ -231,11 +485,11 @@ class Settings:
                 imported_settings = json.load(f)
             
             # Fusionner avec les paramètres par défaut
-            self.settings = self._deep_merge(
-                copy.deepcopy(self.DEFAULT_SETTINGS),
-                imported_settings
-            )
-            self.save()
+            with self.batch():
+                self._apply('', self._deep_merge(
+                    copy.deepcopy(self.DEFAULT_SETTINGS),
+                    imported_settings
+                ))
             print(f"✅ Paramètres importés depuis: {import_path}")
             return True
         except Exception as e:
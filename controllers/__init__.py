@@ -1,19 +1,33 @@
-
 # controllers/__init__.py
-"""Controllers package"""
-from .auth_controller import AuthController
-from .folder_controller import FolderController
-from .file_controller import FileController
-from .search_controller import SearchController
-from .audit_controller import AuditController
-from .sharing_controller import SharingController
+"""Controllers package
+
+Les contrôleurs sont chargés au premier accès: l'écran de connexion ne
+charge que AuthController.
+"""
+
+import importlib
+
+# Nom exporté -> module qui le définit
+_EXPORTS = {
+    'AuthController': '.auth_controller',
+    'FolderController': '.folder_controller',
+    'FileController': '.file_controller',
+    'SearchController': '.search_controller',
+    'AuditController': '.audit_controller',
+    'SharingController': '.sharing_controller',
+    'GroupController': '.group_controller',
+    'ExportController': '.export_controller',
+    'IntegrityController': '.integrity_controller',
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    'AuthController',
-    'FolderController',
-    'FileController',
-    'SearchController',
-    'AuditController',
-    'SharingController'
-]
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -2,48 +2,319 @@
 
 # controllers/audit_controller.py
 from database.db_manager import DatabaseManager
+from database.audit_writer import AuditWriter
+from database.object_cache import ObjectCache
+from config.settings import Settings
 from models.audit_log import AuditLog
+from models.user import User
+import csv
 import json
+import os
 
 class AuditController:
     def __init__(self, user, db: DatabaseManager):
         self.user = user
         self.db = db
 
-    def log_action(self, action, entity_type, entity_id, details=None):
-        """Log an action in audit trail"""
+    def log_action(self, action, entity_type, entity_id, details=None, durable=None):
+        """
+        Log an action in audit trail
+        
+        L'événement passe par la file de l'AuditWriter et est écrit par lot
+        en arrière-plan. En mode durable, l'appel attend que l'événement
+        (et tous ceux soumis avant lui) soit enregistré en base.
+        
+        Args:
+            durable: True/False pour forcer le mode; par défaut les actions
+                et entités listées dans audit.durable_* sont durables
+        
+        Returns:
+            bool: False si l'écriture durable a échoué
+        """
+        if durable is None:
+            settings = Settings()
+            durable = (action in settings.get('audit.durable_actions', []) or
+                       entity_type in settings.get('audit.durable_entities', []))
+        
+        writer = AuditWriter()
+        writer.submit(
+            self.user.id, action, entity_type, entity_id,
+            details=json.dumps(details) if isinstance(details, dict) else details
+        )
+        
+        if durable:
+            return writer.flush()
+        return True
+    
+    # Colonnes des exports CSV/JSONL
+    EXPORT_FIELDS = ['id', 'timestamp', 'user_id', 'username', 'action',
+                     'entity_type', 'entity_id', 'details', 'ip_address']
+    
+    def get_logs(self, entity_type=None, entity_id=None, limit=100, include_archive=True):
+        """
+        Get audit logs
+        
+        Args:
+            include_archive: Compléter avec les mois archivés (AuditArchive)
+                quand la table ne suffit pas à atteindre limit
+        """
+        logs, _ = self.query_logs(user_id=self.user.id, entity_type=entity_type,
+                                  entity_id=entity_id, limit=limit,
+                                  include_archive=include_archive)
+        return logs
+    
+    def _scoped_user_id(self, user_id):
+        """Un non-administrateur ne voit que son propre journal"""
+        if self.user.is_admin():
+            return user_id
+        return self.user.id
+    
+    def _filtered_query(self, session, user_id=None, actions=None, entity_type=None,
+                        entity_id=None, since=None, until=None):
+        query = session.query(AuditLog)
+        
+        user_id = self._scoped_user_id(user_id)
+        if user_id is not None:
+            query = query.filter(AuditLog.user_id == user_id)
+        if actions:
+            query = query.filter(AuditLog.action.in_(actions))
+        if entity_type:
+            query = query.filter(AuditLog.entity_type == entity_type)
+        if entity_id:
+            query = query.filter(AuditLog.entity_id == entity_id)
+        if since is not None:
+            query = query.filter(AuditLog.timestamp >= since)
+        if until is not None:
+            query = query.filter(AuditLog.timestamp < until)
+        return query
+    
+    def query_logs(self, user_id=None, actions=None, entity_type=None, entity_id=None,
+                   since=None, until=None, after=None, limit=100, include_archive=True):
+        """
+        Une page du journal, du plus récent au plus ancien
+        
+        La pagination se fait par clé sur (timestamp, id): chaque page coûte
+        le même prix quelle que soit sa position, contrairement à OFFSET.
+        Une fois la table épuisée, les pages continuent dans les mois
+        archivés (plus anciens que la table), avec le même curseur.
+        
+        Args:
+            user_id: Utilisateur (administrateurs seulement; None = tous)
+            actions: Liste d'actions (CREATE, VIEW, DELETE...)
+            since, until: Intervalle [since, until) de dates UTC
+            after: Curseur renvoyé par la page précédente
+            include_archive: Continuer dans les mois archivés (AuditArchive)
+        
+        Returns:
+            tuple: (liste d'AuditLog détachés, curseur de la page suivante ou None)
+        """
+        # Les événements encore en file doivent apparaître dans le résultat:
+        # écrits une fois, avant la première page
+        if after is None:
+            AuditWriter().flush()
+        logs, cursor = self._query_page(user_id, actions, entity_type, entity_id,
+                                        since, until, after, limit)
+        if cursor is not None or not include_archive:
+            return logs, cursor
+        
+        if logs:
+            after = (logs[-1].timestamp, logs[-1].id)
+        logs += self._query_archive_page(user_id, actions, entity_type, entity_id,
+                                         since, until, after, limit - len(logs))
+        cursor = (logs[-1].timestamp, logs[-1].id) if len(logs) == limit else None
+        return logs, cursor
+    
+    def _query_page(self, user_id, actions, entity_type, entity_id, since, until, after, limit):
         session = self.db.get_session()
         try:
-            log = AuditLog(
-                user_id=self.user.id,
-                action=action,
-                entity_type=entity_type,
-                entity_id=entity_id,
-                details=json.dumps(details) if isinstance(details, dict) else details
+            query = self._filtered_query(session, user_id, actions, entity_type,
+                                         entity_id, since, until)
+            if after is not None:
+                timestamp, last_id = after
+                query = query.filter(
+                    (AuditLog.timestamp < timestamp) |
+                    ((AuditLog.timestamp == timestamp) & (AuditLog.id < last_id))
+                )
+            
+            logs = (
+                query.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+                .limit(limit)
+                .all()
             )
+            session.expunge_all()
+        finally:
+            session.close()
+        
+        cursor = (logs[-1].timestamp, logs[-1].id) if len(logs) == limit else None
+        return logs, cursor
+    
+    def iter_logs(self, user_id=None, actions=None, entity_type=None, entity_id=None,
+                  since=None, until=None, include_archive=False, batch_size=1000):
+        """
+        Parcourir tout le journal filtré, page par page
+        
+        Seule la page courante est en mémoire. Avec include_archive, le
+        parcours continue dans les mois archivés une fois la table épuisée.
+        """
+        AuditWriter().flush()
+        
+        cursor = None
+        while True:
+            logs, cursor = self._query_page(user_id, actions, entity_type, entity_id,
+                                            since, until, cursor, batch_size)
+            yield from logs
+            if cursor is None:
+                break
+        
+        if not include_archive:
+            return
+        
+        from database.audit_archive import AuditArchive
+        
+        matches = self._archive_filter(user_id, actions, entity_type, entity_id)
+        for record in AuditArchive(db=self.db).iter_records(since, until, matches):
+            yield AuditLog(**record)
+    
+    def _archive_filter(self, user_id, actions, entity_type, entity_id):
+        """Filtres de _filtered_query, appliqués aux événements archivés"""
+        user_id = self._scoped_user_id(user_id)
+        
+        def matches(record):
+            return ((user_id is None or record['user_id'] == user_id) and
+                    (not actions or record['action'] in actions) and
+                    (not entity_type or record['entity_type'] == entity_type) and
+                    (not entity_id or record['entity_id'] == entity_id))
+        return matches
+    
+    def _query_archive_page(self, user_id, actions, entity_type, entity_id,
+                            since, until, after, limit):
+        """Suite d'une page dans les mois archivés, après le curseur after"""
+        from datetime import datetime, timedelta
+        from database.audit_archive import AuditArchive
+        
+        in_scope = matches = self._archive_filter(user_id, actions, entity_type, entity_id)
+        if after is not None:
+            # Les mois plus récents que le curseur ne sont pas ouverts
+            last_timestamp, last_id = after
+            cursor_until = last_timestamp + timedelta(microseconds=1)
+            until = cursor_until if until is None else min(until, cursor_until)
+            
+            def matches(record):
+                key = (record['timestamp'] or datetime.min, record['id'])
+                return key < (last_timestamp, last_id) and in_scope(record)
+        
+        logs = []
+        for record in AuditArchive(db=self.db).iter_records(since, until, matches):
+            logs.append(AuditLog(**record))
+            if len(logs) >= limit:
+                break
+        return logs
+    
+    def export_logs(self, file_path, fmt='csv', progress_callback=None,
+                    should_stop=None, **filters):
+        """
+        Exporter le journal filtré en CSV ou JSON lines, en flux
+        
+        Le fichier est écrit sous un nom temporaire puis renommé: un export
+        interrompu ne laisse pas de fichier partiel.
+        
+        Args:
+            fmt: 'csv' ou 'jsonl'
+            progress_callback: Appelée avec le nombre de lignes écrites
+            should_stop: Fonction sans argument, True pour interrompre
+            **filters: Filtres de iter_logs (user_id, actions, since...)
+        
+        Returns:
+            tuple: (succès, nombre de lignes ou message d'erreur)
+        """
+        if fmt not in ('csv', 'jsonl'):
+            return False, f"Format non supporté: {fmt}"
+        
+        tmp_path = f"{file_path}.part"
+        usernames = {}
+        count = 0
+        
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                writer = None
+                if fmt == 'csv':
+                    writer = csv.DictWriter(f, fieldnames=self.EXPORT_FIELDS)
+                    writer.writeheader()
+                
+                for log in self.iter_logs(**filters):
+                    if should_stop is not None and should_stop():
+                        raise InterruptedError("Export annulé")
+                    
+                    if log.user_id not in usernames:
+                        usernames[log.user_id] = self._username(log.user_id)
+                    
+                    record = {
+                        'id': log.id,
+                        'timestamp': log.timestamp.isoformat() if log.timestamp else None,
+                        'user_id': log.user_id,
+                        'username': usernames[log.user_id],
+                        'action': log.action,
+                        'entity_type': log.entity_type,
+                        'entity_id': log.entity_id,
+                        'details': log.details,
+                        'ip_address': log.ip_address,
+                    }
+                    if writer is not None:
+                        writer.writerow(record)
+                    else:
+                        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    
+                    count += 1
+                    if progress_callback and count % 1000 == 0:
+                        progress_callback(count)
             
-            session.add(log)
-            session.commit()
-            return True
+            os.replace(tmp_path, file_path)
         except Exception as e:
-            session.rollback()
-            return False
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False, str(e)
+        
+        if progress_callback:
+            progress_callback(count)
+        self.log_action('EXPORT', 'AUDIT', 0, {'file': os.path.basename(file_path), 'rows': count})
+        return True, count
+    
+    def _username(self, user_id):
+        values = ObjectCache().get(('user', user_id), lambda: self._load_user(user_id),
+                                   version=lambda values: self._user_version(user_id))
+        return values['username'] if values is not None else None
+    
+    def _load_user(self, user_id):
+        session = self.db.get_session()
+        try:
+            user = session.query(User).filter(User.id == user_id).first()
+            return (ObjectCache.snapshot(user), user.updated_at) if user else None
         finally:
             session.close()
     
-    def get_logs(self, entity_type=None, entity_id=None, limit=100):
-        """Get audit logs"""
+    def _user_version(self, user_id):
         session = self.db.get_session()
         try:
-            query = session.query(AuditLog).filter(AuditLog.user_id == self.user.id)
-            
-            if entity_type:
-                query = query.filter(AuditLog.entity_type == entity_type)
-            
-            if entity_id:
-                query = query.filter(AuditLog.entity_id == entity_id)
-            
-            logs = query.order_by(AuditLog.timestamp.desc()).limit(limit).all()
-            return logs
+            row = session.query(User.updated_at).filter(User.id == user_id).first()
+            return row[0] if row else None
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
+    
+    def archive_old_logs(self, retention_days=None, progress_callback=None):
+        """
+        Déplacer les mois anciens du journal vers les archives compressées
+        
+        Réservé aux administrateurs. Voir AuditArchive.rotate.
+        """
+        if not self.user.is_admin():
+            return False, "Action réservée aux administrateurs"
+        
+        from database.audit_archive import AuditArchive
+        try:
+            stats = AuditArchive(db=self.db).rotate(retention_days, progress_callback)
+        except Exception as e:
+            return False, f"Erreur lors de l'archivage: {e}"
+        
+        self.log_action('ARCHIVE', 'AUDIT', 0,
+                        {'months': stats['months'], 'archived': stats['archived']}, durable=True)
+        return True, stats
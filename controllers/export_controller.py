@@ -0,0 +1,261 @@
+# controllers/export_controller.py
+from database.db_manager import DatabaseManager
+from models.folder import Folder
+from models.file import File
+from controllers.audit_controller import AuditController
+from controllers.permission_resolver import PermissionResolver
+from utils.archive_stream import (ARCHIVE_FORMATS, ArchiveEntry, is_compressed_format,
+                                  open_archive_writer)
+from utils.enums import AccessLevel
+from sqlalchemy import and_, func, or_
+from datetime import timezone
+import os
+import re
+import tempfile
+import time
+
+# Caractères interdits dans un nom d'entrée (séparateurs, caractères de contrôle)
+_UNSAFE_NAME = re.compile(r'[/\\\x00-\x1f]')
+
+
+def _safe_name(name, fallback):
+    """Nom utilisable comme composant de chemin dans une archive"""
+    name = _UNSAFE_NAME.sub('_', name or '').strip()
+    return name if name not in ('', '.', '..') else str(fallback)
+
+
+def _unique_name(name, used):
+    """
+    Nom non encore utilisé dans un dossier de l'archive
+
+    La comparaison ignore la casse: l'archive doit pouvoir être extraite
+    sur un système de fichiers insensible à la casse.
+    """
+    stem, extension = os.path.splitext(name)
+    candidate = name
+    n = 2
+    while candidate.casefold() in used:
+        candidate = f"{stem} ({n}){extension}"
+        n += 1
+    used.add(candidate.casefold())
+    return candidate
+
+
+def _timestamp(moment):
+    """Horodatage POSIX d'une date de la base (naïve, en UTC)"""
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class ExportController:
+    """
+    Export d'un dossier et de ses sous-dossiers en une archive ZIP ou TAR
+
+    L'archive est écrite en flux (utils.archive_stream): les fichiers sont
+    lus directement dans le stockage, sans copie intermédiaire, et
+    l'arborescence est parcourue par lots au fil de l'écriture. Les
+    formats déjà compressés (images, vidéos, archives...) sont stockés
+    tels quels, les autres sont compressés en parallèle.
+
+    Un manifeste MANIFEST.sha256 termine l'archive: une ligne par
+    fichier, au format de sha256sum (vérifiable avec « sha256sum -c »
+    après extraction). Les empreintes sont calculées pendant l'écriture.
+    """
+
+    # Identifiants par requête IN (limite des paramètres SQL)
+    CHUNK_SIZE = 500
+    # Fichiers lus par requête
+    BATCH_SIZE = 1000
+    # Secondes minimum entre deux progressions
+    PROGRESS_INTERVAL = 0.25
+
+    MANIFEST_NAME = 'MANIFEST.sha256'
+
+    def __init__(self, user, db: DatabaseManager):
+        self.user = user
+        self.db = db
+        self.audit = AuditController(user, db)
+
+    def export_folder(self, folder_id, destination, fmt='zip', level=6, workers=None,
+                      progress_callback=None, should_stop=None):
+        """
+        Exporter un dossier et tout son sous-arbre dans une archive
+
+        L'archive est écrite sous un nom temporaire puis renommée: un export
+        interrompu ne laisse pas de fichier partiel. Un fichier absent du
+        stockage est ignoré et signalé dans les erreurs.
+
+        Args:
+            fmt: 'zip' ou 'tar'
+            level: Niveau de compression ZIP (0 = aucune)
+            workers: Threads de compression (ZIP)
+            progress_callback: Appelée avec (octets écrits, octets à écrire)
+            should_stop: Fonction sans argument, True pour interrompre
+
+        Returns:
+            tuple: (succès, statistiques ou message d'erreur)
+        """
+        if fmt not in ARCHIVE_FORMATS:
+            return False, f"Format non supporté: {fmt}"
+        if not self.user.is_admin() and \
+                not PermissionResolver(self.db).can(self.user, folder_id, AccessLevel.READ):
+            return False, "Permission refusée"
+
+        session = self.db.get_session()
+        try:
+            tree = self._load_tree(session, folder_id)
+            if not tree:
+                return False, "Dossier non trouvé"
+            total = self._total_size(session, [folder[0] for folder in tree])
+        finally:
+            session.close()
+
+        stats = {'path': destination, 'format': fmt, 'folders': len(tree),
+                 'files': 0, 'bytes': 0, 'errors': []}
+        tmp_path = f"{destination}.part"
+        manifest = tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='\n',
+                                               suffix='.sha256', delete=False)
+        last_progress = 0.0
+
+        try:
+            with open(tmp_path, 'wb') as out:
+                writer = open_archive_writer(fmt, out, level=level, workers=workers)
+
+                for result in writer.write(self._iter_entries(tree), should_stop):
+                    if result.error:
+                        stats['errors'].append(f"{result.entry.name}: {result.error}")
+                    elif result.entry.path is not None:
+                        manifest.write(f"{result.sha256}  {result.entry.name}\n")
+                        stats['files'] += 1
+                        stats['bytes'] += result.size
+
+                    now = time.monotonic()
+                    if progress_callback and now - last_progress >= self.PROGRESS_INTERVAL:
+                        last_progress = now
+                        progress_callback(stats['bytes'], total)
+
+                manifest.close()
+                for result in writer.write([ArchiveEntry(self.MANIFEST_NAME, manifest.name)]):
+                    if result.error:
+                        raise OSError(result.error)
+                writer.close()
+
+                out.flush()
+                os.fsync(out.fileno())
+
+            os.replace(tmp_path, destination)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False, str(e)
+        finally:
+            manifest.close()
+            os.remove(manifest.name)
+
+        if progress_callback:
+            progress_callback(stats['bytes'], total)
+
+        self.audit.log_action('EXPORT', 'FOLDER', folder_id, {
+            'file': os.path.basename(destination), 'format': fmt,
+            'files': stats['files'], 'bytes': stats['bytes'],
+        })
+        return True, stats
+
+    # ------------------------------
+    # Parcours de l'arborescence
+    # ------------------------------
+    def _load_tree(self, session, root_id):
+        """
+        Dossiers du sous-arbre dans l'ordre de l'archive
+
+        Returns:
+            list: (id, chemin dans l'archive, date, noms déjà pris), chaque
+                  dossier suivi de ses sous-dossiers; vide si le dossier
+                  n'existe pas
+        """
+        root = session.query(Folder.id, Folder.name, Folder.created_at).filter(
+            Folder.id == root_id
+        ).first()
+        if root is None:
+            return []
+
+        # Sous-dossiers par parent, un niveau de l'arbre par requête
+        children = {}
+        seen = {root_id}
+        level = [root_id]
+        while level:
+            next_level = []
+            for start in range(0, len(level), self.CHUNK_SIZE):
+                rows = (
+                    session.query(Folder.id, Folder.name, Folder.parent_id, Folder.created_at)
+                    .filter(Folder.parent_id.in_(level[start:start + self.CHUNK_SIZE]))
+                    .order_by(Folder.name, Folder.id)
+                    .all()
+                )
+                for row in rows:
+                    if row.id not in seen:
+                        seen.add(row.id)
+                        children.setdefault(row.parent_id, []).append(row)
+                        next_level.append(row.id)
+            level = next_level
+
+        tree = []
+        stack = [(root, _safe_name(root.name, root.id))]
+        while stack:
+            folder, path = stack.pop()
+            used = set()
+            subfolders = [
+                (child, f"{path}/{_unique_name(_safe_name(child.name, child.id), used)}")
+                for child in children.get(folder.id, [])
+            ]
+            tree.append((folder.id, path, _timestamp(folder.created_at), used))
+            stack.extend(reversed(subfolders))
+        return tree
+
+    def _total_size(self, session, folder_ids):
+        total = 0
+        for start in range(0, len(folder_ids), self.CHUNK_SIZE):
+            total += session.query(func.coalesce(func.sum(File.file_size), 0)).filter(
+                File.folder_id.in_(folder_ids[start:start + self.CHUNK_SIZE])
+            ).scalar() or 0
+        return total
+
+    def _iter_entries(self, tree):
+        """
+        Entrées de l'archive: chaque dossier puis ses fichiers, par ordre de nom
+
+        Chaque lot est lu dans sa propre session: aucune connexion n'est
+        retenue pendant la compression et l'écriture de l'archive.
+        """
+        for folder_id, path, mtime, used in tree:
+            yield ArchiveEntry(path, None, mtime)
+
+            # Pagination par clé (nom, id), couverte par ix_files_folder_name
+            last = None
+            while True:
+                batch = self._load_batch(folder_id, last)
+                if not batch:
+                    break
+
+                for row in batch:
+                    name = _unique_name(_safe_name(row.name, row.id), used)
+                    yield ArchiveEntry(f"{path}/{name}", row.file_path,
+                                       compress=not is_compressed_format(row.name, row.mime_type))
+                last = batch[-1]
+
+    def _load_batch(self, folder_id, last):
+        """Fichiers d'un dossier suivant la clé (nom, id) de last"""
+        session = self.db.get_session()
+        try:
+            query = session.query(File.id, File.name, File.file_path, File.mime_type).filter(
+                File.folder_id == folder_id
+            )
+            if last is not None:
+                query = query.filter(or_(File.name > last.name,
+                                         and_(File.name == last.name, File.id > last.id)))
+            return query.order_by(File.name, File.id).limit(self.BATCH_SIZE).all()
+        finally:
+            session.close()
@@ -1,20 +1,103 @@
 # controllers/file_controller.py
 from database.db_manager import DatabaseManager
 from models.file import File
+from models.file_integrity import FileIntegrity
+from models.rows import FileRow
 from controllers.audit_controller import AuditController
+from database.object_cache import ObjectCache
 from config.settings import Settings
+from utils.enums import IntegrityStatus
 import shutil
+import hashlib
 import os
+import re
+import time
 from pathlib import Path
-import magic
 import threading
+from datetime import datetime, timezone
+
+# Caractères refusés dans un nom de fichier par les systèmes courants
+_UNSAFE_STORAGE_NAME = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+# Clients cloud réutilisés entre les transferts, par type de cloud. Ils sont
+# oubliés quand leur configuration change (abonnement aux Settings).
+_cloud_clients = {}
+_cloud_clients_lock = threading.Lock()
+
+
+def _invalidate_cloud_clients(changed_keys):
+    """Oublier les clients cloud dont la configuration a été modifiée"""
+    with _cloud_clients_lock:
+        for cloud_type in list(_cloud_clients):
+            prefix = f'storage.cloud_config.{cloud_type}.'
+            if any(key.startswith(prefix) for key in changed_keys):
+                del _cloud_clients[cloud_type]
+
 
 class FileController:
+    # Colonnes autorisées pour le tri des listings paginés
+    SORTABLE_COLUMNS = {
+        'name': File.name,
+        'file_type': File.file_type,
+        'file_size': File.file_size,
+        'created_at': File.created_at,
+    }
+
+    # Blocs lus dans un flux à stocker
+    STREAM_CHUNK_SIZE = 1 << 20
+    # Fichiers insérés par transaction lors d'un import d'archive
+    IMPORT_BATCH_SIZE = 500
+    # Secondes minimum entre deux progressions
+    PROGRESS_INTERVAL = 0.25
+
     def __init__(self, user, db: DatabaseManager):
         self.user = user
         self.db = db
         self.audit = AuditController(user, db)
         self.settings = Settings()
+        self._magic = None
+    
+    def _cloud_client(self, cloud_type, config):
+        """
+        Client du cloud configuré, créé au premier transfert puis réutilisé
+        
+        Lève ImportError si la bibliothèque du cloud n'est pas installée.
+        """
+        with _cloud_clients_lock:
+            client = _cloud_clients.get(cloud_type)
+            if client is not None:
+                return client
+        
+        if cloud_type == 'aws_s3':
+            import boto3
+            
+            client = boto3.client(
+                's3',
+                aws_access_key_id=config.get('access_key'),
+                aws_secret_access_key=config.get('secret_key'),
+                region_name=config.get('region', 'us-east-1')
+            )
+        elif cloud_type == 'azure':
+            from azure.storage.blob import BlobServiceClient
+            
+            connection_string = f"DefaultEndpointsProtocol=https;AccountName={config.get('account_name')};AccountKey={config.get('account_key')};EndpointSuffix=core.windows.net"
+            client = BlobServiceClient.from_connection_string(connection_string)
+        elif cloud_type == 'google_cloud':
+            from google.cloud import storage
+            
+            # Définir les credentials si fournis
+            credentials_file = config.get('credentials_file')
+            if credentials_file and os.path.exists(credentials_file):
+                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_file
+            
+            client = storage.Client(project=config.get('project_id'))
+        else:
+            raise ValueError(f"Type de cloud non supporté: {cloud_type}")
+        
+        with _cloud_clients_lock:
+            if not _cloud_clients:
+                self.settings.subscribe(_invalidate_cloud_clients)
+            return _cloud_clients.setdefault(cloud_type, client)
     
     def _upload_to_cloud(self, file_path, file_name, folder_id):
         """
@@ -50,15 +133,9 @@ class FileController:
     def _upload_to_s3(self, file_path, remote_path, config):
         """Upload vers AWS S3"""
         try:
-            import boto3
             from botocore.exceptions import ClientError
             
-            s3_client = boto3.client(
-                's3',
-                aws_access_key_id=config.get('access_key'),
-                aws_secret_access_key=config.get('secret_key'),
-                region_name=config.get('region', 'us-east-1')
-            )
+            s3_client = self._cloud_client('aws_s3', config)
             
             bucket_name = config.get('bucket_name')
             s3_client.upload_file(file_path, bucket_name, remote_path)
@@ -76,10 +153,7 @@ class FileController:
     def _upload_to_azure(self, file_path, remote_path, config):
         """Upload vers Azure Blob Storage"""
         try:
-            from azure.storage.blob import BlobServiceClient
-            
-            connection_string = f"DefaultEndpointsProtocol=https;AccountName={config.get('account_name')};AccountKey={config.get('account_key')};EndpointSuffix=core.windows.net"
-            blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+            blob_service_client = self._cloud_client('azure', config)
             
             container_name = config.get('container_name')
             blob_client = blob_service_client.get_blob_client(
@@ -101,14 +175,7 @@ class FileController:
     def _upload_to_google_cloud(self, file_path, remote_path, config):
         """Upload vers Google Cloud Storage"""
         try:
-            from google.cloud import storage
-            
-            # Définir les credentials si fournis
-            credentials_file = config.get('credentials_file')
-            if credentials_file and os.path.exists(credentials_file):
-                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_file
-            
-            client = storage.Client(project=config.get('project_id'))
+            client = self._cloud_client('google_cloud', config)
             bucket = client.bucket(config.get('bucket_name'))
             blob = bucket.blob(remote_path)
             
@@ -188,14 +255,7 @@ class FileController:
     def _delete_from_s3(self, remote_path, config):
         """Supprimer de AWS S3"""
         try:
-            import boto3
-            
-            s3_client = boto3.client(
-                's3',
-                aws_access_key_id=config.get('access_key'),
-                aws_secret_access_key=config.get('secret_key'),
-                region_name=config.get('region', 'us-east-1')
-            )
+            s3_client = self._cloud_client('aws_s3', config)
             
             s3_client.delete_object(
                 Bucket=config.get('bucket_name'),
@@ -210,10 +270,7 @@ class FileController:
     def _delete_from_azure(self, remote_path, config):
         """Supprimer de Azure"""
         try:
-            from azure.storage.blob import BlobServiceClient
-            
-            connection_string = f"DefaultEndpointsProtocol=https;AccountName={config.get('account_name')};AccountKey={config.get('account_key')};EndpointSuffix=core.windows.net"
-            blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+            blob_service_client = self._cloud_client('azure', config)
             
             blob_client = blob_service_client.get_blob_client(
                 container=config.get('container_name'),
@@ -230,13 +287,7 @@ class FileController:
     def _delete_from_google_cloud(self, remote_path, config):
         """Supprimer de Google Cloud"""
         try:
-            from google.cloud import storage
-            
-            credentials_file = config.get('credentials_file')
-            if credentials_file and os.path.exists(credentials_file):
-                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_file
-            
-            client = storage.Client(project=config.get('project_id'))
+            client = self._cloud_client('google_cloud', config)
             bucket = client.bucket(config.get('bucket_name'))
             blob = bucket.blob(remote_path)
             
@@ -265,27 +316,114 @@ class FileController:
         except Exception as e:
             return False, str(e)
     
+    def download_from_cloud(self, file_name, folder_id, destination):
+        """
+        Télécharger la copie cloud d'un fichier (même chemin distant que l'upload)
+
+        Returns:
+            tuple: (succès, message)
+        """
+        try:
+            if not self.settings.get('storage.cloud_enabled'):
+                return False, "Cloud non activé"
+
+            cloud_type = self.settings.get('storage.cloud_type')
+            cloud_config = self.settings.get(f'storage.cloud_config.{cloud_type}', {})
+            remote_path = f"folder_{folder_id}/{file_name}"
+
+            if cloud_type == 'aws_s3':
+                return self._download_from_s3(remote_path, destination, cloud_config)
+            elif cloud_type == 'azure':
+                return self._download_from_azure(remote_path, destination, cloud_config)
+            elif cloud_type == 'google_cloud':
+                return self._download_from_google_cloud(remote_path, destination, cloud_config)
+            elif cloud_type == 'ftp':
+                return self._download_from_ftp(remote_path, destination, cloud_config)
+
+            return False, f"Type de cloud non supporté: {cloud_type}"
+
+        except Exception as e:
+            print(f"⚠️  Erreur téléchargement cloud: {e}")
+            return False, str(e)
+
+    def _download_from_s3(self, remote_path, destination, config):
+        """Télécharger depuis AWS S3"""
+        try:
+            s3_client = self._cloud_client('aws_s3', config)
+            s3_client.download_file(config.get('bucket_name'), remote_path, str(destination))
+            return True, "Téléchargé depuis S3"
+        except Exception as e:
+            return False, str(e)
+
+    def _download_from_azure(self, remote_path, destination, config):
+        """Télécharger depuis Azure"""
+        try:
+            blob_service_client = self._cloud_client('azure', config)
+
+            blob_client = blob_service_client.get_blob_client(
+                container=config.get('container_name'),
+                blob=remote_path
+            )
+
+            with open(destination, 'wb') as out:
+                blob_client.download_blob().readinto(out)
+            return True, "Téléchargé depuis Azure"
+        except Exception as e:
+            return False, str(e)
+
+    def _download_from_google_cloud(self, remote_path, destination, config):
+        """Télécharger depuis Google Cloud"""
+        try:
+            client = self._cloud_client('google_cloud', config)
+            bucket = client.bucket(config.get('bucket_name'))
+            bucket.blob(remote_path).download_to_filename(str(destination))
+            return True, "Téléchargé depuis Google Cloud"
+        except Exception as e:
+            return False, str(e)
+
+    def _download_from_ftp(self, remote_path, destination, config):
+        """Télécharger depuis le FTP"""
+        try:
+            from ftplib import FTP
+
+            ftp = FTP()
+            ftp.connect(config.get('host'), int(config.get('port', 21)))
+            ftp.login(config.get('username'), config.get('password'))
+
+            ftp.cwd(config.get('remote_path', '/'))
+            with open(destination, 'wb') as out:
+                ftp.retrbinary(f'RETR {remote_path}', out.write)
+            ftp.quit()
+            return True, "Téléchargé depuis le FTP"
+        except Exception as e:
+            return False, str(e)
+
     def add_file(self, source_path, folder_id):
         """Add file to archive (local + cloud si activé)"""
+        dest_path = None
         session = self.db.get_session()
         try:
-            # Get storage base path
-            base_path = Path(self.settings.get('storage.base_path', 'storage/files'))
-            base_path.mkdir(parents=True, exist_ok=True)
-            
-            # Create destination path
+            # Chemin libre: deux fichiers de même nom ne partagent jamais le stockage
             file_name = Path(source_path).name
-            dest_path = base_path / str(folder_id) / file_name
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            dest_path = self._storage_path(folder_id, file_name)
+            tmp_path = dest_path.with_name(dest_path.name + '.part')
             
-            # Copy file localement
-            shutil.copy2(source_path, dest_path)
+            # Copy file localement (nom temporaire: pas de fichier partiel)
+            try:
+                shutil.copy2(source_path, tmp_path)
+                os.replace(tmp_path, dest_path)
+            except BaseException:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+                dest_path = None
+                raise
             
             # Get file info
             file_size = os.path.getsize(dest_path)
             
             # Get MIME type using python-magic
             try:
+                import magic  # chargé au premier import de fichier
                 mime = magic.Magic(mime=True)
                 mime_type = mime.from_file(str(dest_path))
             except Exception as e:
@@ -322,7 +460,7 @@ class FileController:
                 # Lancer l'upload dans un thread séparé pour ne pas bloquer
                 upload_thread = threading.Thread(
                     target=self._upload_to_cloud,
-                    args=(str(dest_path), file_name, folder_id),
+                    args=(str(dest_path), dest_path.name, folder_id),
                     daemon=True
                 )
                 upload_thread.start()
@@ -333,10 +471,330 @@ class FileController:
             
         except Exception as e:
             session.rollback()
+            if dest_path is not None and dest_path.exists():
+                dest_path.unlink()
             return False, str(e)
         finally:
             session.close()
     
+    # ------------------------------
+    # Import en flux
+    # ------------------------------
+    def _storage_path(self, folder_id, file_name):
+        """
+        Chemin de stockage libre pour un nouveau fichier du dossier
+
+        Un fichier existant n'est jamais écrasé: un suffixe « (2) »,
+        « (3) »... est ajouté au nom stocké. Le nom est réservé en créant
+        le fichier temporaire « <nom>.part » (création exclusive): deux
+        imports parallèles ne peuvent pas choisir le même chemin.
+        L'appelant écrit dans ce fichier puis le renomme, ou le supprime.
+        """
+        folder_path = Path(self.settings.get('storage.base_path', 'storage/files')) / str(folder_id)
+        folder_path.mkdir(parents=True, exist_ok=True)
+
+        name = _UNSAFE_STORAGE_NAME.sub('_', file_name).strip() or 'fichier'
+        stem, suffix = os.path.splitext(name)
+        dest_path = folder_path / name
+        n = 2
+        while True:
+            if not dest_path.exists():
+                tmp_path = dest_path.with_name(dest_path.name + '.part')
+                try:
+                    os.close(os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                except FileExistsError:
+                    pass
+                else:
+                    # Nom libéré par un import terminé entre les deux tests
+                    if not dest_path.exists():
+                        return dest_path
+                    tmp_path.unlink()
+            dest_path = folder_path / f"{stem} ({n}){suffix}"
+            n += 1
+
+    def _detect_mime_type(self, head):
+        """Type MIME d'après les premiers octets du contenu"""
+        try:
+            if self._magic is None:
+                import magic  # chargé au premier import de fichier
+                self._magic = magic.Magic(mime=True)
+            return self._magic.from_buffer(head)
+        except Exception as e:
+            print(f"Avertissement: Impossible de détecter le MIME type: {e}")
+            return 'application/octet-stream'
+
+    def _store_stream(self, stream, file_name, folder_id, mtime=None, should_stop=None):
+        """
+        Écrire un flux directement dans le stockage
+
+        Le contenu est écrit sous un nom temporaire puis renommé: un flux
+        illisible ou interrompu ne laisse pas de fichier partiel. Le
+        SHA-256 est calculé au passage.
+
+        Returns:
+            tuple: (chemin, taille, type MIME, SHA-256)
+        """
+        dest_path = self._storage_path(folder_id, file_name)
+        tmp_path = dest_path.with_name(dest_path.name + '.part')
+        digest = hashlib.sha256()
+        size = 0
+
+        try:
+            with open(tmp_path, 'wb') as out:
+                chunk = stream.read(self.STREAM_CHUNK_SIZE)
+                mime_type = self._detect_mime_type(chunk[:8192])
+                while chunk:
+                    if should_stop is not None and should_stop():
+                        raise InterruptedError("Import annulé")
+                    out.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                    chunk = stream.read(self.STREAM_CHUNK_SIZE)
+            os.replace(tmp_path, dest_path)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+        if mtime is not None:
+            os.utime(dest_path, (mtime, mtime))
+        return dest_path, size, mime_type, digest.hexdigest()
+
+    def _new_file(self, file_name, dest_path, size, mime_type, folder_id):
+        return File(
+            name=file_name[:255],
+            file_path=str(dest_path),
+            file_type=Path(file_name).suffix[1:][:50],
+            file_size=size,
+            mime_type=(mime_type or '')[:100] or None,
+            folder_id=folder_id,
+            uploaded_by=self.user.id
+        )
+
+    def _cloud_enabled(self):
+        return self.settings.get('storage.cloud_enabled') or \
+            self.settings.get('storage.cloud_backup_enabled')
+
+    def _upload_batch_to_cloud(self, files):
+        """Envoyer un lot de fichiers vers le cloud, l'un après l'autre (thread séparé)"""
+        for file_path, folder_id in files:
+            self._upload_to_cloud(file_path, Path(file_path).name, folder_id)
+
+    def add_file_from_stream(self, stream, file_name, folder_id, mtime=None):
+        """
+        Ajouter un fichier à partir d'un flux binaire (membre d'archive, réseau...)
+
+        Le contenu est écrit directement dans le stockage, sans fichier
+        source sur disque.
+        """
+        dest_path = None
+        session = self.db.get_session()
+        try:
+            dest_path, size, mime_type, digest = self._store_stream(stream, file_name, folder_id, mtime)
+            file = self._new_file(file_name, dest_path, size, mime_type, folder_id)
+            file.integrity = FileIntegrity.baseline(digest, size)
+            session.add(file)
+            session.commit()
+
+            self.audit.log_action('CREATE', 'FILE', file.id,
+                                  f"Ajout du fichier: {file.name}")
+            session.expunge(file)
+
+            if self._cloud_enabled():
+                threading.Thread(
+                    target=self._upload_to_cloud,
+                    args=(str(dest_path), dest_path.name, folder_id),
+                    daemon=True
+                ).start()
+
+            return True, file
+        except Exception as e:
+            session.rollback()
+            if dest_path is not None and dest_path.exists():
+                dest_path.unlink()
+            return False, str(e)
+        finally:
+            session.close()
+
+    def import_archive(self, archive_path, folder_id, progress_callback=None, should_stop=None):
+        """
+        Importer le contenu d'une archive ZIP ou TAR dans un dossier d'archive
+
+        Les membres sont décompressés en flux et écrits directement dans le
+        stockage: l'archive n'est jamais extraite sur disque. Les
+        répertoires de l'archive deviennent des sous-dossiers (un
+        sous-dossier de même nom existant est réutilisé). Dossiers et
+        fichiers sont insérés par lots de IMPORT_BATCH_SIZE fichiers, une
+        transaction par lot. Un membre illisible est ignoré et signalé.
+
+        Une archive produite par ExportController contient un manifeste
+        MANIFEST.sha256 à sa racine: il n'est pas importé, mais sert à
+        vérifier l'empreinte de chaque fichier (écarts signalés en erreur).
+
+        Si l'import est interrompu (annulation, archive corrompue), seul le
+        lot en cours est annulé: les lots précédents restent importés.
+
+        Args:
+            progress_callback: Appelée avec (octets de l'archive lus, taille de l'archive)
+            should_stop: Fonction sans argument, True pour interrompre
+
+        Returns:
+            tuple: (succès, statistiques ou message d'erreur)
+        """
+        from controllers.export_controller import ExportController
+        from controllers.folder_controller import invalidate_folder_caches
+        from controllers.permission_resolver import PermissionResolver
+        from models.folder import Folder
+        from utils.archive_stream import detect_archive_format, iter_archive_members
+        from utils.enums import AccessLevel
+
+        if not os.path.isfile(archive_path):
+            return False, f"Archive introuvable: {archive_path}"
+        fmt = detect_archive_format(archive_path)
+        if fmt is None:
+            return False, "Format d'archive non reconnu (ZIP ou TAR attendu)"
+        if not self.user.is_admin() and \
+                not PermissionResolver(self.db).can(self.user, folder_id, AccessLevel.WRITE):
+            return False, "Permission refusée"
+
+        archive_name = os.path.basename(archive_path)
+        total = os.path.getsize(archive_path)
+        stats = {'folders': 0, 'files': 0, 'bytes': 0, 'errors': []}
+
+        # Chemin dans l'archive -> id du dossier ('' = dossier de destination)
+        folder_ids = {'': folder_id}
+        new_folders = []
+        new_files = []
+        # Empreintes calculées et attendues (manifeste), par chemin dans l'archive
+        digests = {}
+        expected = None
+        last_progress = 0.0
+
+        session = self.db.get_session()
+
+        def ensure_folder(path):
+            if path in folder_ids:
+                return folder_ids[path]
+            parent_path, _, name = path.rpartition('/')
+            parent_id = ensure_folder(parent_path)
+
+            existing = session.query(Folder.id).filter(
+                Folder.parent_id == parent_id, Folder.name == name
+            ).order_by(Folder.id).first()
+            if existing is not None:
+                folder_ids[path] = existing[0]
+            else:
+                folder = Folder(name=name[:255], parent_id=parent_id, owner_id=self.user.id)
+                session.add(folder)
+                session.flush()
+                folder_ids[path] = folder.id
+                new_folders.append((path, folder))
+            return folder_ids[path]
+
+        def commit_batch():
+            session.add_all(file for file, _ in new_files)
+            session.flush()
+            # Valeurs lues avant le commit, qui expire les objets
+            folders = [(folder.id, folder.name) for _, folder in new_folders]
+            files = [(file.id, file.name, file.file_path, file.folder_id, file.file_size)
+                     for file, _ in new_files]
+            session.commit()
+            new_folders.clear()
+            new_files.clear()
+            session.expunge_all()
+
+            if folders:
+                invalidate_folder_caches()
+            for created_id, name in folders:
+                self.audit.log_action('CREATE', 'FOLDER', created_id, f"Création du dossier: {name}")
+            for created_id, name, _, _, _ in files:
+                self.audit.log_action('CREATE', 'FILE', created_id,
+                                      f"Import de l'archive {archive_name}: {name}")
+
+            if files and self._cloud_enabled():
+                threading.Thread(
+                    target=self._upload_batch_to_cloud,
+                    args=([(file_path, target_id) for _, _, file_path, target_id, _ in files],),
+                    daemon=True
+                ).start()
+
+            stats['folders'] += len(folders)
+            stats['files'] += len(files)
+            stats['bytes'] += sum(size for _, _, _, _, size in files)
+
+        try:
+            with open(archive_path, 'rb') as raw:
+                for member in iter_archive_members(raw, fmt):
+                    if should_stop is not None and should_stop():
+                        raise InterruptedError("Import annulé")
+
+                    if member.is_dir:
+                        ensure_folder(member.name)
+                    elif member.name == ExportController.MANIFEST_NAME and not member.error:
+                        expected = self._read_manifest(member.stream)
+                    elif member.error:
+                        stats['errors'].append(f"{member.name}: {member.error}")
+                    else:
+                        parent_path, _, file_name = member.name.rpartition('/')
+                        target_id = ensure_folder(parent_path)
+                        try:
+                            dest_path, size, mime_type, digest = self._store_stream(
+                                member.stream, file_name, target_id, member.mtime, should_stop)
+                        except InterruptedError:
+                            raise
+                        except Exception as e:
+                            stats['errors'].append(f"{member.name}: {e}")
+                        else:
+                            file = self._new_file(file_name, dest_path, size, mime_type, target_id)
+                            file.integrity = FileIntegrity.baseline(digest, size)
+                            new_files.append((file, dest_path))
+                            digests[member.name] = digest
+
+                    if len(new_files) >= self.IMPORT_BATCH_SIZE:
+                        commit_batch()
+
+                    now = time.monotonic()
+                    if progress_callback and now - last_progress >= self.PROGRESS_INTERVAL:
+                        last_progress = now
+                        progress_callback(raw.tell(), total)
+
+            commit_batch()
+        except Exception as e:
+            session.rollback()
+            # Les fichiers du lot annulé ne sont référencés par aucune ligne
+            for _, dest_path in new_files:
+                if dest_path.exists():
+                    dest_path.unlink()
+            if new_folders:
+                invalidate_folder_caches()
+            message = str(e) or type(e).__name__
+            if stats['files']:
+                message += f" ({stats['files']} fichier(s) déjà importé(s))"
+            return False, message
+        finally:
+            session.close()
+
+        if expected is not None:
+            for name, digest in expected.items():
+                if name not in digests:
+                    stats['errors'].append(f"{name}: absent de l'archive ou illisible")
+                elif digests[name] != digest:
+                    stats['errors'].append(f"{name}: empreinte SHA-256 différente du manifeste")
+
+        if progress_callback:
+            progress_callback(total, total)
+        return True, stats
+
+    @staticmethod
+    def _read_manifest(stream):
+        """Empreintes d'un manifeste au format de sha256sum: {chemin: sha256}"""
+        expected = {}
+        for line in stream.read().decode('utf-8', errors='replace').splitlines():
+            digest, separator, name = line.partition('  ')
+            if separator and len(digest) == 64:
+                expected[name.lstrip('*')] = digest.lower()
+        return expected
+
     def get_files_in_folder(self, folder_id):
         """Get all files in a folder"""
         session = self.db.get_session()
@@ -349,17 +807,96 @@ class FileController:
             return files
         finally:
             session.close()
-    
+
+    def count_files_in_folder(self, folder_id):
+        """Compter les fichiers d'un dossier sans les charger"""
+        session = self.db.get_session()
+        try:
+            from sqlalchemy import func
+
+            return session.query(func.count(File.id)).filter(
+                File.folder_id == folder_id
+            ).scalar() or 0
+        finally:
+            session.close()
+
+    def get_file_rows(self, folder_id, offset=0, limit=200,
+                      sort_key='name', descending=False):
+        """
+        Récupérer une page de lignes compactes (FileRow) d'un dossier
+
+        Le tri est fait en SQL; l'id sert de départage pour que les pages
+        successives restent stables.
+        """
+        session = self.db.get_session()
+        try:
+            column = self.SORTABLE_COLUMNS.get(sort_key, File.name)
+            order = [column.desc(), File.id.desc()] if descending else [column.asc(), File.id.asc()]
+
+            rows = (
+                session.query(
+                    File.id, File.name, File.file_type,
+                    File.file_size, File.mime_type, File.created_at
+                )
+                .filter(File.folder_id == folder_id)
+                .order_by(*order)
+                .offset(offset)
+                .limit(limit)
+                .all()
+            )
+            return [FileRow(*row) for row in rows]
+        finally:
+            session.close()
+
+    def get_file_paths(self, file_ids):
+        """
+        Récupérer les chemins de plusieurs fichiers en une seule requête
+
+        Returns:
+            dict: {id du fichier: chemin}
+        """
+        if not file_ids:
+            return {}
+
+        session = self.db.get_session()
+        try:
+            rows = (
+                session.query(File.id, File.file_path)
+                .filter(File.id.in_(list(file_ids)))
+                .all()
+            )
+            return {file_id: file_path for file_id, file_path in rows}
+        finally:
+            session.close()
+
     def get_file_by_id(self, file_id):
-        """Get file by ID"""
+        """Get file by ID (servi par l'ObjectCache, validé sur updated_at)"""
+        values = ObjectCache().get(('file', file_id), lambda: self._load_file(file_id),
+                                   version=lambda values: self._file_version(file_id))
+        return ObjectCache.materialize(File, values) if values is not None else None
+    
+    def _load_file(self, file_id):
         session = self.db.get_session()
         try:
             file = session.query(File).filter(File.id == file_id).first()
-            
-            if file:
-                session.expunge(file)
-            
-            return file
+            if file is None:
+                return None
+            return ObjectCache.snapshot(file), file.updated_at
+        finally:
+            session.close()
+    
+    def _file_exists(self, file_id):
+        session = self.db.get_session()
+        try:
+            return session.query(File.id).filter(File.id == file_id).first() is not None
+        finally:
+            session.close()
+    
+    def _file_version(self, file_id):
+        session = self.db.get_session()
+        try:
+            row = session.query(File.updated_at).filter(File.id == file_id).first()
+            return row[0] if row else None
         finally:
             session.close()
     
@@ -378,6 +915,7 @@ class FileController:
             # Delete from database first
             session.delete(file)
             session.commit()
+            ObjectCache().invalidate(('file', file_id))
             
             # Log action
             self.audit.log_action('DELETE', 'FILE', file_id, 
@@ -396,9 +934,10 @@ class FileController:
                self.settings.get('storage.cloud_backup_enabled'):
                 
                 # Lancer la suppression cloud dans un thread
+                # Copie cloud envoyée sous le nom stocké
                 delete_thread = threading.Thread(
                     target=self._delete_from_cloud,
-                    args=(file_name, folder_id),
+                    args=(Path(file_path).name, folder_id),
                     daemon=True
                 )
                 delete_thread.start()
@@ -422,6 +961,10 @@ class FileController:
                 return False, "Fichier non trouvé"
             
             if not os.path.exists(file.file_path):
+                from controllers.integrity_controller import record_problem
+                record_problem(session, file_id, IntegrityStatus.MISSING,
+                               "Fichier absent lors d'un téléchargement")
+                session.commit()
                 return False, "Le fichier source n'existe plus sur le disque"
             
             # Copy file to destination
@@ -452,6 +995,7 @@ class FileController:
                     setattr(file, key, value)
             
             session.commit()
+            ObjectCache().invalidate(('file', file_id))
             
             self.audit.log_action('UPDATE', 'FILE', file_id, 
                                 f"Modification du fichier: {file.name}")
@@ -465,6 +1009,174 @@ class FileController:
         finally:
             session.close()
     
+    def update_file_content(self, file_id, source_path):
+        """
+        Remplacer le contenu archivé d'un fichier par une nouvelle version
+
+        Utilisé par l'import incrémental quand un fichier source a changé.
+        """
+        session = self.db.get_session()
+        try:
+            file = session.query(File).filter(File.id == file_id).first()
+            if not file:
+                return False, "Fichier non trouvé"
+            
+            dest_path = Path(file.file_path)
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source_path, dest_path)
+            
+            file.file_size = os.path.getsize(dest_path)
+            try:
+                import magic
+                mime = magic.Magic(mime=True)
+                file.mime_type = mime.from_file(str(dest_path))
+            except Exception as e:
+                print(f"Avertissement: Impossible de détecter le MIME type: {e}")
+            file.updated_at = datetime.now(timezone.utc)
+            # Nouveau contenu: la référence sera recalculée à la prochaine vérification
+            file.integrity = None
+            
+            session.commit()
+            ObjectCache().invalidate(('file', file_id))
+            
+            self.audit.log_action('UPDATE', 'FILE', file_id,
+                                f"Nouvelle version du fichier: {file.name}")
+            
+            session.expunge(file)
+            
+            if self.settings.get('storage.cloud_enabled') or \
+               self.settings.get('storage.cloud_backup_enabled'):
+                upload_thread = threading.Thread(
+                    target=self._upload_to_cloud,
+                    args=(str(dest_path), file.name, file.folder_id),
+                    daemon=True
+                )
+                upload_thread.start()
+            
+            return True, file
+            
+        except Exception as e:
+            session.rollback()
+            return False, str(e)
+        finally:
+            session.close()
+    
+    def sync_folder(self, source_root, folder_id, recursive=True,
+                    progress_callback=None, should_stop=None, file_filter=None, paths=None):
+        """
+        Import incrémental d'un dossier source dans un dossier d'archive
+        
+        Le dossier est scanné puis comparé à son manifeste (ScanManifest):
+        seuls les fichiers nouveaux et modifiés sont copiés. Les fichiers
+        déplacés dans la source sont reportés dans le manifeste sans être
+        recopiés. Les fichiers supprimés de la source restent archivés et
+        sont seulement retirés du manifeste. Au premier passage, tout le
+        dossier est importé.
+        
+        Avec paths, seuls ces fichiers du dossier source sont comparés au
+        manifeste (sélection de l'utilisateur): les autres fichiers connus
+        ne sont pas considérés comme supprimés.
+        
+        Args:
+            source_root: Dossier source
+            folder_id: Dossier d'archive de destination
+            paths: Fichiers du dossier source à synchroniser (None = tout le dossier)
+            progress_callback: Appelée avec (traités, total)
+            should_stop: Fonction sans argument, True pour interrompre
+            file_filter: Fonction (chemin) -> bool pour ignorer des fichiers
+        
+        Returns:
+            dict: Compteurs new/changed/moved/deleted/unchanged et erreurs
+        """
+        from utils.scanner import FolderScanner
+        from utils.scan_manifest import ScanManifest
+        from utils.file_handler import FileHandler
+        
+        stats = {'new': 0, 'changed': 0, 'moved': 0, 'deleted': 0,
+                 'unchanged': 0, 'errors': []}
+        
+        with ScanManifest(source_root, folder_id) as manifest:
+            scanner = FolderScanner(exclude_hidden=False)
+            if paths is None:
+                scanned_files = scanner.iter_files(source_root, recursive)
+            else:
+                scanned_files = self._stat_files(paths, stats['errors'])
+            if file_filter is not None:
+                scanned_files = (scanned for scanned in scanned_files if file_filter(scanned.path))
+            delta = manifest.compute_delta(scanned_files, complete=paths is None)
+            stats['unchanged'] = delta.unchanged
+            stats['errors'].extend(f"{path}: {message}" for path, message in scanner.errors)
+            
+            # Déplacements et suppressions: le manifeste seul est mis à jour
+            for scanned, old_rel_path in delta.moved:
+                manifest.record_move(old_rel_path, scanned)
+            stats['moved'] = len(delta.moved)
+            
+            for rel_path, _ in delta.deleted:
+                manifest.forget(rel_path)
+            stats['deleted'] = len(delta.deleted)
+            manifest.commit()
+            
+            total = len(delta.new) + len(delta.changed)
+            done = 0
+            
+            for scanned in delta.new:
+                if should_stop is not None and should_stop():
+                    return stats
+                
+                success, result = self.add_file(scanned.path, folder_id)
+                if success:
+                    manifest.record(scanned, result.id, FileHandler.get_file_hash(scanned.path))
+                    stats['new'] += 1
+                else:
+                    stats['errors'].append(f"{scanned.name}: {result}")
+                
+                done += 1
+                if done % 100 == 0:
+                    manifest.commit()
+                if progress_callback:
+                    progress_callback(done, total)
+            
+            for scanned, file_id, old_hash in delta.changed:
+                if should_stop is not None and should_stop():
+                    return stats
+                
+                new_hash = FileHandler.get_file_hash(scanned.path)
+                if old_hash is not None and new_hash == old_hash:
+                    # Date modifiée mais contenu identique: rien à recopier
+                    manifest.record(scanned, file_id, new_hash)
+                    stats['unchanged'] += 1
+                else:
+                    if file_id is not None:
+                        success, result = self.update_file_content(file_id, scanned.path)
+                    if file_id is None or (not success and not self._file_exists(file_id)):
+                        # Fichier archivé supprimé entre temps: le réimporter
+                        success, result = self.add_file(scanned.path, folder_id)
+                    
+                    if success:
+                        manifest.record(scanned, result.id, new_hash)
+                        stats['changed'] += 1
+                    else:
+                        stats['errors'].append(f"{scanned.name}: {result}")
+                
+                done += 1
+                if done % 100 == 0:
+                    manifest.commit()
+                if progress_callback:
+                    progress_callback(done, total)
+        
+        return stats
+    
+    @staticmethod
+    def _stat_files(paths, errors):
+        from utils.scanner import FolderScanner
+        
+        for path in paths:
+            try:
+                yield FolderScanner.stat_file(path)
+            except OSError as e:
+                errors.append(f"{os.path.basename(path)}: {e}")
+    
     def search_files(self, query=None, file_type=None, folder_id=None):
         """Search files with filters"""
         session = self.db.get_session()
@@ -3,11 +3,151 @@ from database.db_manager import DatabaseManager
 from models.folder import Folder
 from models.file import File
 from controllers.audit_controller import AuditController
-from sqlalchemy import or_, func
-from sqlalchemy.orm import selectinload
+from controllers.permission_resolver import PermissionResolver
+from database.object_cache import ObjectCache
+from models.user import User
+from models.rows import FolderRow
+from sqlalchemy import or_, func, select
+from sqlalchemy.orm import selectinload, aliased
 import os
 import shutil
 
+# Critères de tri des dossiers (clé -> colonne)
+FOLDER_SORT_COLUMNS = {
+    'name': Folder.name,
+    'created_at': Folder.created_at,
+    'year': Folder.year,
+    'theme': Folder.theme,
+    'sector': Folder.sector,
+}
+
+DEFAULT_FOLDER_SORT = [('name', False)]
+
+# Attributs dont dépendent les permissions héritées
+ACCESS_ATTRIBUTES = {'parent_id', 'owner_id', 'visibility'}
+
+
+def normalize_folder_sort(sort=None):
+    """
+    Normaliser une spécification de tri multi-critères
+
+    Accepte une clé ('year'), une clé préfixée par '-' pour un tri
+    décroissant ('-year'), un tuple (clé, décroissant) ou une liste de
+    ces éléments. Les clés inconnues sont ignorées.
+
+    Returns:
+        list: Liste de tuples (clé, décroissant)
+    """
+    if not sort:
+        return list(DEFAULT_FOLDER_SORT)
+
+    if isinstance(sort, (str, tuple)):
+        sort = [sort]
+
+    keys = []
+    for item in sort:
+        if isinstance(item, str):
+            key, descending = item.lstrip('-'), item.startswith('-')
+        else:
+            key, descending = item[0], bool(item[1])
+        if key in FOLDER_SORT_COLUMNS and key not in [k for k, _ in keys]:
+            keys.append((key, descending))
+
+    return keys or list(DEFAULT_FOLDER_SORT)
+
+
+def folder_order_by(sort=None):
+    """Clauses ORDER BY pour un tri multi-critères (id en départage)"""
+    clauses = []
+    for key, descending in normalize_folder_sort(sort):
+        column = FOLDER_SORT_COLUMNS[key]
+        clauses.append(column.desc() if descending else column.asc())
+    clauses.append(Folder.id.asc())
+    return clauses
+
+
+def attach_subfolder_counts(folders, session):
+    """Compter les sous-dossiers directs de chaque dossier en une requête"""
+    if not folders:
+        return
+
+    counts = dict(
+        session.query(Folder.parent_id, func.count(Folder.id))
+        .filter(Folder.parent_id.in_([folder.id for folder in folders]))
+        .group_by(Folder.parent_id)
+        .all()
+    )
+    for folder in folders:
+        folder.subfolder_count = counts.get(folder.id, 0)
+
+
+def load_sorted_subfolders(folders, session, sort=None):
+    """
+    Charger toute l'arborescence sous des dossiers, niveau par niveau
+
+    Une requête triée par niveau remplit la collection subfolders de
+    chaque dossier dans l'ordre demandé, sans requête par dossier.
+    """
+    from sqlalchemy.orm.attributes import set_committed_value
+
+    level = list(folders)
+    while level:
+        children = (
+            session.query(Folder)
+            .options(selectinload(Folder.owner))
+            .filter(Folder.parent_id.in_([folder.id for folder in level]))
+            .order_by(*folder_order_by(sort))
+            .all()
+        )
+        by_parent = {}
+        for child in children:
+            by_parent.setdefault(child.parent_id, []).append(child)
+
+        for folder in level:
+            subfolders = by_parent.get(folder.id, [])
+            set_committed_value(folder, 'subfolders', subfolders)
+            folder.subfolder_count = len(subfolders)
+
+        level = children
+
+
+
+def fetch_folder_rows(session, filters, sort=None, offset=0, limit=None):
+    """
+    Lignes compactes (FolderRow) des dossiers vérifiant filters, triées en SQL
+
+    Une seule requête sur quelques colonnes: le nom du propriétaire vient
+    d'une jointure et le nombre de sous-dossiers d'une sous-requête
+    corrélée (index ix_folders_parent_name), sans instance ORM.
+    """
+    child = aliased(Folder)
+    subfolder_count = (
+        select(func.count(child.id))
+        .where(child.parent_id == Folder.id)
+        .correlate(Folder)
+        .scalar_subquery()
+    )
+    query = (
+        select(Folder.id, Folder.name, Folder.parent_id, Folder.owner_id, User.username,
+               Folder.visibility, Folder.year, Folder.theme, Folder.sector,
+               Folder.created_at, subfolder_count)
+        .outerjoin(User, User.id == Folder.owner_id)
+        .where(*filters)
+        .order_by(*folder_order_by(sort))
+    )
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    return [FolderRow(*row) for row in session.execute(query)]
+
+
+def invalidate_folder_caches():
+    """Oublier les dossiers et arborescences en cache après une écriture"""
+    cache = ObjectCache()
+    cache.invalidate_kind('folder')
+    cache.invalidate_kind('folder_tree')
+
 class FolderController:
     def __init__(self, user, db: DatabaseManager):
         self.user = user
@@ -31,6 +171,7 @@ class FolderController:
             
             session.add(folder)
             session.commit()
+            invalidate_folder_caches()
             
             self.audit.log_action('CREATE', 'FOLDER', folder.id, 
                                 f"Création du dossier: {name}")
@@ -42,26 +183,34 @@ class FolderController:
         finally:
             session.close()
     
-    def get_root_folders(self):
-        """Get all root folders (no parent) and load all subfolders recursively"""
+    def get_root_folders(self, sort=None, offset=0, limit=None, recursive=True):
+        """
+        Get root folders (no parent), sorted in SQL
+
+        Args:
+            sort: Spécification de tri (voir normalize_folder_sort)
+            offset, limit: Pagination des dossiers racines
+            recursive: Charger toute l'arborescence (triée) ou seulement
+                       le nombre de sous-dossiers pour un chargement paresseux
+        """
         session = self.db.get_session()
         try:
-            folders = (
+            query = (
                 session.query(Folder)
-                .options(
-                    selectinload(Folder.subfolders),
-                    selectinload(Folder.owner) # ✅ Charger l'utilisateur lié
-                    )
+                .options(selectinload(Folder.owner)) # ✅ Charger l'utilisateur lié
                 .filter(
                     Folder.parent_id.is_(None),
                     Folder.owner_id == self.user.id
                 )
-                .all()
+                .order_by(*folder_order_by(sort))
             )
+            folders = self._paginate(query, offset, limit).all()
 
-            # Charger récursivement tous les sous-dossiers
-            for folder in folders:
-                self._load_all_subfolders(folder, session)
+            if recursive:
+                # Charger récursivement tous les sous-dossiers, dans le même ordre
+                load_sorted_subfolders(folders, session, sort)
+            else:
+                attach_subfolder_counts(folders, session)
 
             # Détacher les objets pour éviter DetachedInstanceError
             session.expunge_all()
@@ -69,32 +218,194 @@ class FolderController:
         finally:
             session.close()
 
-    def _load_all_subfolders(self, folder, session):
-        """Forcer le chargement récursif de tous les sous-dossiers"""
-        # Accéder à folder.subfolders pour déclencher le chargement
-        for sub in folder.subfolders:
-            # Charger aussi les sous-niveaux
-            self._load_all_subfolders(sub, session)
+    def get_subfolders(self, parent_id, sort=None, offset=0, limit=None):
+        """
+        Récupérer une page des sous-dossiers directs d'un dossier
+
+        Utilisé pour le chargement paresseux de l'arborescence: chaque
+        dossier retourné porte un attribut subfolder_count.
+        """
+        session = self.db.get_session()
+        try:
+            query = (
+                session.query(Folder)
+                .options(selectinload(Folder.owner))
+                .filter(Folder.parent_id == parent_id)
+                .order_by(*folder_order_by(sort))
+            )
+            folders = self._paginate(query, offset, limit).all()
+            attach_subfolder_counts(folders, session)
+
+            session.expunge_all()
+            return folders
+        finally:
+            session.close()
+
+    def get_root_folder_rows(self, sort=None, offset=0, limit=None):
+        """Page de mes dossiers racines en lignes compactes (FolderRow)"""
+        session = self.db.get_session()
+        try:
+            return fetch_folder_rows(
+                session,
+                [Folder.parent_id.is_(None), Folder.owner_id == self.user.id],
+                sort, offset, limit
+            )
+        finally:
+            session.close()
+
+    def get_subfolder_rows(self, parent_id, sort=None, offset=0, limit=None):
+        """Page des sous-dossiers directs en lignes compactes (FolderRow)"""
+        session = self.db.get_session()
+        try:
+            return fetch_folder_rows(session, [Folder.parent_id == parent_id], sort, offset, limit)
+        finally:
+            session.close()
+
+    def get_folder(self, folder_id):
+        """
+        Dossier complet (avec owner, sans sous-dossiers), pour l'édition et
+        les propriétés; servi par l'ObjectCache et validé sur updated_at
+        """
+        from sqlalchemy.orm.attributes import set_committed_value
+
+        snapshot = ObjectCache().get(('folder', folder_id), lambda: self._load_folder(folder_id),
+                                     version=lambda snapshot: self._folder_version(folder_id))
+        if snapshot is None:
+            return None
+        values, owner_values = snapshot
+        folder = ObjectCache.materialize(Folder, values)
+        if owner_values is not None:
+            set_committed_value(folder, 'owner', ObjectCache.materialize(User, owner_values))
+        return folder
 
-    def get_folder_by_id(self, folder_id):
-        """Get folder by ID"""
+    def _load_folder(self, folder_id):
         session = self.db.get_session()
         try:
             folder = (
                 session.query(Folder)
-                .options(
-                    selectinload(Folder.subfolders),
-                    selectinload(Folder.owner) # ✅ Charger l'utilisateur lié
-                    )
+                .options(selectinload(Folder.owner))
+                .filter(Folder.id == folder_id)
+                .first()
+            )
+            if folder is None:
+                return None
+            owner = ObjectCache.snapshot(folder.owner) if folder.owner else None
+            return (ObjectCache.snapshot(folder), owner), folder.updated_at
+        finally:
+            session.close()
+
+    def _folder_version(self, folder_id):
+        session = self.db.get_session()
+        try:
+            row = session.query(Folder.updated_at).filter(Folder.id == folder_id).first()
+            return row[0] if row else None
+        finally:
+            session.close()
+
+    def get_permissions(self, folder_ids):
+        """Permissions effectives de l'utilisateur: {folder_id: AccessLevel}"""
+        return PermissionResolver(self.db).resolve(self.user, folder_ids)
+
+    def _paginate(self, query, offset=0, limit=None):
+        """Appliquer offset/limit à une requête"""
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    def get_folder_by_id(self, folder_id, sort=None):
+        """
+        Get folder by ID with its whole subtree (sorted)
+
+        L'arborescence est servie par l'ObjectCache; elle est revalidée par
+        le nombre et la date de modification de ses dossiers (un ajout, un
+        renommage ou un déplacement la périme).
+        """
+        key = ('folder_tree', folder_id, tuple(normalize_folder_sort(sort)))
+        tree = ObjectCache().get(key, lambda: self._load_folder_tree(folder_id, sort),
+                                 version=self._folder_tree_version)
+        return self._materialize_folder_tree(tree) if tree is not None else None
+
+    def _load_folder_tree(self, folder_id, sort):
+        """Instantané (dossiers en largeur d'abord, version) de l'arborescence"""
+        session = self.db.get_session()
+        try:
+            folder = (
+                session.query(Folder)
+                .options(selectinload(Folder.owner)) # ✅ Charger l'utilisateur lié
                 .filter(Folder.id == folder_id)
                 .first()
             )
-            if folder:
-                self._load_all_subfolders(folder, session)
-                session.expunge_all()
-            return folder
+            if folder is None:
+                return None
+            load_sorted_subfolders([folder], session, sort)
+
+            nodes = []
+            level = [folder]
+            while level:
+                for node in level:
+                    owner = ObjectCache.snapshot(node.owner) if node.owner else None
+                    nodes.append((ObjectCache.snapshot(node), owner))
+                level = [child for node in level for child in node.subfolders]
+
+            tree = tuple(nodes)
+            return tree, self._folder_tree_version(tree, session)
         finally:
             session.close()
+
+    def _folder_tree_version(self, tree, session=None):
+        """(nombre de dossiers, dernière modification) du dossier racine et de ses descendants"""
+        own_session = session is None
+        if own_session:
+            session = self.db.get_session()
+        try:
+            root_id = tree[0][0]['id']
+            ids = [values['id'] for values, _ in tree]
+            count, latest = 0, None
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                condition = Folder.parent_id.in_(chunk)
+                if start == 0:
+                    condition = or_(condition, Folder.id == root_id)
+                chunk_count, chunk_latest = (
+                    session.query(func.count(Folder.id), func.max(Folder.updated_at))
+                    .filter(condition)
+                    .one()
+                )
+                count += chunk_count
+                if chunk_latest is not None and (latest is None or chunk_latest > latest):
+                    latest = chunk_latest
+            return count, latest
+        finally:
+            if own_session:
+                session.close()
+
+    @staticmethod
+    def _materialize_folder_tree(tree):
+        """Reconstruire des Folder détachés (avec owner et subfolders triés)"""
+        from sqlalchemy.orm.attributes import set_committed_value
+
+        folders = {}
+        owners = {}
+        children = {}
+        for values, owner_values in tree:
+            folder = ObjectCache.materialize(Folder, values)
+            if owner_values is not None:
+                owner = owners.get(owner_values['id'])
+                if owner is None:
+                    owner = owners[owner_values['id']] = ObjectCache.materialize(User, owner_values)
+                set_committed_value(folder, 'owner', owner)
+            folders[folder.id] = folder
+            children.setdefault(folder.parent_id, []).append(folder)
+
+        # Les dossiers sont dans l'ordre de tri: les listes d'enfants aussi
+        for folder_id, folder in folders.items():
+            subfolders = children.get(folder_id, [])
+            set_committed_value(folder, 'subfolders', subfolders)
+            folder.subfolder_count = len(subfolders)
+
+        return folders[tree[0][0]['id']]
     
     def update_folder(self, folder_id, **kwargs):
         """Update folder properties"""
@@ -117,6 +428,9 @@ class FolderController:
                     setattr(folder, key, value)
             
             session.commit()
+            invalidate_folder_caches()
+            if ACCESS_ATTRIBUTES & kwargs.keys():
+                PermissionResolver().invalidate()
             self.audit.log_action('UPDATE', 'FOLDER', folder_id, 
                                 f"Modification du dossier")
             
@@ -177,6 +491,9 @@ class FolderController:
             # Grâce au CASCADE, tous les sous-dossiers et fichiers seront supprimés automatiquement
             session.delete(folder)
             session.commit()
+            invalidate_folder_caches()
+            ObjectCache().invalidate_kind('file')
+            PermissionResolver().invalidate()
             
             # Message de résultat
             message = f"Dossier '{folder_name}' supprimé avec succès"
@@ -210,7 +527,7 @@ class FolderController:
             session.refresh(subfolder)
             self._collect_all_files(subfolder, files_list, session)
     
-    def search_folders(self, query=None, year=None, theme=None, sector=None):
+    def search_folders(self, query=None, year=None, theme=None, sector=None, sort=None):
         session = self.db.get_session()
         try:
             filters = [Folder.owner_id == self.user.id]
@@ -245,16 +562,13 @@ class FolderController:
 
             folders = (
                 session.query(Folder)
-                .options(
-                    selectinload(Folder.subfolders),
-                    selectinload(Folder.owner) # ✅ Charger l'utilisateur lié
-                )
+                .options(selectinload(Folder.owner)) # ✅ Charger l'utilisateur lié
                 .filter(*filters)
+                .order_by(*folder_order_by(sort))
                 .all()
             )
 
-            for folder in folders:
-                self._load_all_subfolders(folder, session)
+            load_sorted_subfolders(folders, session, sort)
 
             session.expunge_all()
             return folders
@@ -0,0 +1,248 @@
+# controllers/group_controller.py
+from database.db_manager import DatabaseManager
+from models.user import User
+from models.user_group import UserGroup, GroupMembership
+from models.folder_group_share import FolderGroupShare
+from controllers.audit_controller import AuditController
+from controllers.permission_resolver import PermissionResolver
+from controllers.folder_controller import invalidate_folder_caches
+from controllers.sharing_controller import reset_unshared_visibility
+from sqlalchemy import func
+
+
+class GroupController:
+    """
+    Groupes d'utilisateurs (services, équipes)
+
+    Un dossier partagé avec un groupe est accessible à tous ses membres:
+    ajouter ou retirer un membre ne touche à aucun partage, seules les
+    permissions en cache du membre sont oubliées. La gestion des groupes
+    est réservée aux administrateurs.
+    """
+
+    # Identifiants par requête IN (limite des paramètres SQL)
+    CHUNK_SIZE = 500
+
+    def __init__(self, user, db: DatabaseManager):
+        self.user = user
+        self.db = db
+        self.audit = AuditController(user, db)
+
+    # ------------------------------
+    # Groupes
+    # ------------------------------
+    def create_group(self, name, description=None):
+        """Créer un groupe"""
+        if not self.user.is_admin():
+            return False, "Permission refusée"
+
+        name = (name or '').strip()
+        if not name:
+            return False, "Le nom du groupe est obligatoire"
+
+        session = self.db.get_session()
+        try:
+            if session.query(UserGroup.id).filter(UserGroup.name == name).first():
+                return False, f"Le groupe '{name}' existe déjà"
+
+            group = UserGroup(name=name, description=description, created_by=self.user.id)
+            session.add(group)
+            session.commit()
+            session.refresh(group)
+            session.expunge(group)
+
+            self.audit.log_action('CREATE', 'GROUP', group.id, f"Création du groupe: {name}")
+            return True, group
+        except Exception as e:
+            session.rollback()
+            return False, str(e)
+        finally:
+            session.close()
+
+    def delete_group(self, group_id):
+        """
+        Supprimer un groupe, ses adhésions et ses partages
+
+        Les dossiers dont c'était le dernier partage redeviennent privés.
+        """
+        if not self.user.is_admin():
+            return False, "Permission refusée"
+
+        session = self.db.get_session()
+        try:
+            group = session.query(UserGroup).filter(UserGroup.id == group_id).first()
+            if not group:
+                return False, "Groupe non trouvé"
+
+            name = group.name
+            folder_ids = [folder_id for (folder_id,) in session.query(FolderGroupShare.folder_id)
+                          .filter(FolderGroupShare.group_id == group_id)]
+            session.delete(group)
+            session.flush()
+            reset_unshared_visibility(session, folder_ids)
+            session.commit()
+            invalidate_folder_caches()
+            PermissionResolver().invalidate()
+
+            self.audit.log_action('DELETE', 'GROUP', group_id, f"Suppression du groupe: {name}")
+            return True, f"Groupe '{name}' supprimé"
+        except Exception as e:
+            session.rollback()
+            return False, str(e)
+        finally:
+            session.close()
+
+    def get_groups(self, prefix='', limit=50):
+        """Groupes dont le nom commence par prefix, avec leur nombre de membres"""
+        session = self.db.get_session()
+        try:
+            query = session.query(UserGroup, func.count(GroupMembership.id)).outerjoin(
+                GroupMembership, GroupMembership.group_id == UserGroup.id
+            )
+            prefix = (prefix or '').strip()
+            if prefix:
+                query = query.filter(UserGroup.name.like(f"{prefix}%"))
+            rows = (
+                query.group_by(UserGroup.id)
+                .order_by(UserGroup.name, UserGroup.id)
+                .limit(limit)
+                .all()
+            )
+
+            groups = []
+            for group, member_count in rows:
+                group.member_count = member_count
+                groups.append(group)
+            session.expunge_all()
+            return groups
+        finally:
+            session.close()
+
+    def get_user_groups(self, user_id=None):
+        """Groupes dont un utilisateur (par défaut l'utilisateur courant) est membre"""
+        session = self.db.get_session()
+        try:
+            groups = (
+                session.query(UserGroup)
+                .join(GroupMembership, GroupMembership.group_id == UserGroup.id)
+                .filter(GroupMembership.user_id == (user_id or self.user.id))
+                .order_by(UserGroup.name)
+                .all()
+            )
+            session.expunge_all()
+            return groups
+        finally:
+            session.close()
+
+    # ------------------------------
+    # Membres
+    # ------------------------------
+    def get_members(self, group_id, after=None, limit=100):
+        """
+        Une page des membres d'un groupe, triés par id
+
+        Returns:
+            tuple: (liste de User détachés, curseur de la page suivante ou None)
+        """
+        session = self.db.get_session()
+        try:
+            query = (
+                session.query(User)
+                .join(GroupMembership, GroupMembership.user_id == User.id)
+                .filter(GroupMembership.group_id == group_id)
+            )
+            if after is not None:
+                query = query.filter(User.id > after)
+            users = query.order_by(User.id).limit(limit).all()
+            session.expunge_all()
+        finally:
+            session.close()
+
+        cursor = users[-1].id if len(users) == limit else None
+        return users, cursor
+
+    def add_members(self, group_id, user_ids):
+        """
+        Ajouter des utilisateurs à un groupe (une transaction)
+
+        Returns:
+            tuple: (True, nombre d'adhésions créées) ou (False, message)
+        """
+        if not self.user.is_admin():
+            return False, "Permission refusée"
+
+        user_ids = set(user_ids)
+        session = self.db.get_session()
+        try:
+            if not session.query(UserGroup.id).filter(UserGroup.id == group_id).first():
+                return False, "Groupe non trouvé"
+
+            found = set()
+            already = set()
+            for chunk in self._chunks(user_ids):
+                found.update(row[0] for row in session.query(User.id).filter(User.id.in_(chunk)))
+                already.update(
+                    row[0] for row in session.query(GroupMembership.user_id).filter(
+                        GroupMembership.group_id == group_id,
+                        GroupMembership.user_id.in_(chunk)
+                    )
+                )
+            missing = user_ids - found
+            if missing:
+                return False, f"Utilisateur(s) non trouvé(s): {', '.join(map(str, sorted(missing)))}"
+
+            new_ids = sorted(user_ids - already)
+            if new_ids:
+                session.bulk_insert_mappings(GroupMembership, [
+                    {'group_id': group_id, 'user_id': user_id, 'added_by': self.user.id}
+                    for user_id in new_ids
+                ])
+                session.commit()
+                PermissionResolver().invalidate(new_ids)
+
+                self.audit.log_action('UPDATE', 'GROUP', group_id,
+                                    {'added_members': new_ids})
+            return True, len(new_ids)
+        except Exception as e:
+            session.rollback()
+            return False, str(e)
+        finally:
+            session.close()
+
+    def remove_members(self, group_id, user_ids):
+        """
+        Retirer des utilisateurs d'un groupe
+
+        Returns:
+            tuple: (True, nombre d'adhésions supprimées) ou (False, message)
+        """
+        if not self.user.is_admin():
+            return False, "Permission refusée"
+
+        user_ids = sorted(set(user_ids))
+        session = self.db.get_session()
+        try:
+            removed = 0
+            for chunk in self._chunks(user_ids):
+                removed += session.query(GroupMembership).filter(
+                    GroupMembership.group_id == group_id,
+                    GroupMembership.user_id.in_(chunk)
+                ).delete(synchronize_session=False)
+            session.commit()
+
+            if removed:
+                PermissionResolver().invalidate(user_ids)
+                self.audit.log_action('UPDATE', 'GROUP', group_id,
+                                    {'removed_members': user_ids})
+            return True, removed
+        except Exception as e:
+            session.rollback()
+            return False, str(e)
+        finally:
+            session.close()
+
+    @classmethod
+    def _chunks(cls, ids):
+        ids = sorted(set(ids))
+        for start in range(0, len(ids), cls.CHUNK_SIZE):
+            yield ids[start:start + cls.CHUNK_SIZE]
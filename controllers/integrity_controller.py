@@ -0,0 +1,617 @@
+# controllers/integrity_controller.py
+from database.db_manager import DatabaseManager
+from models.file import File
+from models.file_integrity import FileIntegrity, IntegrityCheckpoint
+from models.rows import IntegrityRow
+from controllers.audit_controller import AuditController
+from controllers.file_controller import FileController
+from utils.enums import AccessLevel, IntegrityStatus
+from sqlalchemy import or_, select
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import hashlib
+import os
+import socket
+import time
+import uuid
+
+# Défauts qu'une copie cloud peut corriger
+REPAIRABLE = (IntegrityStatus.MISSING, IntegrityStatus.SIZE_MISMATCH, IntegrityStatus.CORRUPT)
+# Statuts sans défaut
+HEALTHY = (IntegrityStatus.OK, IntegrityStatus.REPAIRED)
+
+
+def _utcnow():
+    """Date UTC naïve, comparable aux dates lues dans la base"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def record_problem(session, file_id, status, detail=None):
+    """
+    Enregistrer un défaut constaté hors du vérificateur (téléchargement...)
+
+    La transaction est validée par l'appelant.
+    """
+    integrity = session.get(FileIntegrity, file_id)
+    if integrity is None:
+        integrity = FileIntegrity(file_id=file_id)
+        session.add(integrity)
+    now = _utcnow()
+    if integrity.status in HEALTHY or integrity.status is None:
+        integrity.failed_at = now
+    integrity.status = status
+    integrity.detail = detail
+    integrity.checked_at = now
+
+
+class _Throttle:
+    """
+    Limiteur de débit (seau à jetons)
+
+    Le crédit accumulé pendant les pauses est plafonné à une seconde de
+    lecture: une reprise ne produit pas de rafale.
+    """
+
+    def __init__(self, rate, should_stop=None):
+        self.rate = rate
+        self.should_stop = should_stop
+        self._tokens = 0.0
+        self._last = time.monotonic()
+
+    def consume(self, nbytes):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate) - nbytes
+        self._last = now
+
+        # Attente par tranches courtes pour rester interruptible
+        while self._tokens < 0:
+            if self.should_stop is not None and self.should_stop():
+                raise InterruptedError("Vérification annulée")
+            time.sleep(min(-self._tokens / self.rate, 0.2))
+            now = time.monotonic()
+            self._tokens += (now - self._last) * self.rate
+            self._last = now
+
+
+class _LeaseLost(Exception):
+    """Le point de reprise a été réservé par un autre vérificateur"""
+
+
+class IntegrityController:
+    """
+    Vérification de l'intégrité du stockage (« scrubbing »)
+
+    Chaque fichier est relu et comparé à sa référence (FileIntegrity):
+    présence, taille enregistrée dans files, puis SHA-256. La référence
+    est posée à l'écriture du fichier quand l'empreinte est connue
+    (import en flux, archives), sinon à sa première vérification.
+
+    Le parcours se fait par id croissant et sa position est sauvegardée
+    dans un point de reprise (IntegrityCheckpoint) avec les résultats,
+    dans la même transaction, au moins toutes les CHECKPOINT_SECONDS: un
+    passage interrompu reprend où il s'était arrêté. Aucune écriture n'est
+    tenue ouverte pendant la lecture des fichiers. Un point de reprise
+    n'est utilisé que par un vérificateur à la fois: son verrou est
+    renouvelé à chaque sauvegarde et pendant la lecture des gros
+    fichiers, libéré à la fin, et considéré comme abandonné après
+    LEASE_SECONDS sans renouvellement. Chaque sauvegarde vérifie que le
+    verrou est toujours détenu; sinon la tranche s'arrête sans rien
+    écrire.
+
+    La lecture est limitée en débit et les pages lues sont retirées du
+    cache du système: un passage complet ne ralentit pas les accès
+    interactifs au stockage.
+    """
+
+    DEFAULT_CHECKPOINT = 'scrub'
+
+    # Fichiers lus par requête
+    BATCH_SIZE = 500
+    # Sauvegarde du point de reprise: nombre de fichiers ou secondes
+    CHECKPOINT_FILES = 100
+    CHECKPOINT_SECONDS = 10
+    # Verrou considéré comme abandonné (vérificateur arrêté brutalement)
+    LEASE_SECONDS = 600
+    # Blocs lus pour le calcul des empreintes
+    READ_CHUNK_SIZE = 1 << 20
+    # Secondes minimum entre deux progressions
+    PROGRESS_INTERVAL = 0.25
+
+    def __init__(self, user, db: DatabaseManager):
+        self.user = user
+        self.db = db
+        self.audit = AuditController(user, db)
+        self.files = FileController(user, db)
+        # Un propriétaire par instance: deux vérificateurs d'un même processus
+        # ne partagent pas le verrou
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    # ------------------------------
+    # Vérification
+    # ------------------------------
+    def scrub(self, checkpoint=DEFAULT_CHECKPOINT, folder_ids=None, rate=None,
+              max_files=None, max_seconds=None, repair=False, restart=False,
+              progress_callback=None, problem_callback=None, should_stop=None):
+        """
+        Vérifier les fichiers stockés à partir du point de reprise
+
+        S'arrête à la fin du passage (le suivant repartira du début), après
+        max_files fichiers ou max_seconds secondes, ou sur should_stop; la
+        position est alors sauvegardée.
+
+        Args:
+            checkpoint: Nom du point de reprise (un par périmètre vérifié)
+            folder_ids: Limiter aux fichiers de ces dossiers (None = tous)
+            rate: Débit de lecture maximal en octets par seconde (None = illimité)
+            repair: Restaurer depuis la copie cloud les fichiers en défaut
+            restart: Abandonner le passage en cours et repartir du début
+            progress_callback: Appelée avec (fichiers vérifiés dans le passage, total)
+            problem_callback: Appelée avec un dict par défaut constaté
+            should_stop: Fonction sans argument, True pour interrompre
+
+        Returns:
+            tuple: (succès, statistiques ou message d'erreur)
+        """
+        if not self._acquire(checkpoint):
+            return False, "Vérification déjà en cours pour ce périmètre"
+
+        stats = {'checked': 0, 'bytes': 0, 'baselined': 0, 'problems': [],
+                 'repaired': 0, 'completed': False, 'interrupted': False}
+        repair = repair and self.user.is_admin()
+        throttle = _Throttle(rate, should_stop)
+        started = time.monotonic()
+        last_progress = 0.0
+        repaired = []
+
+        # Fin de la tranche: le verrou a été repris par un autre vérificateur
+        lost_lease = "Vérification reprise par un autre poste (verrou expiré)"
+
+        def heartbeat():
+            if not self._renew(checkpoint):
+                raise _LeaseLost(lost_lease)
+
+        session = self.db.get_session()
+        # Les références lues restent utilisables après chaque sauvegarde
+        session.expire_on_commit = False
+        try:
+            # Point de reprise détaché: ses compteurs ne sont écrits que par
+            # _save(), sous condition que le verrou soit toujours détenu
+            state = session.get(IntegrityCheckpoint, checkpoint)
+            session.expunge(state)
+            if restart or state.pass_started_at is None:
+                self._start_pass(state)
+
+            total_query = session.query(File.id)
+            if folder_ids is not None:
+                total_query = total_query.filter(File.folder_id.in_(folder_ids))
+            total = total_query.count()
+            session.commit()
+
+            # Résultats en attente de la prochaine sauvegarde: aucune écriture
+            # (donc aucun verrou SQLite) n'est tenue pendant la lecture des fichiers
+            results = []
+            last_save = time.monotonic()
+
+            while not stats['completed']:
+                query = (
+                    session.query(File.id, File.name, File.file_path, File.file_size,
+                                  File.folder_id, FileIntegrity)
+                    .outerjoin(FileIntegrity, FileIntegrity.file_id == File.id)
+                    .filter(File.id > state.last_file_id)
+                )
+                if folder_ids is not None:
+                    query = query.filter(File.folder_id.in_(folder_ids))
+                batch = query.order_by(File.id).limit(self.BATCH_SIZE).all()
+                session.commit()
+
+                if not batch:
+                    state.passes += 1
+                    state.last_completed_at = _utcnow()
+                    state.pass_started_at = None
+                    stats['completed'] = True
+                    break
+
+                for row in batch:
+                    if (should_stop is not None and should_stop()) or \
+                            (max_files is not None and stats['checked'] >= max_files) or \
+                            (max_seconds is not None and time.monotonic() - started >= max_seconds):
+                        stats['interrupted'] = True
+                        break
+
+                    try:
+                        status, detail, digest, size = self._check(row, throttle, should_stop, heartbeat)
+                    except InterruptedError:
+                        stats['interrupted'] = True
+                        break
+
+                    if status in REPAIRABLE and repair:
+                        restored, result = self._restore(row, row.FileIntegrity)
+                        if restored:
+                            digest, size = result
+                            detail = f"Restauré depuis le cloud ({status.value})"
+                            status = IntegrityStatus.REPAIRED
+                            repaired.append((row.id, row.name))
+                        else:
+                            detail = f"{detail}; réparation impossible: {result}"
+
+                    if status == IntegrityStatus.OK and \
+                            (row.FileIntegrity is None or row.FileIntegrity.sha256 is None):
+                        stats['baselined'] += 1
+                    if status not in HEALTHY:
+                        problem = {'id': row.id, 'name': row.name, 'path': row.file_path,
+                                   'folder_id': row.folder_id, 'problem': status.value,
+                                   'detail': detail}
+                        stats['problems'].append(problem)
+                        state.problems += 1
+                        if problem_callback:
+                            problem_callback(problem)
+
+                    results.append((row, status, detail, digest, size))
+                    stats['checked'] += 1
+                    stats['bytes'] += size or 0
+                    state.files_checked += 1
+                    state.bytes_checked += size or 0
+                    state.last_file_id = row.id
+
+                    now = time.monotonic()
+                    if len(results) >= self.CHECKPOINT_FILES or now - last_save >= self.CHECKPOINT_SECONDS:
+                        if not self._save(session, state, results):
+                            raise _LeaseLost(lost_lease)
+                        last_save = now
+
+                    if progress_callback and now - last_progress >= self.PROGRESS_INTERVAL:
+                        last_progress = now
+                        progress_callback(state.files_checked, total)
+
+                if stats['interrupted']:
+                    break
+
+            if stats['completed']:
+                # Le passage terminé rend obsolètes les défauts des fichiers supprimés
+                self._purge_orphans(session)
+            if not self._save(session, state, results, release=True):
+                raise _LeaseLost(lost_lease)
+            stats['position'] = state.last_file_id
+            stats['passes'] = state.passes
+            done = state.files_checked
+        except _LeaseLost as e:
+            # Le verrou appartient à l'autre vérificateur: ne pas le libérer
+            session.rollback()
+            return False, str(e)
+        except Exception as e:
+            session.rollback()
+            self._release(checkpoint)
+            return False, str(e)
+        finally:
+            session.close()
+
+        stats['repaired'] = len(repaired)
+        for file_id, name in repaired:
+            self.audit.log_action('UPDATE', 'FILE', file_id,
+                                  f"Restauration depuis la copie cloud: {name}")
+
+        if progress_callback:
+            progress_callback(total if stats['completed'] else done, total)
+        return True, stats
+
+    def _check(self, row, throttle, should_stop, heartbeat=None):
+        """
+        Vérifier un fichier
+
+        Returns:
+            tuple: (statut, détail, SHA-256 ou None, taille lue ou None)
+        """
+        integrity = row.FileIntegrity
+        try:
+            size = os.stat(row.file_path).st_size
+        except FileNotFoundError:
+            return IntegrityStatus.MISSING, "Fichier absent du stockage", None, None
+        except OSError as e:
+            return IntegrityStatus.UNREADABLE, str(e), None, None
+
+        expected_size = row.file_size
+        if expected_size is None and integrity is not None:
+            expected_size = integrity.size
+        if expected_size is not None and size != expected_size:
+            return (IntegrityStatus.SIZE_MISMATCH,
+                    f"{size} octets au lieu de {expected_size}", None, size)
+
+        try:
+            digest = self._hash_file(row.file_path, throttle, should_stop, heartbeat)
+        except OSError as e:
+            return IntegrityStatus.UNREADABLE, str(e), None, size
+
+        if integrity is not None and integrity.sha256 is not None and digest != integrity.sha256:
+            return (IntegrityStatus.CORRUPT,
+                    "Empreinte SHA-256 différente de la référence", digest, size)
+        return IntegrityStatus.OK, None, digest, size
+
+    def _hash_file(self, path, throttle=None, should_stop=None, heartbeat=None):
+        """
+        SHA-256 d'un fichier, lu au débit du limiteur sans polluer le cache du système
+
+        heartbeat() est appelée toutes les CHECKPOINT_SECONDS pendant la
+        lecture d'un gros fichier (renouvellement du verrou).
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb', buffering=0) as f:
+            fd = f.fileno()
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            buffer = bytearray(self.READ_CHUNK_SIZE)
+            view = memoryview(buffer)
+            offset = 0
+            last_beat = time.monotonic()
+            try:
+                while True:
+                    if should_stop is not None and should_stop():
+                        raise InterruptedError("Vérification annulée")
+                    n = f.readinto(buffer)
+                    if not n:
+                        break
+                    digest.update(view[:n])
+                    if hasattr(os, 'posix_fadvise'):
+                        os.posix_fadvise(fd, offset, n, os.POSIX_FADV_DONTNEED)
+                    offset += n
+                    if throttle is not None:
+                        throttle.consume(n)
+                    if heartbeat is not None and time.monotonic() - last_beat >= self.CHECKPOINT_SECONDS:
+                        heartbeat()
+                        last_beat = time.monotonic()
+            finally:
+                view.release()
+        return digest.hexdigest()
+
+    def _apply(self, session, row, status, detail, digest, size):
+        """Reporter le résultat d'une vérification sur la ligne FileIntegrity du fichier"""
+        now = _utcnow()
+        integrity = row.FileIntegrity
+        if integrity is None:
+            integrity = FileIntegrity(file_id=row.id)
+            session.add(integrity)
+
+        if status in HEALTHY:
+            # Première lecture (fichier antérieur aux références) ou restauration
+            if integrity.sha256 is None or status == IntegrityStatus.REPAIRED:
+                integrity.sha256 = digest
+                integrity.size = size
+                integrity.hashed_at = now
+            integrity.failed_at = None
+        elif integrity.status in HEALTHY or integrity.status is None:
+            integrity.failed_at = now
+
+        integrity.status = status
+        integrity.detail = detail
+        integrity.checked_at = now
+
+    def _purge_orphans(self, session):
+        """Supprimer les résultats de fichiers qui n'existent plus"""
+        session.query(FileIntegrity).filter(
+            ~FileIntegrity.file_id.in_(select(File.id))
+        ).delete(synchronize_session=False)
+
+    # ------------------------------
+    # Point de reprise
+    # ------------------------------
+    @staticmethod
+    def _start_pass(state):
+        state.last_file_id = 0
+        state.files_checked = 0
+        state.bytes_checked = 0
+        state.problems = 0
+        state.pass_started_at = _utcnow()
+
+    def _acquire(self, name):
+        """Réserver le point de reprise (créé au premier usage)"""
+        session = self.db.get_session()
+        try:
+            if session.get(IntegrityCheckpoint, name) is None:
+                session.add(IntegrityCheckpoint(name=name))
+                try:
+                    session.commit()
+                except Exception:
+                    # Créé au même moment par un autre vérificateur
+                    session.rollback()
+
+            now = _utcnow()
+            claimed = session.query(IntegrityCheckpoint).filter(
+                IntegrityCheckpoint.name == name,
+                or_(IntegrityCheckpoint.locked_by.is_(None),
+                    IntegrityCheckpoint.locked_by == self.owner,
+                    IntegrityCheckpoint.updated_at < now - timedelta(seconds=self.LEASE_SECONDS))
+            ).update({IntegrityCheckpoint.locked_by: self.owner,
+                      IntegrityCheckpoint.updated_at: now}, synchronize_session=False)
+            session.commit()
+            return claimed == 1
+        finally:
+            session.close()
+
+    def _release(self, name):
+        session = self.db.get_session()
+        try:
+            session.query(IntegrityCheckpoint).filter(
+                IntegrityCheckpoint.name == name,
+                IntegrityCheckpoint.locked_by == self.owner
+            ).update({IntegrityCheckpoint.locked_by: None}, synchronize_session=False)
+            session.commit()
+        finally:
+            session.close()
+
+    def _renew(self, name):
+        """Renouveler le verrou du point de reprise; False s'il a été repris"""
+        session = self.db.get_session()
+        try:
+            renewed = session.query(IntegrityCheckpoint).filter(
+                IntegrityCheckpoint.name == name,
+                IntegrityCheckpoint.locked_by == self.owner
+            ).update({IntegrityCheckpoint.updated_at: _utcnow()}, synchronize_session=False)
+            session.commit()
+            return renewed == 1
+        finally:
+            session.close()
+
+    def _save(self, session, state, results, release=False):
+        """
+        Valider ensemble les résultats en attente et la position
+
+        La position n'est écrite que si le verrou est toujours détenu: un
+        vérificateur dont le verrou a expiré n'écrase pas le travail de
+        celui qui l'a repris.
+
+        Returns:
+            bool: False si le verrou a été repris (rien n'est enregistré)
+        """
+        for result in results:
+            self._apply(session, *result)
+
+        values = {
+            IntegrityCheckpoint.last_file_id: state.last_file_id,
+            IntegrityCheckpoint.files_checked: state.files_checked,
+            IntegrityCheckpoint.bytes_checked: state.bytes_checked,
+            IntegrityCheckpoint.problems: state.problems,
+            IntegrityCheckpoint.passes: state.passes,
+            IntegrityCheckpoint.pass_started_at: state.pass_started_at,
+            IntegrityCheckpoint.last_completed_at: state.last_completed_at,
+            IntegrityCheckpoint.updated_at: _utcnow(),
+        }
+        if release:
+            values[IntegrityCheckpoint.locked_by] = None
+
+        saved = session.query(IntegrityCheckpoint).filter(
+            IntegrityCheckpoint.name == state.name,
+            IntegrityCheckpoint.locked_by == self.owner
+        ).update(values, synchronize_session=False)
+        if saved != 1:
+            session.rollback()
+            return False
+
+        session.commit()
+        results.clear()
+        return True
+
+    def get_checkpoint(self, name=DEFAULT_CHECKPOINT):
+        """Point de reprise (détaché), ou None si aucune vérification n'a eu lieu"""
+        session = self.db.get_session()
+        try:
+            state = session.get(IntegrityCheckpoint, name)
+            if state is not None:
+                session.expunge(state)
+            return state
+        finally:
+            session.close()
+
+    # ------------------------------
+    # Rapport
+    # ------------------------------
+    def get_problems(self, folder_ids=None, limit=None):
+        """Fichiers en défaut lors de leur dernière vérification, par ancienneté du défaut"""
+        session = self.db.get_session()
+        try:
+            query = (
+                session.query(File.id, File.name, File.folder_id, File.file_path,
+                              FileIntegrity.status, FileIntegrity.detail,
+                              FileIntegrity.failed_at, FileIntegrity.checked_at)
+                .join(FileIntegrity, FileIntegrity.file_id == File.id)
+                .filter(FileIntegrity.status.notin_(HEALTHY))
+            )
+            if folder_ids is not None:
+                query = query.filter(File.folder_id.in_(folder_ids))
+            query = query.order_by(FileIntegrity.failed_at, File.id)
+            if limit is not None:
+                query = query.limit(limit)
+            return [IntegrityRow(*row) for row in query.all()]
+        finally:
+            session.close()
+
+    # ------------------------------
+    # Réparation
+    # ------------------------------
+    def repair_file(self, file_id):
+        """
+        Restaurer un fichier depuis sa copie cloud
+
+        La copie n'est installée que si elle correspond à la référence
+        (empreinte, sinon taille enregistrée).
+
+        Returns:
+            tuple: (succès, message)
+        """
+        from controllers.permission_resolver import PermissionResolver
+
+        session = self.db.get_session()
+        try:
+            row = (
+                session.query(File.id, File.name, File.file_path, File.file_size,
+                              File.folder_id, FileIntegrity)
+                .outerjoin(FileIntegrity, FileIntegrity.file_id == File.id)
+                .filter(File.id == file_id)
+                .first()
+            )
+            if row is None:
+                return False, "Fichier non trouvé"
+            if not self.user.is_admin() and \
+                    not PermissionResolver(self.db).can(self.user, row.folder_id, AccessLevel.WRITE):
+                return False, "Permission refusée"
+
+            restored, result = self._restore(row, row.FileIntegrity)
+            if not restored:
+                return False, result
+
+            digest, size = result
+            self._apply(session, row, IntegrityStatus.REPAIRED,
+                        "Restauré depuis le cloud", digest, size)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            return False, str(e)
+        finally:
+            session.close()
+
+        self.audit.log_action('UPDATE', 'FILE', file_id,
+                              f"Restauration depuis la copie cloud: {row.name}")
+        return True, "Fichier restauré depuis le cloud"
+
+    def _restore(self, row, integrity):
+        """
+        Télécharger la copie cloud à côté du fichier, la vérifier puis la
+        mettre en place par renommage
+
+        Returns:
+            tuple: (succès, (SHA-256, taille) ou message d'erreur)
+        """
+        dest_path = Path(row.file_path)
+        tmp_path = dest_path.with_name(dest_path.name + '.part')
+        expected_sha = integrity.sha256 if integrity is not None else None
+        expected_size = row.file_size
+        if expected_size is None and integrity is not None:
+            expected_size = integrity.size
+
+        try:
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Nom stocké (uploads récents), puis nom affiché (anciens uploads)
+            message = None
+            for remote_name in dict.fromkeys([dest_path.name, row.name]):
+                downloaded, message = self.files.download_from_cloud(remote_name, row.folder_id, tmp_path)
+                if downloaded:
+                    break
+            else:
+                return False, f"Copie cloud indisponible: {message}"
+
+            size = os.path.getsize(tmp_path)
+            if expected_size is not None and size != expected_size:
+                return False, f"La copie cloud fait {size} octets au lieu de {expected_size}"
+            digest = self._hash_file(tmp_path)
+            if expected_sha is not None and digest != expected_sha:
+                return False, "La copie cloud ne correspond pas à l'empreinte de référence"
+
+            os.replace(tmp_path, dest_path)
+            print(f"✅ Fichier restauré depuis le cloud: {dest_path}")
+            return True, (digest, size)
+        except OSError as e:
+            return False, str(e)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
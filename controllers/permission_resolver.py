@@ -0,0 +1,175 @@
+# controllers/permission_resolver.py
+"""
+controllers/permission_resolver.py
+Permissions effectives des utilisateurs sur les dossiers
+"""
+
+import threading
+import time
+from typing import Dict, Iterable
+
+from sqlalchemy import select, literal, and_
+
+from database.db_manager import DatabaseManager
+from models.folder import Folder
+from models.folder_share import FolderShare
+from models.folder_group_share import FolderGroupShare
+from models.user_group import GroupMembership
+from utils.enums import AccessLevel, FolderVisibility
+
+
+class PermissionResolver:
+    """
+    Résolution et cache des permissions effectives (AccessLevel)
+
+    Un dossier hérite des droits de tous ses ancêtres: le propriétaire
+    d'un dossier ou d'un parent a FULL, un dossier public (ou sous un
+    dossier public) est en READ, un partage (direct ou à un groupe dont
+    l'utilisateur est membre) donne son niveau à tout le sous-arbre. Le
+    niveau retenu est le plus élevé. Les superusers ont
+    FULL partout, sans requête.
+
+    resolve() calcule les dossiers manquants en une seule requête
+    récursive sur les ancêtres, quel que soit leur nombre. Les résultats
+    sont gardés par utilisateur pendant CACHE_TTL secondes; les
+    contrôleurs appellent invalidate() après chaque partage, retrait de
+    partage, changement de membres d'un groupe ou changement de
+    visibilité, de propriétaire ou de parent.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    # Durée de vie des permissions en cache (secondes)
+    CACHE_TTL = 60.0
+    # Dossiers résolus par requête (limite des paramètres SQL)
+    CHUNK_SIZE = 500
+    # Profondeur maximale parcourue (protège d'un cycle parent_id)
+    MAX_DEPTH = 64
+
+    def __new__(cls, db: DatabaseManager = None):
+        """Implémentation du pattern Singleton"""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, db: DatabaseManager = None):
+        with self._lock:
+            if self._initialized:
+                return
+
+            self.db = db or DatabaseManager()
+            # user_id -> (expiration, {folder_id: AccessLevel})
+            self._cache = {}
+            self._cache_lock = threading.Lock()
+            self._initialized = True
+
+    # ------------------------------
+    # Consultation
+    # ------------------------------
+    def resolve(self, user, folder_ids: Iterable[int]) -> Dict[int, AccessLevel]:
+        """
+        Permissions de l'utilisateur sur un ensemble de dossiers
+
+        Returns:
+            dict: {folder_id: AccessLevel} (NONE pour un dossier inexistant)
+        """
+        folder_ids = {folder_id for folder_id in folder_ids if folder_id is not None}
+        if user.is_superuser():
+            return {folder_id: AccessLevel.FULL for folder_id in folder_ids}
+
+        now = time.monotonic()
+        with self._cache_lock:
+            expires_at, levels = self._cache.get(user.id, (0, {}))
+            if expires_at <= now:
+                levels = {}
+                self._cache[user.id] = (now + self.CACHE_TTL, levels)
+            result = {folder_id: levels[folder_id] for folder_id in folder_ids if folder_id in levels}
+
+        missing = sorted(folder_ids - result.keys())
+        found = {}
+        for start in range(0, len(missing), self.CHUNK_SIZE):
+            found.update(self._query_levels(user.id, missing[start:start + self.CHUNK_SIZE]))
+
+        if found:
+            with self._cache_lock:
+                # Une invalidation pendant la requête a remplacé l'entrée: ne rien y écrire
+                entry = self._cache.get(user.id)
+                if entry is not None and entry[1] is levels:
+                    levels.update(found)
+
+        # Les dossiers inexistants ne sont pas mis en cache (leur id peut être réutilisé)
+        for folder_id in missing:
+            result[folder_id] = found.get(folder_id, AccessLevel.NONE)
+        return result
+
+    def level(self, user, folder_id) -> AccessLevel:
+        """Permission de l'utilisateur sur un dossier"""
+        if folder_id is None:
+            return AccessLevel.NONE
+        return self.resolve(user, [folder_id])[folder_id]
+
+    def can(self, user, folder_id, required: AccessLevel = AccessLevel.READ) -> bool:
+        """Vérifier que l'utilisateur a au moins le niveau demandé"""
+        return self.level(user, folder_id) >= required
+
+    def _query_levels(self, user_id, folder_ids) -> Dict[int, AccessLevel]:
+        """Calculer les permissions d'un lot de dossiers existants (une requête)"""
+        # (dossier demandé, ancêtre) pour le dossier lui-même et chaque parent
+        chain = (
+            select(Folder.id.label('folder_id'),
+                   Folder.id.label('ancestor_id'),
+                   Folder.parent_id.label('parent_id'),
+                   literal(0).label('depth'))
+            .where(Folder.id.in_(folder_ids))
+            .cte('ancestors', recursive=True)
+        )
+        parent = Folder.__table__.alias('parent_folder')
+        chain = chain.union_all(
+            select(chain.c.folder_id, parent.c.id, parent.c.parent_id, chain.c.depth + 1)
+            .where(parent.c.id == chain.c.parent_id, chain.c.depth < self.MAX_DEPTH)
+        )
+
+        # Groupes de l'utilisateur (index ix_group_memberships_user_group)
+        user_groups = select(GroupMembership.group_id).where(GroupMembership.user_id == user_id)
+
+        query = (
+            select(chain.c.folder_id, Folder.owner_id, Folder.visibility,
+                   FolderShare.permission, FolderGroupShare.permission)
+            .select_from(chain)
+            .join(Folder, Folder.id == chain.c.ancestor_id)
+            .outerjoin(FolderShare, and_(FolderShare.folder_id == chain.c.ancestor_id,
+                                         FolderShare.user_id == user_id))
+            .outerjoin(FolderGroupShare, and_(FolderGroupShare.folder_id == chain.c.ancestor_id,
+                                              FolderGroupShare.group_id.in_(user_groups)))
+        )
+
+        levels = {}
+        session = self.db.get_session()
+        try:
+            for folder_id, owner_id, visibility, permission, group_permission in session.execute(query):
+                if owner_id == user_id:
+                    level = AccessLevel.FULL
+                else:
+                    level = max(AccessLevel.from_share(permission),
+                                AccessLevel.from_share(group_permission))
+                    if visibility == FolderVisibility.PUBLIC:
+                        level = max(level, AccessLevel.READ)
+                levels[folder_id] = max(levels.get(folder_id, AccessLevel.NONE), level)
+        finally:
+            session.close()
+        return levels
+
+    # ------------------------------
+    # Invalidation
+    # ------------------------------
+    def invalidate(self, user_ids: Iterable[int] = None):
+        """Oublier les permissions en cache (de tous les utilisateurs par défaut)"""
+        with self._cache_lock:
+            if user_ids is None:
+                self._cache.clear()
+            else:
+                for user_id in user_ids:
+                    self._cache.pop(user_id, None)
@@ -2,9 +2,17 @@
 from database.db_manager import DatabaseManager
 from models.folder import Folder, FolderVisibility
 from models.folder_share import FolderShare, SharePermission
+from models.folder_group_share import FolderGroupShare
+from models.user_group import UserGroup, GroupMembership
 from models.user import User
 from controllers.audit_controller import AuditController
-from sqlalchemy.orm import selectinload
+from controllers.permission_resolver import PermissionResolver
+from controllers.folder_controller import (folder_order_by, load_sorted_subfolders,
+                                          attach_subfolder_counts, fetch_folder_rows,
+                                          invalidate_folder_caches)
+from sqlalchemy import or_, and_, exists, func, select, literal
+from sqlalchemy.orm import selectinload, aliased
+
 
 class SharingController:
     def __init__(self, user, db: DatabaseManager):
@@ -47,6 +55,7 @@ class SharingController:
                 # Mettre à jour la permission
                 existing_share.permission = permission
                 session.commit()
+                PermissionResolver().invalidate([user_id])
                 
                 self.audit.log_action('UPDATE', 'SHARE', existing_share.id,
                                     f"Permission mise à jour pour {target_user.username}")
@@ -67,6 +76,8 @@ class SharingController:
                 folder.visibility = FolderVisibility.SHARED
             
             session.commit()
+            invalidate_folder_caches()
+            PermissionResolver().invalidate([user_id])
             
             self.audit.log_action('CREATE', 'SHARE', share.id,
                                 f"Dossier '{folder.name}' partagé avec {target_user.username}")
@@ -79,6 +90,198 @@ class SharingController:
         finally:
             session.close()
     
+    # Identifiants par requête IN (limite des paramètres SQL)
+    CHUNK_SIZE = 500
+
+    @classmethod
+    def _chunks(cls, ids):
+        ids = sorted(set(ids))
+        for start in range(0, len(ids), cls.CHUNK_SIZE):
+            yield ids[start:start + cls.CHUNK_SIZE]
+
+    def share_folders(self, folder_ids, user_ids=(), permission=SharePermission.READ, group_ids=()):
+        """
+        Partager plusieurs dossiers avec plusieurs utilisateurs et groupes
+
+        Les vérifications (existence, propriété, utilisateurs actifs,
+        groupes) sont faites par lots de requêtes IN, puis les partages sont
+        créés ou mis à jour en une seule transaction: tout est appliqué ou
+        rien. Un partage à un groupe est une seule ligne, quel que soit le
+        nombre de membres.
+
+        Returns:
+            tuple: (True, {'created': n, 'updated': n, 'unchanged': n})
+                   ou (False, message d'erreur)
+        """
+        folder_ids = set(folder_ids)
+        user_ids = set(user_ids)
+        group_ids = set(group_ids)
+        if not folder_ids or not (user_ids or group_ids):
+            return False, "Aucun dossier ou utilisateur sélectionné"
+
+        session = self.db.get_session()
+        try:
+            folders = {}
+            for chunk in self._chunks(folder_ids):
+                for folder_id, owner_id, visibility in (
+                    session.query(Folder.id, Folder.owner_id, Folder.visibility)
+                    .filter(Folder.id.in_(chunk))
+                ):
+                    folders[folder_id] = (owner_id, visibility)
+
+            missing = folder_ids - folders.keys()
+            if missing:
+                return False, f"Dossier(s) non trouvé(s): {', '.join(map(str, sorted(missing)))}"
+
+            if not self.user.is_superuser():
+                foreign = sorted(folder_id for folder_id, (owner_id, _) in folders.items()
+                                 if owner_id != self.user.id)
+                if foreign:
+                    return False, ("Vous n'avez pas la permission de partager: "
+                                   f"{', '.join(map(str, foreign))}")
+
+            found_users = set()
+            for chunk in self._chunks(user_ids):
+                found_users.update(
+                    row[0] for row in session.query(User.id)
+                    .filter(User.id.in_(chunk), User.is_active.isnot(False))
+                )
+            missing = user_ids - found_users
+            if missing:
+                return False, f"Utilisateur(s) non trouvé(s): {', '.join(map(str, sorted(missing)))}"
+
+            found_groups = set()
+            for chunk in self._chunks(group_ids):
+                found_groups.update(
+                    row[0] for row in session.query(UserGroup.id).filter(UserGroup.id.in_(chunk))
+                )
+            missing = group_ids - found_groups
+            if missing:
+                return False, f"Groupe(s) non trouvé(s): {', '.join(map(str, sorted(missing)))}"
+
+            stats = {'created': 0, 'updated': 0, 'unchanged': 0}
+            self._upsert_shares(session, FolderShare, FolderShare.user_id, 'user_id',
+                                folder_ids, user_ids, permission, stats)
+            self._upsert_shares(session, FolderGroupShare, FolderGroupShare.group_id, 'group_id',
+                                folder_ids, group_ids, permission, stats)
+
+            # Les dossiers privés qui reçoivent un partage deviennent partagés
+            private_ids = [folder_id for folder_id, (_, visibility) in folders.items()
+                           if visibility == FolderVisibility.PRIVATE]
+            for chunk in self._chunks(private_ids):
+                session.query(Folder).filter(Folder.id.in_(chunk)).update(
+                    {Folder.visibility: FolderVisibility.SHARED}, synchronize_session=False
+                )
+
+            session.commit()
+            invalidate_folder_caches()
+            # Les membres des groupes sont concernés: tout oublier dans ce cas
+            PermissionResolver().invalidate(None if group_ids else user_ids)
+
+            self.audit.log_action('CREATE', 'SHARE', min(folder_ids), {
+                'folders': sorted(folder_ids),
+                'users': sorted(user_ids),
+                'groups': sorted(group_ids),
+                'permission': permission.value,
+                **stats
+            })
+            return True, stats
+
+        except Exception as e:
+            session.rollback()
+            return False, str(e)
+        finally:
+            session.close()
+
+    def _upsert_shares(self, session, model, target_column, target_key,
+                       folder_ids, target_ids, permission, stats):
+        """Créer ou mettre à jour par lots les partages (dossier, cible)"""
+        if not target_ids:
+            return
+
+        # Partages existants: (dossier, cible) -> (id, permission)
+        existing = {}
+        for chunk in self._chunks(folder_ids):
+            for share_id, folder_id, target_id, current in (
+                session.query(model.id, model.folder_id, target_column, model.permission)
+                .filter(model.folder_id.in_(chunk), target_column.in_(target_ids))
+            ):
+                existing[(folder_id, target_id)] = (share_id, current)
+
+        to_insert = []
+        to_update = []
+        for folder_id in sorted(folder_ids):
+            for target_id in sorted(target_ids):
+                if (folder_id, target_id) not in existing:
+                    to_insert.append({'folder_id': folder_id, target_key: target_id,
+                                      'permission': permission, 'shared_by': self.user.id})
+                elif existing[(folder_id, target_id)][1] != permission:
+                    to_update.append({'id': existing[(folder_id, target_id)][0],
+                                      'permission': permission})
+                else:
+                    stats['unchanged'] += 1
+
+        if to_insert:
+            session.bulk_insert_mappings(model, to_insert)
+        if to_update:
+            session.bulk_update_mappings(model, to_update)
+        stats['created'] += len(to_insert)
+        stats['updated'] += len(to_update)
+
+    def _has_shares(self, session, folder_id):
+        """Le dossier est-il encore partagé avec un utilisateur ou un groupe"""
+        return session.query(or_(
+            exists().where(FolderShare.folder_id == folder_id),
+            exists().where(FolderGroupShare.folder_id == folder_id)
+        )).scalar()
+
+    def search_users(self, prefix='', after=None, limit=50, exclude_self=True):
+        """
+        Une page d'utilisateurs actifs dont le nom ou l'email commence par prefix
+
+        La recherche (insensible à la casse) et la pagination par clé sur
+        (nom en minuscules, id) utilisent les index ix_users_username_lower
+        et ix_users_email_lower: le coût ne dépend pas du nombre d'utilisateurs.
+        Le préfixe et le curseur sont mis en minuscules par la base, comme
+        les clés des index (lower() de SQLite ne convertit que l'ASCII).
+
+        Returns:
+            tuple: (liste de User détachés, curseur de la page suivante ou None)
+        """
+        username_key = func.lower(User.username)
+        prefix = (prefix or '').strip()
+
+        session = self.db.get_session()
+        try:
+            if prefix:
+                prefix = session.scalar(select(func.lower(prefix)))
+            query = session.query(User, username_key).filter(User.is_active.isnot(False))
+            if exclude_self:
+                query = query.filter(User.id != self.user.id)
+            if prefix:
+                # Intervalle [prefix, prefix + U+FFFF): utilisable par l'index, contrairement à LIKE
+                upper = prefix + '\uffff'
+                email_key = func.lower(User.email)
+                query = query.filter(or_(
+                    and_(username_key >= prefix, username_key < upper),
+                    and_(email_key >= prefix, email_key < upper)
+                ))
+            if after is not None:
+                last_key, last_id = after
+                query = query.filter(or_(
+                    username_key > last_key,
+                    and_(username_key == last_key, User.id > last_id)
+                ))
+
+            rows = query.order_by(username_key, User.id).limit(limit).all()
+            session.expunge_all()
+        finally:
+            session.close()
+
+        users = [user for user, _ in rows]
+        cursor = (rows[-1][1], rows[-1][0].id) if len(rows) == limit else None
+        return users, cursor
+
     def unshare_folder(self, folder_id, user_id):
         """Retirer le partage d'un dossier"""
         session = self.db.get_session()
@@ -101,15 +304,14 @@ class SharingController:
             target_user = share.user
             session.delete(share)
             
-            # Si plus de partages, remettre en privé
-            remaining_shares = session.query(FolderShare).filter(
-                FolderShare.folder_id == folder_id
-            ).count()
+            session.flush()
             
-            if remaining_shares == 0 and folder.visibility == FolderVisibility.SHARED:
-                folder.visibility = FolderVisibility.PRIVATE
+            # Si plus de partages, remettre en privé
+            reset_unshared_visibility(session, [folder_id])
             
             session.commit()
+            invalidate_folder_caches()
+            PermissionResolver().invalidate([user_id])
             
             self.audit.log_action('DELETE', 'SHARE', folder_id,
                                 f"Partage retiré pour {target_user.username}")
@@ -122,6 +324,46 @@ class SharingController:
         finally:
             session.close()
     
+    def unshare_folder_group(self, folder_id, group_id):
+        """Retirer le partage d'un dossier avec un groupe"""
+        session = self.db.get_session()
+        try:
+            folder = session.query(Folder).filter(Folder.id == folder_id).first()
+            if not folder:
+                return False, "Dossier non trouvé"
+            
+            if folder.owner_id != self.user.id and not self.user.is_superuser():
+                return False, "Permission refusée"
+            
+            share = session.query(FolderGroupShare).filter(
+                FolderGroupShare.folder_id == folder_id,
+                FolderGroupShare.group_id == group_id
+            ).first()
+            
+            if not share:
+                return False, "Partage non trouvé"
+            
+            group_name = share.group.name
+            session.delete(share)
+            session.flush()
+            
+            reset_unshared_visibility(session, [folder_id])
+            
+            session.commit()
+            invalidate_folder_caches()
+            PermissionResolver().invalidate()
+            
+            self.audit.log_action('DELETE', 'SHARE', folder_id,
+                                f"Partage retiré pour le groupe {group_name}")
+            
+            return True, "Partage retiré"
+            
+        except Exception as e:
+            session.rollback()
+            return False, str(e)
+        finally:
+            session.close()
+    
     def set_folder_public(self, folder_id, is_public=True):
         """Rendre un dossier public ou privé"""
         session = self.db.get_session()
@@ -138,14 +380,15 @@ class SharingController:
                 message = "Dossier rendu public"
             else:
                 # Vérifier s'il y a des partages
-                has_shares = session.query(FolderShare).filter(
-                    FolderShare.folder_id == folder_id
-                ).count() > 0
+                has_shares = self._has_shares(session, folder_id)
                 
                 folder.visibility = FolderVisibility.SHARED if has_shares else FolderVisibility.PRIVATE
                 message = "Dossier rendu privé"
             
             session.commit()
+            invalidate_folder_caches()
+            # La visibilité publique concerne tous les utilisateurs
+            PermissionResolver().invalidate()
             
             self.audit.log_action('UPDATE', 'FOLDER', folder_id,
                                 f"Visibilité changée: {folder.visibility.value}")
@@ -158,46 +401,38 @@ class SharingController:
         finally:
             session.close()
     
-    def get_public_folders(self):
-        """Récupérer tous les dossiers publics"""
+    def get_public_folders(self, sort=None, offset=0, limit=None, recursive=True):
+        """Récupérer les dossiers publics, triés en SQL (voir normalize_folder_sort)"""
         session = self.db.get_session()
         try:
-            folders = (
+            query = (
                 session.query(Folder)
-                .options(
-                    selectinload(Folder.owner),
-                    selectinload(Folder.subfolders),
-                    selectinload(Folder.files)
-                )
+                .options(selectinload(Folder.owner))
                 .filter(Folder.visibility == FolderVisibility.PUBLIC)
-                .all()
+                .order_by(*folder_order_by(sort))
             )
+            folders = self._paginate(query, offset, limit).all()
             
-            for folder in folders:
-                self._load_all_subfolders(folder, session)
+            self._load_tree(folders, session, sort, recursive)
             session.expunge_all()
             return folders
             
         finally:
             session.close()
     
-    def get_shared_with_me(self):
-        """Récupérer les dossiers partagés avec moi"""
+    def get_shared_with_me(self, sort=None, offset=0, limit=None, recursive=True):
+        """Récupérer les dossiers partagés avec moi, triés en SQL"""
         session = self.db.get_session()
         try:
-            shares = (
-                session.query(FolderShare)
-                .options(
-                    selectinload(FolderShare.folder),
-                    selectinload(FolderShare.folder).selectinload(Folder.owner) # ✅ Charger l'utilisateur lié
-                    )
-                .filter(FolderShare.user_id == self.user.id)
-                .all()
+            query = (
+                session.query(Folder)
+                .options(selectinload(Folder.owner)) # ✅ Charger l'utilisateur lié
+                .filter(self._shared_filter(Folder))
+                .order_by(*folder_order_by(sort))
             )
+            folders = self._paginate(query, offset, limit).all()
             
-            folders = [share.folder for share in shares]
-            for folder in folders:
-                self._load_all_subfolders(folder, session)
+            self._load_tree(folders, session, sort, recursive)
             session.expunge_all()
             
             return folders
@@ -205,6 +440,21 @@ class SharingController:
         finally:
             session.close()
     
+    def _paginate(self, query, offset=0, limit=None):
+        """Appliquer offset/limit à une requête"""
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+    
+    def _load_tree(self, folders, session, sort=None, recursive=True):
+        """Charger l'arborescence triée, ou seulement le nombre de sous-dossiers"""
+        if recursive:
+            load_sorted_subfolders(folders, session, sort)
+        else:
+            attach_subfolder_counts(folders, session)
+    
     def get_folder_shares(self, folder_id):
         """Récupérer la liste des partages d'un dossier"""
         session = self.db.get_session()
@@ -231,83 +481,172 @@ class SharingController:
         finally:
             session.close()
     
-    def get_all_accessible_folders(self):
+    def get_folder_group_shares(self, folder_id):
+        """Récupérer les partages d'un dossier avec des groupes (avec le nombre de membres)"""
+        session = self.db.get_session()
+        try:
+            folder = session.query(Folder.owner_id).filter(Folder.id == folder_id).first()
+            if not folder:
+                return None
+            
+            if folder.owner_id != self.user.id and not self.user.is_superuser():
+                return None
+            
+            shares = (
+                session.query(FolderGroupShare)
+                .options(selectinload(FolderGroupShare.group))
+                .filter(FolderGroupShare.folder_id == folder_id)
+                .all()
+            )
+            counts = dict(
+                session.query(GroupMembership.group_id, func.count(GroupMembership.id))
+                .filter(GroupMembership.group_id.in_([share.group_id for share in shares]))
+                .group_by(GroupMembership.group_id)
+                .all()
+            ) if shares else {}
+            for share in shares:
+                share.group.member_count = counts.get(share.group_id, 0)
+            
+            session.expunge_all()
+            return shares
+            
+        finally:
+            session.close()
+    
+    def _shared_filter(self, folder):
+        """Condition SQL: dossier partagé avec l'utilisateur ou l'un de ses groupes"""
+        user_groups = select(GroupMembership.group_id).where(GroupMembership.user_id == self.user.id)
+        return or_(
+            exists().where(FolderShare.folder_id == folder.id,
+                           FolderShare.user_id == self.user.id),
+            exists().where(FolderGroupShare.folder_id == folder.id,
+                           FolderGroupShare.group_id.in_(user_groups))
+        )
+
+    def _accessible_filter(self, folder):
+        """Condition SQL: dossier possédé, public ou partagé avec l'utilisateur"""
+        return or_(
+            folder.owner_id == self.user.id,
+            folder.visibility == FolderVisibility.PUBLIC,
+            self._shared_filter(folder)
+        )
+
+    def _accessible_roots_filters(self):
+        """
+        Conditions des racines accessibles
+
+        Une racine est un dossier accessible (possédé, public ou partagé)
+        dont aucun ancêtre ne l'est: un sous-dossier partagé apparaît donc
+        à la racine de celui qui le reçoit, sauf s'il est déjà visible sous
+        un ancêtre accessible (droits hérités, comme PermissionResolver).
+        Chaque dossier ne sort qu'une fois, quel que soit le nombre de
+        raisons d'y accéder.
         """
-        Récupérer tous les dossiers accessibles par l'utilisateur:
+        if self.user.is_superuser():
+            # Superuser voit tout
+            return [Folder.parent_id.is_(None)]
+
+        # (dossier accessible, ancêtre): la remontée s'arrête au premier
+        # ancêtre accessible
+        child = aliased(Folder)
+        chain = (
+            select(child.id.label('folder_id'),
+                   child.parent_id.label('ancestor_id'),
+                   literal(1).label('depth'))
+            .where(child.parent_id.isnot(None), self._accessible_filter(child))
+            .cte('accessible_ancestors', recursive=True)
+        )
+        ancestor = aliased(Folder)
+        chain = chain.union_all(
+            select(chain.c.folder_id, ancestor.parent_id, chain.c.depth + 1)
+            .where(ancestor.id == chain.c.ancestor_id,
+                   ancestor.parent_id.isnot(None),
+                   ~self._accessible_filter(ancestor),
+                   chain.c.depth < PermissionResolver.MAX_DEPTH)
+        )
+
+        covering = aliased(Folder)
+        ancestor_accessible = exists(
+            select(chain.c.folder_id)
+            .join(covering, covering.id == chain.c.ancestor_id)
+            .where(chain.c.folder_id == Folder.id, self._accessible_filter(covering))
+        )
+        return [self._accessible_filter(Folder), ~ancestor_accessible]
+
+    def accessible_roots_query(self, session, sort=None):
+        """Requête unique des racines accessibles, triée en SQL"""
+        return (
+            session.query(Folder)
+            .options(selectinload(Folder.owner))
+            .filter(*self._accessible_roots_filters())
+            .order_by(*folder_order_by(sort))
+        )
+
+    def get_all_accessible_folders(self, sort=None, offset=0, limit=None, recursive=True):
+        """
+        Récupérer les dossiers racines accessibles par l'utilisateur:
         - Ses propres dossiers
         - Les dossiers publics
         - Les dossiers partagés avec lui
         - Si superuser: TOUS les dossiers
+
+        Une seule requête, paginée par offset/limit (voir accessible_roots_query).
         """
         session = self.db.get_session()
         try:
-            if self.user.is_superuser():
-                # Superuser voit tout
-                folders = (
-                    session.query(Folder)
-                    .options(
-                        selectinload(Folder.subfolders),
-                        selectinload(Folder.owner)
-                        )
-                    .filter(Folder.parent_id.is_(None))
-                    .all()
-                )
-            else:
-                # Dossiers personnels
-                my_folders = (
-                    session.query(Folder)
-                    .options(
-                        selectinload(Folder.subfolders),
-                        selectinload(Folder.owner) # ✅ Charger l'utilisateur lié
-                    )
-                    .filter(
-                        Folder.owner_id == self.user.id,
-                        Folder.parent_id.is_(None)
-                    )
-                    .all()
-                )
-                
-                # Dossiers publics des autres
-                public_folders = (
-                    session.query(Folder)
-                    .options(
-                        selectinload(Folder.subfolders),
-                        selectinload(Folder.owner) # ✅ Charger l'utilisateur lié
-                    )
-                    .filter(
-                        Folder.visibility == FolderVisibility.PUBLIC,
-                        Folder.owner_id != self.user.id,
-                        Folder.parent_id.is_(None)
-                    )
-                    .all()
-                )
-                
-                # Dossiers partagés avec moi
-                shared_folder_ids = [
-                    share.folder_id for share in 
-                    session.query(FolderShare.folder_id)
-                    .filter(FolderShare.user_id == self.user.id)
-                    .all()
-                ]
-                
-                shared_folders = (
-                    session.query(Folder)
-                    .options(
-                        selectinload(Folder.subfolders),
-                        selectinload(Folder.owner) # ✅ Charger l'utilisateur lié
-                    )
-                    .filter(
-                        Folder.id.in_(shared_folder_ids),
-                        Folder.parent_id.is_(None)
-                    )
-                    .all()
-                ) if shared_folder_ids else []
-                
-                folders = my_folders + public_folders + shared_folders
-            for folder in folders:
-                self._load_all_subfolders(folder, session)
+            query = self.accessible_roots_query(session, sort)
+            folders = self._paginate(query, offset, limit).all()
+
+            self._load_tree(folders, session, sort, recursive)
             session.expunge_all()
             return folders
-            
+
         finally:
             session.close()
+
+    def count_accessible_folders(self):
+        """Nombre de dossiers racines accessibles (pour la pagination)"""
+        session = self.db.get_session()
+        try:
+            return self.accessible_roots_query(session).order_by(None).count()
+        finally:
+            session.close()
+
+    # ------------------------------
+    # Listings en lignes compactes (FolderRow)
+    # ------------------------------
+    def get_public_folder_rows(self, sort=None, offset=0, limit=None):
+        """Page des dossiers publics en lignes compactes"""
+        return self._folder_rows([Folder.visibility == FolderVisibility.PUBLIC], sort, offset, limit)
+
+    def get_shared_with_me_rows(self, sort=None, offset=0, limit=None):
+        """Page des dossiers partagés avec moi (ou mes groupes) en lignes compactes"""
+        return self._folder_rows([self._shared_filter(Folder)], sort, offset, limit)
+
+    def get_accessible_folder_rows(self, sort=None, offset=0, limit=None):
+        """Page des racines accessibles en lignes compactes"""
+        return self._folder_rows(self._accessible_roots_filters(), sort, offset, limit)
+
+    def _folder_rows(self, filters, sort, offset, limit):
+        session = self.db.get_session()
+        try:
+            return fetch_folder_rows(session, filters, sort, offset, limit)
+        finally:
+            session.close()
+
+
+def reset_unshared_visibility(session, folder_ids):
+    """
+    Remettre en privé les dossiers SHARED qui n'ont plus aucun partage
+
+    Appelée après le retrait de partages (utilisateur, groupe, ou groupe
+    supprimé avec ses partages); la transaction est validée par l'appelant.
+    """
+    folder_ids = list(folder_ids)
+    for start in range(0, len(folder_ids), SharingController.CHUNK_SIZE):
+        session.query(Folder).filter(
+            Folder.id.in_(folder_ids[start:start + SharingController.CHUNK_SIZE]),
+            Folder.visibility == FolderVisibility.SHARED,
+            ~exists().where(FolderShare.folder_id == Folder.id),
+            ~exists().where(FolderGroupShare.folder_id == Folder.id)
+        ).update({Folder.visibility: FolderVisibility.PRIVATE}, synchronize_session='fetch')
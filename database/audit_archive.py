@@ -0,0 +1,259 @@
+# database/audit_archive.py
+"""
+database/audit_archive.py
+Partitions mensuelles archivées du journal d'audit (JSON lines compressé)
+"""
+
+import gzip
+import json
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from config.settings import Settings
+from database.db_manager import DatabaseManager
+
+
+class AuditArchive:
+    """
+    Archives du journal d'audit, une partition par mois
+
+    La table audit_logs ne garde que les mois récents. rotate() déplace
+    chaque mois entièrement plus ancien que la période de rétention vers
+    un fichier audit_AAAA-MM_<id>.jsonl.gz (un événement JSON par ligne,
+    par ordre de date), puis supprime les lignes correspondantes. Le
+    fichier est écrit de manière atomique et synchronisé sur disque
+    avant toute suppression: une interruption ne perd aucun événement.
+
+    Les archives restent consultables avec query(), qui renvoie des
+    AuditLog détachés comme la table.
+    """
+
+    BATCH_SIZE = 5000
+    FILE_PATTERN = re.compile(r'^audit_(\d{4})-(\d{2})_(\d+)\.jsonl\.gz$')
+
+    def __init__(self, archive_dir: Optional[str] = None, db: Optional[DatabaseManager] = None):
+        settings = Settings()
+        self.archive_dir = Path(archive_dir or settings.get('audit.archive_dir'))
+        self.db = db or DatabaseManager()
+
+    # ------------------------------
+    # Partitions
+    # ------------------------------
+    def partitions(self) -> Dict[str, List[Path]]:
+        """Fichiers d'archive par mois ('AAAA-MM'), du plus récent au plus ancien"""
+        months = {}
+        if self.archive_dir.is_dir():
+            for path in self.archive_dir.iterdir():
+                match = self.FILE_PATTERN.match(path.name)
+                if match:
+                    months.setdefault(f"{match.group(1)}-{match.group(2)}", []).append(path)
+        return {month: sorted(months[month]) for month in sorted(months, reverse=True)}
+
+    @staticmethod
+    def _month_start(moment: datetime) -> datetime:
+        return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def _next_month(month_start: datetime) -> datetime:
+        return (month_start + timedelta(days=32)).replace(day=1)
+
+    # ------------------------------
+    # Rotation
+    # ------------------------------
+    def rotate(self, retention_days: Optional[int] = None, progress_callback=None) -> Dict:
+        """
+        Archiver les mois complets plus anciens que retention_days
+
+        Returns:
+            dict: {'months': [...], 'archived': nombre d'événements}
+        """
+        from models.audit_log import AuditLog
+        from database.audit_writer import AuditWriter
+
+        if retention_days is None:
+            retention_days = int(Settings().get('audit.retention_days', 365))
+        stats = {'months': [], 'archived': 0}
+        if retention_days <= 0:
+            return stats
+
+        # Les événements encore en file doivent être en base
+        AuditWriter().flush()
+
+        cutoff = self._month_start(datetime.utcnow() - timedelta(days=retention_days))
+
+        session = self.db.get_session()
+        try:
+            oldest = (
+                session.query(AuditLog.timestamp)
+                .filter(AuditLog.timestamp < cutoff)
+                .order_by(AuditLog.timestamp, AuditLog.id)
+                .first()
+            )
+        finally:
+            session.close()
+
+        if oldest is None:
+            return stats
+
+        month = self._month_start(oldest[0])
+        while month < cutoff:
+            count = self._archive_month(month, self._next_month(month))
+            if count:
+                stats['months'].append(month.strftime('%Y-%m'))
+                stats['archived'] += count
+                if progress_callback:
+                    progress_callback(stats['archived'])
+            month = self._next_month(month)
+
+        return stats
+
+    def _archive_month(self, start: datetime, end: datetime) -> int:
+        """Écrire les événements d'un mois dans un fichier puis les supprimer"""
+        from models.audit_log import AuditLog
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.archive_dir, suffix='.tmp')
+        count = 0
+        first_id = None
+        last_key = None
+        max_id = 0
+
+        session = self.db.get_session()
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+                # Pagination par clé (timestamp, id): pas d'OFFSET sur une grosse table
+                while True:
+                    query = session.query(AuditLog).filter(
+                        AuditLog.timestamp >= start, AuditLog.timestamp < end
+                    )
+                    if last_key is not None:
+                        query = query.filter(
+                            (AuditLog.timestamp > last_key[0]) |
+                            ((AuditLog.timestamp == last_key[0]) & (AuditLog.id > last_key[1]))
+                        )
+                    batch = query.order_by(AuditLog.timestamp, AuditLog.id).limit(self.BATCH_SIZE).all()
+                    if not batch:
+                        break
+
+                    for log in batch:
+                        f.write(json.dumps(self._to_record(log), ensure_ascii=False) + '\n')
+                        max_id = max(max_id, log.id)
+                    if first_id is None:
+                        first_id = batch[0].id
+                    count += len(batch)
+                    last_key = (batch[-1].timestamp, batch[-1].id)
+                    session.expunge_all()
+
+                f.flush()
+                raw.flush()
+                os.fsync(raw.fileno())
+
+            if count == 0:
+                os.unlink(tmp_path)
+                return 0
+
+            final_path = self.archive_dir / f"audit_{start.strftime('%Y-%m')}_{first_id}.jsonl.gz"
+            os.replace(tmp_path, final_path)
+
+            # Le fichier est durable: les lignes peuvent quitter la table, par
+            # lots pour ne pas tenir un long verrou. Les événements écrits
+            # pendant l'archivage sont datés de maintenant, hors de ce mois.
+            while True:
+                chunk = [
+                    row[0] for row in session.query(AuditLog.id).filter(
+                        AuditLog.timestamp >= start, AuditLog.timestamp < end,
+                        AuditLog.id <= max_id
+                    ).limit(self.BATCH_SIZE)
+                ]
+                if not chunk:
+                    break
+                session.query(AuditLog).filter(AuditLog.id.in_(chunk)).delete(synchronize_session=False)
+                session.commit()
+
+            print(f"📦 Journal d'audit {start.strftime('%Y-%m')}: {count} événement(s) archivé(s)")
+            return count
+        except Exception:
+            session.rollback()
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def _to_record(log) -> Dict:
+        return {
+            'id': log.id,
+            'user_id': log.user_id,
+            'action': log.action,
+            'entity_type': log.entity_type,
+            'entity_id': log.entity_id,
+            'details': log.details,
+            'ip_address': log.ip_address,
+            'timestamp': log.timestamp.isoformat() if log.timestamp else None,
+        }
+
+    # ------------------------------
+    # Consultation
+    # ------------------------------
+    def iter_records(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                     predicate: Optional[Callable[[Dict], bool]] = None) -> Iterator[Dict]:
+        """
+        Événements archivés, du plus récent au plus ancien
+
+        Les mois hors de [since, until) ne sont pas ouverts. Seuls les
+        événements retenus par predicate sont gardés en mémoire, le temps
+        de trier leur mois.
+        """
+        for month, paths in self.partitions().items():
+            month_start = datetime.strptime(month, '%Y-%m')
+            if until is not None and month_start >= until:
+                continue
+            if since is not None and self._next_month(month_start) <= since:
+                break
+
+            records = []
+            for path in paths:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    for line in f:
+                        record = json.loads(line)
+                        timestamp = record['timestamp']
+                        record['timestamp'] = datetime.fromisoformat(timestamp) if timestamp else None
+
+                        if since is not None and (timestamp is None or record['timestamp'] < since):
+                            continue
+                        if until is not None and timestamp is not None and record['timestamp'] >= until:
+                            continue
+                        if predicate is None or predicate(record):
+                            records.append(record)
+
+            records.sort(key=lambda r: (r['timestamp'] or datetime.min, r['id']), reverse=True)
+            yield from records
+
+    def query(self, user_id=None, entity_type=None, entity_id=None, action=None,
+              since: Optional[datetime] = None, until: Optional[datetime] = None,
+              limit: Optional[int] = 100) -> list:
+        """
+        Rechercher dans les archives (du plus récent au plus ancien)
+
+        Returns:
+            list: AuditLog détachés (non liés à une session)
+        """
+        from models.audit_log import AuditLog
+
+        def matches(record):
+            return ((user_id is None or record['user_id'] == user_id) and
+                    (not entity_type or record['entity_type'] == entity_type) and
+                    (not entity_id or record['entity_id'] == entity_id) and
+                    (not action or record['action'] == action))
+
+        logs = []
+        for record in self.iter_records(since, until, matches):
+            logs.append(AuditLog(**record))
+            if limit is not None and len(logs) >= limit:
+                break
+        return logs
@@ -0,0 +1,172 @@
+# database/audit_writer.py
+"""
+database/audit_writer.py
+Écriture différée et groupée du journal d'audit
+"""
+
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+
+from config.settings import Settings
+from database.db_manager import DatabaseManager
+
+
+class AuditWriter:
+    """
+    File d'attente des événements d'audit, partagée par toute l'application
+
+    Les événements sont horodatés à leur création puis placés dans une
+    file; un thread d'écriture les insère par lots, dès que batch_size
+    événements sont en attente ou au plus tard après flush_interval
+    secondes. Une consultation de fichier ne coûte donc plus une
+    transaction. flush() attend que tout ce qui a été soumis soit écrit:
+    c'est le mode durable utilisé pour les actions sensibles, et il est
+    appelé automatiquement à l'arrêt de l'interpréteur.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    # Tentatives d'écriture d'un lot avant abandon
+    MAX_ATTEMPTS = 3
+
+    def __new__(cls):
+        """Implémentation du pattern Singleton"""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        with self._lock:
+            if self._initialized:
+                return
+
+            settings = Settings()
+            self.batch_size = max(1, int(settings.get('audit.batch_size', 100)))
+            self.flush_interval = float(settings.get('audit.flush_interval', 2.0))
+
+            self._queue = queue.Queue()
+            self._thread = None
+            self._thread_lock = threading.Lock()
+            atexit.register(self.close)
+            self._initialized = True
+
+    # ------------------------------
+    # Soumission
+    # ------------------------------
+    def submit(self, user_id, action, entity_type, entity_id, details=None, ip_address=None):
+        """Placer un événement dans la file (non bloquant)"""
+        self._queue.put({
+            'user_id': user_id,
+            'action': action,
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'details': details,
+            'ip_address': ip_address,
+            'timestamp': datetime.utcnow(),
+        })
+        self._ensure_thread()
+
+    def flush(self, timeout=None) -> bool:
+        """
+        Attendre l'écriture de tous les événements déjà soumis
+
+        Returns:
+            bool: True si tout a été écrit avec succès
+        """
+        if self._thread is None and self._queue.empty():
+            return True
+
+        done = threading.Event()
+        result = {'success': True}
+        self._queue.put((done, result))
+        self._ensure_thread()
+
+        if not done.wait(timeout):
+            return False
+        return result['success']
+
+    def close(self):
+        """Écrire les événements restants puis arrêter le thread"""
+        with self._thread_lock:
+            thread = self._thread
+        if thread is None:
+            return
+
+        self.flush()
+        self._queue.put(None)
+        thread.join()
+        with self._thread_lock:
+            self._thread = None
+
+    # ------------------------------
+    # Thread d'écriture
+    # ------------------------------
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='audit-writer', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        pending = []
+        waiters = []
+        deadline = None
+        stop = False
+
+        while not stop:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+
+            if item is None:
+                stop = True
+            elif isinstance(item, tuple) and item:
+                waiters.append(item)
+            elif isinstance(item, dict):
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            # Écrire quand le lot est complet, à l'échéance ou sur demande
+            if not stop and len(pending) < self.batch_size and not waiters and item != ():
+                continue
+
+            success = True
+            while pending:
+                batch, pending = pending[:self.batch_size], pending[self.batch_size:]
+                success = self._write(batch) and success
+            deadline = None
+
+            for done, result in waiters:
+                result['success'] = success
+                done.set()
+            waiters = []
+
+    def _write(self, batch) -> bool:
+        """Insérer un lot dans audit_logs (une transaction)"""
+        from models.audit_log import AuditLog
+
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            session = DatabaseManager().get_session()
+            try:
+                session.bulk_insert_mappings(AuditLog, batch)
+                session.commit()
+                return True
+            except Exception as e:
+                session.rollback()
+                if attempt == self.MAX_ATTEMPTS:
+                    print(f"❌ {len(batch)} événement(s) d'audit perdus: {e}")
+                    return False
+                time.sleep(0.1 * attempt)
+            finally:
+                session.close()
@@ -1,5 +1,7 @@
 # database/db_manager.py
-from sqlalchemy import create_engine
+import warnings
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import SAWarning
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import StaticPool
 from pathlib import Path
@@ -7,12 +9,31 @@ from utils.path_config import load_resource
 
 Base = declarative_base()
 
+
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """
+    Réglages de chaque connexion SQLite
+
+    WAL: les lectures ne bloquent pas l'écriture en cours (et inversement).
+    busy_timeout: une écriture attend la fin de celle d'un autre thread ou
+    d'un autre poste au lieu d'échouer aussitôt.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute(f'PRAGMA busy_timeout={DatabaseManager.SQLITE_BUSY_TIMEOUT_MS}')
+    finally:
+        cursor.close()
+
 class DatabaseManager:
     _instance = None
     _engine = None
     _session_factory = None
     _db_type = None # <-- ajouté pour stocker le type de base de données
     
+    # Attente maximale du verrou d'écriture SQLite
+    SQLITE_BUSY_TIMEOUT_MS = 30000
+    
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -44,11 +65,24 @@ class DatabaseManager:
             db_path.parent.mkdir(parents=True, exist_ok=True)
             
             connection_string = f'sqlite:///{db_path}'
-            self._engine = create_engine(
-                connection_string,
-                connect_args={'check_same_thread': False},
-                poolclass=StaticPool
-            )
+            if str(db_path) == ':memory:':
+                # Base en mémoire: elle n'existe que dans sa connexion
+                self._engine = create_engine(
+                    connection_string,
+                    connect_args={'check_same_thread': False},
+                    poolclass=StaticPool
+                )
+            else:
+                # Une connexion par session (pool par défaut): chaque thread
+                # (interface, pool de tâches, écriture de l'audit...) a sa
+                # propre transaction. Avec une connexion partagée, la fermeture
+                # d'une session annulait les écritures non validées des autres.
+                self._engine = create_engine(
+                    connection_string,
+                    connect_args={'check_same_thread': False,
+                                  'timeout': self.SQLITE_BUSY_TIMEOUT_MS / 1000}
+                )
+                event.listen(self._engine, 'connect', _configure_sqlite_connection)
         
         elif db_type == 'postgresql':
             host = kwargs.get('host', 'localhost')
@@ -78,6 +112,24 @@ class DatabaseManager:
         
         # Créer toutes les tables définies dans Base
         Base.metadata.create_all(self._engine)
+        
+        # create_all ignore les tables existantes: ajouter les index manquants
+        self._create_missing_indexes()
+    
+    def _create_missing_indexes(self):
+        """Créer les index déclarés dans les modèles mais absents de la base"""
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                try:
+                    # Les index sur expression (lower(...)) ne sont pas relus par
+                    # checkfirst: la base signale alors qu'ils existent déjà
+                    with warnings.catch_warnings():
+                        warnings.simplefilter('ignore', SAWarning)
+                        index.create(self._engine, checkfirst=True)
+                except Exception as e:
+                    if 'already exists' in str(e) or 'Duplicate key name' in str(e):
+                        continue
+                    print(f"⚠️  Impossible de créer l'index {index.name}: {e}")
     
     def get_session(self):
         """Get a new database session"""
@@ -0,0 +1,166 @@
+# database/object_cache.py
+"""
+database/object_cache.py
+Cache en mémoire des lignes lues par clé primaire
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from config.settings import Settings
+
+
+class ObjectCache:
+    """
+    Cache LRU des objets lus par id, partagé par toute l'application
+
+    Les contrôleurs ouvrent une session par appel: sans cache, chaque clic
+    recharge les mêmes lignes. Une entrée garde un instantané (valeurs des
+    colonnes) et sa version (updated_at). Pendant ttl secondes l'entrée
+    est servie sans accès à la base; ensuite une requête de version, bien
+    plus légère que le chargement, dit si l'instantané est encore valable
+    (modifications faites par un autre poste). Les chemins d'écriture
+    appellent invalidate() pour que le poste courant voie ses propres
+    modifications immédiatement.
+
+    Les instantanés ne sont jamais rendus tels quels: snapshot() et
+    materialize() reconstruisent à chaque lecture une instance détachée
+    neuve, qu'un appelant peut modifier sans altérer le cache.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """Implémentation du pattern Singleton"""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        with self._lock:
+            if self._initialized:
+                return
+
+            settings = Settings()
+            self.max_entries = max(1, int(settings.get('cache.object_entries', 5000)))
+            self.ttl = float(settings.get('cache.object_ttl', 30))
+
+            # clé -> [instantané, version, expiration]
+            self._entries = OrderedDict()
+            self._entries_lock = threading.Lock()
+            self._stats = {'hits': 0, 'revalidated': 0, 'misses': 0,
+                           'evictions': 0, 'invalidations': 0}
+            settings.subscribe(self._on_settings_changed)
+            self._initialized = True
+
+    def _on_settings_changed(self, changed_keys):
+        if 'cache.object_entries' in changed_keys or 'cache.object_ttl' in changed_keys:
+            settings = Settings()
+            with self._entries_lock:
+                self.max_entries = max(1, int(settings.get('cache.object_entries', 5000)))
+                self.ttl = float(settings.get('cache.object_ttl', 30))
+                self._evict()
+
+    # ------------------------------
+    # Lecture
+    # ------------------------------
+    def get(self, key: Hashable, load: Callable[[], Optional[Tuple[Any, Any]]],
+            version: Optional[Callable[[Any], Any]] = None):
+        """
+        Instantané de key, chargé par load() si absent ou périmé
+
+        Args:
+            load: Retourne (instantané, version), ou None si l'objet n'existe pas
+            version: Reçoit l'instantané et retourne sa version actuelle en
+                     base; sans validateur une entrée expirée est rechargée
+
+        Returns:
+            L'instantané, ou None (les absences ne sont pas mises en cache)
+        """
+        now = time.monotonic()
+        with self._entries_lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > now:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry[0]
+
+        if entry is not None and version is not None:
+            current = version(entry[0])
+            if current is not None and current == entry[1]:
+                with self._entries_lock:
+                    # Une invalidation pendant la requête l'emporte
+                    if self._entries.get(key) is entry:
+                        entry[2] = time.monotonic() + self.ttl
+                        self._entries.move_to_end(key)
+                    self._stats['revalidated'] += 1
+                return entry[0]
+
+        loaded = load()
+        with self._entries_lock:
+            self._stats['misses'] += 1
+            if loaded is None:
+                self._entries.pop(key, None)
+                return None
+            snapshot, snapshot_version = loaded
+            self._entries[key] = [snapshot, snapshot_version, time.monotonic() + self.ttl]
+            self._entries.move_to_end(key)
+            self._evict()
+        return snapshot
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    # ------------------------------
+    # Invalidation
+    # ------------------------------
+    def invalidate(self, *keys: Hashable):
+        """Oublier des entrées précises"""
+        with self._entries_lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self._stats['invalidations'] += 1
+
+    def invalidate_kind(self, kind: str):
+        """Oublier toutes les entrées dont la clé commence par kind ('file', 'folder_tree'...)"""
+        with self._entries_lock:
+            stale = [key for key in self._entries if isinstance(key, tuple) and key[0] == kind]
+            for key in stale:
+                del self._entries[key]
+            self._stats['invalidations'] += len(stale)
+
+    def clear(self):
+        with self._entries_lock:
+            self._stats['invalidations'] += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs de succès/échecs et taille actuelle"""
+        with self._entries_lock:
+            return dict(self._stats, entries=len(self._entries), max_entries=self.max_entries)
+
+    # ------------------------------
+    # Instantanés d'objets ORM
+    # ------------------------------
+    @staticmethod
+    def snapshot(obj) -> Dict[str, Any]:
+        """Valeurs des colonnes d'une instance ORM"""
+        mapper = sa_inspect(obj).mapper
+        return {attr.key: getattr(obj, attr.key) for attr in mapper.column_attrs}
+
+    @staticmethod
+    def materialize(model, values: Dict[str, Any]):
+        """Instance détachée neuve à partir d'un instantané"""
+        obj = model(**values)
+        make_transient_to_detached(obj)
+        return obj
@@ -5,9 +5,10 @@ import sys
 from PySide6.QtWidgets import QApplication
 from database.db_manager import DatabaseManager
 from config.settings import Settings
-from views.login_window import LoginWindow
-from views.main_window import MainWindow
 from utils.theme_manager import ThemeManager
+# Seul le chemin de connexion est chargé au lancement: la fenêtre principale
+# et ses dépendances (contrôleurs, aperçus...) sont importées après la connexion
+from views.login_window import LoginWindow
 
 def main():
     # Create application
@@ -44,6 +45,7 @@ def main():
             user = login_window.user
             
             # Show main window
+            from views.main_window import MainWindow
             main_window = MainWindow(user, db)
             main_window.show()
             
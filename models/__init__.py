@@ -5,5 +5,10 @@ from .folder import Folder
 from .file import File
 from .audit_log import AuditLog
 from .folder_share import FolderShare
+from .user_group import UserGroup, GroupMembership
+from .folder_group_share import FolderGroupShare
+from .file_integrity import FileIntegrity, IntegrityCheckpoint
 
-__all__ = ['User', 'Folder', 'File', 'AuditLog', 'FolderShare']
\ No newline at end of file
+__all__ = ['User', 'Folder', 'File', 'AuditLog', 'FolderShare',
+           'UserGroup', 'GroupMembership', 'FolderGroupShare',
+           'FileIntegrity', 'IntegrityCheckpoint']
\ No newline at end of file
@@ -1,13 +1,22 @@
 
 
 # models/audit_log.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database.db_manager import Base
 
 class AuditLog(Base):
     __tablename__ = 'audit_logs'
+    __table_args__ = (
+        # Lecture du journal d'un utilisateur, du plus récent au plus ancien
+        Index('ix_audit_logs_user_timestamp', 'user_id', 'timestamp', 'id'),
+        # Archivage par mois et parcours global par date
+        Index('ix_audit_logs_timestamp', 'timestamp', 'id'),
+        # Filtres par action et par entité, paginés sur (timestamp, id)
+        Index('ix_audit_logs_action_timestamp', 'action', 'timestamp', 'id'),
+        Index('ix_audit_logs_entity_timestamp', 'entity_type', 'entity_id', 'timestamp', 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -1,11 +1,18 @@
 # models/file.py
-from sqlalchemy import Column, Integer, String, BigInteger, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, BigInteger, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime,timezone
 from database.db_manager import Base
 
 class File(Base):
     __tablename__ = 'files'
+    __table_args__ = (
+        # Index couvrant le listing paginé d'un dossier pour chaque colonne triable
+        Index('ix_files_folder_name', 'folder_id', 'name', 'id'),
+        Index('ix_files_folder_type', 'folder_id', 'file_type', 'id'),
+        Index('ix_files_folder_size', 'folder_id', 'file_size', 'id'),
+        Index('ix_files_folder_created', 'folder_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
@@ -16,12 +23,19 @@ class File(Base):
     # Relations avec CASCADE
     folder_id = Column(Integer, ForeignKey('folders.id', ondelete='CASCADE'), nullable=False)
     
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), 
+                       onupdate=lambda: datetime.now(timezone.utc))
     
     # Relationships
     folder = relationship("Folder", back_populates="files")
     uploader = relationship('User')
+    integrity = relationship(
+        "FileIntegrity",
+        back_populates="file",
+        uselist=False,
+        cascade="all, delete-orphan"
+    )
 
     file_type = Column(String(50))
     uploaded_by = Column(Integer, ForeignKey('users.id'), nullable=False)
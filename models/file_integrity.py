@@ -0,0 +1,66 @@
+# models/file_integrity.py
+from sqlalchemy import Column, Integer, String, Text, BigInteger, ForeignKey, DateTime, Index, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+from database.db_manager import Base
+from utils.enums import IntegrityStatus
+
+
+class FileIntegrity(Base):
+    __tablename__ = 'file_integrity'
+    __table_args__ = (
+        # Fichiers en défaut (rapport de vérification)
+        Index('ix_file_integrity_status_file', 'status', 'file_id'),
+    )
+
+    file_id = Column(Integer, ForeignKey('files.id', ondelete='CASCADE'), primary_key=True)
+
+    # Empreinte de référence: calculée à l'écriture dans le stockage, ou à
+    # la première vérification pour les fichiers plus anciens
+    sha256 = Column(String(64), nullable=True)
+    size = Column(BigInteger, nullable=True)
+    hashed_at = Column(DateTime, nullable=True)
+
+    # Dernière vérification
+    status = Column(SQLEnum(IntegrityStatus), default=IntegrityStatus.OK, nullable=False)
+    detail = Column(Text, nullable=True)
+    checked_at = Column(DateTime, nullable=True)
+    # Première détection du défaut en cours (None si conforme)
+    failed_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    file = relationship("File", back_populates="integrity")
+
+    @classmethod
+    def baseline(cls, sha256, size):
+        """Référence d'un fichier qui vient d'être écrit dans le stockage"""
+        now = datetime.now(timezone.utc)
+        return cls(sha256=sha256, size=size, hashed_at=now,
+                   status=IntegrityStatus.OK, checked_at=now)
+
+    def __repr__(self):
+        return f"<FileIntegrity(file_id={self.file_id}, status={self.status})>"
+
+
+class IntegrityCheckpoint(Base):
+    __tablename__ = 'integrity_checkpoints'
+
+    # 'scrub' pour tout le stockage, 'scrub:folder:<id>' pour un sous-arbre
+    name = Column(String(100), primary_key=True)
+
+    # Dernier fichier vérifié du passage en cours (parcours par id croissant)
+    last_file_id = Column(Integer, default=0, nullable=False)
+    files_checked = Column(Integer, default=0, nullable=False)
+    bytes_checked = Column(BigInteger, default=0, nullable=False)
+    problems = Column(Integer, default=0, nullable=False)
+
+    passes = Column(Integer, default=0, nullable=False)
+    pass_started_at = Column(DateTime, nullable=True)
+    last_completed_at = Column(DateTime, nullable=True)
+
+    # Verrou d'un vérificateur en cours (hôte:pid:instance), renouvelé à chaque sauvegarde
+    locked_by = Column(String(255), nullable=True)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<IntegrityCheckpoint(name='{self.name}', last_file_id={self.last_file_id})>"
@@ -1,5 +1,5 @@
 # models/folder.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from database.db_manager import Base
@@ -7,6 +7,17 @@ from utils.enums import  FolderVisibility
 
 class Folder(Base):
     __tablename__ = 'folders'
+    __table_args__ = (
+        # Index des listings triés: racines d'un propriétaire et enfants d'un dossier
+        Index('ix_folders_owner_parent_name', 'owner_id', 'parent_id', 'name', 'id'),
+        Index('ix_folders_parent_name', 'parent_id', 'name', 'id'),
+        Index('ix_folders_parent_created', 'parent_id', 'created_at', 'id'),
+        Index('ix_folders_parent_year', 'parent_id', 'year', 'id'),
+        Index('ix_folders_parent_theme', 'parent_id', 'theme', 'id'),
+        Index('ix_folders_parent_sector', 'parent_id', 'sector', 'id'),
+        # Dossiers publics (racines accessibles)
+        Index('ix_folders_visibility_parent', 'visibility', 'parent_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
@@ -60,6 +71,13 @@ class Folder(Base):
         cascade="all, delete-orphan"
     )
     
+    # Partages du dossier avec des groupes
+    group_shares = relationship(
+        "FolderGroupShare",
+        back_populates="folder",
+        cascade="all, delete-orphan"
+    )
+    
     def __repr__(self):
         return f"<Folder(id={self.id}, name='{self.name}', visibility='{self.visibility.value}')>"
     
@@ -0,0 +1,40 @@
+# models/folder_group_share.py
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, UniqueConstraint, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+from database.db_manager import Base
+from utils.enums import SharePermission
+
+
+class FolderGroupShare(Base):
+    __tablename__ = 'folder_group_shares'
+    __table_args__ = (
+        # Un seul partage par (dossier, groupe); sert aussi aux partages d'un dossier
+        UniqueConstraint('folder_id', 'group_id', name='uq_folder_group_shares_folder_group'),
+        # Dossiers partagés avec un groupe (EXISTS des requêtes d'accès)
+        Index('ix_folder_group_shares_group_folder', 'group_id', 'folder_id'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    
+    # Relations
+    folder_id = Column(Integer, ForeignKey('folders.id', ondelete='CASCADE'), nullable=False)
+    group_id = Column(Integer, ForeignKey('user_groups.id', ondelete='CASCADE'), nullable=False)
+    
+    # Permission accordée à tous les membres du groupe
+    permission = Column(SQLEnum(SharePermission), 
+                       default=SharePermission.READ, 
+                       nullable=False)
+    
+    # Qui a partagé
+    shared_by = Column(Integer, ForeignKey('users.id'), nullable=False)
+    
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    # Relationships
+    folder = relationship("Folder", back_populates="group_shares")
+    group = relationship("UserGroup", back_populates="folder_shares")
+    sharer = relationship("User", foreign_keys=[shared_by])
+    
+    def __repr__(self):
+        return f"<FolderGroupShare(folder_id={self.folder_id}, group_id={self.group_id}, permission='{self.permission.value}')>"
@@ -1,5 +1,5 @@
 # models/folder_share.py
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Enum as SQLEnum
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from database.db_manager import Base
@@ -9,6 +9,12 @@ from utils.enums import  SharePermission
 
 class FolderShare(Base):
     __tablename__ = 'folder_shares'
+    __table_args__ = (
+        # Dossiers partagés avec un utilisateur (EXISTS des requêtes d'accès)
+        Index('ix_folder_shares_user_folder', 'user_id', 'folder_id'),
+        # Partages d'un dossier
+        Index('ix_folder_shares_folder_user', 'folder_id', 'user_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     
@@ -0,0 +1,57 @@
+# models/rows.py
+"""
+Lignes compactes en lecture seule pour les listings.
+
+Ces objets sont construits à partir de requêtes ne sélectionnant que
+quelques colonnes: ils ne sont pas attachés à une session et ne
+déclenchent jamais de chargement paresseux.
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from utils.enums import FolderVisibility, IntegrityStatus
+
+
+class FileRow(NamedTuple):
+    """Ligne de listing d'un fichier"""
+    id: int
+    name: str
+    file_type: Optional[str]
+    file_size: Optional[int]
+    mime_type: Optional[str]
+    created_at: Optional[datetime]
+
+
+class FolderRow(NamedTuple):
+    """Ligne de listing d'un dossier (arborescence paresseuse)"""
+    id: int
+    name: str
+    parent_id: Optional[int]
+    owner_id: int
+    owner_name: Optional[str]
+    visibility: FolderVisibility
+    year: Optional[int]
+    theme: Optional[str]
+    sector: Optional[str]
+    created_at: Optional[datetime]
+    subfolder_count: int
+
+    def is_public(self):
+        """Vérifie si le dossier est public"""
+        return self.visibility == FolderVisibility.PUBLIC
+
+    def is_shared(self):
+        """Vérifie si le dossier est partagé"""
+        return self.visibility == FolderVisibility.SHARED
+
+
+class IntegrityRow(NamedTuple):
+    """Fichier en défaut lors de la dernière vérification du stockage"""
+    file_id: int
+    name: str
+    folder_id: int
+    file_path: str
+    status: IntegrityStatus
+    detail: Optional[str]
+    failed_at: Optional[datetime]
+    checked_at: Optional[datetime]
@@ -1,5 +1,5 @@
 # models/user.py
-from sqlalchemy import Column, Integer, String, DateTime, Boolean,Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index, func, Enum as SQLEnum
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -10,7 +10,6 @@ from utils.enums import UserRole, FolderVisibility
 
 class User(Base):
     __tablename__ = 'users'
-    
     id = Column(Integer, primary_key=True)
     username = Column(String(100), unique=True, nullable=False)
     email = Column(String(255), unique=True, nullable=False)
@@ -65,4 +64,9 @@ class User(Base):
         if hasattr(folder, 'shared_with'):
             return any(share.user_id == self.id for share in folder.shared_with)
         
-        return False
\ No newline at end of file
+        return False
+
+
+# Recherche par préfixe insensible à la casse (sélecteur d'utilisateurs)
+Index('ix_users_username_lower', func.lower(User.username), User.id)
+Index('ix_users_email_lower', func.lower(User.email))
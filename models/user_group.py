@@ -0,0 +1,56 @@
+# models/user_group.py
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+from database.db_manager import Base
+
+
+class UserGroup(Base):
+    __tablename__ = 'user_groups'
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), unique=True, nullable=False)
+    description = Column(Text, nullable=True)
+    
+    created_by = Column(Integer, ForeignKey('users.id'), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    # Relationships
+    creator = relationship("User", foreign_keys=[created_by])
+    memberships = relationship(
+        "GroupMembership",
+        back_populates="group",
+        cascade="all, delete-orphan"
+    )
+    folder_shares = relationship(
+        "FolderGroupShare",
+        back_populates="group",
+        cascade="all, delete-orphan"
+    )
+    
+    def __repr__(self):
+        return f"<UserGroup(id={self.id}, name='{self.name}')>"
+
+
+class GroupMembership(Base):
+    __tablename__ = 'group_memberships'
+    __table_args__ = (
+        # Un utilisateur n'est membre qu'une fois d'un groupe; sert aussi à lister les membres
+        UniqueConstraint('group_id', 'user_id', name='uq_group_memberships_group_user'),
+        # Groupes d'un utilisateur (résolution des permissions)
+        Index('ix_group_memberships_user_group', 'user_id', 'group_id'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    group_id = Column(Integer, ForeignKey('user_groups.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    
+    added_by = Column(Integer, ForeignKey('users.id'), nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    # Relationships
+    group = relationship("UserGroup", back_populates="memberships")
+    user = relationship("User", foreign_keys=[user_id])
+    
+    def __repr__(self):
+        return f"<GroupMembership(group_id={self.group_id}, user_id={self.user_id})>"
@@ -0,0 +1,80 @@
+"""
+tests/support.py
+Outils communs aux tests: dossier personnel isolé et base SQLite temporaire
+
+À importer avant tout module de l'application: Settings lit et écrit
+~/.archive_manager/config.json, qui doit être celui d'un dossier
+temporaire et non celui de l'utilisateur.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+HOME = tempfile.mkdtemp(prefix='archive-manager-tests-')
+os.environ['HOME'] = HOME
+os.environ['USERPROFILE'] = HOME
+
+from config.settings import Settings  # noqa: E402
+from database.db_manager import DatabaseManager  # noqa: E402
+from database.object_cache import ObjectCache  # noqa: E402
+import models  # noqa: E402,F401  (enregistre toutes les tables)
+from models.folder import Folder  # noqa: E402
+from models.user import User  # noqa: E402
+from utils.enums import FolderVisibility, UserRole  # noqa: E402
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Base SQLite neuve et stockage vide pour chaque test"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(dir=HOME)
+        self.storage = os.path.join(self.tmp, 'storage')
+        Settings().set('storage.base_path', self.storage)
+
+        self.db = DatabaseManager()
+        self.db.initialize('sqlite', db_path=os.path.join(self.tmp, 'archives.db'))
+
+        from controllers.permission_resolver import PermissionResolver
+        ObjectCache().clear()
+        PermissionResolver().invalidate()
+
+    def tearDown(self):
+        from database.audit_writer import AuditWriter
+        # Les événements en attente visent la base de ce test
+        AuditWriter().flush()
+        self.db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def create_user(self, username, role=UserRole.USER):
+        session = self.db.get_session()
+        try:
+            # Pas de hachage du mot de passe: les tests ne se connectent pas
+            user = User(username=username, email=f'{username}@example.org', role=role,
+                        password_hash='-')
+            session.add(user)
+            session.commit()
+            session.refresh(user)
+            session.expunge(user)
+            return user
+        finally:
+            session.close()
+
+    def create_folder(self, name, owner, parent=None, visibility=FolderVisibility.PRIVATE):
+        session = self.db.get_session()
+        try:
+            folder = Folder(name=name, owner_id=owner.id, visibility=visibility,
+                            parent_id=parent.id if parent is not None else None)
+            session.add(folder)
+            session.commit()
+            session.refresh(folder)
+            session.expunge(folder)
+            return folder
+        finally:
+            session.close()
@@ -0,0 +1,147 @@
+"""Export d'un dossier en archive puis réimport, avec vérification du manifeste"""
+
+import os
+import zipfile
+
+import support
+from controllers.export_controller import ExportController
+from controllers.file_controller import FileController
+from controllers.folder_controller import FolderController
+from utils.enums import UserRole
+
+CONTENTS = {
+    'projet/notes.txt': b'premiere version\n',
+    'projet/docs/rapport.txt': 'rapport annuel é'.encode('utf-8') * 500,
+    'projet/docs/images/vide.bin': b'',
+    'projet/docs/images/data.bin': bytes(range(256)) * 64,
+}
+
+
+class ArchiveRoundTripTests(support.DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user('admin', UserRole.ADMIN)
+        self.files = FileController(self.admin, self.db)
+        self.exporter = ExportController(self.admin, self.db)
+
+        source = os.path.join(self.tmp, 'source')
+        folders = {'projet': self.create_folder('projet', self.admin)}
+        for path, data in CONTENTS.items():
+            parent = path.rpartition('/')[0]
+            self.ensure_folder(folders, parent)
+            local = os.path.join(source, path)
+            os.makedirs(os.path.dirname(local), exist_ok=True)
+            with open(local, 'wb') as f:
+                f.write(data)
+            success, result = self.files.add_file(local, folders[parent].id)
+            self.assertTrue(success, result)
+        self.root = folders['projet']
+        self.target = self.create_folder('restauration', self.admin)
+
+    def ensure_folder(self, folders, path):
+        if path not in folders:
+            parent, _, name = path.rpartition('/')
+            self.ensure_folder(folders, parent)
+            folders[path] = self.create_folder(name, self.admin, folders[parent])
+        return folders[path]
+
+    def export(self, fmt):
+        destination = os.path.join(self.tmp, f'export.{fmt}')
+        success, stats = self.exporter.export_folder(self.root.id, destination, fmt=fmt)
+        self.assertTrue(success, stats)
+        self.assertEqual(stats['errors'], [])
+        self.assertEqual(stats['files'], len(CONTENTS))
+        self.assertFalse(os.path.exists(f'{destination}.part'))
+        return destination
+
+    def imported_contents(self):
+        """{chemin: contenu} des fichiers importés sous le dossier cible"""
+        folders = FolderController(self.admin, self.db)
+        contents = {}
+
+        def walk(folder_id, prefix):
+            for file in self.files.get_files_in_folder(folder_id):
+                with open(file.file_path, 'rb') as f:
+                    contents[prefix + file.name] = f.read()
+            for child in folders.get_subfolders(folder_id):
+                walk(child.id, f'{prefix}{child.name}/')
+
+        walk(self.target.id, '')
+        return contents
+
+    def assert_round_trip(self, fmt):
+        archive = self.export(fmt)
+
+        success, stats = self.files.import_archive(archive, self.target.id)
+
+        self.assertTrue(success, stats)
+        self.assertEqual(stats['errors'], [])
+        self.assertEqual(stats['files'], len(CONTENTS))
+        # projet, docs, images
+        self.assertEqual(stats['folders'], 3)
+        self.assertEqual(self.imported_contents(), CONTENTS)
+
+    def test_zip_round_trip(self):
+        self.assert_round_trip('zip')
+
+    def test_tar_round_trip(self):
+        self.assert_round_trip('tar')
+
+    def test_uncompressed_zip_round_trip(self):
+        destination = os.path.join(self.tmp, 'stored.zip')
+        self.assertTrue(self.exporter.export_folder(self.root.id, destination, level=0)[0])
+
+        success, stats = self.files.import_archive(destination, self.target.id)
+
+        self.assertTrue(success, stats)
+        self.assertEqual(self.imported_contents(), CONTENTS)
+
+    def test_manifest_lists_every_file(self):
+        with zipfile.ZipFile(self.export('zip')) as archive:
+            manifest = archive.read(ExportController.MANIFEST_NAME).decode('utf-8')
+
+        names = sorted(line.split('  ', 1)[1] for line in manifest.splitlines())
+        self.assertEqual(names, sorted(CONTENTS))
+        self.assertNotIn(ExportController.MANIFEST_NAME, self.imported_contents())
+
+    def test_altered_member_is_reported(self):
+        archive = self.export('zip')
+        tampered = os.path.join(self.tmp, 'tampered.zip')
+        with zipfile.ZipFile(archive) as source, zipfile.ZipFile(tampered, 'w') as out:
+            for info in source.infolist():
+                data = source.read(info)
+                if info.filename == 'projet/notes.txt':
+                    data = b'version modifiee\n'
+                out.writestr(info, data)
+
+        success, stats = self.files.import_archive(tampered, self.target.id)
+
+        self.assertTrue(success, stats)
+        self.assertEqual(stats['errors'],
+                         ["projet/notes.txt: empreinte SHA-256 différente du manifeste"])
+
+    def test_missing_member_is_reported(self):
+        archive = self.export('zip')
+        truncated = os.path.join(self.tmp, 'truncated.zip')
+        with zipfile.ZipFile(archive) as source, zipfile.ZipFile(truncated, 'w') as out:
+            for info in source.infolist():
+                if info.filename != 'projet/docs/images/data.bin':
+                    out.writestr(info, source.read(info))
+
+        success, stats = self.files.import_archive(truncated, self.target.id)
+
+        self.assertTrue(success, stats)
+        self.assertEqual(stats['files'], len(CONTENTS) - 1)
+        self.assertEqual(stats['errors'],
+                         ["projet/docs/images/data.bin: absent de l'archive ou illisible"])
+
+    def test_reimport_reuses_existing_folders(self):
+        archive = self.export('tar')
+        self.assertTrue(self.files.import_archive(archive, self.target.id)[0])
+
+        success, stats = self.files.import_archive(archive, self.target.id)
+
+        self.assertTrue(success, stats)
+        self.assertEqual(stats['folders'], 0)
+        self.assertEqual(stats['files'], len(CONTENTS))
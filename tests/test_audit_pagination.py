@@ -0,0 +1,140 @@
+"""Pagination par clé du journal d'audit (query_logs, iter_logs), archives comprises"""
+
+import os
+from datetime import datetime, timedelta
+
+import support
+from config.settings import Settings
+from controllers.audit_controller import AuditController
+from models.audit_log import AuditLog
+from utils.enums import UserRole
+
+
+class AuditPaginationTests(support.DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user('admin', UserRole.ADMIN)
+        self.bob = self.create_user('bob')
+
+        # 25 événements dont plusieurs partagent le même horodatage:
+        # le curseur doit départager par id
+        start = datetime(2026, 1, 1, 12, 0, 0)
+        session = self.db.get_session()
+        try:
+            for i in range(25):
+                session.add(AuditLog(
+                    user_id=self.admin.id if i % 2 else self.bob.id,
+                    action='VIEW' if i % 3 else 'DELETE',
+                    entity_type='FILE', entity_id=i + 1,
+                    timestamp=start + timedelta(seconds=i // 4)
+                ))
+            session.commit()
+        finally:
+            session.close()
+
+    def pages(self, controller, limit, **filters):
+        pages, cursor = [], None
+        while True:
+            logs, cursor = controller.query_logs(after=cursor, limit=limit, **filters)
+            pages.append([log.entity_id for log in logs])
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_every_event_once_in_order(self):
+        pages = self.pages(AuditController(self.admin, self.db), limit=7)
+
+        self.assertEqual([len(page) for page in pages], [7, 7, 7, 4])
+        entity_ids = [entity_id for page in pages for entity_id in page]
+        self.assertEqual(entity_ids, list(range(25, 0, -1)))
+
+    def test_exact_multiple_of_the_page_size_ends_with_an_empty_page(self):
+        pages = self.pages(AuditController(self.admin, self.db), limit=5)
+
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 5, 0])
+
+    def test_filters_apply_to_every_page(self):
+        pages = self.pages(AuditController(self.admin, self.db), limit=3, actions=['DELETE'])
+
+        entity_ids = [entity_id for page in pages for entity_id in page]
+        self.assertEqual(entity_ids, [i + 1 for i in range(24, -1, -1) if i % 3 == 0])
+
+    def test_non_admin_only_pages_through_own_events(self):
+        pages = self.pages(AuditController(self.bob, self.db), limit=4, user_id=self.admin.id)
+
+        entity_ids = [entity_id for page in pages for entity_id in page]
+        self.assertEqual(entity_ids, [i + 1 for i in range(24, -1, -1) if i % 2 == 0])
+
+    def test_iter_logs_matches_the_pages(self):
+        controller = AuditController(self.admin, self.db)
+        logs = list(controller.iter_logs(batch_size=6))
+
+        self.assertEqual([log.entity_id for log in logs], list(range(25, 0, -1)))
+
+    def test_queued_events_are_visible_on_the_first_page(self):
+        controller = AuditController(self.admin, self.db)
+        controller.log_action('UPDATE', 'FOLDER', 99, durable=False)
+
+        logs, _ = controller.query_logs(entity_type='FOLDER')
+        self.assertEqual([log.entity_id for log in logs], [99])
+
+
+class AuditArchivePaginationTests(support.DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        Settings().set('audit.archive_dir', os.path.join(self.tmp, 'archives'))
+        self.admin = self.create_user('admin', UserRole.ADMIN)
+        self.bob = self.create_user('bob')
+
+        # 6 événements de janvier 2020 (archivés), puis 4 récents (table)
+        recent = datetime.utcnow() - timedelta(hours=1)
+        moments = [datetime(2020, 1, 10, 8, 0, 0) + timedelta(days=i // 2) for i in range(6)]
+        moments += [recent + timedelta(minutes=i) for i in range(4)]
+        session = self.db.get_session()
+        try:
+            for i, moment in enumerate(moments):
+                session.add(AuditLog(user_id=self.admin.id if i % 2 else self.bob.id,
+                                     action='VIEW', entity_type='FILE', entity_id=i + 1,
+                                     timestamp=moment))
+            session.commit()
+        finally:
+            session.close()
+
+        controller = AuditController(self.admin, self.db)
+        success, stats = controller.archive_old_logs(retention_days=30)
+        self.assertTrue(success, stats)
+        self.assertEqual(stats['archived'], 6)
+
+    def entity_ids(self, controller, limit, **filters):
+        entity_ids, cursor = [], None
+        while True:
+            logs, cursor = controller.query_logs(after=cursor, limit=limit, entity_type='FILE',
+                                                 **filters)
+            entity_ids.extend(log.entity_id for log in logs)
+            if cursor is None:
+                return entity_ids
+
+    def test_pages_continue_into_archived_months(self):
+        controller = AuditController(self.admin, self.db)
+
+        for limit in (3, 4, 10, 100):
+            self.assertEqual(self.entity_ids(controller, limit), list(range(10, 0, -1)))
+
+    def test_table_only_paging(self):
+        controller = AuditController(self.admin, self.db)
+
+        self.assertEqual(self.entity_ids(controller, 3, include_archive=False), [10, 9, 8, 7])
+
+    def test_archived_events_keep_user_scoping(self):
+        controller = AuditController(self.bob, self.db)
+
+        self.assertEqual(self.entity_ids(controller, 2), [9, 7, 5, 3, 1])
+
+    def test_get_logs_reads_archives_by_default(self):
+        controller = AuditController(self.bob, self.db)
+
+        self.assertEqual([log.entity_id for log in controller.get_logs(entity_type='FILE')],
+                         [9, 7, 5, 3, 1])
+        self.assertEqual([log.entity_id for log in
+                          controller.get_logs(entity_type='FILE', include_archive=False)], [9, 7])
@@ -0,0 +1,88 @@
+"""Commandes import et export de la ligne de commande"""
+
+import argparse
+import io
+import json
+import os
+
+import support
+import cli
+from controllers.file_controller import FileController
+from utils.enums import UserRole
+
+
+class CliCopyTests(support.DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user('admin', UserRole.ADMIN)
+        self.folder = self.create_folder('scans', self.admin)
+        self.files = FileController(self.admin, self.db)
+
+    def run_command(self, command, name, **args):
+        output = io.StringIO()
+        code = command(argparse.Namespace(**args), self.db, self.admin, cli.EventWriter(output, name))
+        events = [json.loads(line) for line in output.getvalue().splitlines()]
+        return code, events[-1]
+
+    def write(self, path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def stored_contents(self):
+        files = self.files.get_files_in_folder(self.folder.id)
+        contents = []
+        for file in files:
+            with open(file.file_path, encoding='utf-8') as f:
+                contents.append(f.read())
+        return files, sorted(contents)
+
+    def test_parallel_full_import_keeps_same_named_files_apart(self):
+        source = os.path.join(self.tmp, 'source')
+        expected = [f'contenu {i}' for i in range(12)]
+        for i, content in enumerate(expected):
+            self.write(os.path.join(source, f'lot{i}', 'scan.pdf'), content)
+
+        code, result = self.run_command(cli.cmd_import, 'import', source=source,
+                                        folder_id=self.folder.id, full=True,
+                                        no_recursive=False, workers=4)
+
+        self.assertEqual(code, cli.EXIT_OK, result)
+        self.assertEqual(result['imported'], 12)
+        files, contents = self.stored_contents()
+        self.assertEqual(len({file.file_path for file in files}), 12)
+        self.assertEqual(contents, sorted(expected))
+        # Aucune réservation de nom laissée dans le stockage
+        stored = os.listdir(os.path.join(self.storage, str(self.folder.id)))
+        self.assertFalse([name for name in stored if name.endswith('.part')])
+
+    def test_storage_name_is_reserved_before_the_copy(self):
+        # Deux imports parallèles demandent un chemin avant d'avoir écrit
+        first = self.files._storage_path(self.folder.id, 'scan.pdf')
+        second = self.files._storage_path(self.folder.id, 'scan.pdf')
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(second.name, 'scan (2).pdf')
+        self.assertTrue(first.with_name('scan.pdf.part').exists())
+
+    def test_directory_export_keeps_same_named_files_apart(self):
+        for i, content in enumerate(['premier', 'second', 'troisième']):
+            path = self.write(os.path.join(self.tmp, f'source{i}', 'rapport.txt'), content)
+            self.assertTrue(self.files.add_file(path, self.folder.id)[0])
+        destination = os.path.join(self.tmp, 'export')
+
+        code, result = self.run_command(cli.cmd_export, 'export', folder_id=self.folder.id,
+                                        destination=destination, format='dir',
+                                        include_root=False, workers=4)
+
+        self.assertEqual(code, cli.EXIT_OK, result)
+        self.assertEqual(result['exported'], 3)
+        self.assertEqual(sorted(os.listdir(destination)),
+                         ['rapport (2).txt', 'rapport (3).txt', 'rapport.txt'])
+        contents = []
+        for name in os.listdir(destination):
+            with open(os.path.join(destination, name), encoding='utf-8') as f:
+                contents.append(f.read())
+        self.assertEqual(sorted(contents), ['premier', 'second', 'troisième'])
@@ -0,0 +1,94 @@
+"""Sessions SQLite utilisées depuis plusieurs threads"""
+
+import threading
+
+import support
+from database.audit_writer import AuditWriter
+from models.audit_log import AuditLog
+from models.user import User
+
+
+class ThreadedSessionTests(support.DatabaseTestCase):
+
+    def count_users(self):
+        session = self.db.get_session()
+        try:
+            return session.query(User).count()
+        finally:
+            session.close()
+
+    def test_close_in_another_thread_keeps_pending_insert(self):
+        writer = self.db.get_session()
+        user = User(username='alice', email='alice@example.org', password_hash='-')
+        writer.add(user)
+        writer.flush()
+
+        # Une session ouverte puis fermée par un autre thread pendant que
+        # l'insertion n'est pas encore validée
+        def read_and_close():
+            session = self.db.get_session()
+            session.query(User).count()
+            session.close()
+
+        thread = threading.Thread(target=read_and_close)
+        thread.start()
+        thread.join()
+
+        writer.commit()
+        writer.close()
+        self.assertEqual(self.count_users(), 1)
+
+    def test_concurrent_writers_all_committed(self):
+        errors = []
+
+        def insert(prefix):
+            for i in range(20):
+                session = self.db.get_session()
+                try:
+                    user = User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.org', password_hash='-')
+                    session.add(user)
+                    session.flush()
+                    session.commit()
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    session.close()
+
+        threads = [threading.Thread(target=insert, args=(f'u{n}-',)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.count_users(), 80)
+
+    def test_audit_writer_and_user_writes_interleaved(self):
+        owner = self.create_user('owner')
+        writer = AuditWriter()
+
+        session = self.db.get_session()
+        try:
+            for i in range(50):
+                writer.submit(owner.id, 'VIEW', 'FILE', i)
+                user = User(username=f'user{i}', email=f'user{i}@example.org', password_hash='-')
+                session.add(user)
+                session.flush()
+                if i % 10 == 9:
+                    session.commit()
+            session.commit()
+        finally:
+            session.close()
+
+        self.assertTrue(writer.flush(timeout=30))
+        session = self.db.get_session()
+        try:
+            self.assertEqual(session.query(AuditLog).filter(AuditLog.action == 'VIEW').count(), 50)
+        finally:
+            session.close()
+        self.assertEqual(self.count_users(), 51)
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()
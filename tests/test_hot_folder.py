@@ -0,0 +1,77 @@
+"""Dossiers surveillés: import des lots et résistance aux erreurs d'import"""
+
+import os
+import threading
+
+import support
+from controllers.file_controller import FileController
+from utils.enums import UserRole
+from utils.hot_folder import HotFolderService, PollingWatcher
+
+
+class HotFolderIngestTests(support.DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.owner = self.create_user('owner', UserRole.ADMIN)
+        self.folder = self.create_folder('scans', self.owner)
+        self.controller = FileController(self.owner, self.db)
+
+        self.source = os.path.join(self.tmp, 'depot')
+        os.makedirs(os.path.join(self.source, 'dept1'))
+        os.makedirs(os.path.join(self.source, 'dept2'))
+        self.mapping = {'source': self.source, 'folder_id': self.folder.id}
+
+    def drop(self, rel_path, content):
+        path = os.path.join(self.source, rel_path)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def stored_contents(self):
+        contents = []
+        for file in self.controller.get_files_in_folder(self.folder.id):
+            with open(file.file_path, encoding='utf-8') as f:
+                contents.append(f.read())
+        return sorted(contents)
+
+    def test_same_name_in_two_subfolders_keeps_both_contents(self):
+        paths = [self.drop('dept1/scan001.pdf', 'premier'), self.drop('dept2/scan001.pdf', 'second')]
+
+        stats = HotFolderService(self.controller).ingest(self.mapping, paths)
+
+        self.assertEqual((stats['new'], stats['errors']), (2, []))
+        self.assertEqual(self.stored_contents(), ['premier', 'second'])
+
+    def test_batch_of_known_files_is_skipped(self):
+        path = self.drop('dept1/scan001.pdf', 'premier')
+        service = HotFolderService(self.controller)
+        service.ingest(self.mapping, [path])
+
+        stats = service.ingest(self.mapping, [path])
+
+        self.assertEqual((stats['new'], stats['changed']), (0, 0))
+        self.assertEqual(len(self.controller.get_files_in_folder(self.folder.id)), 1)
+
+    def test_failed_full_sync_does_not_stop_the_watcher(self):
+        ingested = []
+
+        class BrokenController:
+            def sync_folder(self, *args, **kwargs):
+                raise RuntimeError("base indisponible")
+
+        service = HotFolderService(BrokenController(),
+                                   on_ingested=lambda mapping, stats: ingested.append(stats))
+        watcher = PollingWatcher(self.source, lambda path: None, interval=0.05)
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=watcher.run, args=(stop, lambda: service.on_batch(self.mapping, None)))
+        thread.start()
+        try:
+            thread.join(timeout=0.3)
+            self.assertTrue(thread.is_alive())
+        finally:
+            stop.set()
+            thread.join(timeout=2)
+
+        self.assertEqual(ingested, [{'new': 0, 'changed': 0, 'errors': ['base indisponible']}])
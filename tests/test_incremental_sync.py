@@ -0,0 +1,189 @@
+"""Import incrémental: manifeste du dossier source et FileController.sync_folder"""
+
+import os
+
+import support
+from controllers.file_controller import FileController
+from utils.scan_manifest import ScanManifest
+from utils.enums import UserRole
+
+
+class IncrementalSyncTests(support.DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.owner = self.create_user('owner', UserRole.ADMIN)
+        self.folder = self.create_folder('import', self.owner)
+        self.controller = FileController(self.owner, self.db)
+
+        self.source = os.path.join(self.tmp, 'source')
+        os.makedirs(os.path.join(self.source, 'sub'))
+        self.write('a.txt', 'alpha')
+        self.write('b.txt', 'bravo')
+        self.write('sub/c.txt', 'charlie')
+
+    def write(self, rel_path, content, mtime=None):
+        path = os.path.join(self.source, rel_path)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def sync(self, paths=None):
+        stats = self.controller.sync_folder(self.source, self.folder.id, paths=paths)
+        self.assertEqual(stats['errors'], [])
+        return stats
+
+    def counts(self, stats):
+        return {key: stats[key] for key in ('new', 'changed', 'moved', 'deleted', 'unchanged')}
+
+    def archived_names(self):
+        return sorted(f.name for f in self.controller.get_files_in_folder(self.folder.id))
+
+    def manifest_paths(self):
+        with ScanManifest(self.source, self.folder.id) as manifest:
+            return sorted(row[0] for row in manifest.conn.execute("SELECT rel_path FROM entries"))
+
+    def test_first_sync_imports_everything(self):
+        stats = self.sync()
+
+        self.assertEqual(self.counts(stats),
+                         {'new': 3, 'changed': 0, 'moved': 0, 'deleted': 0, 'unchanged': 0})
+        self.assertEqual(self.archived_names(), ['a.txt', 'b.txt', 'c.txt'])
+        self.assertEqual(self.manifest_paths(), ['a.txt', 'b.txt', os.path.join('sub', 'c.txt')])
+
+    def test_same_name_in_two_subfolders_keeps_both_contents(self):
+        os.makedirs(os.path.join(self.source, 'a'))
+        os.makedirs(os.path.join(self.source, 'b'))
+        self.write('a/report.txt', 'AAAA')
+        self.write('b/report.txt', 'BB')
+
+        self.assertEqual(self.sync()['new'], 5)
+
+        reports = [f for f in self.controller.get_files_in_folder(self.folder.id)
+                   if f.name == 'report.txt']
+        self.assertEqual(len({f.file_path for f in reports}), 2)
+        contents = []
+        for f in reports:
+            with open(f.file_path, encoding='utf-8') as stored:
+                contents.append(stored.read())
+            self.assertEqual(os.path.getsize(f.file_path), f.file_size)
+        self.assertEqual(sorted(contents), ['AAAA', 'BB'])
+
+    def test_second_sync_copies_nothing(self):
+        self.sync()
+        stats = self.sync()
+
+        self.assertEqual(self.counts(stats),
+                         {'new': 0, 'changed': 0, 'moved': 0, 'deleted': 0, 'unchanged': 3})
+        self.assertEqual(len(self.archived_names()), 3)
+
+    def test_changed_content_updates_the_archived_file(self):
+        self.sync()
+        self.write('a.txt', 'alpha, version 2', mtime=os.path.getmtime(self.source) + 10)
+
+        stats = self.sync()
+
+        self.assertEqual(stats['changed'], 1)
+        self.assertEqual(stats['unchanged'], 2)
+        archived = [f for f in self.controller.get_files_in_folder(self.folder.id) if f.name == 'a.txt']
+        self.assertEqual(len(archived), 1)
+        with open(archived[0].file_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'alpha, version 2')
+
+    def test_touched_file_with_same_content_is_not_copied(self):
+        self.sync()
+        os.utime(os.path.join(self.source, 'b.txt'), (1_000_000, 1_000_000))
+
+        stats = self.sync()
+
+        self.assertEqual(stats['changed'], 0)
+        self.assertEqual(stats['unchanged'], 3)
+        # Le manifeste retient la nouvelle date: le passage suivant ne relit plus le fichier
+        self.assertEqual(self.counts(self.sync())['unchanged'], 3)
+
+    def test_moved_file_is_recorded_without_copy(self):
+        self.sync()
+        os.rename(os.path.join(self.source, 'b.txt'), os.path.join(self.source, 'sub', 'b.txt'))
+
+        stats = self.sync()
+
+        self.assertEqual(self.counts(stats),
+                         {'new': 0, 'changed': 0, 'moved': 1, 'deleted': 0, 'unchanged': 2})
+        self.assertEqual(self.archived_names(), ['a.txt', 'b.txt', 'c.txt'])
+        self.assertIn(os.path.join('sub', 'b.txt'), self.manifest_paths())
+        self.assertNotIn('b.txt', self.manifest_paths())
+
+    def test_renamed_folder_of_hard_links_is_not_ambiguous(self):
+        os.makedirs(os.path.join(self.source, 'liens'))
+        first = self.write('liens/x.txt', 'partagé')
+        os.link(first, os.path.join(self.source, 'liens', 'y.txt'))
+        self.sync()
+        os.rename(os.path.join(self.source, 'liens'), os.path.join(self.source, 'liens2'))
+
+        stats = self.sync()
+
+        # Deux anciens chemins pour deux nouveaux, même inode: pas de
+        # déplacement devinable, les fichiers sont réimportés
+        self.assertEqual(self.counts(stats),
+                         {'new': 2, 'changed': 0, 'moved': 0, 'deleted': 2, 'unchanged': 3})
+        self.assertEqual(self.manifest_paths(),
+                         ['a.txt', 'b.txt', os.path.join('liens2', 'x.txt'),
+                          os.path.join('liens2', 'y.txt'), os.path.join('sub', 'c.txt')])
+
+    def test_move_next_to_a_remaining_hard_link_is_a_move(self):
+        link = os.path.join(self.source, 'sub', 'a-lien.txt')
+        os.link(os.path.join(self.source, 'a.txt'), link)
+        self.sync()
+        os.rename(link, os.path.join(self.source, 'a-lien.txt'))
+
+        stats = self.sync()
+
+        self.assertEqual(self.counts(stats),
+                         {'new': 0, 'changed': 0, 'moved': 1, 'deleted': 0, 'unchanged': 3})
+        self.assertIn('a-lien.txt', self.manifest_paths())
+
+    def test_deleted_file_stays_archived(self):
+        self.sync()
+        os.remove(os.path.join(self.source, 'sub', 'c.txt'))
+
+        stats = self.sync()
+
+        self.assertEqual(stats['deleted'], 1)
+        self.assertEqual(self.archived_names(), ['a.txt', 'b.txt', 'c.txt'])
+        self.assertEqual(self.manifest_paths(), ['a.txt', 'b.txt'])
+
+    def test_partial_sync_does_not_forget_unselected_files(self):
+        self.sync()
+        new_path = self.write('d.txt', 'delta')
+
+        stats = self.sync(paths=[new_path, os.path.join(self.source, 'a.txt')])
+
+        self.assertEqual(self.counts(stats),
+                         {'new': 1, 'changed': 0, 'moved': 0, 'deleted': 0, 'unchanged': 1})
+        self.assertEqual(self.manifest_paths(),
+                         ['a.txt', 'b.txt', 'd.txt', os.path.join('sub', 'c.txt')])
+
+    def test_partial_sync_of_a_hard_link_is_not_a_move(self):
+        self.sync()
+        # Même inode, mais l'ancien chemin existe toujours: c'est un nouveau fichier
+        link = os.path.join(self.source, 'link.txt')
+        os.link(os.path.join(self.source, 'a.txt'), link)
+
+        stats = self.sync(paths=[link])
+
+        self.assertEqual(stats['new'], 1)
+        self.assertEqual(stats['moved'], 0)
+        self.assertIn('a.txt', self.manifest_paths())
+
+    def test_deleted_archive_file_is_reimported_on_change(self):
+        self.sync()
+        archived = [f for f in self.controller.get_files_in_folder(self.folder.id) if f.name == 'a.txt'][0]
+        self.assertTrue(self.controller.delete_file(archived.id)[0])
+        self.write('a.txt', 'alpha, version 2', mtime=os.path.getmtime(self.source) + 10)
+
+        stats = self.sync()
+
+        self.assertEqual(stats['changed'], 1)
+        self.assertEqual(self.archived_names(), ['a.txt', 'b.txt', 'c.txt'])
@@ -0,0 +1,157 @@
+"""Vérification du stockage: point de reprise, reprise et verrou du vérificateur"""
+
+import os
+from datetime import datetime, timezone
+
+import support
+from controllers.file_controller import FileController
+from controllers.integrity_controller import IntegrityController
+from models.file_integrity import IntegrityCheckpoint
+from utils.enums import IntegrityStatus, UserRole
+
+
+class ScrubCheckpointTests(support.DatabaseTestCase):
+
+    FILE_COUNT = 10
+
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user('admin', UserRole.ADMIN)
+        folder = self.create_folder('stock', self.admin)
+        files = FileController(self.admin, self.db)
+
+        source = os.path.join(self.tmp, 'source')
+        os.makedirs(source)
+        self.stored = []
+        for i in range(self.FILE_COUNT):
+            path = os.path.join(source, f'fichier{i:02d}.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f'contenu {i}\n' * (i + 1))
+            success, file = files.add_file(path, folder.id)
+            self.assertTrue(success, file)
+            self.stored.append(file)
+
+        self.controller = self.scrubber()
+
+    def scrubber(self):
+        controller = IntegrityController(self.admin, self.db)
+        # Sauvegarde après chaque paire de fichiers
+        controller.CHECKPOINT_FILES = 2
+        return controller
+
+    def set_lock(self, owner):
+        session = self.db.get_session()
+        try:
+            state = session.get(IntegrityCheckpoint, IntegrityController.DEFAULT_CHECKPOINT)
+            state.locked_by = owner
+            state.updated_at = datetime.now(timezone.utc)
+            session.commit()
+        finally:
+            session.close()
+
+    def test_full_pass(self):
+        success, stats = self.controller.scrub()
+
+        self.assertTrue(success, stats)
+        self.assertTrue(stats['completed'])
+        self.assertEqual(stats['checked'], self.FILE_COUNT)
+        self.assertEqual(stats['problems'], [])
+        self.assertEqual(stats['passes'], 1)
+        # Fichiers ajoutés par add_file: la référence est prise à la première lecture
+        self.assertEqual(stats['baselined'], self.FILE_COUNT)
+
+        state = self.controller.get_checkpoint()
+        self.assertIsNone(state.locked_by)
+        self.assertIsNone(state.pass_started_at)
+        self.assertIsNotNone(state.last_completed_at)
+
+    def test_interrupted_pass_resumes_where_it_stopped(self):
+        success, stats = self.controller.scrub(max_files=3)
+
+        self.assertTrue(success, stats)
+        self.assertFalse(stats['completed'])
+        self.assertEqual(stats['checked'], 3)
+        self.assertEqual(stats['position'], self.stored[2].id)
+        state = self.controller.get_checkpoint()
+        self.assertEqual((state.last_file_id, state.files_checked), (self.stored[2].id, 3))
+        self.assertIsNone(state.locked_by)
+
+        # Un autre vérificateur (autre instance) reprend au fichier suivant
+        success, stats = self.scrubber().scrub(max_files=4)
+        self.assertEqual(stats['checked'], 4)
+        self.assertEqual(stats['position'], self.stored[6].id)
+
+        success, stats = self.controller.scrub()
+        self.assertTrue(stats['completed'])
+        self.assertEqual(stats['checked'], self.FILE_COUNT - 7)
+        self.assertEqual(stats['passes'], 1)
+        self.assertEqual(self.controller.get_checkpoint().files_checked, self.FILE_COUNT)
+
+    def test_next_pass_starts_from_the_beginning(self):
+        self.controller.scrub()
+
+        success, stats = self.controller.scrub(max_files=2)
+
+        self.assertEqual(stats['position'], self.stored[1].id)
+        self.assertEqual(stats['passes'], 1)
+
+    def test_restart_abandons_the_current_pass(self):
+        self.controller.scrub(max_files=5)
+
+        success, stats = self.controller.scrub(restart=True, max_files=1)
+
+        self.assertEqual(stats['position'], self.stored[0].id)
+        self.assertEqual(self.controller.get_checkpoint().files_checked, 1)
+
+    def test_problems_are_recorded_and_reported(self):
+        self.controller.scrub()
+        os.remove(self.stored[1].file_path)
+        with open(self.stored[4].file_path, 'r+b') as f:
+            f.write(b'X')
+
+        success, stats = self.controller.scrub()
+
+        self.assertTrue(success, stats)
+        problems = {problem['id']: problem['problem'] for problem in stats['problems']}
+        self.assertEqual(problems, {self.stored[1].id: IntegrityStatus.MISSING.value,
+                                    self.stored[4].id: IntegrityStatus.CORRUPT.value})
+        report = {row.file_id: row.status for row in self.controller.get_problems()}
+        self.assertEqual(report, {self.stored[1].id: IntegrityStatus.MISSING,
+                                  self.stored[4].id: IntegrityStatus.CORRUPT})
+
+    def test_locked_checkpoint_is_refused(self):
+        self.controller.scrub(max_files=1)
+        self.set_lock('autre-poste:1:abcdef12')
+
+        success, message = self.controller.scrub()
+
+        self.assertFalse(success)
+        self.assertEqual(self.controller.get_checkpoint().files_checked, 1)
+
+    def test_expired_lock_is_taken_over(self):
+        self.controller.scrub(max_files=1)
+        self.set_lock('autre-poste:1:abcdef12')
+        self.controller.LEASE_SECONDS = -1
+
+        success, stats = self.controller.scrub()
+
+        self.assertTrue(success, stats)
+        self.assertTrue(stats['completed'])
+
+    def test_lost_lock_does_not_overwrite_the_new_owner(self):
+        check = self.controller._check
+
+        def steal_before_fourth(row, *args):
+            # Un autre poste reprend le verrou pendant la tranche
+            if row.id == self.stored[3].id:
+                self.set_lock('autre-poste:1:abcdef12')
+            return check(row, *args)
+
+        self.controller._check = steal_before_fourth
+        success, message = self.controller.scrub()
+
+        self.assertFalse(success)
+        state = self.controller.get_checkpoint()
+        self.assertEqual(state.locked_by, 'autre-poste:1:abcdef12')
+        # Seule la sauvegarde faite avant la perte du verrou est conservée
+        self.assertEqual((state.last_file_id, state.files_checked), (self.stored[1].id, 2))
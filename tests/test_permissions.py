@@ -0,0 +1,111 @@
+"""Permissions héritées, invalidation du cache et racines accessibles"""
+
+import support
+from controllers.group_controller import GroupController
+from controllers.permission_resolver import PermissionResolver
+from controllers.sharing_controller import SharingController
+from models.folder import Folder
+from utils.enums import AccessLevel, FolderVisibility, SharePermission, UserRole
+
+
+class PermissionResolverTests(support.DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.owner = self.create_user('owner', UserRole.ADMIN)
+        self.bob = self.create_user('bob')
+        self.resolver = PermissionResolver(self.db)
+
+        # root > child > grandchild, et un dossier sans lien
+        self.root = self.create_folder('root', self.owner)
+        self.child = self.create_folder('child', self.owner, self.root)
+        self.grandchild = self.create_folder('grandchild', self.owner, self.child)
+        self.other = self.create_folder('other', self.owner)
+
+    def levels(self, user):
+        folders = [self.root, self.child, self.grandchild, self.other]
+        levels = self.resolver.resolve(user, [folder.id for folder in folders])
+        return [levels[folder.id] for folder in folders]
+
+    def visibility(self, folder):
+        session = self.db.get_session()
+        try:
+            return session.get(Folder, folder.id).visibility
+        finally:
+            session.close()
+
+    def test_owner_has_full_access_to_the_subtree(self):
+        self.assertEqual(self.levels(self.owner), [AccessLevel.FULL] * 4)
+
+    def test_share_is_inherited_by_descendants_only(self):
+        sharing = SharingController(self.owner, self.db)
+        self.assertTrue(sharing.share_folder(self.child.id, self.bob.id, SharePermission.WRITE)[0])
+
+        self.assertEqual(self.levels(self.bob),
+                         [AccessLevel.NONE, AccessLevel.WRITE, AccessLevel.WRITE, AccessLevel.NONE])
+
+    def test_highest_inherited_level_wins(self):
+        sharing = SharingController(self.owner, self.db)
+        sharing.share_folder(self.root.id, self.bob.id, SharePermission.READ)
+        sharing.share_folder(self.grandchild.id, self.bob.id, SharePermission.MANAGE)
+
+        self.assertEqual(self.levels(self.bob),
+                         [AccessLevel.READ, AccessLevel.READ, AccessLevel.FULL, AccessLevel.NONE])
+
+    def test_public_ancestor_gives_read(self):
+        SharingController(self.owner, self.db).set_folder_public(self.root.id)
+
+        self.assertEqual(self.levels(self.bob),
+                         [AccessLevel.READ, AccessLevel.READ, AccessLevel.READ, AccessLevel.NONE])
+
+    def test_group_share_follows_membership(self):
+        groups = GroupController(self.owner, self.db)
+        ok, group = groups.create_group('compta')
+        self.assertTrue(ok)
+        groups.add_members(group.id, [self.bob.id])
+        SharingController(self.owner, self.db).share_folders(
+            [self.child.id], permission=SharePermission.WRITE, group_ids=[group.id])
+
+        self.assertEqual(self.resolver.level(self.bob, self.grandchild.id), AccessLevel.WRITE)
+
+        # Retirer le membre invalide son cache: plus d'accès sans attendre CACHE_TTL
+        groups.remove_members(group.id, [self.bob.id])
+        self.assertEqual(self.resolver.level(self.bob, self.grandchild.id), AccessLevel.NONE)
+
+    def test_unshare_invalidates_cached_levels(self):
+        sharing = SharingController(self.owner, self.db)
+        sharing.share_folder(self.root.id, self.bob.id)
+        self.assertEqual(self.resolver.level(self.bob, self.grandchild.id), AccessLevel.READ)
+
+        self.assertTrue(sharing.unshare_folder(self.root.id, self.bob.id)[0])
+        self.assertEqual(self.resolver.level(self.bob, self.grandchild.id), AccessLevel.NONE)
+        self.assertEqual(self.visibility(self.root), FolderVisibility.PRIVATE)
+
+    def test_delete_group_revokes_access_and_resets_visibility(self):
+        groups = GroupController(self.owner, self.db)
+        ok, group = groups.create_group('rh')
+        groups.add_members(group.id, [self.bob.id])
+        SharingController(self.owner, self.db).share_folders([self.root.id], group_ids=[group.id])
+        self.assertEqual(self.resolver.level(self.bob, self.child.id), AccessLevel.READ)
+        self.assertEqual(self.visibility(self.root), FolderVisibility.SHARED)
+
+        self.assertTrue(groups.delete_group(group.id)[0])
+
+        self.assertEqual(self.resolver.level(self.bob, self.child.id), AccessLevel.NONE)
+        self.assertEqual(self.visibility(self.root), FolderVisibility.PRIVATE)
+
+    def test_accessible_roots_skip_folders_under_an_accessible_ancestor(self):
+        sharing = SharingController(self.owner, self.db)
+        # root partagé, child non, grandchild partagé: grandchild est déjà sous root
+        sharing.share_folder(self.root.id, self.bob.id)
+        sharing.share_folder(self.grandchild.id, self.bob.id)
+        sharing.share_folder(self.other.id, self.bob.id)
+
+        roots = SharingController(self.bob, self.db).get_all_accessible_folders(recursive=False)
+        self.assertEqual(sorted(folder.name for folder in roots), ['other', 'root'])
+
+    def test_shared_subfolder_is_a_root_when_its_ancestors_are_not_accessible(self):
+        SharingController(self.owner, self.db).share_folder(self.grandchild.id, self.bob.id)
+
+        roots = SharingController(self.bob, self.db).get_all_accessible_folders(recursive=False)
+        self.assertEqual([folder.name for folder in roots], ['grandchild'])
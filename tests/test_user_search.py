@@ -0,0 +1,46 @@
+"""Recherche paginée d'utilisateurs (SharingController.search_users)"""
+
+import support
+from controllers.sharing_controller import SharingController
+
+
+class UserSearchPaginationTests(support.DatabaseTestCase):
+
+    NAMES = ['alice', 'Albert', 'alain', 'Bob', 'bernard', 'Émile', 'émilie', 'zoé']
+
+    def setUp(self):
+        super().setUp()
+        self.me = self.create_user('me')
+        for name in self.NAMES:
+            self.create_user(name)
+        self.sharing = SharingController(self.me, self.db)
+
+    def search_all(self, prefix='', limit=3):
+        names, cursor = [], None
+        while True:
+            users, cursor = self.sharing.search_users(prefix, after=cursor, limit=limit)
+            names.extend(user.username for user in users)
+            if cursor is None:
+                return names
+
+    def test_pages_cover_every_user_once(self):
+        names = self.search_all(limit=3)
+
+        self.assertEqual(sorted(names), sorted(self.NAMES))
+        self.assertEqual(len(names), len(set(names)))
+        self.assertNotIn('me', names)
+
+    def test_prefix_is_case_insensitive(self):
+        self.assertEqual(self.search_all('AL', limit=2), ['alain', 'Albert', 'alice'])
+
+    def test_non_ascii_names_are_paged_without_loss(self):
+        # lower() de SQLite ne convertit que l'ASCII: 'Émile' et 'émilie'
+        # ont des clés distinctes, le curseur doit utiliser la clé de la base
+        self.assertEqual(self.search_all('é', limit=1), ['émilie'])
+        self.assertEqual(self.search_all('É', limit=1), ['Émile'])
+
+        names = self.search_all(limit=1)
+        self.assertEqual(sorted(names), sorted(self.NAMES))
+
+    def test_prefix_matches_email(self):
+        self.assertEqual(self.search_all('bernard@'), ['bernard'])
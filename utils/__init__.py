@@ -1,23 +1,48 @@
+# utils/__init__.py
+"""Utilities package for archive manager
 
+Les classes exportées sont chargées au premier accès: importer un
+sous-module (utils.enums, utils.scanner...) ne charge ni PySide6 ni les
+autres utilitaires, ce qui permet de les utiliser sans interface (cli.py).
+"""
+
+import importlib
+
+# Nom exporté -> module qui le définit
+_EXPORTS = {
+    'FileHandler': '.file_handler',
+    'FolderScanner': '.scanner',
+    'ScannedFile': '.scanner',
+    'ScanManifest': '.scan_manifest',
+    'ScanDelta': '.scan_manifest',
+    'ArchiveEntry': '.archive_stream',
+    'ArchiveMember': '.archive_stream',
+    'ZipStreamWriter': '.archive_stream',
+    'TarStreamWriter': '.archive_stream',
+    'StorageScrubber': '.storage_scrubber',
+    'PreviewGenerator': '.preview_generator',
+    'PreviewCache': '.preview_cache',
+    'TextPreview': '.text_preview',
+    'Validator': '.validators',
+    'UserRole': '.enums',
+    'FolderVisibility': '.enums',
+    'SharePermission': '.enums',
+    'AccessLevel': '.enums',
+    'IntegrityStatus': '.enums',
+    'AlertDialog': '.alert_dialog',
+    'TaskRunner': '.task_runner',
+    'CancellationToken': '.task_runner',
+    'TaskCancelled': '.task_runner',
+}
+
+__all__ = list(_EXPORTS)
 
-# utils/__init__.py
-"""Utilities package for archive manager"""
 
-import enum
-from .file_handler import FileHandler
-from .scanner import FolderScanner
-from .preview_generator import PreviewGenerator
-from .validators import Validator
-from .enums import UserRole,FolderVisibility,SharePermission
-from .alert_dialog import AlertDialog
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-__all__ = [
-    'FileHandler',
-    'FolderScanner', 
-    'PreviewGenerator',
-    'Validator',
-    'UserRole',
-    'FolderVisibility',
-    'SharePermission',
-    'AlertDialog'
-]
\ No newline at end of file
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,506 @@
+# utils/archive_stream.py
+"""
+utils/archive_stream.py
+Lecture et écriture en flux d'archives ZIP (ZIP64) et TAR
+"""
+
+import hashlib
+import os
+import struct
+import tarfile
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Iterator, NamedTuple, Optional
+
+# Formats déjà compressés: les recompresser coûte du CPU sans rien gagner
+COMPRESSED_EXTENSIONS = frozenset({
+    'zip', 'gz', 'tgz', 'bz2', 'xz', 'txz', '7z', 'rar', 'zst', 'lz4', 'cab',
+    'jpg', 'jpeg', 'png', 'gif', 'webp', 'heic', 'heif', 'avif', 'jp2',
+    'mp3', 'm4a', 'aac', 'ogg', 'oga', 'opus', 'flac', 'wma',
+    'mp4', 'm4v', 'mov', 'mkv', 'avi', 'webm', 'wmv', 'mpg', 'mpeg',
+    'docx', 'xlsx', 'pptx', 'odt', 'ods', 'odp', 'epub', 'jar', 'apk',
+})
+COMPRESSED_MIME_PREFIXES = (
+    'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'video/',
+    'audio/mpeg', 'audio/ogg', 'audio/aac', 'audio/flac',
+    'application/zip', 'application/gzip', 'application/x-7z', 'application/x-rar',
+    'application/x-bzip2', 'application/x-xz', 'application/zstd',
+)
+
+ARCHIVE_FORMATS = ('zip', 'tar')
+
+
+def is_compressed_format(name: str, mime_type: Optional[str] = None) -> bool:
+    """Vérifie si un fichier est déjà compressé (d'après son extension ou son type MIME)"""
+    extension = os.path.splitext(name)[1][1:].lower()
+    if extension in COMPRESSED_EXTENSIONS:
+        return True
+    return bool(mime_type) and mime_type.startswith(COMPRESSED_MIME_PREFIXES)
+
+
+class ArchiveEntry(NamedTuple):
+    """Entrée à écrire dans une archive"""
+    name: str                       # Chemin dans l'archive, séparé par '/'
+    path: Optional[str]             # Fichier source, None pour un dossier
+    mtime: Optional[float] = None   # Date de modification (celle du fichier source par défaut)
+    compress: bool = True           # False pour stocker tel quel
+
+
+class ArchiveResult(NamedTuple):
+    """Entrée écrite (ou ignorée, avec le message d'erreur)"""
+    entry: ArchiveEntry
+    size: int
+    sha256: Optional[str]
+    error: Optional[str] = None
+
+
+class ArchiveMember(NamedTuple):
+    """Membre lu dans une archive"""
+    name: str                       # Chemin relatif normalisé, séparé par '/'
+    is_dir: bool
+    size: int
+    mtime: Optional[float]
+    stream: Optional[BinaryIO]      # Contenu, lisible jusqu'au membre suivant
+    error: Optional[str] = None     # Membre illisible (chiffré, méthode inconnue...)
+
+
+def detect_archive_format(path: str) -> Optional[str]:
+    """'zip', 'tar' (compressé ou non) ou None"""
+    if zipfile.is_zipfile(path):
+        return 'zip'
+    if tarfile.is_tarfile(path):
+        return 'tar'
+    return None
+
+
+def _member_path(name: str) -> str:
+    """Chemin relatif sûr: sans racine ni composant '.' ou '..'"""
+    parts = [part for part in name.replace('\\', '/').split('/') if part not in ('', '.', '..')]
+    return '/'.join(parts)
+
+
+def iter_archive_members(fileobj: BinaryIO, fmt: str) -> Iterator[ArchiveMember]:
+    """
+    Membres d'une archive ZIP ou TAR (.tar, .tar.gz, .tar.bz2, .tar.xz)
+
+    Le contenu de chaque membre est décompressé à la volée pendant la
+    lecture, sans extraction sur disque; il n'est lisible que jusqu'au
+    membre suivant. Un TAR est lu séquentiellement, sans retour en
+    arrière. Les liens, fichiers spéciaux et métadonnées macOS
+    (__MACOSX) sont ignorés.
+    """
+    if fmt == 'zip':
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                name = _member_path(info.filename)
+                if not name or name.split('/')[0] == '__MACOSX':
+                    continue
+                try:
+                    # Date DOS: heure locale
+                    mtime = time.mktime(info.date_time + (0, 0, -1))
+                except (OverflowError, ValueError):
+                    mtime = None
+
+                if info.is_dir():
+                    yield ArchiveMember(name, True, 0, mtime, None)
+                    continue
+                try:
+                    stream = archive.open(info)
+                except (RuntimeError, NotImplementedError, zipfile.BadZipFile) as e:
+                    yield ArchiveMember(name, False, info.file_size, mtime, None, str(e))
+                    continue
+                with stream:
+                    yield ArchiveMember(name, False, info.file_size, mtime, stream)
+
+    elif fmt == 'tar':
+        with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+            for info in archive:
+                name = _member_path(info.name)
+                if not name or name.split('/')[0] == '__MACOSX':
+                    continue
+                if info.isdir():
+                    yield ArchiveMember(name, True, 0, info.mtime, None)
+                elif info.isreg():
+                    yield ArchiveMember(name, False, info.size, info.mtime, archive.extractfile(info))
+    else:
+        raise ValueError(f"Format d'archive non supporté: {fmt}")
+
+
+def open_archive_writer(fmt: str, fileobj: BinaryIO, level: int = 6, workers: Optional[int] = None):
+    """Writer d'archive pour le format demandé ('zip' ou 'tar')"""
+    if fmt == 'zip':
+        return ZipStreamWriter(fileobj, level=level, workers=workers)
+    if fmt == 'tar':
+        return TarStreamWriter(fileobj)
+    raise ValueError(f"Format d'archive non supporté: {fmt}")
+
+
+def _deflate(data: bytes, zdict: Optional[bytes], level: int) -> bytes:
+    """
+    Compresser un bloc en deflate brut (thread de travail)
+
+    Le bloc se termine par un vidage synchronisé: les blocs compressés
+    séparément, concaténés, forment un seul flux deflate valide. Les
+    derniers 32 Ko du bloc précédent servent de dictionnaire pour ne pas
+    perdre les répétitions à cheval sur deux blocs.
+    """
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+class _ZipEntryState:
+    """Entrée ZIP en cours d'écriture"""
+
+    __slots__ = ('entry', 'name', 'mtime', 'method', 'streamed', 'zip64',
+                 'offset', 'crc', 'size', 'compressed_size', 'sha256')
+
+    def __init__(self, entry, mtime, method, streamed, zip64=False):
+        self.entry = entry
+        # Les dossiers se terminent par '/' dans une archive ZIP
+        self.name = (entry.name if streamed else entry.name.rstrip('/') + '/').encode('utf-8')
+        self.mtime = mtime
+        self.method = method
+        self.streamed = streamed
+        self.zip64 = zip64
+        self.offset = 0
+        self.crc = 0
+        self.size = 0
+        self.compressed_size = 0
+        self.sha256 = hashlib.sha256() if streamed else None
+
+
+class ZipStreamWriter:
+    """
+    Archive ZIP écrite en un seul passage, sans fichier intermédiaire
+
+    Les fichiers sont lus par blocs et écrits directement dans la sortie,
+    qui n'a pas besoin d'être positionnable: tailles et CRC suivent les
+    données (descripteur de données). Les extensions ZIP64 sont utilisées
+    dès qu'un fichier, une position ou le nombre d'entrées dépasse les
+    limites du format ZIP classique (4 Go, 65535 entrées).
+
+    La compression deflate est faite en parallèle, bloc par bloc, sur un
+    pool de threads (zlib libère le GIL), y compris d'un fichier à
+    l'autre: pendant qu'un bloc est écrit, les suivants sont compressés.
+    Le nombre de blocs en attente est borné, la mémoire utilisée ne
+    dépend pas de la taille de l'archive. Le répertoire central est
+    accumulé dans un fichier temporaire (en mémoire tant qu'il est petit).
+    """
+
+    CHUNK_SIZE = 1 << 20
+    DICT_SIZE = 32768
+    ZIP64_LIMIT = 0xFFFFFFFF
+    # Au-delà, ZIP64 dès l'en-tête local: deflate peut légèrement grossir les données
+    ZIP64_THRESHOLD = ZIP64_LIMIT - (ZIP64_LIMIT >> 8)
+
+    STORED = 0
+    DEFLATED = 8
+
+    def __init__(self, fileobj: BinaryIO, level: int = 6, workers: Optional[int] = None):
+        """
+        Args:
+            fileobj: Sortie binaire (fichier, socket, tube...)
+            level: Niveau de compression deflate (0 = tout stocker)
+            workers: Threads de compression (nombre de processeurs par défaut)
+        """
+        self._out = fileobj
+        self.level = level
+        self.workers = max(1, workers or min(8, os.cpu_count() or 1))
+        self._offset = 0
+        self._count = 0
+        self._central = tempfile.SpooledTemporaryFile(max_size=16 << 20)
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._central.close()
+
+    def _write(self, data: bytes):
+        self._out.write(data)
+        self._offset += len(data)
+
+    # ------------------------------
+    # Entrées
+    # ------------------------------
+    def write(self, entries: Iterable[ArchiveEntry],
+              should_stop: Optional[Callable[[], bool]] = None) -> Iterator[ArchiveResult]:
+        """
+        Écrire des entrées, dans l'ordre donné
+
+        Un ArchiveResult est produit pour chaque entrée une fois écrite;
+        un fichier source illisible est ignoré (résultat avec erreur).
+        Lève InterruptedError si should_stop() devient vrai.
+        """
+        window = self.workers * 4
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='zip-deflate') as executor:
+            try:
+                for entry in entries:
+                    if entry.path is None:
+                        state = _ZipEntryState(entry, entry.mtime, self.STORED, streamed=False)
+                        pending.append(('begin', state, None))
+                        pending.append(('end', state, None))
+                    else:
+                        yield from self._read_file(entry, executor, pending, window, should_stop)
+                    yield from self._drain(pending, window)
+                yield from self._drain(pending, 0)
+            finally:
+                for _, _, payload in pending:
+                    if isinstance(payload, Future):
+                        payload.cancel()
+
+    def _read_file(self, entry, executor, pending, window, should_stop) -> Iterator[ArchiveResult]:
+        """Lire un fichier source et mettre ses blocs (compressés en parallèle) en file"""
+        try:
+            source = open(entry.path, 'rb')
+        except OSError as e:
+            pending.append(('error', entry, str(e)))
+            return
+
+        with source:
+            stat = os.fstat(source.fileno())
+            compress = entry.compress and self.level > 0 and stat.st_size > 0
+            state = _ZipEntryState(
+                entry, entry.mtime or stat.st_mtime,
+                self.DEFLATED if compress else self.STORED,
+                streamed=True, zip64=stat.st_size >= self.ZIP64_THRESHOLD
+            )
+            pending.append(('begin', state, None))
+
+            zdict = None
+            while True:
+                if should_stop is not None and should_stop():
+                    raise InterruptedError("Export annulé")
+
+                chunk = source.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                state.crc = zlib.crc32(chunk, state.crc)
+                state.sha256.update(chunk)
+                state.size += len(chunk)
+
+                if compress:
+                    pending.append(('data', state, executor.submit(_deflate, chunk, zdict, self.level)))
+                    zdict = chunk[-self.DICT_SIZE:]
+                else:
+                    pending.append(('data', state, chunk))
+
+                # Écrire les blocs prêts avant de lire plus loin (mémoire bornée)
+                yield from self._drain(pending, window)
+
+            if compress:
+                # Bloc final vide: termine le flux deflate
+                pending.append(('data', state, b'\x03\x00'))
+            pending.append(('end', state, None))
+
+    def _drain(self, pending, limit) -> Iterator[ArchiveResult]:
+        while len(pending) > limit:
+            result = self._apply(pending.popleft())
+            if result is not None:
+                yield result
+
+    def _apply(self, op) -> Optional[ArchiveResult]:
+        kind, state, payload = op
+        if kind == 'begin':
+            self._begin(state)
+        elif kind == 'data':
+            data = payload.result() if isinstance(payload, Future) else payload
+            self._write(data)
+            state.compressed_size += len(data)
+        elif kind == 'end':
+            self._end(state)
+            return ArchiveResult(state.entry, state.size,
+                                 state.sha256.hexdigest() if state.sha256 else None)
+        else:
+            # Erreur de lecture: state est l'entrée, payload le message
+            return ArchiveResult(state, 0, None, payload)
+        return None
+
+    # ------------------------------
+    # Format ZIP
+    # ------------------------------
+    @staticmethod
+    def _dos_datetime(mtime):
+        parts = time.localtime(mtime if mtime is not None else time.time())
+        if parts.tm_year < 1980:
+            return 0, (1 << 5) | 1
+        dos_time = (parts.tm_hour << 11) | (parts.tm_min << 5) | (parts.tm_sec // 2)
+        dos_date = ((parts.tm_year - 1980) << 9) | (parts.tm_mon << 5) | parts.tm_mday
+        return dos_time, dos_date
+
+    def _flags(self, state):
+        # Bit 11: noms en UTF-8; bit 3: tailles et CRC après les données
+        return 0x0800 | (0x0008 if state.streamed else 0)
+
+    def _begin(self, state):
+        state.offset = self._offset
+        dos_time, dos_date = self._dos_datetime(state.mtime)
+
+        if state.zip64:
+            extra = struct.pack('<HHQQ', 0x0001, 16, 0, 0)
+            size_field = self.ZIP64_LIMIT
+        else:
+            extra = b''
+            size_field = 0
+
+        self._write(struct.pack(
+            '<IHHHHHIIIHH', 0x04034b50, 45 if state.zip64 else 20, self._flags(state),
+            state.method, dos_time, dos_date, 0, size_field, size_field,
+            len(state.name), len(extra)
+        ) + state.name + extra)
+
+    def _end(self, state):
+        if state.streamed:
+            if state.zip64:
+                self._write(struct.pack('<IIQQ', 0x08074b50, state.crc,
+                                        state.compressed_size, state.size))
+            elif max(state.size, state.compressed_size) >= self.ZIP64_LIMIT:
+                raise ValueError(f"{state.entry.name}: fichier modifié pendant l'export")
+            else:
+                self._write(struct.pack('<IIII', 0x08074b50, state.crc,
+                                        state.compressed_size, state.size))
+
+        # Champs ZIP64 du répertoire central: seulement ceux qui débordent, dans cet ordre
+        size, compressed_size, offset = state.size, state.compressed_size, state.offset
+        zip64_fields = []
+        if size >= self.ZIP64_LIMIT:
+            zip64_fields.append(size)
+            size = self.ZIP64_LIMIT
+        if compressed_size >= self.ZIP64_LIMIT:
+            zip64_fields.append(compressed_size)
+            compressed_size = self.ZIP64_LIMIT
+        if offset >= self.ZIP64_LIMIT:
+            zip64_fields.append(offset)
+            offset = self.ZIP64_LIMIT
+        extra = b''
+        if zip64_fields:
+            extra = struct.pack(f'<HH{len(zip64_fields)}Q', 0x0001, 8 * len(zip64_fields), *zip64_fields)
+
+        if state.streamed:
+            external_attr = 0o100644 << 16
+        else:
+            external_attr = (0o40755 << 16) | 0x10
+        version = 45 if (state.zip64 or zip64_fields) else 20
+        dos_time, dos_date = self._dos_datetime(state.mtime)
+
+        self._central.write(struct.pack(
+            '<IHHHHHHIIIHHHHHII', 0x02014b50, (3 << 8) | 45, version, self._flags(state),
+            state.method, dos_time, dos_date, state.crc, compressed_size, size,
+            len(state.name), len(extra), 0, 0, 0, external_attr, offset
+        ) + state.name + extra)
+        self._count += 1
+
+    def close(self):
+        """Écrire le répertoire central (la sortie n'est pas fermée)"""
+        if self._closed:
+            return
+        self._closed = True
+
+        central_offset = self._offset
+        self._central.seek(0)
+        for chunk in iter(lambda: self._central.read(self.CHUNK_SIZE), b''):
+            self._write(chunk)
+        self._central.close()
+        central_size = self._offset - central_offset
+
+        count = self._count
+        if count >= 0xFFFF or central_size >= self.ZIP64_LIMIT or central_offset >= self.ZIP64_LIMIT:
+            zip64_end_offset = self._offset
+            self._write(struct.pack('<IQHHIIQQQQ', 0x06064b50, 44, (3 << 8) | 45, 45, 0, 0,
+                                    count, count, central_size, central_offset))
+            self._write(struct.pack('<IIQI', 0x07064b50, 0, zip64_end_offset, 1))
+            count = min(count, 0xFFFF)
+            central_size = min(central_size, self.ZIP64_LIMIT)
+            central_offset = min(central_offset, self.ZIP64_LIMIT)
+
+        self._write(struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, count, count,
+                                central_size, central_offset, 0))
+
+
+class _HashingReader:
+    """Lecture d'un fichier source avec calcul du SHA-256 au passage"""
+
+    def __init__(self, source, should_stop):
+        self.source = source
+        self.should_stop = should_stop
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size=-1):
+        if self.should_stop is not None and self.should_stop():
+            raise InterruptedError("Export annulé")
+        data = self.source.read(size)
+        self.sha256.update(data)
+        self.size += len(data)
+        return data
+
+
+class TarStreamWriter:
+    """
+    Archive TAR (format PAX) écrite en un seul passage
+
+    TAR ne compresse pas les entrées: les fichiers sont recopiés par
+    blocs dans la sortie. Le format PAX n'a pas de limite de taille ni de
+    longueur de nom, et garde les noms en UTF-8.
+    """
+
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, fileobj: BinaryIO):
+        self._tar = tarfile.open(fileobj=fileobj, mode='w|', format=tarfile.PAX_FORMAT,
+                                 copybufsize=self.CHUNK_SIZE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+    def write(self, entries: Iterable[ArchiveEntry],
+              should_stop: Optional[Callable[[], bool]] = None) -> Iterator[ArchiveResult]:
+        """Écrire des entrées, dans l'ordre donné (voir ZipStreamWriter.write)"""
+        for entry in entries:
+            if should_stop is not None and should_stop():
+                raise InterruptedError("Export annulé")
+
+            info = tarfile.TarInfo(entry.name)
+            if entry.path is None:
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                info.mtime = entry.mtime if entry.mtime is not None else time.time()
+                self._tar.addfile(info)
+                yield ArchiveResult(entry, 0, None)
+                continue
+
+            try:
+                source = open(entry.path, 'rb')
+            except OSError as e:
+                yield ArchiveResult(entry, 0, None, str(e))
+                continue
+
+            with source:
+                stat = os.fstat(source.fileno())
+                info.size = stat.st_size
+                info.mode = 0o644
+                info.mtime = entry.mtime or stat.st_mtime
+                reader = _HashingReader(source, should_stop)
+                self._tar.addfile(info, reader)
+            yield ArchiveResult(entry, reader.size, reader.sha256.hexdigest())
+
+    def close(self):
+        """Écrire la fin de l'archive (la sortie n'est pas fermée)"""
+        self._tar.close()
@@ -20,3 +20,45 @@ class SharePermission(enum.Enum):
     MANAGE = "manage"       # Gestion complète (renommer, supprimer)
 
 
+class AccessLevel(enum.IntEnum):
+    """Permission effective d'un utilisateur sur un dossier (ordonnée)"""
+    NONE = 0    # Aucun accès
+    READ = 1    # Consultation
+    WRITE = 2   # Ajout et modification de fichiers
+    FULL = 3    # Gestion complète (propriétaire, superuser, partage MANAGE)
+
+    @classmethod
+    def from_share(cls, permission):
+        """Niveau accordé par une permission de partage"""
+        return {
+            SharePermission.READ: cls.READ,
+            SharePermission.WRITE: cls.WRITE,
+            SharePermission.MANAGE: cls.FULL,
+        }.get(permission, cls.NONE)
+
+
+class IntegrityStatus(enum.Enum):
+    """Résultat de la dernière vérification d'un fichier stocké"""
+    OK = "ok"                        # Taille et empreinte conformes
+    MISSING = "missing"              # Fichier absent du stockage
+    SIZE_MISMATCH = "size_mismatch"  # Taille différente de celle enregistrée
+    CORRUPT = "corrupt"              # Empreinte différente de la référence
+    UNREADABLE = "unreadable"        # Erreur de lecture (droits, disque)
+    REPAIRED = "repaired"            # Restauré depuis la copie cloud
+
+
+class PdfPreviewStatus(enum.Enum):
+    """Résultat de l'extraction du texte d'un PDF (aperçu)"""
+    TEXT = "text"          # Texte extrait
+    NO_TEXT = "no_text"    # Aucun texte (PDF d'images numérisées, PDF vide)
+    ERROR = "error"        # Lecture impossible (protégé, corrompu, PyPDF2 absent)
+
+    @classmethod
+    def overall(cls, statuses):
+        """Statut du document: du texte sur une page suffit"""
+        statuses = set(statuses)
+        if cls.TEXT in statuses:
+            return cls.TEXT
+        if cls.ERROR in statuses:
+            return cls.ERROR
+        return cls.NO_TEXT
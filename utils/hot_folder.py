@@ -0,0 +1,412 @@
+# utils/hot_folder.py
+"""
+utils/hot_folder.py
+Dossiers surveillés ("hot folders"): import automatique des fichiers déposés
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from config.settings import Settings
+from utils.scanner import FolderScanner
+
+
+# Fichiers temporaires laissés par les copieurs et navigateurs pendant l'écriture
+TEMPORARY_SUFFIXES = ('.tmp', '.part', '.partial', '.crdownload', '.download', '~')
+
+
+def is_temporary(path: str) -> bool:
+    name = os.path.basename(path)
+    return name.startswith('.') or name.startswith('~$') or name.lower().endswith(TEMPORARY_SUFFIXES)
+
+
+class InotifyWatcher:
+    """
+    Surveillance d'une arborescence avec inotify (Linux), via ctypes
+
+    Les sous-dossiers créés après le démarrage sont ajoutés à la
+    surveillance; les fichiers qu'ils contiennent déjà sont signalés.
+    Un débordement de la file du noyau est signalé par callback(None):
+    l'appelant doit alors rescanner le dossier. La pose des surveillances
+    (parcours de l'arborescence) se fait au début de run(), dans le
+    thread de surveillance.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    _EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, root: str, callback: Callable[[Optional[str]], None], recursive: bool = True):
+        libc_name = ctypes.util.find_library('c')
+        if libc_name is None:
+            raise OSError("libc introuvable: inotify indisponible")
+
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError("inotify non supporté par ce système")
+
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        self.root = root
+        self.callback = callback
+        self.recursive = recursive
+        self._watches = {}      # descripteur de surveillance -> dossier
+
+    def _add_watch(self, path: str) -> bool:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            print(f"⚠️  Surveillance impossible de {path}: {os.strerror(errno)}")
+            return False
+        self._watches[wd] = path
+        return True
+
+    def _add_tree(self, root: str, report_files: bool):
+        """Surveiller un dossier (et ses sous-dossiers), sans récursion"""
+        if not self.recursive:
+            self._add_watch(root)
+            return
+
+        scanner = FolderScanner(exclude_hidden=False, workers=1)
+        for dir_path, files, _, _ in scanner.walk(root):
+            self._add_watch(dir_path)
+            if report_files:
+                for scanned in files:
+                    self.callback(scanned.path)
+
+    def run(self, stop_event: threading.Event, on_ready: Optional[Callable[[], None]] = None):
+        """
+        Boucle de lecture des événements jusqu'à stop_event
+
+        on_ready() est appelée quand toute l'arborescence est surveillée:
+        un fichier déposé ensuite ne peut plus être manqué.
+        """
+        try:
+            self._add_tree(self.root, report_files=False)
+            if on_ready is not None:
+                on_ready()
+            while not stop_event.is_set():
+                readable, _, _ = select.select([self.fd], [], [], 0.5)
+                if not readable:
+                    continue
+                try:
+                    data = os.read(self.fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self._dispatch(data)
+        finally:
+            os.close(self.fd)
+
+    def _dispatch(self, data: bytes):
+        offset = 0
+        header = self._EVENT_HEADER
+
+        while offset + header.size <= len(data):
+            wd, mask, _, length = header.unpack_from(data, offset)
+            raw_name = data[offset + header.size:offset + header.size + length]
+            offset += header.size + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                self.callback(None)
+                continue
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+
+            path = os.path.join(directory, os.fsdecode(raw_name.rstrip(b'\0')))
+
+            if mask & self.IN_ISDIR:
+                # Nouveau sous-dossier (créé ou déplacé): le surveiller aussi
+                if self.recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._add_tree(path, report_files=True)
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                self.callback(path)
+
+
+class PollingWatcher:
+    """
+    Surveillance par scans périodiques (autres systèmes, partages NFS/SMB
+    montés depuis d'autres machines où inotify ne voit rien)
+
+    Le premier scan (référence) est fait au début de run().
+    """
+
+    def __init__(self, root: str, callback: Callable[[Optional[str]], None],
+                 recursive: bool = True, interval: float = 10.0):
+        self.root = root
+        self.callback = callback
+        self.recursive = recursive
+        self.interval = interval
+        self._snapshot = {}
+
+    def _scan(self) -> Dict[str, tuple]:
+        scanner = FolderScanner(exclude_hidden=False)
+        return {
+            scanned.path: (scanned.size, scanned.modified)
+            for scanned in scanner.iter_files(self.root, self.recursive)
+        }
+
+    def run(self, stop_event: threading.Event, on_ready: Optional[Callable[[], None]] = None):
+        """Scans jusqu'à stop_event; on_ready() est appelée après le scan de référence"""
+        self._snapshot = self._scan()
+        if on_ready is not None:
+            on_ready()
+        while not stop_event.wait(self.interval):
+            snapshot = self._scan()
+            for path, state in snapshot.items():
+                if self._snapshot.get(path) != state:
+                    self.callback(path)
+            self._snapshot = snapshot
+
+
+class HotFolderService:
+    """
+    Import automatique des fichiers déposés dans les dossiers surveillés
+
+    Chaque dossier source configuré ('hot_folders.folders') est associé
+    à un dossier d'archive. Les événements sont regroupés (debounce); un
+    fichier n'est importé que lorsque sa taille et sa date n'ont plus
+    changé pendant 'stable_seconds' (copie terminée). Les fichiers prêts
+    sont transmis par lots à on_batch(mapping, paths); paths à None
+    demande une synchronisation complète du dossier (démarrage,
+    débordement de la file inotify).
+
+    La mise en place de la surveillance (parcours initial des dossiers)
+    se fait dans les threads du service: start() rend la main aussitôt.
+
+    Par défaut les lots sont importés dans le thread du service avec
+    ingest(); l'interface fournit son propre on_batch pour exécuter
+    l'import dans le pool de la base de données, en appelant aussi
+    ingest() (un import à la fois).
+
+    Exemple de configuration:
+        'hot_folders': {
+            'enabled': True,
+            'folders': [{'source': '/srv/scans', 'folder_id': 12}]
+        }
+    """
+
+    def __init__(self, file_controller, on_batch: Optional[Callable] = None,
+                 on_ingested: Optional[Callable] = None):
+        settings = Settings()
+        self.file_controller = file_controller
+        self.mappings = [
+            mapping for mapping in settings.get('hot_folders.folders', [])
+            if mapping.get('source') and mapping.get('folder_id')
+        ]
+        self.debounce = float(settings.get('hot_folders.debounce_seconds', 2))
+        self.stable_seconds = float(settings.get('hot_folders.stable_seconds', 3))
+        self.batch_size = int(settings.get('hot_folders.batch_size', 50))
+        self.poll_interval = float(settings.get('hot_folders.poll_interval', 10))
+        self.force_polling = settings.get('hot_folders.mode', 'auto') == 'poll'
+
+        self.on_batch = on_batch or self._ingest_in_place
+        self.on_ingested = on_ingested
+
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._ingest_lock = threading.Lock()
+        # chemin -> [mapping, dernier événement, (taille, mtime), stable depuis]
+        self._candidates = {}
+
+    # ------------------------------
+    # Démarrage / arrêt
+    # ------------------------------
+    def start(self):
+        """Démarrer la surveillance de tous les dossiers configurés (sans attendre)"""
+        for mapping in self.mappings:
+            self._start_thread(self._watch, mapping, name=f"hot-folder-{mapping['folder_id']}")
+
+        if self._threads:
+            self._start_thread(self._coordinate, name='hot-folder-ingest')
+
+    def _watch(self, mapping):
+        """Thread de surveillance d'un dossier source"""
+        source = os.path.abspath(mapping['source'])
+        if not os.path.isdir(source):
+            print(f"⚠️  Dossier surveillé introuvable: {source}")
+            return
+
+        callback = self._make_callback(mapping)
+        recursive = mapping.get('recursive', True)
+        watcher = None
+        if not self.force_polling:
+            try:
+                watcher = InotifyWatcher(source, callback, recursive)
+            except OSError as e:
+                print(f"⚠️  inotify indisponible ({e}), surveillance par scrutation")
+        if watcher is None:
+            watcher = PollingWatcher(source, callback, recursive, self.poll_interval)
+
+        def on_ready():
+            # Rattrapage des fichiers déposés pendant que l'application était fermée
+            self.on_batch(mapping, None)
+            print(f"✅ Dossier surveillé: {source} → dossier {mapping['folder_id']}")
+
+        watcher.run(self._stop, on_ready)
+
+    def _start_thread(self, target, *args, name):
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self):
+        """Arrêter la surveillance"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+
+    # ------------------------------
+    # Événements
+    # ------------------------------
+    def _make_callback(self, mapping):
+        def callback(path):
+            if path is None:
+                self.on_batch(mapping, None)
+                return
+            if is_temporary(path):
+                return
+            with self._lock:
+                candidate = self._candidates.get(path)
+                if candidate is None:
+                    self._candidates[path] = [mapping, time.monotonic(), None, None]
+                else:
+                    candidate[1] = time.monotonic()
+        return callback
+
+    def _coordinate(self):
+        """Détecter les fichiers stables et les transmettre par lots"""
+        while not self._stop.wait(0.5):
+            for mapping, paths in self._collect_ready():
+                for start in range(0, len(paths), self.batch_size):
+                    self.on_batch(mapping, paths[start:start + self.batch_size])
+
+    def _collect_ready(self) -> List[tuple]:
+        now = time.monotonic()
+        ready = {}
+
+        with self._lock:
+            for path, candidate in list(self._candidates.items()):
+                mapping, last_event, last_state, stable_since = candidate
+                if now - last_event < self.debounce:
+                    continue
+
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # Fichier supprimé ou renommé avant la fin de la copie
+                    del self._candidates[path]
+                    continue
+
+                state = (stat.st_size, stat.st_mtime_ns)
+                if state != last_state:
+                    candidate[2] = state
+                    candidate[3] = now
+                    continue
+
+                if now - stable_since >= self.stable_seconds:
+                    del self._candidates[path]
+                    # Regroupement par dossier surveillé (les mappings sont des dict)
+                    ready.setdefault(id(mapping), (mapping, []))[1].append(path)
+
+        return list(ready.values())
+
+    # ------------------------------
+    # Import
+    # ------------------------------
+    def _ingest_in_place(self, mapping, paths):
+        try:
+            stats = self.ingest(mapping, paths)
+        except Exception as e:
+            # Appelée aussi par les watchers: une erreur d'import ne doit
+            # pas arrêter la surveillance du dossier
+            print(f"⚠️  Import du dossier surveillé {mapping['source']}: {e}")
+            stats = {'new': 0, 'changed': 0, 'errors': [str(e)]}
+        if self.on_ingested is not None:
+            self.on_ingested(mapping, stats)
+
+    def ingest(self, mapping, paths):
+        """
+        Importer un lot, un seul à la fois
+
+        Les lots arrivent du coordinateur et des watchers (synchronisations
+        complètes): sans exclusion, un même fichier pourrait être importé
+        deux fois avant d'être inscrit au manifeste.
+        """
+        with self._ingest_lock:
+            return self.ingest_batch(mapping, paths)
+
+    def ingest_batch(self, mapping, paths):
+        """
+        Importer un lot de fichiers d'un dossier surveillé
+
+        Args:
+            mapping: {'source': ..., 'folder_id': ...}
+            paths: Fichiers à importer, ou None pour tout synchroniser
+
+        Returns:
+            dict: Compteurs 'new', 'changed' et 'errors'
+        """
+        from utils.scan_manifest import ScanManifest
+        from utils.file_handler import FileHandler
+
+        source = os.path.abspath(mapping['source'])
+        folder_id = mapping['folder_id']
+
+        if paths is None:
+            return self.file_controller.sync_folder(
+                source, folder_id, mapping.get('recursive', True),
+                file_filter=lambda path: not is_temporary(path)
+            )
+
+        stats = {'new': 0, 'changed': 0, 'errors': []}
+
+        # Le manifeste est partagé avec l'import incrémental: pas de doublons
+        with ScanManifest(source, folder_id) as manifest:
+            for path in paths:
+                try:
+                    scanned = FolderScanner.stat_file(path)
+                except OSError as e:
+                    stats['errors'].append(f"{os.path.basename(path)}: {e}")
+                    continue
+
+                known = manifest.get(manifest.relative_path(path))
+                if known is not None and known[0] == scanned.size and known[1] == scanned.modified:
+                    continue
+
+                if known is not None and known[3] is not None:
+                    success, result = self.file_controller.update_file_content(known[3], path)
+                    key = 'changed'
+                else:
+                    success, result = self.file_controller.add_file(path, folder_id)
+                    key = 'new'
+
+                if success:
+                    manifest.record(scanned, result.id, FileHandler.get_file_hash(path))
+                    stats[key] += 1
+                else:
+                    stats['errors'].append(f"{scanned.name}: {result}")
+
+        return stats
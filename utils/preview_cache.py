@@ -0,0 +1,225 @@
+# utils/preview_cache.py
+"""
+utils/preview_cache.py
+Cache disque des aperçus (miniatures et extraits de texte) avec éviction LRU
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from config.settings import Settings
+
+
+class PreviewCache:
+    """
+    Cache persistant des aperçus, partagé par toute l'application
+
+    Chaque entrée est identifiée par l'identité du fichier source (id,
+    taille, date de modification) et par le type d'aperçu: un fichier
+    modifié produit donc une nouvelle clé et l'ancienne entrée finit par
+    être évincée. La date de modification des entrées sert d'horodatage
+    d'accès pour l'éviction LRU.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """Implémentation du pattern Singleton"""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        # Le cache est aussi utilisé par les threads de préchargement
+        with self._lock:
+            if self._initialized:
+                return
+
+            settings = Settings()
+            self.cache_dir = Path(settings.get('preview.cache_dir'))
+            self.max_bytes = int(settings.get('preview.cache_max_mb', 512)) * 1024 * 1024
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            self._io_lock = threading.Lock()
+            self._total_bytes = self._scan_size()
+            settings.subscribe(self._on_settings_changed)
+            self._initialized = True
+
+    def _on_settings_changed(self, changed_keys):
+        """Appliquer un nouveau budget sans redémarrer l'application"""
+        if 'preview.cache_max_mb' in changed_keys:
+            self.max_bytes = int(Settings().get('preview.cache_max_mb', 512)) * 1024 * 1024
+            if self._total_bytes > self.max_bytes:
+                self.evict()
+
+    # ------------------------------
+    # Clés
+    # ------------------------------
+    @staticmethod
+    def make_key(file_path: str, kind: str, file_id=None, variant: str = '') -> Optional[str]:
+        """
+        Construire la clé d'un aperçu à partir de l'identité du fichier
+
+        Returns:
+            str: Clé hexadécimale, ou None si le fichier est inaccessible
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        identity = f"{file_id or os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{kind}|{variant}"
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str, suffix: str) -> Path:
+        # Deux niveaux de répertoires pour éviter les dossiers géants
+        return self.cache_dir / key[:2] / f"{key}{suffix}"
+
+    # ------------------------------
+    # Lecture / écriture
+    # ------------------------------
+    def get_path(self, key: str, suffix: str) -> Optional[str]:
+        """Retourner le chemin d'une entrée existante (et la marquer utilisée)"""
+        if key is None:
+            return None
+
+        path = self._entry_path(key, suffix)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return str(path)
+
+    def get_text(self, key: str) -> Optional[str]:
+        """Lire un extrait de texte mis en cache"""
+        path = self.get_path(key, '.txt')
+        if path is None:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put_text(self, key: str, text: str) -> Optional[str]:
+        """Mettre en cache un extrait de texte"""
+        if key is None or text is None:
+            return None
+        return self.put_bytes(key, '.txt', text.encode('utf-8'))
+
+    def put_bytes(self, key: str, suffix: str, data: bytes) -> Optional[str]:
+        """Écrire une entrée de manière atomique puis appliquer le budget"""
+        if key is None:
+            return None
+
+        path = self._entry_path(key, suffix)
+        try:
+            # Une entrée remplacée ne compte plus dans le total
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Impossible d'écrire dans le cache d'aperçus: {e}")
+            return None
+
+        with self._io_lock:
+            self._total_bytes += len(data) - replaced
+            over_budget = self._total_bytes > self.max_bytes
+
+        if over_budget:
+            self.evict()
+        return str(path)
+
+    def put_image(self, key: str, image, fmt: str = 'JPEG', quality: int = 85) -> Optional[str]:
+        """Mettre en cache une image PIL (miniature)"""
+        if key is None:
+            return None
+
+        import io
+
+        buffer = io.BytesIO()
+        if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(buffer, format=fmt, quality=quality)
+        suffix = '.jpg' if fmt == 'JPEG' else f".{fmt.lower()}"
+        return self.put_bytes(key, suffix, buffer.getvalue())
+
+    # ------------------------------
+    # Éviction
+    # ------------------------------
+    def _iter_entries(self):
+        for sub in self.cache_dir.iterdir():
+            if not sub.is_dir():
+                continue
+            with os.scandir(sub) as it:
+                for entry in it:
+                    if entry.is_file(follow_symlinks=False):
+                        yield entry
+
+    def _scan_size(self) -> int:
+        try:
+            return sum(entry.stat().st_size for entry in self._iter_entries())
+        except OSError:
+            return 0
+
+    def evict(self, target_ratio: float = 0.9):
+        """
+        Supprimer les entrées les moins récemment utilisées
+
+        L'éviction descend sous target_ratio du budget pour ne pas être
+        relancée à chaque nouvelle entrée.
+        """
+        with self._io_lock:
+            entries = []
+            for entry in self._iter_entries():
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * target_ratio)
+            entries.sort()
+
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+            self._total_bytes = total
+
+    def clear(self):
+        """Vider entièrement le cache"""
+        with self._io_lock:
+            for entry in list(self._iter_entries()):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        """Taille courante et budget du cache"""
+        return {
+            'path': str(self.cache_dir),
+            'size': self._total_bytes,
+            'max_size': self.max_bytes,
+        }
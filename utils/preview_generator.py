@@ -6,22 +6,20 @@ utils/preview_generator.py
 Générateur de prévisualisations pour différents types de fichiers
 """
 
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterator, Optional, Tuple
 import os
 
-# Imports conditionnels pour éviter les erreurs si les bibliothèques ne sont pas installées
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+# Bibliothèques optionnelles: leur présence est vérifiée sans les charger,
+# elles ne sont importées qu'au premier aperçu (démarrage plus rapide)
+PIL_AVAILABLE = find_spec('PIL') is not None
+PYPDF2_AVAILABLE = find_spec('PyPDF2') is not None
 
-try:
-    import PyPDF2
-    PYPDF2_AVAILABLE = True
-except ImportError:
-    PYPDF2_AVAILABLE = False
+from config.settings import Settings
+from utils.enums import PdfPreviewStatus
+from utils.preview_cache import PreviewCache
+from utils.text_preview import TextPreview
 
 class PreviewGenerator:
     """Générateur de prévisualisations pour différents types de fichiers"""
@@ -31,6 +29,20 @@ class PreviewGenerator:
     SUPPORTED_TEXT_FORMATS = ['.txt', '.md', '.log', '.csv', '.json', '.xml', '.html', '.css', '.js', '.py', '.java', '.c', '.cpp', '.h']
     SUPPORTED_DOCUMENT_FORMATS = ['.pdf', '.docx', '.doc', '.odt', '.rtf']
     
+    # Paramètres des aperçus affichés (partagés avec le préchargement pour le cache)
+    IMAGE_PREVIEW_SIZE = (800, 600)     # Par défaut, voir image_preview_size()
+    PDF_PREVIEW_PAGES = 3
+    
+    @classmethod
+    def image_preview_size(cls) -> Tuple[int, int]:
+        """Taille maximale des miniatures affichées ('preview.image_max_size')"""
+        size = Settings().get('preview.image_max_size', cls.IMAGE_PREVIEW_SIZE)
+        try:
+            width, height = size
+            return int(width), int(height)
+        except (TypeError, ValueError):
+            return cls.IMAGE_PREVIEW_SIZE
+    
     @staticmethod
     def can_preview(file_path: str) -> bool:
         """
@@ -72,90 +84,144 @@ class PreviewGenerator:
             return 'unknown'
     
     @staticmethod
-    def generate_image_preview(file_path: str, max_size: Tuple[int, int] = (800, 600)) -> Optional[str]:
+    def generate_image_preview(file_path: str, max_size: Tuple[int, int] = (800, 600),
+                               file_id=None) -> Optional[str]:
         """
         Générer une prévisualisation d'image
         
+        La miniature est enregistrée dans le cache d'aperçus: une image
+        déjà vue n'est plus décodée, seul le fichier réduit est relu.
+        
         Args:
             file_path (str): Chemin de l'image
             max_size (tuple): Taille maximale (largeur, hauteur)
+            file_id: Identifiant du fichier en base (clé de cache)
         
         Returns:
-            str: Chemin de l'image (original ou redimensionné)
+            str: Chemin de l'image (miniature en cache ou original)
         """
         if not PIL_AVAILABLE:
             return None
+        from PIL import Image
+        
+        cache = PreviewCache()
+        variant = f"{max_size[0]}x{max_size[1]}"
+        key = cache.make_key(file_path, 'image', file_id, variant)
+        
+        cached = cache.get_path(key, '.jpg') or cache.get_path(key, '.png')
+        if cached:
+            return cached
         
         try:
-            img = Image.open(file_path)
-            
-            # Vérifier si un redimensionnement est nécessaire
-            if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
+            with Image.open(file_path) as img:
+                # Vérifier si un redimensionnement est nécessaire
+                if img.size[0] <= max_size[0] and img.size[1] <= max_size[1]:
+                    return file_path
+                
+                # Décodage JPEG à échelle réduite (1/2, 1/4, 1/8) avant le redimensionnement
+                img.draft('RGB', max_size)
                 img.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            return file_path
+                
+                # La transparence impose le PNG, sinon JPEG (plus compact)
+                has_alpha = img.mode in ('RGBA', 'LA') or 'transparency' in img.info
+                if has_alpha:
+                    return cache.put_image(key, img.convert('RGBA'), fmt='PNG') or file_path
+                return cache.put_image(key, img, fmt='JPEG') or file_path
         except Exception as e:
             print(f"Erreur lors de la génération de l'aperçu image: {e}")
             return None
     
     @staticmethod
-    def extract_text_preview(file_path: str, max_chars: int = 5000) -> Optional[str]:
+    def extract_text_preview(file_path: str, max_chars: int = 5000, file_id=None) -> Optional[str]:
         """
         Extraire un aperçu texte d'un fichier
         
         Args:
             file_path (str): Chemin du fichier
             max_chars (int): Nombre maximum de caractères à extraire
+            file_id: Identifiant du fichier en base (clé de cache)
         
         Returns:
             str: Contenu du fichier (tronqué si nécessaire)
         """
+        cache = PreviewCache()
+        key = cache.make_key(file_path, 'text', file_id, str(max_chars))
+        cached = cache.get_text(key)
+        if cached is not None:
+            return cached
+        
         try:
-            # Essayer UTF-8 d'abord
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read(max_chars)
-                return content
-        except UnicodeDecodeError:
-            try:
-                # Essayer latin-1 en second
-                with open(file_path, 'r', encoding='latin-1') as f:
-                    content = f.read(max_chars)
-                    return content
-            except Exception:
-                try:
-                    # Essayer cp1252 (Windows)
-                    with open(file_path, 'r', encoding='cp1252') as f:
-                        content = f.read(max_chars)
-                        return content
-                except Exception:
-                    return None
+            # Encodage détecté sur un échantillon, lecture sans tout décoder
+            with TextPreview(file_path) as preview:
+                content = preview.read_head(max_chars)
+            cache.put_text(key, content)
+            return content
         except Exception as e:
             print(f"Erreur lors de l'extraction du texte: {e}")
             return None
     
     @staticmethod
-    def extract_pdf_preview(file_path: str, max_pages: int = 1) -> Optional[str]:
+    def extract_pdf_preview(file_path: str, max_pages: int = 1, file_id=None) -> Optional[str]:
         """
         Extraire le texte des premières pages d'un PDF
         
         Args:
             file_path (str): Chemin du fichier PDF
             max_pages (int): Nombre maximum de pages à extraire
+            file_id: Identifiant du fichier en base (clé de cache)
         
         Returns:
             str: Texte extrait du PDF
         """
+        blocks = list(PreviewGenerator.iter_pdf_preview(file_path, max_pages, file_id))
+        
+        if PdfPreviewStatus.overall(status for status, _ in blocks) == PdfPreviewStatus.NO_TEXT:
+            return "Le PDF ne contient pas de texte extractible.\nIl peut s'agir d'un PDF contenant uniquement des images."
+        
+        return "".join(block for _, block in blocks)
+    
+    @staticmethod
+    def iter_pdf_preview(file_path: str, max_pages: int = 1,
+                         file_id=None) -> Iterator[Tuple[PdfPreviewStatus, str]]:
+        """
+        Extraire le texte des premières pages d'un PDF, page par page
+        
+        Chaque page est produite dès qu'elle est extraite, ce qui permet
+        à l'appelant de l'afficher sans attendre les suivantes. Les
+        erreurs sont produites sous forme de message, avec le statut
+        ERROR; PdfPreviewStatus.overall() donne le statut du document.
+        Seuls les aperçus contenant du texte sont mis en cache.
+        
+        Args:
+            file_path (str): Chemin du fichier PDF
+            max_pages (int): Nombre maximum de pages à extraire
+            file_id: Identifiant du fichier en base (clé de cache)
+        
+        Yields:
+            tuple: (PdfPreviewStatus, texte d'une page ou texte complet s'il est en cache)
+        """
         if not PYPDF2_AVAILABLE:
-            return "⚠️ PyPDF2 n'est pas installé. Impossible de prévisualiser les PDF.\n\nPour activer cette fonctionnalité, installez PyPDF2:\npip install PyPDF2"
+            yield PdfPreviewStatus.ERROR, "⚠️ PyPDF2 n'est pas installé. Impossible de prévisualiser les PDF.\n\nPour activer cette fonctionnalité, installez PyPDF2:\npip install PyPDF2"
+            return
+        import PyPDF2
+        
+        cache = PreviewCache()
+        key = cache.make_key(file_path, 'pdf', file_id, str(max_pages))
+        cached = cache.get_text(key)
+        if cached is not None:
+            yield PdfPreviewStatus.TEXT, cached
+            return
         
         try:
             with open(file_path, 'rb') as f:
                 pdf_reader = PyPDF2.PdfReader(f)
                 
                 if len(pdf_reader.pages) == 0:
-                    return "Le PDF est vide (0 pages)."
+                    yield PdfPreviewStatus.NO_TEXT, "Le PDF est vide (0 pages)."
+                    return
                 
-                text = ""
+                pages = []
+                has_text = False
                 pages_to_read = min(max_pages, len(pdf_reader.pages))
                 
                 for i in range(pages_to_read):
@@ -163,20 +229,25 @@ class PreviewGenerator:
                         page = pdf_reader.pages[i]
                         page_text = page.extract_text()
                         
-                        if page_text:
-                            text += f"--- Page {i+1} ---\n\n{page_text}\n\n"
+                        if page_text and page_text.strip():
+                            status = PdfPreviewStatus.TEXT
+                            block = f"--- Page {i+1} ---\n\n{page_text}\n\n"
                         else:
-                            text += f"--- Page {i+1} ---\n\n[Aucun texte extractible]\n\n"
+                            status = PdfPreviewStatus.NO_TEXT
+                            block = f"--- Page {i+1} ---\n\n[Aucun texte extractible]\n\n"
                     except Exception as e:
-                        text += f"--- Page {i+1} ---\n\n[Erreur lors de l'extraction: {str(e)}]\n\n"
-                
-                if not text.strip():
-                    return "Le PDF ne contient pas de texte extractible.\nIl peut s'agir d'un PDF contenant uniquement des images."
+                        status = PdfPreviewStatus.ERROR
+                        block = f"--- Page {i+1} ---\n\n[Erreur lors de l'extraction: {str(e)}]\n\n"
+                    
+                    has_text = has_text or status == PdfPreviewStatus.TEXT
+                    pages.append(block)
+                    yield status, block
                 
-                return text
+                if has_text:
+                    cache.put_text(key, "".join(pages))
         
         except Exception as e:
-            return f"❌ Erreur lors de la lecture du PDF:\n{str(e)}\n\nLe fichier pourrait être:\n- Protégé par mot de passe\n- Corrompu\n- Dans un format non standard"
+            yield PdfPreviewStatus.ERROR, f"❌ Erreur lors de la lecture du PDF:\n{str(e)}\n\nLe fichier pourrait être:\n- Protégé par mot de passe\n- Corrompu\n- Dans un format non standard"
     
     @staticmethod
     def get_file_info(file_path: str) -> dict:
@@ -0,0 +1,118 @@
+# utils/preview_prefetcher.py
+"""
+utils/preview_prefetcher.py
+Préchargement des aperçus des fichiers voisins dans le cache d'aperçus
+"""
+
+from PySide6.QtCore import QObject, QThread, QThreadPool
+
+from config.settings import Settings
+from utils.preview_generator import PreviewGenerator, PIL_AVAILABLE
+from utils.task_runner import TaskRunner
+
+
+class PreviewPrefetcher(QObject):
+    """
+    Prépare en arrière-plan les aperçus des fichiers autour de la sélection
+
+    Quand un fichier est sélectionné, les K fichiers suivants et
+    précédents du listing sont rendus dans le PreviewCache: la
+    prévisualisation suivante n'a plus qu'à relire la miniature.
+
+    Le travail tourne dans un pool dédié de basse priorité (un thread par
+    défaut) pour ne pas concurrencer l'interface ni les accès à la base.
+    Les fichiers trop gros et les images trop grandes pour le budget
+    mémoire sont ignorés. Une nouvelle sélection annule les préparations
+    qui n'ont pas encore commencé.
+    """
+
+    def __init__(self, file_controller, parent=None):
+        super().__init__(parent)
+        self.file_controller = file_controller
+
+        settings = Settings()
+        self.radius = int(settings.get('preview.prefetch_radius', 3))
+        self.max_file_bytes = int(settings.get('preview.prefetch_max_file_mb', 100)) * 1024 * 1024
+        self.max_pixels = int(settings.get('preview.prefetch_max_megapixels', 60)) * 1_000_000
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, int(settings.get('preview.prefetch_threads', 1))))
+        self.pool.setThreadPriority(QThread.LowestPriority)
+
+        self.runner = TaskRunner(self, pool=self.pool)
+        # La recherche des chemins passe par le pool de la base
+        self.lookup_runner = TaskRunner(self)
+
+    def prefetch(self, rows, index):
+        """
+        Précharger les voisins de la ligne index
+
+        Args:
+            rows: Lignes du listing courant (FileRow)
+            index: Position du fichier sélectionné dans rows
+        """
+        if self.radius <= 0:
+            return
+
+        neighbours = self.neighbours(rows, index)
+
+        # Les préparations de l'ancienne sélection ne sont plus prioritaires
+        self.runner.cancel_all()
+        if not neighbours:
+            return
+
+        self.lookup_runner.submit(
+            self.file_controller.get_file_paths, [row.id for row in neighbours],
+            key='paths',
+            on_result=lambda paths: self._schedule(neighbours, paths)
+        )
+
+    def neighbours(self, rows, index):
+        """Voisins prévisualisables, du plus proche au plus lointain"""
+        selected = []
+        for distance in range(1, self.radius + 1):
+            for position in (index + distance, index - distance):
+                if not 0 <= position < len(rows):
+                    continue
+                row = rows[position]
+                if row.file_size and row.file_size > self.max_file_bytes:
+                    continue
+                if PreviewGenerator.get_file_type(row.name) in ('image', 'pdf'):
+                    selected.append(row)
+        return selected
+
+    def _schedule(self, rows, paths):
+        for row in rows:
+            file_path = paths.get(row.id)
+            if file_path:
+                self.runner.submit(
+                    self.prepare, file_path, row.id, self.max_pixels,
+                    key=('prefetch', row.id)
+                )
+
+    @staticmethod
+    def prepare(file_path, file_id, max_pixels):
+        """Rendre l'aperçu d'un fichier dans le cache (thread de travail)"""
+        file_type = PreviewGenerator.get_file_type(file_path)
+
+        if file_type == 'image':
+            if not PIL_AVAILABLE:
+                return
+            from PIL import Image
+
+            # Lecture de l'en-tête seulement: pas de décodage des pixels
+            with Image.open(file_path) as img:
+                if img.size[0] * img.size[1] > max_pixels:
+                    return
+            PreviewGenerator.generate_image_preview(
+                file_path, max_size=PreviewGenerator.image_preview_size(), file_id=file_id
+            )
+        elif file_type == 'pdf':
+            for _ in PreviewGenerator.iter_pdf_preview(
+                    file_path, max_pages=PreviewGenerator.PDF_PREVIEW_PAGES, file_id=file_id):
+                pass
+
+    def stop(self):
+        """Annuler tous les préchargements (fermeture de la fenêtre)"""
+        self.lookup_runner.cancel_all()
+        self.runner.cancel_all()
@@ -0,0 +1,226 @@
+# utils/scan_manifest.py
+"""
+utils/scan_manifest.py
+Manifeste persistant d'un dossier source pour les imports incrémentaux
+"""
+
+import hashlib
+import os
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from utils.scanner import ScannedFile
+
+
+class ScanDelta(NamedTuple):
+    """Différences entre le dossier source et le dernier import"""
+    new: List[ScannedFile]
+    changed: List[Tuple[ScannedFile, Optional[int], Optional[str]]]   # (fichier, id archivé, sha256)
+    moved: List[Tuple[ScannedFile, str]]                              # (fichier, ancien chemin relatif)
+    deleted: List[Tuple[str, Optional[int]]]                          # (chemin relatif, id archivé)
+    unchanged: int
+
+
+class ScanManifest:
+    """
+    Manifeste d'un dossier source importé dans un dossier d'archive
+
+    Pour chaque fichier importé, le manifeste conserve le chemin relatif,
+    la taille, la date de modification, l'inode, l'empreinte SHA-256 et
+    l'id du fichier archivé. Un nouveau scan est comparé au manifeste par
+    des jointures SQL sur les seules données de stat: les nouveaux,
+    modifiés, déplacés (même inode) et supprimés sont trouvés sans relire
+    le contenu des fichiers.
+
+    Le manifeste est une base SQLite (module standard sqlite3) par couple
+    (dossier source, dossier d'archive), dans ~/.archive_manager/manifests.
+    Une instance ne doit être utilisée que par un seul thread.
+    """
+
+    BATCH_SIZE = 5000
+
+    def __init__(self, source_root: str, folder_id: int, manifest_dir: Optional[str] = None):
+        self.source_root = os.path.abspath(source_root)
+        self.folder_id = folder_id
+
+        manifest_dir = Path(manifest_dir or Path.home() / '.archive_manager' / 'manifests')
+        manifest_dir.mkdir(parents=True, exist_ok=True)
+
+        root_hash = hashlib.sha1(self.source_root.encode('utf-8')).hexdigest()[:16]
+        self.path = manifest_dir / f"{root_hash}_{folder_id}.sqlite"
+
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                rel_path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                inode INTEGER,
+                device INTEGER,
+                sha256 TEXT,
+                file_id INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS ix_entries_inode ON entries (device, inode);
+        """)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('source_root', ?)",
+            (self.source_root,)
+        )
+        self.conn.commit()
+
+    # ------------------------------
+    # Comparaison
+    # ------------------------------
+    def relative_path(self, path: str) -> str:
+        return os.path.relpath(path, self.source_root)
+
+    def compute_delta(self, scanned_files: Iterable[ScannedFile], complete: bool = True) -> ScanDelta:
+        """
+        Comparer un scan du dossier source au manifeste
+
+        Le scan est chargé par lots dans une table temporaire, puis la
+        comparaison est faite en quelques requêtes ensemblistes.
+
+        Avec complete=False (scan d'une partie du dossier), les fichiers
+        absents du scan ne sont pas signalés comme supprimés, et un
+        déplacement n'est retenu que si l'ancien chemin n'existe plus.
+        """
+        conn = self.conn
+        conn.execute("DROP TABLE IF EXISTS temp.scan")
+        conn.execute("""
+            CREATE TEMP TABLE scan (
+                rel_path TEXT PRIMARY KEY,
+                path TEXT, name TEXT, size INTEGER, mtime REAL,
+                created REAL, inode INTEGER, device INTEGER
+            )
+        """)
+
+        batch = []
+        for scanned in scanned_files:
+            batch.append((
+                self.relative_path(scanned.path), scanned.path, scanned.name,
+                scanned.size, scanned.modified, scanned.created,
+                scanned.inode, scanned.device
+            ))
+            if len(batch) >= self.BATCH_SIZE:
+                conn.executemany("INSERT OR REPLACE INTO temp.scan VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                batch = []
+        if batch:
+            conn.executemany("INSERT OR REPLACE INTO temp.scan VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+
+        def scanned_row(row):
+            return ScannedFile(row[0], row[1], row[2], row[3], row[4], row[5], row[6])
+
+        columns = "s.path, s.name, s.size, s.mtime, s.created, s.inode, s.device"
+
+        changed = [
+            (scanned_row(row), row[7], row[8]) for row in conn.execute(f"""
+                SELECT {columns}, e.file_id, e.sha256
+                FROM temp.scan s JOIN entries e ON e.rel_path = s.rel_path
+                WHERE e.size != s.size OR e.mtime != s.mtime
+            """)
+        ]
+
+        unchanged = conn.execute("""
+            SELECT COUNT(*) FROM temp.scan s JOIN entries e ON e.rel_path = s.rel_path
+            WHERE e.size = s.size AND e.mtime = s.mtime
+        """).fetchone()[0]
+
+        # Un fichier disparu dont l'inode réapparaît ailleurs a été déplacé
+        candidates = [
+            (scanned_row(row), row[7]) for row in conn.execute(f"""
+                SELECT {columns}, e.rel_path
+                FROM temp.scan s
+                JOIN entries e ON e.device = s.device AND e.inode = s.inode
+                               AND e.size = s.size AND e.mtime = s.mtime
+                WHERE NOT EXISTS (SELECT 1 FROM entries x WHERE x.rel_path = s.rel_path)
+                  AND NOT EXISTS (SELECT 1 FROM temp.scan y WHERE y.rel_path = e.rel_path)
+            """)
+        ]
+        if not complete:
+            candidates = [(scanned, old) for scanned, old in candidates
+                          if not os.path.lexists(os.path.join(self.source_root, old))]
+        # Liens physiques: plusieurs chemins partagent l'inode. Seules les
+        # paires sans ambiguïté sont des déplacements, les autres chemins
+        # sont traités comme nouveaux et supprimés
+        old_paths = Counter(old for _, old in candidates)
+        new_paths = Counter(scanned.path for scanned, _ in candidates)
+        moved = [(scanned, old) for scanned, old in candidates
+                 if old_paths[old] == 1 and new_paths[scanned.path] == 1]
+        moved_from = {old for _, old in moved}
+        moved_to = {scanned.path for scanned, _ in moved}
+
+        new = [
+            scanned_row(row) for row in conn.execute(f"""
+                SELECT {columns} FROM temp.scan s
+                WHERE NOT EXISTS (SELECT 1 FROM entries e WHERE e.rel_path = s.rel_path)
+            """)
+            if row[0] not in moved_to
+        ]
+
+        deleted = [
+            (row[0], row[1]) for row in conn.execute("""
+                SELECT e.rel_path, e.file_id FROM entries e
+                WHERE NOT EXISTS (SELECT 1 FROM temp.scan s WHERE s.rel_path = e.rel_path)
+            """)
+            if row[0] not in moved_from
+        ] if complete else []
+
+        conn.execute("DROP TABLE temp.scan")
+        return ScanDelta(new, changed, moved, deleted, unchanged)
+
+    # ------------------------------
+    # Mise à jour
+    # ------------------------------
+    def record(self, scanned: ScannedFile, file_id: Optional[int], sha256: Optional[str] = None):
+        """Enregistrer (ou remplacer) l'état importé d'un fichier"""
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO entries (rel_path, size, mtime, inode, device, sha256, file_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (self.relative_path(scanned.path), scanned.size, scanned.modified,
+             scanned.inode, scanned.device, sha256, file_id)
+        )
+
+    def record_move(self, old_rel_path: str, scanned: ScannedFile):
+        """Reporter un déplacement dans le dossier source"""
+        self.conn.execute(
+            "UPDATE entries SET rel_path = ?, inode = ?, device = ? WHERE rel_path = ?",
+            (self.relative_path(scanned.path), scanned.inode, scanned.device, old_rel_path)
+        )
+
+    def forget(self, rel_path: str):
+        """Retirer un fichier supprimé du dossier source"""
+        self.conn.execute("DELETE FROM entries WHERE rel_path = ?", (rel_path,))
+
+    def get(self, rel_path: str) -> Optional[Tuple[int, float, Optional[str], Optional[int]]]:
+        """État enregistré d'un fichier: (taille, mtime, sha256, id archivé)"""
+        return self.conn.execute(
+            "SELECT size, mtime, sha256, file_id FROM entries WHERE rel_path = ?",
+            (rel_path,)
+        ).fetchone()
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,128 +1,263 @@
-
-
 # utils/scanner.py
 import os
-from pathlib import Path
-from typing import List, Dict, Callable, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Callable, Iterator, NamedTuple, Optional, Tuple
+
+
+class ScannedFile(NamedTuple):
+    """File entry produced by FolderScanner.iter_files"""
+    path: str
+    name: str
+    size: int
+    modified: float
+    created: float
+    inode: int
+    device: int
+
+    @property
+    def extension(self) -> str:
+        return os.path.splitext(self.name)[1][1:].lower()
+
 
 class FolderScanner:
-    """Scanner for folders and files"""
-    
-    def __init__(self, 
+    """
+    Scanner for folders and files
+
+    Directories are read with os.scandir, whose entries carry the file
+    type from the directory listing: no extra isfile/isdir call is made
+    per entry. The walk uses an explicit queue instead of recursion, and
+    independent subtrees are listed in parallel on a thread pool, which
+    hides the latency of network shares. Files are produced as a
+    generator so the caller never needs the whole tree in memory.
+    """
+
+    def __init__(self,
                  extensions_filter: Optional[List[str]] = None,
-                 exclude_hidden: bool = True):
+                 exclude_hidden: bool = True,
+                 workers: int = 8):
         """
         Initialize scanner
-        
+
         Args:
             extensions_filter: List of extensions to include (e.g., ['.pdf', '.docx'])
             exclude_hidden: Exclude hidden files and folders
+            workers: Number of directories listed in parallel (1 = sequential)
         """
-        self.extensions_filter = extensions_filter
+        self.extensions_filter = [ext.lower() for ext in extensions_filter] if extensions_filter else None
         self.exclude_hidden = exclude_hidden
-    
-    def scan_folder(self, 
-                   folder_path: str, 
+        self.workers = max(1, workers)
+        self.errors = []
+
+    # ------------------------------
+    # Directory walk
+    # ------------------------------
+    def _list_dir(self, dir_path: str) -> Tuple[str, List[ScannedFile], List[str], Optional[str]]:
+        """
+        List one directory (runs in a worker thread)
+
+        Returns:
+            (dir_path, files, subdirectories, error message or None)
+        """
+        files = []
+        subdirs = []
+
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    name = entry.name
+
+                    # Skip hidden files if configured
+                    if self.exclude_hidden and name.startswith('.'):
+                        continue
+
+                    try:
+                        # Symlinked directories are not followed (no cycles)
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                            continue
+
+                        if not entry.is_file():
+                            continue
+
+                        if self.extensions_filter:
+                            ext = os.path.splitext(name)[1].lower()
+                            if ext not in self.extensions_filter:
+                                continue
+
+                        stat = entry.stat()
+                        files.append(ScannedFile(
+                            entry.path, name, stat.st_size,
+                            stat.st_mtime, stat.st_ctime,
+                            stat.st_ino, stat.st_dev
+                        ))
+                    except OSError:
+                        # Entry removed or unreadable during the scan
+                        continue
+        except PermissionError:
+            return dir_path, files, subdirs, "Permission denied"
+        except OSError as e:
+            return dir_path, files, subdirs, str(e)
+
+        return dir_path, files, subdirs, None
+
+    def walk(self, folder_path: str, recursive: bool = True
+             ) -> Iterator[Tuple[str, List[ScannedFile], List[str], Optional[str]]]:
+        """
+        Walk a folder tree, yielding one listing per directory
+
+        Directory order is not guaranteed when several workers are used.
+        At most 2 × workers listings are held in memory at any time.
+
+        Yields:
+            (dir_path, files, subdirectories, error message or None)
+        """
+        self.errors = []
+
+        if not recursive:
+            listing = self._list_dir(folder_path)
+            self._record_error(listing)
+            yield listing
+            return
+
+        pending = deque([folder_path])
+
+        if self.workers == 1:
+            while pending:
+                listing = self._list_dir(pending.popleft())
+                self._record_error(listing)
+                pending.extend(listing[2])
+                yield listing
+            return
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scanner')
+        in_flight = set()
+        max_in_flight = self.workers * 2
+
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < max_in_flight:
+                    in_flight.add(executor.submit(self._list_dir, pending.popleft()))
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    listing = future.result()
+                    self._record_error(listing)
+                    pending.extend(listing[2])
+                    yield listing
+        finally:
+            # The consumer may stop early: drop queued listings
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _record_error(self, listing):
+        if listing[3]:
+            self.errors.append((listing[0], listing[3]))
+
+    @staticmethod
+    def stat_file(file_path: str) -> ScannedFile:
+        """Build a ScannedFile for a single path (raises OSError)"""
+        stat = os.stat(file_path)
+        return ScannedFile(
+            file_path, os.path.basename(file_path), stat.st_size,
+            stat.st_mtime, stat.st_ctime, stat.st_ino, stat.st_dev
+        )
+
+    def iter_files(self, folder_path: str, recursive: bool = True) -> Iterator[ScannedFile]:
+        """Yield every matching file under folder_path"""
+        for _, files, _, _ in self.walk(folder_path, recursive):
+            yield from files
+
+    # ------------------------------
+    # Compatibility API
+    # ------------------------------
+    def scan_folder(self,
+                   folder_path: str,
                    recursive: bool = True,
                    progress_callback: Optional[Callable] = None) -> Dict:
         """
         Scan folder and return structure
-        
+
         Args:
             folder_path: Path to scan
             recursive: Scan subfolders
             progress_callback: Callback function for progress updates
-        
+
         Returns:
             Dict with folder structure
         """
-        result = {
-            'path': folder_path,
-            'name': os.path.basename(folder_path),
+        nodes = {}
+        order = []
+
+        for dir_path, files, subdirs, error in self.walk(folder_path, recursive):
+            node = nodes.get(dir_path)
+            if node is None:
+                node = self._new_node(dir_path)
+                nodes[dir_path] = node
+            order.append(node)
+
+            if error:
+                node['error'] = error
+
+            for scanned in files:
+                node['files'].append(self._file_info(scanned))
+                node['total_files'] += 1
+                node['total_size'] += scanned.size
+
+                if progress_callback:
+                    progress_callback(scanned.path)
+
+            if recursive:
+                for subdir in subdirs:
+                    child = nodes.setdefault(subdir, self._new_node(subdir))
+                    node['subfolders'].append(child)
+
+        # Totals bottom-up: a parent is always listed before its children
+        for node in reversed(order):
+            for child in node['subfolders']:
+                node['total_files'] += child['total_files']
+                node['total_size'] += child['total_size']
+
+        return nodes.get(folder_path) or self._new_node(folder_path)
+
+    @staticmethod
+    def _new_node(path: str) -> Dict:
+        return {
+            'path': path,
+            'name': os.path.basename(path),
             'files': [],
             'subfolders': [],
             'total_files': 0,
             'total_size': 0
         }
-        
-        try:
-            entries = os.listdir(folder_path)
-            
-            for entry in entries:
-                full_path = os.path.join(folder_path, entry)
-                
-                # Skip hidden files if configured
-                if self.exclude_hidden and entry.startswith('.'):
-                    continue
-                
-                if os.path.isfile(full_path):
-                    # Check extension filter
-                    if self.extensions_filter:
-                        ext = Path(full_path).suffix.lower()
-                        if ext not in self.extensions_filter:
-                            continue
-                    
-                    file_info = self._get_file_info(full_path)
-                    result['files'].append(file_info)
-                    result['total_files'] += 1
-                    result['total_size'] += file_info['size']
-                    
-                    if progress_callback:
-                        progress_callback(full_path)
-                
-                elif os.path.isdir(full_path) and recursive:
-                    subfolder = self.scan_folder(full_path, recursive, progress_callback)
-                    result['subfolders'].append(subfolder)
-                    result['total_files'] += subfolder['total_files']
-                    result['total_size'] += subfolder['total_size']
-        
-        except PermissionError:
-            result['error'] = "Permission denied"
-        except Exception as e:
-            result['error'] = str(e)
-        
-        return result
-    
+
+    @staticmethod
+    def _file_info(scanned: ScannedFile) -> Dict:
+        return {
+            'path': scanned.path,
+            'name': scanned.name,
+            'size': scanned.size,
+            'extension': scanned.extension,
+            'modified': scanned.modified,
+            'created': scanned.created
+        }
+
     def _get_file_info(self, file_path: str) -> Dict:
         """Get file information"""
         stat = os.stat(file_path)
-        
+
         return {
             'path': file_path,
             'name': os.path.basename(file_path),
             'size': stat.st_size,
-            'extension': Path(file_path).suffix[1:].lower(),
+            'extension': os.path.splitext(file_path)[1][1:].lower(),
             'modified': stat.st_mtime,
             'created': stat.st_ctime
         }
-    
+
     def get_all_files(self, folder_path: str, recursive: bool = True) -> List[str]:
         """Get list of all file paths in folder"""
-        files = []
-        
-        try:
-            for entry in os.listdir(folder_path):
-                full_path = os.path.join(folder_path, entry)
-                
-                if self.exclude_hidden and entry.startswith('.'):
-                    continue
-                
-                if os.path.isfile(full_path):
-                    if self.extensions_filter:
-                        ext = Path(full_path).suffix.lower()
-                        if ext in self.extensions_filter:
-                            files.append(full_path)
-                    else:
-                        files.append(full_path)
-                
-                elif os.path.isdir(full_path) and recursive:
-                    files.extend(self.get_all_files(full_path, recursive))
-        
-        except (PermissionError, Exception):
-            pass
-        
-        return files
-    
+        return [scanned.path for scanned in self.iter_files(folder_path, recursive)]
+
     def count_files(self, folder_path: str, recursive: bool = True) -> int:
         """Count total number of files"""
-        return len(self.get_all_files(folder_path, recursive))
+        return sum(1 for _ in self.iter_files(folder_path, recursive))
@@ -0,0 +1,106 @@
+"""
+utils/storage_scrubber.py
+Vérification du stockage en arrière-plan (intégrité des fichiers archivés)
+"""
+
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from config.settings import Settings
+
+
+class StorageScrubber:
+    """
+    Passages périodiques de vérification du stockage, dans un thread
+
+    Le travail est délégué à IntegrityController.scrub() par tranches de
+    SLICE_SECONDS: la position est sauvegardée entre deux tranches et un
+    passage interrompu (fermeture de l'application) reprend au démarrage
+    suivant. Un nouveau passage commence 'integrity.interval_hours' après
+    la fin du précédent. La lecture est limitée à
+    'integrity.max_mb_per_s'.
+
+    on_problems(stats) est appelée depuis le thread du service quand une
+    tranche a trouvé des fichiers absents ou altérés.
+
+    Exemple de configuration:
+        'integrity': {'enabled': True, 'max_mb_per_s': 20, 'interval_hours': 24}
+    """
+
+    # Laisser l'application démarrer avant de lire le stockage
+    START_DELAY = 60
+    # Durée d'une tranche de vérification, et pause entre deux tranches
+    SLICE_SECONDS = 300
+    PAUSE_SECONDS = 5
+    # Nouvel essai quand un autre poste vérifie déjà le stockage
+    RETRY_SECONDS = 900
+
+    def __init__(self, integrity_controller, on_problems: Optional[Callable] = None):
+        settings = Settings()
+        self.controller = integrity_controller
+        self.rate = float(settings.get('integrity.max_mb_per_s', 20)) * 1024 * 1024 or None
+        self.interval = float(settings.get('integrity.interval_hours', 24)) * 3600
+        self.auto_repair = bool(settings.get('integrity.auto_repair', False))
+        self.on_problems = on_problems
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ------------------------------
+    # Démarrage / arrêt
+    # ------------------------------
+    def start(self):
+        """Démarrer les vérifications en arrière-plan"""
+        self._thread = threading.Thread(target=self._run, name='storage-scrubber', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrêter après le bloc en cours de lecture (position sauvegardée)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    # ------------------------------
+    # Boucle
+    # ------------------------------
+    def _run(self):
+        if self._stop.wait(self.START_DELAY):
+            return
+
+        while not self._stop.wait(self._next_pass_delay()):
+            try:
+                success, result = self.controller.scrub(
+                    rate=self.rate, max_seconds=self.SLICE_SECONDS,
+                    repair=self.auto_repair, should_stop=self._stop.is_set
+                )
+            except Exception as e:
+                print(f"⚠️  Vérification du stockage: {e}")
+                success, result = False, str(e)
+
+            if not success:
+                if self._stop.wait(self.RETRY_SECONDS):
+                    return
+                continue
+
+            if result['problems'] and self.on_problems is not None:
+                self.on_problems(result)
+            if result['completed']:
+                print(f"✅ Vérification du stockage terminée (passage {result['passes']})")
+
+    def _next_pass_delay(self) -> float:
+        """Secondes avant la prochaine tranche: une courte pause si un passage est en cours"""
+        try:
+            state = self.controller.get_checkpoint()
+        except Exception as e:
+            print(f"⚠️  Vérification du stockage: {e}")
+            return self.RETRY_SECONDS
+        if state is None or state.pass_started_at is not None or state.last_completed_at is None:
+            return self.PAUSE_SECONDS
+
+        completed = state.last_completed_at
+        if completed.tzinfo is None:
+            completed = completed.replace(tzinfo=timezone.utc)
+        elapsed = (datetime.now(timezone.utc) - completed).total_seconds()
+        return max(self.PAUSE_SECONDS, self.interval - elapsed)
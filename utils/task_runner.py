@@ -0,0 +1,210 @@
+# utils/task_runner.py
+"""
+utils/task_runner.py
+Exécution des appels contrôleurs en arrière-plan (QThreadPool/QRunnable)
+
+Les vues soumettent une fonction au TaskRunner qui l'exécute hors du
+thread GUI et renvoie le résultat par signal. Une tâche soumise avec une
+clé remplace la précédente tâche de même clé: celle-ci est annulée et son
+résultat, s'il arrive quand même, est ignoré.
+"""
+
+import threading
+import traceback
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class TaskCancelled(Exception):
+    """Levée par une tâche qui constate son annulation"""
+
+
+class CancellationToken:
+    """Jeton d'annulation partagé entre la vue et la tâche"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._signals = None
+
+    def cancel(self):
+        """Demander l'annulation de la tâche"""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """Interrompre la tâche si elle a été annulée"""
+        if self._event.is_set():
+            raise TaskCancelled()
+
+    def report(self, value):
+        """Envoyer une progression (ou un résultat partiel) au thread GUI"""
+        if self._signals is not None and not self._event.is_set():
+            self._signals.progress.emit(value)
+
+
+class _TaskSignals(QObject):
+    """Signaux d'une tâche (l'objet vit dans le thread GUI)"""
+    result = Signal(object)
+    error = Signal(str)
+    progress = Signal(object)
+    finished = Signal()
+
+
+class _Task(QRunnable):
+    """Tâche exécutée par le QThreadPool"""
+
+    def __init__(self, fn, args, kwargs, token, pass_token):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.token = token
+        self.pass_token = pass_token
+        self.signals = _TaskSignals()
+        token._signals = self.signals
+
+    def run(self):
+        try:
+            if self.token.cancelled:
+                return
+
+            kwargs = dict(self.kwargs)
+            if self.pass_token:
+                kwargs['token'] = self.token
+
+            result = self.fn(*self.args, **kwargs)
+
+            if not self.token.cancelled:
+                self.signals.result.emit(result)
+        except TaskCancelled:
+            pass
+        except Exception as e:
+            if not self.token.cancelled:
+                traceback.print_exc()
+                self.signals.error.emit(str(e))
+        finally:
+            self.signals.finished.emit()
+
+
+_database_pool = None
+
+
+def database_pool():
+    """
+    Pool partagé pour les tâches qui accèdent à la base de données
+
+    Chaque session a sa propre connexion (DatabaseManager): ces tâches
+    peuvent tourner en même temps que les lectures faites depuis le
+    thread de l'interface. La taille du pool limite seulement la charge:
+    SQLite n'accepte qu'une écriture à la fois (les autres attendent le
+    verrou), deux threads suffisent pour qu'une tâche longue (import) ne
+    retienne pas les listings.
+    """
+    global _database_pool
+    if _database_pool is None:
+        from database.db_manager import DatabaseManager
+
+        _database_pool = QThreadPool()
+        if DatabaseManager().get_db_type() in (None, 'sqlite'):
+            _database_pool.setMaxThreadCount(2)
+        else:
+            _database_pool.setMaxThreadCount(4)
+    return _database_pool
+
+
+class TaskRunner(QObject):
+    """
+    Point d'entrée des vues pour exécuter du travail en arrière-plan
+
+    Exemple:
+        self.runner = TaskRunner(self)
+        self.runner.submit(
+            self.folder_controller.get_root_folders,
+            key='folders',
+            on_result=self.populate_tree,
+        )
+    """
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or database_pool()
+        self._tasks = {}    # token -> _Task en cours
+        self._keys = {}     # clé -> token de la dernière tâche soumise
+
+    def submit(self, fn, *args, key=None, on_result=None, on_error=None,
+               on_progress=None, on_finished=None, pass_token=False, **kwargs):
+        """
+        Exécuter fn(*args, **kwargs) dans le pool
+
+        Args:
+            key: Clé de regroupement; une nouvelle tâche annule la précédente
+            on_result: Appelé dans le thread GUI avec la valeur de retour
+            on_error: Appelé dans le thread GUI avec le message d'erreur
+            on_progress: Appelé pour chaque token.report(valeur)
+            on_finished: Appelé quand la tâche est terminée (même en erreur)
+            pass_token: Passer le jeton à fn via l'argument nommé 'token'
+
+        Returns:
+            CancellationToken: Jeton permettant d'annuler la tâche
+        """
+        if key is not None:
+            self.cancel(key)
+
+        token = CancellationToken()
+        task = _Task(fn, args, kwargs, token, pass_token)
+
+        # Les rappels vérifient l'annulation dans le thread GUI: un signal
+        # déjà en file d'attente ne doit pas écraser un résultat plus récent
+        if on_result is not None:
+            task.signals.result.connect(
+                lambda value: None if token.cancelled else on_result(value))
+        if on_error is not None:
+            task.signals.error.connect(
+                lambda message: None if token.cancelled else on_error(message))
+        if on_progress is not None:
+            task.signals.progress.connect(
+                lambda value: None if token.cancelled else on_progress(value))
+        task.signals.finished.connect(
+            lambda: self._on_finished(token, key, on_finished))
+
+        self._tasks[token] = task
+        if key is not None:
+            self._keys[key] = token
+
+        self.pool.start(task)
+        return token
+
+    def _on_finished(self, token, key, on_finished):
+        """Libérer la tâche terminée"""
+        self._tasks.pop(token, None)
+        if key is not None and self._keys.get(key) is token:
+            del self._keys[key]
+        if on_finished is not None and not token.cancelled:
+            on_finished()
+
+    def cancel(self, key):
+        """Annuler la tâche associée à une clé"""
+        token = self._keys.pop(key, None)
+        if token is not None:
+            self._cancel_token(token)
+
+    def _cancel_token(self, token):
+        token.cancel()
+        task = self._tasks.get(token)
+        # Une tâche pas encore démarrée est retirée de la file d'attente
+        if task is not None and self.pool.tryTake(task):
+            self._tasks.pop(token, None)
+
+    def cancel_all(self):
+        """Annuler toutes les tâches de ce runner (fermeture d'une fenêtre)"""
+        for token in list(self._tasks):
+            self._cancel_token(token)
+        self._keys.clear()
+
+    def is_running(self, key):
+        """Vérifier si une tâche de cette clé est en cours"""
+        return key in self._keys
@@ -0,0 +1,259 @@
+# utils/text_preview.py
+"""
+utils/text_preview.py
+Lecture paginée de fichiers texte volumineux (projection mémoire)
+"""
+
+import codecs
+import mmap
+import threading
+from array import array
+from typing import List, Optional
+
+
+class TextPreview:
+    """
+    Accès aléatoire par lignes à un fichier texte de taille quelconque
+
+    Le fichier est projeté en mémoire (mmap): seules les pages lues sont
+    chargées par le système. L'encodage est détecté une seule fois à
+    partir du BOM ou d'un échantillon du début du fichier. Un index des
+    débuts de lignes (array('Q'), 8 octets par ligne) est construit par
+    tranches, à la demande ou en arrière-plan, ce qui permet d'aller
+    directement à la ligne 2 000 000 d'un journal.
+
+    Exemple:
+        with TextPreview('/var/log/app.log') as preview:
+            lines = preview.get_lines(2_000_000, 100)
+    """
+
+    SAMPLE_SIZE = 64 * 1024
+    INDEX_CHUNK_LINES = 100_000
+
+    # BOM les plus longs en premier (le BOM UTF-32-LE commence par celui d'UTF-16-LE)
+    BOMS = [
+        (codecs.BOM_UTF32_LE, 'utf-32-le'),
+        (codecs.BOM_UTF32_BE, 'utf-32-be'),
+        (codecs.BOM_UTF8, 'utf-8'),
+        (codecs.BOM_UTF16_LE, 'utf-16-le'),
+        (codecs.BOM_UTF16_BE, 'utf-16-be'),
+    ]
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        self._lock = threading.Lock()
+
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Fichier vide: mmap refuse une longueur nulle
+            self._mm = None
+
+        self.size = len(self._mm) if self._mm is not None else 0
+        self.encoding, self.data_start = self._detect_encoding()
+
+        self._newline = '\n'.encode(self.encoding)
+        self._unit = len(self._newline)
+
+        self._offsets = array('Q', [self.data_start])
+        self._scan_pos = self.data_start
+        self.complete = self.size <= self.data_start
+
+    # ------------------------------
+    # Encodage
+    # ------------------------------
+    def _detect_encoding(self):
+        """
+        Détecter l'encodage en une passe sur un échantillon
+
+        Returns:
+            tuple: (nom du codec, position du premier octet de texte)
+        """
+        if self._mm is None:
+            return 'utf-8', 0
+
+        sample = self._mm[:self.SAMPLE_SIZE]
+
+        for bom, encoding in self.BOMS:
+            if sample.startswith(bom):
+                return encoding, len(bom)
+
+        # UTF-16 sans BOM: texte ASCII avec un octet nul sur deux
+        if len(sample) >= 4 and sample.count(0) > len(sample) // 4:
+            if sample[1::2].count(0) > len(sample) // 4:
+                return 'utf-16-le', 0
+            if sample[0::2].count(0) > len(sample) // 4:
+                return 'utf-16-be', 0
+
+        try:
+            sample.decode('utf-8')
+            return 'utf-8', 0
+        except UnicodeDecodeError as e:
+            # Caractère multi-octets coupé en fin d'échantillon
+            if len(sample) == self.SAMPLE_SIZE and e.start >= len(sample) - 3:
+                return 'utf-8', 0
+
+        try:
+            sample.decode('cp1252')
+            return 'cp1252', 0
+        except UnicodeDecodeError:
+            return 'latin-1', 0
+
+    # ------------------------------
+    # Index des lignes
+    # ------------------------------
+    @property
+    def indexed_lines(self) -> int:
+        """Nombre de lignes dont le début est connu"""
+        if self.complete:
+            return self.line_count
+        return len(self._offsets) - 1
+
+    @property
+    def line_count(self) -> Optional[int]:
+        """Nombre total de lignes (None tant que l'index est incomplet)"""
+        if not self.complete:
+            return None
+        offsets = len(self._offsets)
+        # Une dernière ligne vide après le dernier saut de ligne ne compte pas
+        if self._offsets[-1] >= self.size:
+            return offsets - 1
+        return offsets
+
+    @property
+    def progress(self) -> float:
+        """Avancement de l'indexation (0.0 à 1.0)"""
+        if self.complete or self.size == 0:
+            return 1.0
+        return self._scan_pos / self.size
+
+    def index_lines(self, until_line: Optional[int] = None, max_lines: Optional[int] = None) -> bool:
+        """
+        Étendre l'index des débuts de lignes
+
+        Args:
+            until_line: S'arrêter dès que cette ligne est indexée
+            max_lines: Nombre maximal de lignes à ajouter dans cet appel
+
+        Returns:
+            bool: True si l'index couvre tout le fichier
+        """
+        with self._lock:
+            if self._mm is None:
+                return True
+
+            mm = self._mm
+            offsets = self._offsets
+            newline = self._newline
+            unit = self._unit
+            pos = self._scan_pos
+            added = 0
+
+            while not self.complete:
+                if until_line is not None and len(offsets) > until_line:
+                    break
+                if max_lines is not None and added >= max_lines:
+                    break
+
+                found = mm.find(newline, pos)
+                if found < 0:
+                    pos = self.size
+                    self.complete = True
+                    break
+
+                # En UTF-16/32, le motif doit être aligné sur une unité de code
+                if unit > 1 and (found - self.data_start) % unit:
+                    pos = found + 1
+                    continue
+
+                pos = found + unit
+                offsets.append(pos)
+                added += 1
+
+            self._scan_pos = pos
+            return self.complete
+
+    def build_index(self, should_stop=None, on_progress=None) -> bool:
+        """
+        Indexer tout le fichier par tranches
+
+        Le verrou est relâché entre deux tranches: get_lines() reste
+        utilisable pendant la construction.
+
+        Args:
+            should_stop: Fonction sans argument, True pour interrompre
+            on_progress: Appelée avec le nombre de lignes indexées
+
+        Returns:
+            bool: True si l'index est complet
+        """
+        while not self.complete:
+            if should_stop is not None and should_stop():
+                return False
+            self.index_lines(max_lines=self.INDEX_CHUNK_LINES)
+            if on_progress is not None:
+                on_progress(self.indexed_lines)
+        return True
+
+    # ------------------------------
+    # Lecture
+    # ------------------------------
+    def get_lines(self, start: int, count: int) -> List[str]:
+        """
+        Lire count lignes à partir de la ligne start (numérotée depuis 0)
+
+        L'index est étendu si nécessaire jusqu'à la dernière ligne demandée.
+        """
+        if start < 0 or count <= 0:
+            return []
+
+        self.index_lines(until_line=start + count)
+
+        with self._lock:
+            if self._mm is None:
+                return []
+
+            offsets = self._offsets
+            last = min(start + count, len(offsets))
+            if start >= last:
+                return []
+
+            begin = offsets[start]
+            end = offsets[last] if last < len(offsets) else self.size
+            if begin >= end:
+                return []
+
+            text = self._mm[begin:end].decode(self.encoding, errors='replace')
+
+        lines = text.split('\n')
+        if text.endswith('\n'):
+            lines.pop()
+        return [line.rstrip('\r') for line in lines[:count]]
+
+    def read_head(self, max_chars: int) -> str:
+        """Lire les max_chars premiers caractères du fichier"""
+        with self._lock:
+            if self._mm is None:
+                return ''
+            # 4 octets au plus par caractère quel que soit l'encodage retenu
+            raw = self._mm[self.data_start:self.data_start + max_chars * 4]
+        return raw.decode(self.encoding, errors='replace')[:max_chars]
+
+    # ------------------------------
+    # Fermeture
+    # ------------------------------
+    def close(self):
+        """Libérer la projection mémoire et le fichier"""
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+                self.complete = True
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,23 +1,32 @@
-
 # views/__init__.py
-"""Views package"""
-from .login_window import LoginWindow
-from .register_window import RegisterWindow
-from .main_window import MainWindow
-from .search_window import SearchWindow
-from .import_window import ImportWindow
-from .settings_window import SettingsWindow
-from .preview_window import PreviewWindow
-from .folder_dialog import FolderDialog
+"""Views package
+
+Les fenêtres sont chargées au premier accès: importer views.login_window
+ne charge pas la fenêtre principale ni ses dépendances (démarrage rapide).
+"""
+
+import importlib
+
+# Nom exporté -> module qui le définit
+_EXPORTS = {
+    'LoginWindow': '.login_window',
+    'RegisterWindow': '.register_window',
+    'MainWindow': '.main_window',
+    'SearchWindow': '.search_window',
+    'ImportWindow': '.import_window',
+    'SettingsWindow': '.settings_window',
+    'PreviewWindow': '.preview_window',
+    'FolderDialog': '.folder_dialog',
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    'LoginWindow',
-    'RegisterWindow',
-    'MainWindow',
-    'SearchWindow',
-    'ImportWindow',
-    'SettingsWindow',
-    'PreviewWindow',
-    'FolderDialog'
-]
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
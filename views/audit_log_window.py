@@ -0,0 +1,242 @@
+# views/audit_log_window.py
+"""
+views/audit_log_window.py
+Consultation et export du journal d'audit
+"""
+
+from datetime import datetime, time, timedelta
+
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+                               QPushButton, QComboBox, QTableWidget, QTableWidgetItem,
+                               QHeaderView, QDateEdit, QLineEdit, QFileDialog)
+from PySide6.QtCore import QDate, QThreadPool
+
+from controllers.audit_controller import AuditController
+from database.db_manager import DatabaseManager
+from utils.alert_dialog import AlertDialog
+from utils.task_runner import TaskRunner
+
+
+class AuditLogWindow(QDialog):
+    """
+    Journal d'audit paginé avec filtres
+
+    Les administrateurs voient le journal de tous les utilisateurs, les
+    autres seulement le leur. Les pages sont chargées par curseur
+    (timestamp, id) en arrière-plan, et continuent dans les mois archivés
+    une fois la table épuisée; l'export parcourt tout le résultat filtré
+    sans le charger en mémoire.
+    """
+
+    PAGE_SIZE = 200
+
+    ACTIONS = ['CREATE', 'UPDATE', 'DELETE', 'VIEW', 'DOWNLOAD',
+               'LOGIN', 'LOGOUT', 'ARCHIVE', 'EXPORT']
+    ENTITY_TYPES = ['FILE', 'FOLDER', 'USER', 'GROUP', 'SHARE', 'AUDIT']
+
+    def __init__(self, parent, db: DatabaseManager):
+        super().__init__(parent)
+        self.user = parent.user
+        self.db = db
+        self.audit_controller = AuditController(self.user, db)
+        self.runner = TaskRunner(self)
+        # Exports: écriture du fichier hors du pool de la base
+        self.export_runner = TaskRunner(self, pool=QThreadPool.globalInstance())
+        self.cursor = None
+        self.filters = {}
+        self.init_ui()
+        self.apply_filters()
+
+    def init_ui(self):
+        self.setWindowTitle("Journal d'audit")
+        self.setGeometry(200, 200, 1000, 650)
+
+        layout = QVBoxLayout()
+
+        # Filtres
+        filters_layout = QHBoxLayout()
+
+        filters_layout.addWidget(QLabel("Du:"))
+        self.since_input = QDateEdit(QDate.currentDate().addDays(-30))
+        self.since_input.setCalendarPopup(True)
+        filters_layout.addWidget(self.since_input)
+
+        filters_layout.addWidget(QLabel("Au:"))
+        self.until_input = QDateEdit(QDate.currentDate())
+        self.until_input.setCalendarPopup(True)
+        filters_layout.addWidget(self.until_input)
+
+        filters_layout.addWidget(QLabel("Action:"))
+        self.action_combo = QComboBox()
+        self.action_combo.addItem("Toutes", None)
+        for action in self.ACTIONS:
+            self.action_combo.addItem(action, action)
+        filters_layout.addWidget(self.action_combo)
+
+        filters_layout.addWidget(QLabel("Entité:"))
+        self.entity_combo = QComboBox()
+        self.entity_combo.addItem("Toutes", None)
+        for entity_type in self.ENTITY_TYPES:
+            self.entity_combo.addItem(entity_type, entity_type)
+        filters_layout.addWidget(self.entity_combo)
+
+        self.user_input = QLineEdit()
+        self.user_input.setPlaceholderText("Id utilisateur")
+        self.user_input.setMaximumWidth(110)
+        self.user_input.setVisible(self.user.is_admin())
+        filters_layout.addWidget(self.user_input)
+
+        filter_btn = QPushButton("Filtrer")
+        filter_btn.clicked.connect(self.apply_filters)
+        filters_layout.addWidget(filter_btn)
+
+        layout.addLayout(filters_layout)
+
+        # Résultats
+        self.table = QTableWidget()
+        self.table.setColumnCount(6)
+        self.table.setHorizontalHeaderLabels([
+            "Date (UTC)", "Utilisateur", "Action", "Entité", "Id", "Détails"
+        ])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        # Pagination et export
+        bottom_layout = QHBoxLayout()
+
+        self.status_label = QLabel()
+        bottom_layout.addWidget(self.status_label)
+        bottom_layout.addStretch()
+
+        self.more_btn = QPushButton("Charger plus")
+        self.more_btn.clicked.connect(self.load_next_page)
+        bottom_layout.addWidget(self.more_btn)
+
+        self.export_csv_btn = QPushButton("Exporter CSV")
+        self.export_csv_btn.clicked.connect(lambda: self.export('csv'))
+        bottom_layout.addWidget(self.export_csv_btn)
+
+        self.export_jsonl_btn = QPushButton("Exporter JSONL")
+        self.export_jsonl_btn.clicked.connect(lambda: self.export('jsonl'))
+        bottom_layout.addWidget(self.export_jsonl_btn)
+
+        close_btn = QPushButton("Fermer")
+        close_btn.clicked.connect(self.close)
+        bottom_layout.addWidget(close_btn)
+
+        layout.addLayout(bottom_layout)
+        self.setLayout(layout)
+
+    # ------------------------------
+    # Consultation
+    # ------------------------------
+    def current_filters(self):
+        """Filtres saisis, au format de AuditController.query_logs"""
+        since = datetime.combine(self.since_input.date().toPython(), time.min)
+        until = datetime.combine(self.until_input.date().toPython(), time.min) + timedelta(days=1)
+        action = self.action_combo.currentData()
+
+        filters = {
+            'since': since,
+            'until': until,
+            'actions': [action] if action else None,
+            'entity_type': self.entity_combo.currentData(),
+        }
+
+        user_text = self.user_input.text().strip()
+        if self.user.is_admin() and user_text.isdigit():
+            filters['user_id'] = int(user_text)
+        elif not self.user.is_admin():
+            filters['user_id'] = self.user.id
+        return filters
+
+    def apply_filters(self):
+        """Recharger la première page avec les filtres saisis"""
+        self.filters = self.current_filters()
+        self.cursor = None
+        self.table.setRowCount(0)
+        self.load_next_page()
+
+    def load_next_page(self):
+        self.more_btn.setEnabled(False)
+        self.status_label.setText("Chargement...")
+        self.runner.submit(
+            self.audit_controller.query_logs,
+            after=self.cursor, limit=self.PAGE_SIZE,
+            key='page',
+            on_result=self.append_page,
+            on_error=lambda message: self.status_label.setText(f"Erreur: {message}"),
+            **self.filters
+        )
+
+    def append_page(self, result):
+        logs, self.cursor = result
+
+        for log in logs:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            timestamp = log.timestamp.strftime('%Y-%m-%d %H:%M:%S') if log.timestamp else ''
+            self.table.setItem(row, 0, QTableWidgetItem(timestamp))
+            self.table.setItem(row, 1, QTableWidgetItem(str(log.user_id)))
+            self.table.setItem(row, 2, QTableWidgetItem(log.action))
+            self.table.setItem(row, 3, QTableWidgetItem(log.entity_type))
+            self.table.setItem(row, 4, QTableWidgetItem(str(log.entity_id)))
+            self.table.setItem(row, 5, QTableWidgetItem(log.details or ''))
+
+        self.more_btn.setEnabled(self.cursor is not None)
+        suffix = "" if self.cursor is None else " (d'autres événements sont disponibles)"
+        self.status_label.setText(f"{self.table.rowCount()} événement(s){suffix}")
+
+    # ------------------------------
+    # Export
+    # ------------------------------
+    def export(self, fmt):
+        """Exporter tout le résultat filtré (y compris les mois archivés)"""
+        extension = 'csv' if fmt == 'csv' else 'jsonl'
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Exporter le journal d'audit", f"audit.{extension}",
+            f"{extension.upper()} (*.{extension})"
+        )
+        if not file_path:
+            return
+
+        self.export_csv_btn.setEnabled(False)
+        self.export_jsonl_btn.setEnabled(False)
+        self.export_runner.submit(
+            self.export_worker, file_path, fmt, dict(self.filters),
+            key='export',
+            pass_token=True,
+            on_progress=lambda count: self.status_label.setText(f"Export: {count} événement(s)..."),
+            on_result=self.on_export_finished,
+            on_error=lambda message: self.on_export_finished((False, message))
+        )
+
+    def export_worker(self, file_path, fmt, filters, token):
+        return self.audit_controller.export_logs(
+            file_path, fmt,
+            progress_callback=token.report,
+            should_stop=lambda: token.cancelled,
+            include_archive=True,
+            **filters
+        )
+
+    def on_export_finished(self, result):
+        self.export_csv_btn.setEnabled(True)
+        self.export_jsonl_btn.setEnabled(True)
+
+        success, value = result
+        if success:
+            self.status_label.setText(f"Export terminé: {value} événement(s)")
+            AlertDialog.information(self, "Export", f"{value} événement(s) exporté(s)")
+        else:
+            self.status_label.setText("Export échoué")
+            AlertDialog.error(self, "Erreur", f"Export impossible:\n{value}")
+
+    def done(self, result):
+        # Fermer la fenêtre interrompt le chargement et l'export en cours
+        self.runner.cancel_all()
+        self.export_runner.cancel_all()
+        super().done(result)
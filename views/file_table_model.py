@@ -0,0 +1,255 @@
+# views/file_table_model.py
+"""
+views/file_table_model.py
+Modèle de table virtualisé pour les fichiers d'un dossier
+"""
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+
+
+class FileTableModel(QAbstractTableModel):
+    """
+    Modèle de table sur des lignes compactes (FileRow)
+
+    Les lignes sont chargées par pages via canFetchMore/fetchMore au fur
+    et à mesure du défilement, et le tri est délégué à la requête SQL.
+    La vue ne dessine que les lignes visibles.
+
+    Si un TaskRunner est fourni, les pages sont chargées en arrière-plan;
+    changer de dossier ou de tri annule le chargement en cours.
+    """
+
+    PAGE_SIZE = 200
+
+    # (clé de tri SQL, titre de colonne)
+    COLUMNS = [
+        ('name', "Nom"),
+        ('file_type', "Type"),
+        ('file_size', "Taille"),
+        ('created_at', "Date d'ajout"),
+    ]
+
+    TYPE_LABELS = {
+        'pdf': 'PDF',
+        'doc': 'Word', 'docx': 'Word',
+        'xls': 'Excel', 'xlsx': 'Excel',
+        'ppt': 'PowerPoint', 'pptx': 'PowerPoint',
+        'txt': 'Texte',
+        'jpg': 'Image', 'jpeg': 'Image', 'png': 'Image', 'gif': 'Image',
+        'zip': 'Archive', 'rar': 'Archive', '7z': 'Archive'
+    }
+
+    # Émis quand le nombre total de fichiers du dossier est connu
+    count_changed = Signal(int)
+
+    def __init__(self, file_controller, parent=None, runner=None):
+        super().__init__(parent)
+        self.file_controller = file_controller
+        self.runner = runner
+        self.folder_id = None
+        self._fetching = False
+        self.rows = []
+        self.total_count = 0
+        self.sort_key = 'name'
+        self.descending = False
+
+    # ------------------------------
+    # Chargement des données
+    # ------------------------------
+    def set_folder(self, folder_id):
+        """Afficher les fichiers d'un dossier (première page uniquement)"""
+        self.beginResetModel()
+        self.folder_id = folder_id
+        self.rows = []
+        self.total_count = 0
+        self._fetching = False
+        self.endResetModel()
+
+        if self.runner is not None:
+            self.runner.cancel('files-page')
+            self.runner.submit(
+                self._load_first_page, folder_id, self.sort_key, self.descending,
+                key='files',
+                on_result=self._on_first_page
+            )
+            return
+
+        self.total_count = self.file_controller.count_files_in_folder(folder_id)
+        self.count_changed.emit(self.total_count)
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def _load_first_page(self, folder_id, sort_key, descending):
+        """Compter et charger la première page (thread de travail)"""
+        total = self.file_controller.count_files_in_folder(folder_id)
+        page = self.file_controller.get_file_rows(
+            folder_id, offset=0, limit=self.PAGE_SIZE,
+            sort_key=sort_key, descending=descending
+        )
+        return folder_id, total, page
+
+    def _on_first_page(self, result):
+        folder_id, total, page = result
+        if folder_id != self.folder_id:
+            return
+
+        self.total_count = total
+        self.count_changed.emit(total)
+        self._append_rows(page)
+
+    def clear(self):
+        """Vider le modèle"""
+        if self.runner is not None:
+            self.runner.cancel('files')
+            self.runner.cancel('files-page')
+        self._fetching = False
+        self.beginResetModel()
+        self.folder_id = None
+        self.rows = []
+        self.total_count = 0
+        self.endResetModel()
+
+    def refresh(self):
+        """Recharger le dossier courant"""
+        if self.folder_id is not None:
+            self.set_folder(self.folder_id)
+
+    def canFetchMore(self, parent):
+        if parent.isValid() or self.folder_id is None:
+            return False
+        return len(self.rows) < self.total_count
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent) or self._fetching:
+            return
+
+        if self.runner is not None:
+            self._fetching = True
+            self.runner.submit(
+                self._load_page, self.folder_id, len(self.rows),
+                self.sort_key, self.descending,
+                key='files-page',
+                on_result=self._on_page,
+                on_finished=self._on_page_finished
+            )
+            return
+
+        page = self.file_controller.get_file_rows(
+            self.folder_id,
+            offset=len(self.rows),
+            limit=self.PAGE_SIZE,
+            sort_key=self.sort_key,
+            descending=self.descending
+        )
+        self._append_rows(page)
+
+    def _load_page(self, folder_id, offset, sort_key, descending):
+        """Charger une page suivante (thread de travail)"""
+        page = self.file_controller.get_file_rows(
+            folder_id, offset=offset, limit=self.PAGE_SIZE,
+            sort_key=sort_key, descending=descending
+        )
+        return folder_id, offset, page
+
+    def _on_page(self, result):
+        folder_id, offset, page = result
+        self._fetching = False
+        if folder_id == self.folder_id and offset == len(self.rows):
+            self._append_rows(page)
+
+    def _on_page_finished(self):
+        self._fetching = False
+
+    def _append_rows(self, page):
+        """Ajouter une page de lignes à la fin du modèle"""
+        if not page:
+            # Le dossier a changé entre temps: ne plus rien attendre
+            self.total_count = len(self.rows)
+            return
+
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Trier par colonne en SQL puis recharger depuis la première page"""
+        if column < 0 or column >= len(self.COLUMNS):
+            return
+
+        self.sort_key = self.COLUMNS[column][0]
+        self.descending = order == Qt.DescendingOrder
+        self.refresh()
+
+    # ------------------------------
+    # Accès aux lignes
+    # ------------------------------
+    def row_at(self, row):
+        """Retourner la FileRow d'une ligne (ou None)"""
+        if 0 <= row < len(self.rows):
+            return self.rows[row]
+        return None
+
+    # ------------------------------
+    # Interface QAbstractTableModel
+    # ------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section][1]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        file_row = self.rows[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return file_row.name
+            if column == 1:
+                return self.type_label(file_row.file_type)
+            if column == 2:
+                return self.format_size(file_row.file_size)
+            if column == 3:
+                return file_row.created_at.strftime("%d/%m/%Y %H:%M") if file_row.created_at else "N/A"
+        elif role == Qt.UserRole:
+            return file_row
+        elif role == Qt.ToolTipRole and column == 0:
+            return file_row.mime_type or file_row.name
+        elif role == Qt.TextAlignmentRole and column == 2:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+
+        return None
+
+    # ------------------------------
+    # Formatage
+    # ------------------------------
+    def type_label(self, file_type):
+        """Libellé du type de fichier à partir de l'extension"""
+        if not file_type:
+            return "Fichier"
+        ext = file_type.lower()
+        return self.TYPE_LABELS.get(ext, ext.upper())
+
+    @staticmethod
+    def format_size(size):
+        """Formater la taille du fichier"""
+        if size is None:
+            return "0 B"
+        for unit in ['B', 'KB', 'MB', 'GB']:
+            if size < 1024.0:
+                return f"{size:.1f} {unit}"
+            size /= 1024.0
+        return f"{size:.1f} TB"
@@ -1,6 +1,6 @@
 # views/folder_view_window.py
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-                               QPushButton, QTableWidget, QTableWidgetItem,
+                               QPushButton, QTableView, QAbstractItemView,
                                QHeaderView, QGroupBox, QScrollArea, QWidget,
                                QMessageBox, QMenu, QTreeWidget, QTreeWidgetItem,
                                QSplitter)
@@ -10,6 +10,9 @@ from controllers.file_controller import FileController
 from controllers.folder_controller import FolderController
 from controllers.audit_controller import AuditController
 from database.db_manager import DatabaseManager
+from views.file_table_model import FileTableModel
+from utils.task_runner import TaskRunner
+from utils.preview_prefetcher import PreviewPrefetcher
 
 class FolderViewWindow(QDialog):
     """Fenêtre de visualisation détaillée d'un dossier"""
@@ -23,6 +26,8 @@ class FolderViewWindow(QDialog):
         self.file_controller = FileController(user, db)
         self.folder_controller = FolderController(user, db)
         self.audit_controller = AuditController(user, db)
+        self.runner = TaskRunner(self)
+        self.prefetcher = PreviewPrefetcher(self.file_controller, self)
         
         # Logger la consultation
         self.audit_controller.log_action('VIEW', 'FOLDER', folder.id)
@@ -176,20 +181,26 @@ class FolderViewWindow(QDialog):
         self.files_title.setStyleSheet("font-size: 14px; font-weight: bold; color: #2c3e50;")
         layout.addWidget(self.files_title)
         
-        # Table pour les fichiers
-        self.files_table = QTableWidget()
-        self.files_table.setColumnCount(4)
-        self.files_table.setHorizontalHeaderLabels([
-            "Nom", "Type", "Taille", "Date d'ajout"
-        ])
+        # Table virtualisée pour les fichiers (chargement par pages, tri SQL)
+        self.files_model = FileTableModel(self.file_controller, self, runner=self.runner)
+        self.files_model.count_changed.connect(
+            lambda count: self.file_count_label.setText(f"{count} fichier(s)"))
+        self.files_table = QTableView()
+        self.files_table.setModel(self.files_model)
+        # Largeurs fixes: ResizeToContents mesurerait toutes les lignes chargées
         self.files_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
-        self.files_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        self.files_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        self.files_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        self.files_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.files_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Interactive)
+        self.files_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Interactive)
+        self.files_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Interactive)
+        self.files_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.files_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.files_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.files_table.setSortingEnabled(True)
+        self.files_table.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
         self.files_table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.files_table.customContextMenuRequested.connect(self.show_file_context_menu)
         self.files_table.doubleClicked.connect(self.open_file)
+        self.files_table.selectionModel().currentRowChanged.connect(self.on_file_current_changed)
         layout.addWidget(self.files_table)
         
         # Compteur
@@ -254,36 +265,12 @@ class FolderViewWindow(QDialog):
     
     def load_files_for_folder(self, folder):
         """Charger les fichiers d'un dossier spécifique"""
-        self.files_table.setRowCount(0)
-        
         # Mettre à jour le titre
         self.files_title.setText(f"Fichiers de: {folder.name}")
         
-        # Récupérer les fichiers
-        files = self.file_controller.get_files_in_folder(folder.id)
-        
-        for file in files:
-            row = self.files_table.rowCount()
-            self.files_table.insertRow(row)
-            
-            # Nom
-            name_item = QTableWidgetItem(file.name)
-            name_item.setData(Qt.UserRole, file)
-            self.files_table.setItem(row, 0, name_item)
-            
-            # Type
-            file_type = self.get_file_type(file.name)
-            self.files_table.setItem(row, 1, QTableWidgetItem(file_type))
-            
-            # Taille
-            size = self.format_size(file.file_size)
-            self.files_table.setItem(row, 2, QTableWidgetItem(size))
-            
-            # Date
-            date = file.created_at.strftime("%d/%m/%Y %H:%M") if file.created_at else "N/A"
-            self.files_table.setItem(row, 3, QTableWidgetItem(date))
-        
-        self.file_count_label.setText(f"{len(files)} fichier(s)")
+        # Seule la première page est chargée, le reste suit le défilement
+        self.file_count_label.setText("Chargement...")
+        self.files_model.set_folder(folder.id)
     
     def get_file_type(self, filename):
         """Obtenir le type de fichier à partir de l'extension"""
@@ -312,11 +299,21 @@ class FolderViewWindow(QDialog):
             size /= 1024.0
         return f"{size:.1f} TB"
     
+    def get_file_at(self, index):
+        """Charger le fichier complet correspondant à une ligne de la table"""
+        file_row = self.files_model.row_at(index.row())
+        if file_row is None:
+            return None
+        return self.file_controller.get_file_by_id(file_row.id)
+    
+    def on_file_current_changed(self, current, previous):
+        """Précharger les aperçus autour du fichier sélectionné"""
+        if current.isValid():
+            self.prefetcher.prefetch(self.files_model.rows, current.row())
+    
     def open_file(self, index):
         """Ouvrir un fichier"""
-        row = index.row()
-        item = self.files_table.item(row, 0)
-        file = item.data(Qt.UserRole)
+        file = self.get_file_at(index)
         
         if file:
             # Logger la consultation
@@ -349,8 +346,8 @@ class FolderViewWindow(QDialog):
     
     def show_file_context_menu(self, position):
         """Afficher le menu contextuel pour les fichiers"""
-        item = self.files_table.itemAt(position)
-        if not item:
+        index = self.files_table.indexAt(position)
+        if not index.isValid():
             return
         
         menu = QMenu()
@@ -363,22 +360,19 @@ class FolderViewWindow(QDialog):
         action = menu.exec_(self.files_table.mapToGlobal(position))
         
         if action == open_action:
-            self.open_file(self.files_table.indexAt(position))
+            self.open_file(index)
         elif action == download_action:
-            row = self.files_table.row(item)
-            file_item = self.files_table.item(row, 0)
-            file = file_item.data(Qt.UserRole)
-            self.download_file(file)
+            file_row = self.files_model.row_at(index.row())
+            if file_row:
+                self.download_file(file_row)
         elif action == properties_action:
-            row = self.files_table.row(item)
-            file_item = self.files_table.item(row, 0)
-            file = file_item.data(Qt.UserRole)
-            self.show_file_properties(file)
+            file = self.get_file_at(index)
+            if file:
+                self.show_file_properties(file)
     
     def download_file(self, file):
         """Télécharger un fichier"""
         from PySide6.QtWidgets import QFileDialog
-        import shutil
         
         # Demander où sauvegarder
         save_path, _ = QFileDialog.getSaveFileName(
@@ -389,24 +383,35 @@ class FolderViewWindow(QDialog):
         )
         
         if save_path:
-            try:
-                # Copier le fichier
-                shutil.copy2(file.file_path, save_path)
-                
-                # Logger l'action
-                self.audit_controller.log_action('DOWNLOAD', 'FILE', file.id)
-                
-                QMessageBox.information(
-                    self,
-                    "Succès",
-                    f"Fichier téléchargé avec succès:\n{save_path}"
-                )
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "Erreur",
-                    f"Erreur lors du téléchargement:\n{str(e)}"
-                )
+            # Copie et journalisation par le contrôleur, hors du thread GUI
+            self.runner.submit(
+                self.file_controller.download_file,
+                file.id,
+                save_path,
+                on_result=lambda result: self.on_file_downloaded(save_path, *result),
+                on_error=lambda message: self.on_file_downloaded(save_path, False, message)
+            )
+    
+    def on_file_downloaded(self, save_path, success, message):
+        """Afficher le résultat d'un téléchargement"""
+        if success:
+            QMessageBox.information(
+                self,
+                "Succès",
+                f"Fichier téléchargé avec succès:\n{save_path}"
+            )
+        else:
+            QMessageBox.critical(
+                self,
+                "Erreur",
+                f"Erreur lors du téléchargement:\n{message}"
+            )
+    
+    def done(self, result):
+        """Annuler les chargements en cours à la fermeture"""
+        self.runner.cancel_all()
+        self.prefetcher.stop()
+        super().done(result)
     
     def show_folder_properties(self, folder):
         """Afficher les propriétés d'un dossier"""
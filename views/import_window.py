@@ -5,11 +5,13 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                                QPushButton, QListWidget, QFileDialog, 
                                QProgressBar, QMessageBox, QCheckBox)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThreadPool
 from controllers.file_controller import FileController
 from controllers.folder_controller import FolderController
 import os
 from database.db_manager import DatabaseManager
+from utils.scanner import FolderScanner
+from utils.task_runner import TaskRunner
 
 class ImportWindow(QDialog):
     def __init__(self, parent,db: DatabaseManager):
@@ -19,6 +21,14 @@ class ImportWindow(QDialog):
         self.file_controller = FileController(self.user,self.db)
         self.folder_controller = FolderController(self.user,self.db)
         self.selected_files = []
+        self._selected_set = set()
+        # Directory scans do not touch the database: global pool
+        self.runner = TaskRunner(self, pool=QThreadPool.globalInstance())
+        self.import_runner = TaskRunner(self)
+        self.source_root = None
+        # Recursive flag of the folder scan, and whether it ran to the end
+        self._scan_recursive = True
+        self._scan_complete = False
         self.init_ui()
     
     def init_ui(self):
@@ -39,6 +49,14 @@ class ImportWindow(QDialog):
         self.scan_folders_cb.setChecked(True)
         options_layout.addWidget(self.scan_folders_cb)
         
+        self.incremental_cb = QCheckBox("Import incrémental (uniquement les changements)")
+        self.incremental_cb.setToolTip(
+            "Compare le dossier au dernier import et ne copie que les fichiers nouveaux ou modifiés")
+        # Only meaningful for a scanned folder: enabled by select_folder()
+        self.incremental_cb.setChecked(False)
+        self.incremental_cb.setEnabled(False)
+        options_layout.addWidget(self.incremental_cb)
+        
         options_layout.addStretch()
         layout.addLayout(options_layout)
         
@@ -53,6 +71,13 @@ class ImportWindow(QDialog):
         select_folder_btn.clicked.connect(self.select_folder)
         buttons_layout.addWidget(select_folder_btn)
         
+        select_archive_btn = QPushButton("Importer une archive (ZIP/TAR)")
+        select_archive_btn.setToolTip(
+            "Importe le contenu d'une archive sans l'extraire sur disque: "
+            "ses répertoires deviennent des sous-dossiers de la destination")
+        select_archive_btn.clicked.connect(self.import_archive)
+        buttons_layout.addWidget(select_archive_btn)
+        
         clear_btn = QPushButton("Effacer la liste")
         clear_btn.clicked.connect(self.clear_list)
         buttons_layout.addWidget(clear_btn)
@@ -128,7 +153,8 @@ class ImportWindow(QDialog):
         
         if files:
             for file_path in files:
-                if file_path not in self.selected_files:
+                if file_path not in self._selected_set:
+                    self._selected_set.add(file_path)
                     self.selected_files.append(file_path)
                     self.file_list.addItem(os.path.basename(file_path))
             
@@ -142,28 +168,69 @@ class ImportWindow(QDialog):
         )
         
         if folder:
-            files = []
-            
-            if self.scan_folders_cb.isChecked():
-                # Recursive scan
-                for root, dirs, filenames in os.walk(folder):
-                    for filename in filenames:
-                        files.append(os.path.join(root, filename))
-            else:
-                # Only direct children
-                files = [os.path.join(folder, f) for f in os.listdir(folder)
-                        if os.path.isfile(os.path.join(folder, f))]
-            
-            for file_path in files:
-                if file_path not in self.selected_files:
-                    self.selected_files.append(file_path)
-                    self.file_list.addItem(os.path.basename(file_path))
+            self.source_root = folder
+            self._scan_recursive = self.scan_folders_cb.isChecked()
+            self._scan_complete = False
+            self.incremental_cb.setEnabled(True)
             
-            self.update_import_button()
+            # Scan in the background: files are added to the list as they are found
+            self.progress_bar.setVisible(True)
+            self.progress_bar.setMaximum(0)
+            self.runner.submit(
+                self.scan_worker, folder, self._scan_recursive,
+                key='scan',
+                pass_token=True,
+                on_progress=self.add_scanned_files,
+                on_result=self.on_scan_finished,
+                on_finished=lambda: self.progress_bar.setVisible(False)
+            )
+    
+    @staticmethod
+    def scan_worker(folder, recursive, token):
+        """Walk the folder and report file paths in batches (worker thread)"""
+        scanner = FolderScanner(exclude_hidden=False)
+        batch = []
+        count = 0
+        
+        for scanned in scanner.iter_files(folder, recursive):
+            token.raise_if_cancelled()
+            batch.append(scanned.path)
+            if len(batch) >= 1000:
+                token.report(batch)
+                count += len(batch)
+                batch = []
+        
+        if batch:
+            token.report(batch)
+            count += len(batch)
+        return count, len(scanner.errors)
+    
+    def add_scanned_files(self, file_paths):
+        """Append a batch of scanned files to the selection"""
+        new_paths = [path for path in file_paths if path not in self._selected_set]
+        self._selected_set.update(new_paths)
+        self.selected_files.extend(new_paths)
+        self.file_list.addItems([os.path.basename(path) for path in new_paths])
+        self.update_import_button()
+    
+    def on_scan_finished(self, result):
+        count, errors = result
+        # Every file of the folder is in the selection: a full sync is equivalent
+        self._scan_complete = not errors
+        if errors:
+            QMessageBox.warning(self, "Scan terminé",
+                                f"{count} fichier(s) trouvé(s)\n"
+                                f"{errors} dossier(s) illisible(s) ignoré(s)")
     
     def clear_list(self):
         """Clear selected files"""
+        self.runner.cancel('scan')
+        self.source_root = None
+        self._scan_complete = False
+        self.incremental_cb.setChecked(False)
+        self.incremental_cb.setEnabled(False)
         self.selected_files.clear()
+        self._selected_set.clear()
         self.file_list.clear()
         self.update_import_button()
     
@@ -191,6 +258,10 @@ class ImportWindow(QDialog):
                               "Veuillez sélectionner un dossier de destination")
             return
         
+        if self.incremental_cb.isChecked() and self.source_root:
+            self.import_incremental()
+            return
+        
         self.progress_bar.setVisible(True)
         self.progress_bar.setMaximum(len(self.selected_files))
         
@@ -220,3 +291,133 @@ class ImportWindow(QDialog):
         QMessageBox.information(self, "Import terminé", message)
         
         self.clear_list()
+    
+    def import_incremental(self):
+        """Import only what changed in the source folder since its last import"""
+        root = os.path.abspath(self.source_root)
+        in_root = [path for path in self.selected_files
+                   if os.path.abspath(path).startswith(root + os.sep)]
+        # Files picked individually outside the scanned folder are added as usual
+        extra_files = [path for path in self.selected_files
+                       if not os.path.abspath(path).startswith(root + os.sep)]
+        # Only the selected files are synced, unless the selection is the whole folder
+        paths = None if self._scan_complete else in_root
+        
+        self.import_btn.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setMaximum(0)
+        
+        self.import_runner.submit(
+            self.incremental_worker, root, self.destination_folder.id,
+            self._scan_recursive, paths, extra_files,
+            key='import',
+            pass_token=True,
+            on_progress=self.on_import_progress,
+            on_result=self.on_incremental_finished,
+            on_error=lambda message: QMessageBox.critical(self, "Erreur", message),
+            on_finished=self.on_import_finished
+        )
+    
+    def incremental_worker(self, root, folder_id, recursive, paths, extra_files, token):
+        """Run the incremental sync (worker thread)"""
+        stats = self.file_controller.sync_folder(
+            root, folder_id, recursive, paths=paths,
+            progress_callback=lambda done, total: token.report((done, total)),
+            should_stop=lambda: token.cancelled
+        )
+        
+        for file_path in extra_files:
+            token.raise_if_cancelled()
+            success, result = self.file_controller.add_file(file_path, folder_id)
+            if success:
+                stats['new'] += 1
+            else:
+                stats['errors'].append(f"{os.path.basename(file_path)}: {result}")
+        
+        return stats
+    
+    def import_archive(self):
+        """Import the content of a ZIP/TAR archive into the destination folder"""
+        if not hasattr(self, 'destination_folder'):
+            QMessageBox.warning(self, "Erreur",
+                              "Veuillez sélectionner un dossier de destination")
+            return
+        
+        archive_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Sélectionner une archive",
+            "",
+            "Archives (*.zip *.tar *.tar.gz *.tgz *.tar.bz2 *.tar.xz);;Tous les fichiers (*.*)"
+        )
+        if not archive_path:
+            return
+        
+        self.import_btn.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        # Archive sizes overflow the progress bar range: progress in per mille
+        self.progress_bar.setMaximum(1000)
+        self.progress_bar.setValue(0)
+        
+        self.import_runner.submit(
+            self.archive_worker, archive_path, self.destination_folder.id,
+            key='import',
+            pass_token=True,
+            on_progress=lambda progress: self.progress_bar.setValue(
+                progress[0] * 1000 // max(progress[1], 1)),
+            on_result=self.on_archive_imported,
+            on_error=lambda message: QMessageBox.critical(self, "Erreur", message),
+            on_finished=self.on_import_finished
+        )
+    
+    def archive_worker(self, archive_path, folder_id, token):
+        """Stream the archive members into storage (worker thread)"""
+        return self.file_controller.import_archive(
+            archive_path, folder_id,
+            progress_callback=lambda done, total: token.report((done, total)),
+            should_stop=lambda: token.cancelled
+        )
+    
+    def on_archive_imported(self, result):
+        success, stats = result
+        if not success:
+            QMessageBox.critical(self, "Erreur", f"Import de l'archive impossible:\n{stats}")
+            return
+        
+        message = (
+            f"Import de l'archive terminé:\n"
+            f"{stats['files']} fichier(s) importé(s)\n"
+            f"{stats['folders']} dossier(s) créé(s)"
+        )
+        if stats['errors']:
+            message += f"\n\n{len(stats['errors'])} erreur(s):\n" + "\n".join(stats['errors'][:5])
+        QMessageBox.information(self, "Import terminé", message)
+    
+    def on_import_progress(self, progress):
+        done, total = progress
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(done)
+    
+    def on_incremental_finished(self, stats):
+        message = (
+            f"Import incrémental terminé:\n"
+            f"{stats['new']} nouveau(x) fichier(s)\n"
+            f"{stats['changed']} fichier(s) modifié(s)\n"
+            f"{stats['moved']} fichier(s) déplacé(s)\n"
+            f"{stats['deleted']} fichier(s) supprimé(s) de la source\n"
+            f"{stats['unchanged']} fichier(s) inchangé(s)"
+        )
+        if stats['errors']:
+            message += f"\n\n{len(stats['errors'])} erreur(s):\n" + "\n".join(stats['errors'][:5])
+        
+        QMessageBox.information(self, "Import terminé", message)
+        self.clear_list()
+    
+    def on_import_finished(self):
+        self.progress_bar.setVisible(False)
+        self.update_import_button()
+    
+    def done(self, result):
+        """Stop a running scan when the dialog closes"""
+        self.runner.cancel_all()
+        self.import_runner.cancel_all()
+        super().done(result)
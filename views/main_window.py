@@ -4,20 +4,48 @@ views/main_window.py - Fenêtre principale avec création de fichiers
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                                QTreeWidget, QTreeWidgetItem, QPushButton, QLabel,
                                QLineEdit, QToolBar, QMenu, QMessageBox, QFileDialog,
-                               QSplitter, QListWidget, QComboBox, QApplication)
-from PySide6.QtCore import Qt, Signal
+                               QSplitter, QTableView, QHeaderView, QAbstractItemView,
+                               QComboBox, QApplication)
+from PySide6.QtCore import Qt, Signal, QThreadPool
 from PySide6.QtGui import QAction, QCloseEvent
 from controllers.folder_controller import FolderController
 from controllers.file_controller import FileController
 from controllers.audit_controller import AuditController
 from database.db_manager import DatabaseManager
+from views.file_table_model import FileTableModel
+from utils.task_runner import TaskRunner
+from utils.preview_prefetcher import PreviewPrefetcher
+from utils.hot_folder import HotFolderService
+from utils.storage_scrubber import StorageScrubber
+from config.settings import Settings
 import os
-import shutil
 from utils.alert_dialog import AlertDialog
+from utils.enums import AccessLevel
 
 class MainWindow(QMainWindow):
     """Fenêtre principale de l'application"""
     
+    # Nombre de dossiers chargés par niveau de l'arborescence
+    FOLDER_PAGE_SIZE = 200
+    
+    # Libellé du tri -> clé de tri du contrôleur
+    SORT_CRITERIA = {
+        "Nom": 'name',
+        "Date": 'created_at',
+        "Année": 'year',
+        "Thème": 'theme',
+        "Secteur": 'sector',
+    }
+    
+    # Rôles des éléments de l'arborescence
+    LAZY_ROLE = Qt.UserRole + 1   # sous-dossiers pas encore chargés
+    MORE_ROLE = Qt.UserRole + 2   # (parent_id, offset) de la page suivante
+    
+    # Lot prêt dans un dossier surveillé (émis depuis un thread du service)
+    hot_folder_batch = Signal(object, object)
+    # Défauts trouvés par la vérification du stockage (thread du service)
+    integrity_problems = Signal(object)
+    
     def __init__(self, user, db: DatabaseManager):
         super().__init__()
         self.user = user
@@ -35,10 +63,24 @@ class MainWindow(QMainWindow):
         self.sharing_controller = SharingController(user, self.db)
         
         # Mode d'affichage actuel
-        self.current_view_mode = "my_folders"  # my_folders, public, shared
+        self.current_view_mode = "my_folders"  # my_folders, public, shared, all
+        
+        # Tri multi-critères appliqué par la base de données
+        self.folder_sort = [('name', False)]
+        self._tree_generation = 0
+        
+        # Appels contrôleurs exécutés hors du thread GUI
+        self.runner = TaskRunner(self)
+        # Exports d'archives: lecture et compression hors du pool de la base
+        self.export_runner = TaskRunner(self, pool=QThreadPool.globalInstance())
+        
+        # Aperçus des fichiers voisins préparés en arrière-plan
+        self.prefetcher = PreviewPrefetcher(self.file_controller, self)
         
         self.init_ui()
         self.load_folders()
+        self.start_hot_folders()
+        self.start_storage_scrubber()
     
     def init_ui(self):
         """Initialiser l'interface utilisateur"""
@@ -67,6 +109,7 @@ class MainWindow(QMainWindow):
         self.folder_tree = QTreeWidget()
         self.folder_tree.setHeaderLabel("Dossiers")
         self.folder_tree.itemClicked.connect(self.on_folder_selected)
+        self.folder_tree.itemExpanded.connect(self.on_folder_expanded)
         self.folder_tree.setContextMenuPolicy(Qt.CustomContextMenu)
         self.folder_tree.customContextMenuRequested.connect(self.show_folder_context_menu)
         splitter.addWidget(self.folder_tree)
@@ -79,8 +122,19 @@ class MainWindow(QMainWindow):
         file_header.setStyleSheet("font-size: 14px; font-weight: bold;")
         file_layout.addWidget(file_header)
         
-        self.file_list = QListWidget()
-        self.file_list.itemDoubleClicked.connect(self.on_file_double_clicked)
+        # Vue virtualisée: seules les lignes visibles sont dessinées
+        self.file_model = FileTableModel(self.file_controller, self, runner=self.runner)
+        self.file_list = QTableView()
+        self.file_list.setModel(self.file_model)
+        self.file_list.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.file_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.file_list.setSortingEnabled(True)
+        self.file_list.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
+        self.file_list.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.file_list.verticalHeader().setVisible(False)
+        self.file_list.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.file_list.doubleClicked.connect(self.on_file_double_clicked)
+        self.file_list.selectionModel().currentRowChanged.connect(self.on_file_current_changed)
         self.file_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.file_list.customContextMenuRequested.connect(self.show_file_context_menu)
         file_layout.addWidget(self.file_list)
@@ -157,8 +211,16 @@ class MainWindow(QMainWindow):
         shared_folders_action.triggered.connect(self.show_shared_folders)
         view_menu.addAction(shared_folders_action)
         
+        all_folders_action = QAction("🗂️ Tous les dossiers accessibles", self)
+        all_folders_action.triggered.connect(self.show_all_folders)
+        view_menu.addAction(all_folders_action)
+        
         view_menu.addSeparator()
         
+        audit_action = QAction("📜 Journal d'audit", self)
+        audit_action.triggered.connect(self.open_audit_log)
+        view_menu.addAction(audit_action)
+        
         refresh_action = QAction("Actualiser", self)
         refresh_action.triggered.connect(self.refresh_view)
         view_menu.addAction(refresh_action)
@@ -192,25 +254,92 @@ class MainWindow(QMainWindow):
         self.sort_combo.currentTextChanged.connect(self.sort_folders)
         layout.addWidget(self.sort_combo)
         
+        self.sort_order_btn = QPushButton("↑")
+        self.sort_order_btn.setCheckable(True)
+        self.sort_order_btn.setToolTip("Inverser l'ordre de tri")
+        self.sort_order_btn.setFixedWidth(30)
+        self.sort_order_btn.toggled.connect(
+            lambda checked: self.sort_folders(self.sort_combo.currentText()))
+        layout.addWidget(self.sort_order_btn)
+        
         layout.addStretch()
         
         return top_bar
     
     def load_folders(self):
-        """Charger les dossiers selon le mode d'affichage"""
+        """Charger la première page des dossiers racines (en arrière-plan)"""
+        self._tree_generation += 1
         self.folder_tree.clear()
+        self.load_folder_page(None, 0)
+    
+    def load_folder_page(self, parent_item, offset):
+        """
+        Charger une page de dossiers sous un élément de l'arborescence
         
-        if self.current_view_mode == "my_folders":
-            folders = self.folder_controller.get_root_folders()
-        elif self.current_view_mode == "public":
-            folders = self.sharing_controller.get_public_folders()
-        elif self.current_view_mode == "shared":
-            folders = self.sharing_controller.get_shared_with_me()
-        else:
-            folders = []
+        parent_item à None désigne les dossiers racines du mode d'affichage.
+        """
+        generation = self._tree_generation
+        parent_id = None
+        if parent_item is not None:
+            parent_id = parent_item.data(0, Qt.UserRole).id
+        
+        self.runner.submit(
+            self.fetch_folders,
+            self.current_view_mode,
+            parent_id,
+            list(self.folder_sort),
+            offset,
+            key=('folders', parent_id),
+            on_result=lambda folders: self.populate_folder_page(
+                generation, parent_item, offset, folders),
+            on_error=lambda message: AlertDialog.error(
+                self, "Erreur", f"Impossible de charger les dossiers:\n{message}")
+        )
+    
+    def fetch_folders(self, view_mode, parent_id, sort, offset):
+        """Récupérer une page de dossiers triés, en lignes compactes (thread de travail)"""
+        page = dict(sort=sort, offset=offset, limit=self.FOLDER_PAGE_SIZE)
+        
+        if parent_id is not None:
+            return self.folder_controller.get_subfolder_rows(parent_id, **page)
+        if view_mode == "my_folders":
+            return self.folder_controller.get_root_folder_rows(**page)
+        elif view_mode == "public":
+            return self.sharing_controller.get_public_folder_rows(**page)
+        elif view_mode == "shared":
+            return self.sharing_controller.get_shared_with_me_rows(**page)
+        elif view_mode == "all":
+            return self.sharing_controller.get_accessible_folder_rows(**page)
+        return []
+    
+    def populate_folder_page(self, generation, parent_item, offset, folders):
+        """Ajouter une page de dossiers chargés à l'arborescence"""
+        # L'arborescence a été rechargée entre temps: éléments obsolètes
+        if generation != self._tree_generation:
+            return
+        
+        if parent_item is None:
+            parent_item = self.folder_tree.invisibleRootItem()
+        
+        # Retirer l'élément « Chargement... » ou « Afficher plus »
+        for i in reversed(range(parent_item.childCount())):
+            child = parent_item.child(i)
+            if child.data(0, Qt.UserRole) is None:
+                parent_item.removeChild(child)
         
         for folder in folders:
-            self.add_folder_to_tree(folder, None)
+            self.add_folder_to_tree(folder, parent_item)
+        
+        if len(folders) == self.FOLDER_PAGE_SIZE:
+            more_item = QTreeWidgetItem(parent_item)
+            more_item.setText(0, "… Afficher plus")
+            more_item.setData(0, self.MORE_ROLE, offset + len(folders))
+    
+    def on_folder_expanded(self, item):
+        """Charger les sous-dossiers au premier dépliage"""
+        if item.data(0, self.LAZY_ROLE):
+            item.setData(0, self.LAZY_ROLE, False)
+            self.load_folder_page(item, 0)
     
     def show_my_folders(self):
         """Afficher mes dossiers"""
@@ -230,8 +359,14 @@ class MainWindow(QMainWindow):
         self.load_folders()
         self.statusBar().showMessage("Affichage: Dossiers partagés avec moi")
     
+    def show_all_folders(self):
+        """Afficher tous les dossiers accessibles (miens, publics, partagés)"""
+        self.current_view_mode = "all"
+        self.load_folders()
+        self.statusBar().showMessage("Affichage: Tous les dossiers accessibles")
+    
     def add_folder_to_tree(self, folder, parent_item):
-        """Ajouter un dossier à l'arborescence de manière récursive"""
+        """Ajouter un dossier à l'arborescence (sous-dossiers chargés au dépliage)"""
         if parent_item is None:
             item = QTreeWidgetItem(self.folder_tree)
         else:
@@ -240,25 +375,98 @@ class MainWindow(QMainWindow):
         item.setText(0, folder.name)
         item.setData(0, Qt.UserRole, folder)
         
-        # Load subfolders
-        for subfolder in folder.subfolders:
-            self.add_folder_to_tree(subfolder, item)
+        if getattr(folder, 'subfolder_count', 0):
+            placeholder = QTreeWidgetItem(item)
+            placeholder.setText(0, "Chargement...")
+            item.setData(0, self.LAZY_ROLE, True)
     
     def on_folder_selected(self, item):
         """Gérer la sélection d'un dossier"""
+        offset = item.data(0, self.MORE_ROLE)
+        if offset is not None:
+            # Élément « Afficher plus »: charger la page suivante
+            item.setText(0, "Chargement...")
+            item.setData(0, self.MORE_ROLE, None)
+            parent_item = item.parent()
+            self.load_folder_page(parent_item, offset)
+            return
+        
         folder = item.data(0, Qt.UserRole)
+        if folder is None:
+            return
         self.current_folder = folder
         self.load_files(folder)
     
-    def load_files(self, folder):
-        """Charger les fichiers d'un dossier"""
-        self.file_list.clear()
-        files = self.file_controller.get_files_in_folder(folder.id)
+    def start_hot_folders(self):
+        """Démarrer l'import automatique des dossiers surveillés (si configuré)"""
+        self.hot_folders = None
+        if not Settings().get('hot_folders.enabled'):
+            return
+        
+        # Les lots sont importés dans le pool de la base, comme les autres appels
+        self.hot_folder_batch.connect(self.ingest_hot_folder_batch)
+        self.hot_folders = HotFolderService(
+            self.file_controller,
+            on_batch=lambda mapping, paths: self.hot_folder_batch.emit(mapping, paths)
+        )
+        self.hot_folders.start()
+    
+    def stop_hot_folders(self):
+        if self.hot_folders is not None:
+            self.hot_folders.stop()
+            self.hot_folders = None
+    
+    def start_storage_scrubber(self):
+        """Démarrer la vérification du stockage en arrière-plan (administrateurs, si configurée)"""
+        self.storage_scrubber = None
+        if not Settings().get('integrity.enabled') or not self.user.is_admin():
+            return
+        
+        from controllers.integrity_controller import IntegrityController
+        self.integrity_problems.connect(self.on_integrity_problems)
+        self.storage_scrubber = StorageScrubber(
+            IntegrityController(self.user, self.db),
+            on_problems=self.integrity_problems.emit
+        )
+        self.storage_scrubber.start()
+    
+    def stop_storage_scrubber(self):
+        if self.storage_scrubber is not None:
+            self.storage_scrubber.stop()
+            self.storage_scrubber = None
+    
+    def on_integrity_problems(self, stats):
+        """Signaler les fichiers absents ou altérés trouvés par la vérification"""
+        for problem in stats['problems'][:5]:
+            print(f"⚠️  Stockage: {problem['path']}: {problem['detail']}")
+        self.statusBar().showMessage(
+            f"⚠️ {len(stats['problems'])} fichier(s) absent(s) ou altéré(s) dans le stockage "
+            f"(détails: cli.py verify --report)", 15000)
+    
+    def ingest_hot_folder_batch(self, mapping, paths):
+        if self.hot_folders is None:
+            return
+        self.runner.submit(
+            self.hot_folders.ingest, mapping, paths,
+            on_result=lambda stats: self.on_hot_folder_ingested(mapping, stats)
+        )
+    
+    def on_hot_folder_ingested(self, mapping, stats):
+        """Signaler les fichiers importés automatiquement"""
+        count = stats.get('new', 0) + stats.get('changed', 0)
+        for error in stats.get('errors', [])[:5]:
+            print(f"⚠️  Dossier surveillé {mapping['source']}: {error}")
+        if count == 0:
+            return
         
-        for file in files:
-            self.file_list.addItem(f"{file.name} ({self.format_size(file.file_size)})")
-            item = self.file_list.item(self.file_list.count() - 1)
-            item.setData(Qt.UserRole, file)
+        self.statusBar().showMessage(
+            f"📥 {count} fichier(s) importé(s) depuis {mapping['source']}", 5000)
+        if self.current_folder and self.current_folder.id == mapping['folder_id']:
+            self.file_model.refresh()
+    
+    def load_files(self, folder):
+        """Charger les fichiers d'un dossier (par pages, à la demande)"""
+        self.file_model.set_folder(folder.id)
     
     def format_size(self, size):
         """Formatter la taille du fichier"""
@@ -270,9 +478,23 @@ class MainWindow(QMainWindow):
             size /= 1024.0
         return f"{size:.1f} TB"
     
-    def on_file_double_clicked(self, item):
+    def on_file_current_changed(self, current, previous):
+        """Précharger les aperçus autour du fichier sélectionné"""
+        if current.isValid():
+            self.prefetcher.prefetch(self.file_model.rows, current.row())
+    
+    def on_file_double_clicked(self, index):
         """Ouvrir la prévisualisation du fichier"""
-        file = item.data(Qt.UserRole)
+        file_row = self.file_model.row_at(index.row())
+        if file_row is None:
+            return
+        
+        # La ligne du listing est compacte: charger le fichier complet
+        file = self.file_controller.get_file_by_id(file_row.id)
+        if file is None:
+            AlertDialog.warning(self, "Attention", "Ce fichier n'existe plus")
+            return
+        
         self.audit_controller.log_action('VIEW', 'FILE', file.id)
         
         # Import dynamique pour éviter la circularité
@@ -304,25 +526,42 @@ class MainWindow(QMainWindow):
         if not file_paths:
             return
         
-        # Compteurs pour le résultat
+        self.runner.submit(
+            self.add_files_worker,
+            folder.id,
+            file_paths,
+            pass_token=True,
+            on_progress=lambda done: self.statusBar().showMessage(
+                f"Ajout des fichiers: {done}/{len(file_paths)}"),
+            on_result=lambda result: self.on_files_added(folder, *result)
+        )
+    
+    def add_files_worker(self, folder_id, file_paths, token):
+        """Ajouter des fichiers via le contrôleur (thread de travail)"""
         success_count = 0
-        error_count = 0
         errors = []
         
-        for file_path in file_paths:
+        for i, file_path in enumerate(file_paths):
+            token.raise_if_cancelled()
             try:
-                # Ajouter le fichier via le contrôleur
-                result = self.file_controller.add_file(file_path, folder.id)
+                success, result = self.file_controller.add_file(file_path, folder_id)
                 
-                if result:
+                if success:
                     success_count += 1
                 else:
-                    error_count += 1
-                    errors.append(f"{os.path.basename(file_path)}: Échec de l'ajout")
+                    errors.append(f"{os.path.basename(file_path)}: {result}")
                     
             except Exception as e:
-                error_count += 1
                 errors.append(f"{os.path.basename(file_path)}: {str(e)}")
+            
+            token.report(i + 1)
+        
+        return success_count, errors
+    
+    def on_files_added(self, folder, success_count, errors):
+        """Afficher le résultat de l'ajout de fichiers"""
+        error_count = len(errors)
+        self.statusBar().showMessage(f"{success_count} fichier(s) ajouté(s)")
         
         # Rafraîchir la liste des fichiers si c'est le dossier actuel
         if self.current_folder and self.current_folder.id == folder.id:
@@ -432,6 +671,12 @@ class MainWindow(QMainWindow):
         window = SearchWindow(self, self.db)
         window.show()
     
+    def open_audit_log(self):
+        """Ouvrir le journal d'audit"""
+        from views.audit_log_window import AuditLogWindow
+        window = AuditLogWindow(self, self.db)
+        window.show()
+    
     def open_settings(self):
         """Ouvrir les paramètres"""
         from views.settings_window import SettingsWindow
@@ -445,26 +690,42 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage(f"Recherche: {query}")
     
     def sort_folders(self, criteria):
-        """Trier les dossiers"""
+        """Trier les dossiers (tri fait par la base de données)"""
+        key = self.SORT_CRITERIA.get(criteria, 'name')
+        descending = self.sort_order_btn.isChecked()
+        self.sort_order_btn.setText("↓" if descending else "↑")
+        
+        # Le nom départage les égalités du critère principal
+        self.folder_sort = [(key, descending)]
+        if key != 'name':
+            self.folder_sort.append(('name', False))
+        
+        self.load_folders()
         self.statusBar().showMessage(f"Tri par: {criteria}")
     
     def show_folder_context_menu(self, position):
         """Afficher le menu contextuel des dossiers"""
         item = self.folder_tree.itemAt(position)
-        if not item:
+        if not item or item.data(0, Qt.UserRole) is None:
             return
         
         folder = item.data(0, Qt.UserRole)
+        level = self.folder_controller.get_permissions([folder.id])[folder.id]
+        is_owner = folder.owner_id == self.user.id or self.user.is_superuser()
         
         menu = QMenu()
-        
-        # Options de base
-        create_file_action = menu.addAction("📄 Créer un fichier")
-        add_files_action = menu.addAction("📎 Ajouter des fichiers existants")
-        menu.addSeparator()
+        create_file_action = add_files_action = None
+        share_user_action = make_public_action = make_private_action = manage_shares_action = None
+        rename_action = delete_action = None
+        
+        # Ajout de fichiers (permission d'écriture, héritée des dossiers parents)
+        if level >= AccessLevel.WRITE:
+            create_file_action = menu.addAction("📄 Créer un fichier")
+            add_files_action = menu.addAction("📎 Ajouter des fichiers existants")
+            menu.addSeparator()
         
         # Options de partage (uniquement pour le propriétaire ou superuser)
-        if folder.owner_id == self.user.id or self.user.is_superuser():
+        if is_owner:
             share_menu = menu.addMenu("🔗 Partage")
             
             share_user_action = share_menu.addAction("👤 Partager avec un utilisateur")
@@ -478,41 +739,47 @@ class MainWindow(QMainWindow):
             
             menu.addSeparator()
         
-        # Autres actions (uniquement pour le propriétaire)
-        if folder.owner_id == self.user.id or self.user.is_superuser():
+        # Autres actions (gestion complète: propriétaire ou partage MANAGE)
+        if level >= AccessLevel.FULL:
             rename_action = menu.addAction("✏️ Renommer")
             delete_action = menu.addAction("🗑️ Supprimer")
             menu.addSeparator()
         
+        export_action = menu.addAction("📦 Exporter en archive...")
         properties_action = menu.addAction("ℹ️ Propriétés")
         
         action = menu.exec_(self.folder_tree.mapToGlobal(position))
+        if action is None:
+            return
         
         if action == create_file_action:
             self.create_new_file(folder)
         elif action == add_files_action:
             self.add_files_to_folder(folder)
-        elif folder.owner_id == self.user.id or self.user.is_superuser():
-            if action == share_user_action:
-                self.share_folder_with_user(folder)
-            elif action == make_public_action if not folder.is_public() else action == make_private_action:
-                self.toggle_folder_public(folder)
-            elif action == manage_shares_action:
-                self.manage_folder_shares(folder)
-            elif action == delete_action:
-                self.delete_folder(folder)
-            elif action == rename_action:
-                self.rename_folder(folder, item)
-        if action == properties_action:
+        elif action == share_user_action:
+            self.share_folder_with_user(folder)
+        elif action in (make_public_action, make_private_action):
+            self.toggle_folder_public(folder)
+        elif action == manage_shares_action:
+            self.manage_folder_shares(folder)
+        elif action == delete_action:
+            self.delete_folder(folder)
+        elif action == rename_action:
+            self.rename_folder(folder, item)
+        elif action == export_action:
+            self.export_folder_archive(folder)
+        elif action == properties_action:
             self.show_folder_properties(folder)
     
     def show_file_context_menu(self, position):
         """Afficher le menu contextuel des fichiers"""
-        item = self.file_list.itemAt(position)
-        if not item:
+        index = self.file_list.indexAt(position)
+        if not index.isValid():
             return
         
-        file = item.data(Qt.UserRole)
+        file = self.file_model.row_at(index.row())
+        if file is None:
+            return
         
         menu = QMenu()
         
@@ -526,13 +793,18 @@ class MainWindow(QMainWindow):
         action = menu.exec_(self.file_list.mapToGlobal(position))
         
         if action == open_action:
-            self.on_file_double_clicked(item)
+            self.on_file_double_clicked(index)
         elif action == download_action:
             self.download_file(file)
         elif action == delete_action:
             self.delete_file(file)
         elif action == properties_action:
-            self.show_file_properties(file)
+            # La ligne du listing est compacte: charger le fichier complet
+            full_file = self.file_controller.get_file_by_id(file.id)
+            if full_file is None:
+                AlertDialog.warning(self, "Attention", "Ce fichier n'existe plus")
+                return
+            self.show_file_properties(full_file)
     
     def download_file(self, file):
         """Télécharger/copier un fichier"""
@@ -544,20 +816,85 @@ class MainWindow(QMainWindow):
         )
         
         if save_path:
-            try:
-                shutil.copy2(file.file_path, save_path)
-                self.audit_controller.log_action('DOWNLOAD', 'FILE', file.id)
-                AlertDialog.information(
-                    self,
-                    "Succès",
-                    f"Fichier téléchargé avec succès:\n{save_path}"
-                )
-            except Exception as e:
-                AlertDialog.error(
-                    self,
-                    "Erreur",
-                    f"Erreur lors du téléchargement:\n{str(e)}"
-                )
+            self.statusBar().showMessage(f"Téléchargement de {file.name}...")
+            self.runner.submit(
+                self.file_controller.download_file,
+                file.id,
+                save_path,
+                on_result=lambda result: self.on_file_downloaded(save_path, *result),
+                on_error=lambda message: self.on_file_downloaded(save_path, False, message)
+            )
+    
+    def on_file_downloaded(self, save_path, success, message):
+        """Afficher le résultat d'un téléchargement"""
+        if success:
+            self.statusBar().showMessage("Téléchargement terminé", 3000)
+            AlertDialog.information(
+                self,
+                "Succès",
+                f"Fichier téléchargé avec succès:\n{save_path}"
+            )
+        else:
+            AlertDialog.error(
+                self,
+                "Erreur",
+                f"Erreur lors du téléchargement:\n{message}"
+            )
+    
+    def export_folder_archive(self, folder):
+        """Exporter un dossier et ses sous-dossiers en archive ZIP ou TAR"""
+        save_path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Exporter le dossier",
+            f"{folder.name}.zip",
+            "Archive ZIP (*.zip);;Archive TAR (*.tar)"
+        )
+        if not save_path:
+            return
+        
+        fmt = 'tar' if save_path.lower().endswith('.tar') or 'TAR' in selected_filter else 'zip'
+        if not save_path.lower().endswith(f'.{fmt}'):
+            save_path += f'.{fmt}'
+        
+        self.statusBar().showMessage(f"Export de {folder.name}...")
+        self.export_runner.submit(
+            self.export_folder_worker,
+            folder.id,
+            save_path,
+            fmt,
+            key=('export', folder.id),
+            pass_token=True,
+            on_progress=lambda progress: self.statusBar().showMessage(
+                f"Export de {folder.name}: {self.format_size(progress[0])}"
+                f" / {self.format_size(progress[1])}"),
+            on_result=lambda result: self.on_folder_exported(*result),
+            on_error=lambda message: self.on_folder_exported(False, message)
+        )
+    
+    def export_folder_worker(self, folder_id, save_path, fmt, token):
+        """Écrire l'archive (thread de travail)"""
+        from controllers.export_controller import ExportController
+        
+        return ExportController(self.user, self.db).export_folder(
+            folder_id, save_path, fmt,
+            progress_callback=lambda done, total: token.report((done, total)),
+            should_stop=lambda: token.cancelled
+        )
+    
+    def on_folder_exported(self, success, result):
+        """Afficher le résultat d'un export d'archive"""
+        if not success:
+            self.statusBar().showMessage("Export échoué", 3000)
+            AlertDialog.error(self, "Erreur", f"Export impossible:\n{result}")
+            return
+        
+        self.statusBar().showMessage("Export terminé", 3000)
+        message = (f"{result['files']} fichier(s), {self.format_size(result['bytes'])}"
+                   f" exporté(s) dans:\n{result['path']}")
+        if result['errors']:
+            message += f"\n\n{len(result['errors'])} fichier(s) introuvable(s):\n"
+            message += "\n".join(result['errors'][:10])
+        AlertDialog.information(self, "Export", message)
     
     def delete_file(self, file):
         """Supprimer un fichier"""
@@ -586,14 +923,23 @@ class MainWindow(QMainWindow):
         )
         
         if reply == True:
-            success, message = self.folder_controller.delete_folder(folder.id)
-            if success:
-                AlertDialog.information(self, "Succès", message)
-                self.load_folders()
-                self.current_folder = None
-                self.file_list.clear()
-            else:
-                AlertDialog.error(self, "Erreur", message)
+            self.statusBar().showMessage(f"Suppression du dossier {folder.name}...")
+            self.runner.submit(
+                self.folder_controller.delete_folder,
+                folder.id,
+                on_result=lambda result: self.on_folder_deleted(*result),
+                on_error=lambda message: self.on_folder_deleted(False, message)
+            )
+    
+    def on_folder_deleted(self, success, message):
+        """Afficher le résultat de la suppression d'un dossier"""
+        if success:
+            AlertDialog.information(self, "Succès", message)
+            self.load_folders()
+            self.current_folder = None
+            self.file_model.clear()
+        else:
+            AlertDialog.error(self, "Erreur", message)
     
     def rename_folder(self, folder, item):
         """Renommer un dossier"""
@@ -619,6 +965,12 @@ class MainWindow(QMainWindow):
     
     def show_folder_properties(self, folder):
         """Afficher les propriétés d'un dossier"""
+        # L'arborescence ne garde que des lignes compactes: charger le dossier complet
+        folder = self.folder_controller.get_folder(folder.id)
+        if folder is None:
+            AlertDialog.error(self, "Erreur", "Dossier non trouvé")
+            return
+        
         # Afficher le badge de visibilité
         visibility_badges = {
             'private': '🔒 Privé',
@@ -627,7 +979,7 @@ class MainWindow(QMainWindow):
         }
         
         visibility = visibility_badges.get(folder.visibility.value, folder.visibility.value)
-        owner_info = f" (Propriétaire: {folder.owner.username})" if hasattr(folder, 'owner') else ""
+        owner_info = f" (Propriétaire: {folder.owner.username})" if folder.owner else ""
         
         info = f"""
 <b>Nom:</b> {folder.name}<br>
@@ -722,6 +1074,11 @@ class MainWindow(QMainWindow):
             
             # Définir le flag de déconnexion
             self.should_logout = True
+            self.runner.cancel_all()
+            self.export_runner.cancel_all()
+            self.prefetcher.stop()
+            self.stop_hot_folders()
+            self.stop_storage_scrubber()
             
             # Fermer la fenêtre principale
             self.close()
@@ -742,6 +1099,11 @@ class MainWindow(QMainWindow):
             if reply == True:
                 # Logger la fermeture
                 self.audit_controller.log_action('LOGOUT', 'USER', self.user.id)
+                self.runner.cancel_all()
+                self.export_runner.cancel_all()
+                self.prefetcher.stop()
+                self.stop_hot_folders()
+                self.stop_storage_scrubber()
                 event.accept()
             else:
                 event.ignore()
@@ -33,7 +33,7 @@ class ManageSharesDialog(QDialog):
         layout.addSpacing(10)
         
         # Titre
-        title = QLabel("Utilisateurs ayant accès à ce dossier:")
+        title = QLabel("Utilisateurs et groupes ayant accès à ce dossier:")
         title.setStyleSheet("font-weight: bold;")
         layout.addWidget(title)
         
@@ -41,7 +41,7 @@ class ManageSharesDialog(QDialog):
         self.shares_table = QTableWidget()
         self.shares_table.setColumnCount(4)
         self.shares_table.setHorizontalHeaderLabels([
-            "Utilisateur", "Email", "Permission", "Actions"
+            "Utilisateur / groupe", "Email / membres", "Permission", "Actions"
         ])
         self.shares_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
         self.shares_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
@@ -68,49 +68,80 @@ class ManageSharesDialog(QDialog):
         
         self.setLayout(layout)
     
+    PERMISSION_LABELS = {
+        'read': '👁️ Lecture',
+        'write': '✏️ Écriture',
+        'manage': '⚙️ Gestion'
+    }
+    
     def load_shares(self):
-        """Charger les partages"""
+        """Charger les partages (groupes puis utilisateurs)"""
         self.shares_table.setRowCount(0)
         
-        shares = self.sharing_controller.get_folder_shares(self.folder.id)
+        for share in self.sharing_controller.get_folder_group_shares(self.folder.id) or []:
+            self.add_share_row(
+                f"👥 {share.group.name}",
+                f"{share.group.member_count} membre(s)",
+                share.permission,
+                lambda checked, s=share: self.remove_group_share(s)
+            )
+        
+        for share in self.sharing_controller.get_folder_shares(self.folder.id) or []:
+            self.add_share_row(
+                share.user.username,
+                share.user.email,
+                share.permission,
+                lambda checked, s=share: self.remove_share(s)
+            )
+    
+    def add_share_row(self, name, detail, permission, on_remove):
+        row = self.shares_table.rowCount()
+        self.shares_table.insertRow(row)
         
-        if not shares:
-            return
+        self.shares_table.setItem(row, 0, QTableWidgetItem(name))
+        self.shares_table.setItem(row, 1, QTableWidgetItem(detail))
         
-        for share in shares:
-            row = self.shares_table.rowCount()
-            self.shares_table.insertRow(row)
-            
-            # Utilisateur
-            self.shares_table.setItem(row, 0, QTableWidgetItem(share.user.username))
-            
-            # Email
-            self.shares_table.setItem(row, 1, QTableWidgetItem(share.user.email))
-            
-            # Permission
-            permission_icons = {
-                'read': '👁️ Lecture',
-                'write': '✏️ Écriture',
-                'manage': '⚙️ Gestion'
+        # Permission
+        perm_text = self.PERMISSION_LABELS.get(permission.value, permission.value)
+        self.shares_table.setItem(row, 2, QTableWidgetItem(perm_text))
+        
+        # Bouton supprimer
+        remove_btn = QPushButton("🗑️ Retirer")
+        remove_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #e74c3c;
+                color: white;
+                padding: 5px 10px;
+                border-radius: 3px;
             }
-            perm_text = permission_icons.get(share.permission.value, share.permission.value)
-            self.shares_table.setItem(row, 2, QTableWidgetItem(perm_text))
+            QPushButton:hover {
+                background-color: #c0392b;
+            }
+        """)
+        remove_btn.clicked.connect(on_remove)
+        self.shares_table.setCellWidget(row, 3, remove_btn)
+    
+    def remove_group_share(self, share):
+        """Retirer un partage de groupe"""
+        reply = QMessageBox.question(
+            self,
+            'Confirmation',
+            f'Voulez-vous retirer l\'accès du groupe {share.group.name} ?',
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        
+        if reply == QMessageBox.Yes:
+            success, message = self.sharing_controller.unshare_folder_group(
+                self.folder.id,
+                share.group_id
+            )
             
-            # Bouton supprimer
-            remove_btn = QPushButton("🗑️ Retirer")
-            remove_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #e74c3c;
-                    color: white;
-                    padding: 5px 10px;
-                    border-radius: 3px;
-                }
-                QPushButton:hover {
-                    background-color: #c0392b;
-                }
-            """)
-            remove_btn.clicked.connect(lambda checked, s=share: self.remove_share(s))
-            self.shares_table.setCellWidget(row, 3, remove_btn)
+            if success:
+                QMessageBox.information(self, "Succès", message)
+                self.load_shares()
+            else:
+                QMessageBox.critical(self, "Erreur", message)
     
     def remove_share(self, share):
         """Retirer un partage"""
@@ -8,10 +8,13 @@ Fenêtre de prévisualisation des fichiers
 
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                                QPushButton, QTextEdit, QScrollArea, QWidget,
-                               QMessageBox, QFileDialog)
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QPixmap, QFont
+                               QMessageBox, QFileDialog, QSpinBox)
+from PySide6.QtCore import Qt, QThreadPool
+from PySide6.QtGui import QPixmap, QImage, QFont, QTextCursor
+from utils.enums import PdfPreviewStatus
 from utils.preview_generator import PreviewGenerator
+from utils.task_runner import TaskRunner
+from utils.text_preview import TextPreview
 from pathlib import Path
 import os
 import subprocess
@@ -20,6 +23,9 @@ import platform
 class PreviewWindow(QDialog):
     """Fenêtre de prévisualisation des fichiers"""
     
+    # Nombre de lignes par page pour les fichiers texte
+    TEXT_PAGE_LINES = 500
+    
     def __init__(self, file_obj, parent=None):
         """
         Initialiser la fenêtre de prévisualisation
@@ -32,6 +38,9 @@ class PreviewWindow(QDialog):
         self.file = file_obj
         self.parent_window = parent
         self.preview_gen = PreviewGenerator()
+        
+        # L'aperçu n'accède pas à la base: pool global plutôt que celui de la base
+        self.runner = TaskRunner(self, pool=QThreadPool.globalInstance())
         self.init_ui()
     
     def init_ui(self):
@@ -154,39 +163,96 @@ class PreviewWindow(QDialog):
             return self.create_no_preview()
     
     def create_image_preview(self):
-        """Créer la prévisualisation d'une image"""
+        """Créer la prévisualisation d'une image (chargée en arrière-plan)"""
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         scroll.setStyleSheet("background-color: #2c3e50;")
         
-        label = QLabel()
-        label.setAlignment(Qt.AlignCenter)
-        
-        try:
-            pixmap = QPixmap(self.file.file_path)
-            
-            if pixmap.isNull():
-                label.setText("❌ Impossible de charger l'image")
-                label.setStyleSheet("color: white; font-size: 14px;")
-            else:
-                # Redimensionner si trop grand
-                if pixmap.width() > 800 or pixmap.height() > 600:
-                    pixmap = pixmap.scaled(800, 600, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                
-                label.setPixmap(pixmap)
-        except Exception as e:
-            label.setText(f"❌ Erreur lors du chargement de l'image:\n{str(e)}")
-            label.setStyleSheet("color: white; font-size: 14px;")
-        
-        scroll.setWidget(label)
+        self.image_label = QLabel("⏳ Chargement de l'aperçu...")
+        self.image_label.setAlignment(Qt.AlignCenter)
+        self.image_label.setStyleSheet("color: white; font-size: 14px;")
+        scroll.setWidget(self.image_label)
+        
+        self.runner.submit(
+            self._load_image, self.file.file_path, self.file.id,
+            key='preview',
+            on_result=self._on_image_loaded,
+            on_error=lambda message: self._show_image_error(
+                f"❌ Erreur lors du chargement de l'image:\n{message}")
+        )
         return scroll
     
+    @staticmethod
+    def _load_image(file_path, file_id):
+        """Décoder la miniature (thread de travail)"""
+        # Miniature issue du cache d'aperçus (l'original n'est décodé qu'une fois)
+        image_path = PreviewGenerator.generate_image_preview(
+            file_path, max_size=PreviewGenerator.image_preview_size(), file_id=file_id
+        ) or file_path
+        
+        # QImage peut être construite hors du thread GUI, contrairement à QPixmap
+        image = QImage(image_path)
+        if not image.isNull() and (image.width() > 800 or image.height() > 600):
+            image = image.scaled(800, 600, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return image
+    
+    def _on_image_loaded(self, image):
+        if image.isNull():
+            self._show_image_error("❌ Impossible de charger l'image")
+            return
+        self.image_label.setStyleSheet("")
+        self.image_label.setPixmap(QPixmap.fromImage(image))
+    
+    def _show_image_error(self, message):
+        self.image_label.setText(message)
+        self.image_label.setStyleSheet("color: white; font-size: 14px;")
+    
     def create_text_preview(self):
-        """Créer la prévisualisation d'un fichier texte"""
-        text_edit = QTextEdit()
-        text_edit.setReadOnly(True)
-        text_edit.setFont(QFont("Courier New", 10))
-        text_edit.setStyleSheet("""
+        """
+        Créer la prévisualisation paginée d'un fichier texte
+        
+        Le fichier est lu par pages de lignes via TextPreview; l'index des
+        lignes est construit en arrière-plan pendant la consultation.
+        """
+        widget = QWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        # Barre de navigation
+        nav_layout = QHBoxLayout()
+        
+        self.prev_page_btn = QPushButton("◀ Précédent")
+        self.prev_page_btn.clicked.connect(self.show_previous_text_page)
+        nav_layout.addWidget(self.prev_page_btn)
+        
+        self.next_page_btn = QPushButton("Suivant ▶")
+        self.next_page_btn.clicked.connect(self.show_next_text_page)
+        nav_layout.addWidget(self.next_page_btn)
+        
+        self.text_position_label = QLabel("")
+        self.text_position_label.setStyleSheet("color: #7f8c8d; font-size: 12px;")
+        nav_layout.addWidget(self.text_position_label)
+        
+        nav_layout.addStretch()
+        
+        nav_layout.addWidget(QLabel("Aller à la ligne:"))
+        self.goto_line_spin = QSpinBox()
+        self.goto_line_spin.setRange(1, 2**31 - 1)
+        self.goto_line_spin.setMinimumWidth(110)
+        nav_layout.addWidget(self.goto_line_spin)
+        
+        goto_btn = QPushButton("Aller")
+        goto_btn.clicked.connect(self.goto_text_line)
+        self.goto_line_spin.lineEdit().returnPressed.connect(self.goto_text_line)
+        nav_layout.addWidget(goto_btn)
+        
+        layout.addLayout(nav_layout)
+        
+        self.text_edit = QTextEdit()
+        self.text_edit.setReadOnly(True)
+        self.text_edit.setLineWrapMode(QTextEdit.NoWrap)
+        self.text_edit.setFont(QFont("Courier New", 10))
+        self.text_edit.setStyleSheet("""
             QTextEdit {
                 background-color: #2c3e50;
                 color: #ecf0f1;
@@ -194,27 +260,120 @@ class PreviewWindow(QDialog):
                 padding: 10px;
             }
         """)
+        self.text_edit.setPlainText("⏳ Chargement de l'aperçu...")
+        layout.addWidget(self.text_edit)
         
-        content = self.preview_gen.extract_text_preview(self.file.file_path, max_chars=10000)
+        widget.setLayout(layout)
         
-        if content:
-            text_edit.setPlainText(content)
-            
-            # Ajouter une note si le fichier est tronqué
-            if len(content) >= 10000:
-                text_edit.append("\n\n--- Aperçu limité aux 10 000 premiers caractères ---")
+        self.text_doc = None
+        self.text_start = 0
+        self.text_page_len = 0
+        self._set_text_navigation_enabled(False)
+        
+        self.runner.submit(
+            self._open_text, self.file.file_path, self.TEXT_PAGE_LINES,
+            key='preview',
+            on_result=self._on_text_opened,
+            on_error=self._on_text_error
+        )
+        return widget
+    
+    @staticmethod
+    def _open_text(file_path, page_lines):
+        """Ouvrir le fichier et lire la première page (thread de travail)"""
+        doc = TextPreview(file_path)
+        return doc, doc.get_lines(0, page_lines)
+    
+    def _on_text_opened(self, result):
+        self.text_doc, lines = result
+        self._show_text_page(0, lines)
+        self._set_text_navigation_enabled(True)
+        
+        self.runner.submit(
+            self._index_text, self.text_doc,
+            key='preview-index',
+            pass_token=True,
+            on_progress=lambda _: self._update_text_position(),
+            on_result=lambda _: self._update_text_position()
+        )
+    
+    @staticmethod
+    def _index_text(doc, token):
+        """Construire l'index des lignes par tranches (thread de travail)"""
+        return doc.build_index(
+            should_stop=lambda: token.cancelled,
+            on_progress=token.report
+        )
+    
+    def _on_text_error(self, message):
+        self.text_edit.setPlainText("❌ Impossible de lire le contenu du fichier.\n\n"
+                                    "Le fichier pourrait être dans un format non supporté ou corrompu.\n\n"
+                                    f"Détail: {message}")
+    
+    def load_text_page(self, start):
+        """Charger une page de lignes à partir de la ligne start (depuis 0)"""
+        if self.text_doc is None:
+            return
+        
+        self.runner.submit(
+            self.text_doc.get_lines, start, self.TEXT_PAGE_LINES,
+            key='preview',
+            on_result=lambda lines: self._show_text_page(start, lines),
+            on_error=self._on_text_error
+        )
+    
+    def _show_text_page(self, start, lines):
+        if not lines and start > 0:
+            # Au-delà de la fin du fichier: rester sur la page courante
+            self._update_text_position()
+            return
+        
+        self.text_start = start
+        self.text_page_len = len(lines)
+        self.text_edit.setPlainText("\n".join(lines))
+        self._update_text_position()
+    
+    def _update_text_position(self):
+        if self.text_doc is None:
+            return
+        
+        total = self.text_doc.line_count
+        if total is None:
+            total_text = f"… (indexation {self.text_doc.progress:.0%})"
         else:
-            text_edit.setPlainText("❌ Impossible de lire le contenu du fichier.\n\n"
-                                  "Le fichier pourrait être dans un format non supporté ou corrompu.")
+            total_text = f"{total:,}"
         
-        return text_edit
+        first = self.text_start + 1 if self.text_page_len else 0
+        last = self.text_start + self.text_page_len
+        self.text_position_label.setText(
+            f"Lignes {first:,}–{last:,} sur {total_text} · {self.text_doc.encoding}".replace(",", " ")
+        )
+        
+        self.prev_page_btn.setEnabled(self.text_start > 0)
+        self.next_page_btn.setEnabled(self.text_page_len == self.TEXT_PAGE_LINES
+                                      and (total is None or last < total))
+    
+    def _set_text_navigation_enabled(self, enabled):
+        self.prev_page_btn.setEnabled(enabled)
+        self.next_page_btn.setEnabled(enabled)
+        self.goto_line_spin.setEnabled(enabled)
+    
+    def show_previous_text_page(self):
+        self.load_text_page(max(0, self.text_start - self.TEXT_PAGE_LINES))
+    
+    def show_next_text_page(self):
+        self.load_text_page(self.text_start + self.TEXT_PAGE_LINES)
+    
+    def goto_text_line(self):
+        """Aller à la ligne saisie (numérotée depuis 1)"""
+        self.load_text_page(self.goto_line_spin.value() - 1)
     
     def create_pdf_preview(self):
-        """Créer la prévisualisation d'un PDF"""
-        text_edit = QTextEdit()
-        text_edit.setReadOnly(True)
-        text_edit.setFont(QFont("Arial", 10))
-        text_edit.setStyleSheet("""
+        """Créer la prévisualisation d'un PDF (pages affichées au fil de l'extraction)"""
+        self.text_edit = QTextEdit()
+        self.text_edit.setReadOnly(True)
+        self.text_edit.setFont(QFont("Arial", 10))
+        self.text_edit.setStyleSheet("""
             QTextEdit {
                 background-color: white;
                 color: #2c3e50;
@@ -222,24 +381,57 @@ class PreviewWindow(QDialog):
                 padding: 15px;
             }
         """)
-        
-        content = self.preview_gen.extract_pdf_preview(self.file.file_path, max_pages=3)
-        
-        if content:
-            text_edit.setPlainText(content)
-            text_edit.append("\n\n" + "="*50)
-            text_edit.append("📄 Aperçu limité aux 3 premières pages")
-            text_edit.append("Pour voir le document complet, cliquez sur 'Ouvrir avec l'application par défaut'")
-            text_edit.append("="*50)
+        self.text_edit.setPlainText("⏳ Extraction de la première page...")
+        self._pdf_pages = 0
+        
+        self.runner.submit(
+            self._extract_pdf_pages, self.file.file_path, self.file.id,
+            key='preview',
+            pass_token=True,
+            on_progress=self._on_pdf_page,
+            on_result=self._on_pdf_finished
+        )
+        return self.text_edit
+    
+    @staticmethod
+    def _extract_pdf_pages(file_path, file_id, token):
+        """Extraire les pages une à une et les envoyer au thread GUI"""
+        statuses = []
+        for status, block in PreviewGenerator.iter_pdf_preview(
+                file_path, max_pages=PreviewGenerator.PDF_PREVIEW_PAGES, file_id=file_id):
+            token.raise_if_cancelled()
+            statuses.append(status)
+            token.report(block)
+        return PdfPreviewStatus.overall(statuses)
+    
+    def _on_pdf_page(self, block):
+        if self._pdf_pages == 0:
+            self.text_edit.clear()
+        self._pdf_pages += 1
+        
+        cursor = self.text_edit.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(block)
+    
+    def _on_pdf_finished(self, status):
+        if status == PdfPreviewStatus.TEXT:
+            self.text_edit.append("\n\n" + "="*50)
+            self.text_edit.append("📄 Aperçu limité aux 3 premières pages")
+            self.text_edit.append("Pour voir le document complet, cliquez sur 'Ouvrir avec l'application par défaut'")
+            self.text_edit.append("="*50)
+        elif status == PdfPreviewStatus.NO_TEXT:
+            self.text_edit.setPlainText("📄 Aucun texte extractible dans les premières pages.\n\n"
+                                        "Le PDF contient probablement uniquement des images "
+                                        "(document numérisé).\n\n"
+                                        "Utilisez 'Ouvrir avec l'application par défaut' pour le consulter.")
         else:
-            text_edit.setPlainText("❌ Impossible de lire le contenu du PDF.\n\n"
+            # Le message d'erreur reçu reste affiché au-dessus des explications
+            self.text_edit.append("\n" + "="*50)
+            self.text_edit.append("❌ Impossible de lire le contenu du PDF.\n\n"
                                   "Raisons possibles:\n"
                                   "- Le PDF est protégé par mot de passe\n"
-                                  "- Le PDF est corrompu\n"
-                                  "- Le PDF contient uniquement des images\n\n"
+                                  "- Le PDF est corrompu\n\n"
                                   "Utilisez 'Ouvrir avec l'application par défaut' pour essayer de l'ouvrir.")
-        
-        return text_edit
     
     def create_no_preview(self):
         """Créer un widget quand aucune prévisualisation n'est disponible"""
@@ -278,6 +470,13 @@ class PreviewWindow(QDialog):
         widget.setLayout(layout)
         return widget
     
+    def done(self, result):
+        """Annuler la génération de l'aperçu à la fermeture"""
+        self.runner.cancel_all()
+        if getattr(self, 'text_doc', None) is not None:
+            self.text_doc.close()
+        super().done(result)
+    
     def open_with_default(self):
         """Ouvrir le fichier avec l'application par défaut du système"""
         try:
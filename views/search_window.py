@@ -5,6 +5,7 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
 from PySide6.QtCore import Qt
 from controllers.folder_controller import FolderController
 from database.db_manager import DatabaseManager
+from utils.task_runner import TaskRunner
 
 class SearchWindow(QDialog):
     def __init__(self, parent, db: DatabaseManager):
@@ -12,6 +13,7 @@ class SearchWindow(QDialog):
         self.user = parent.user
         self.db=db
         self.folder_controller = FolderController(self.user,self.db)
+        self.runner = TaskRunner(self)
         self.init_ui()
     
     def init_ui(self):
@@ -115,16 +117,19 @@ class SearchWindow(QDialog):
         theme = self.theme_input.text().strip() or None
         sector = self.sector_input.text().strip() or None
 
-        # Search folders
-        folders = self.folder_controller.search_folders(
+        # Search folders (hors du thread GUI; une nouvelle recherche remplace la précédente)
+        self.runner.submit(
+            self.folder_controller.search_folders,
             query=keyword,
             year=year,
             theme=theme,
-            sector=sector
+            sector=sector,
+            key='search',
+            on_result=self.display_results
         )
-   
-
-        # Display results
+    
+    def display_results(self, folders):
+        """Display search results"""
         self.results_table.setRowCount(0)
         
         for folder in folders:
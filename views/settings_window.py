@@ -703,75 +703,77 @@ class SettingsWindow(QDialog):
         """Save all settings"""
         db_changed = False
         
-        # Storage
-        self.settings.set('storage.base_path', self.storage_path_input.text())
-        
-        # Cloud settings
-        self.settings.set('storage.cloud_enabled', self.cloud_enabled_cb.isChecked())
-        self.settings.set('storage.cloud_backup_enabled', self.cloud_backup_cb.isChecked())
-        
-        cloud_type = self.cloud_type_combo.currentData()
-        self.settings.set('storage.cloud_type', cloud_type)
-        
-        # Save cloud config based on type
-        if cloud_type == 'aws_s3':
-            self.settings.set('storage.cloud_config.aws_s3.access_key', self.aws_access_key.text())
-            self.settings.set('storage.cloud_config.aws_s3.secret_key', self.aws_secret_key.text())
-            self.settings.set('storage.cloud_config.aws_s3.bucket_name', self.aws_bucket.text())
-            self.settings.set('storage.cloud_config.aws_s3.region', self.aws_region.text())
-        elif cloud_type == 'azure':
-            self.settings.set('storage.cloud_config.azure.account_name', self.azure_account.text())
-            self.settings.set('storage.cloud_config.azure.account_key', self.azure_key.text())
-            self.settings.set('storage.cloud_config.azure.container_name', self.azure_container.text())
-        elif cloud_type == 'google_cloud':
-            self.settings.set('storage.cloud_config.google_cloud.project_id', self.google_project.text())
-            self.settings.set('storage.cloud_config.google_cloud.bucket_name', self.google_bucket.text())
-            self.settings.set('storage.cloud_config.google_cloud.credentials_file', self.google_creds.text())
-        elif cloud_type == 'ftp':
-            self.settings.set('storage.cloud_config.ftp.host', self.ftp_host.text())
-            self.settings.set('storage.cloud_config.ftp.port', self.ftp_port.value())
-            self.settings.set('storage.cloud_config.ftp.username', self.ftp_user.text())
-            self.settings.set('storage.cloud_config.ftp.password', self.ftp_password.text())
-            self.settings.set('storage.cloud_config.ftp.remote_path', self.ftp_path.text())
-        
-        # Database
-        db_types = {0: 'sqlite', 1: 'postgresql', 2: 'mysql'}
-        new_db_type = db_types[self.db_type_combo.currentIndex()]
-        old_db_type = self.settings.get('database.type')
-        
-        if new_db_type != old_db_type:
-            db_changed = True
+        # Une seule écriture du fichier de configuration pour tout le formulaire
+        with self.settings.batch():
+            # Storage
+            self.settings.set('storage.base_path', self.storage_path_input.text())
+        
+            # Cloud settings
+            self.settings.set('storage.cloud_enabled', self.cloud_enabled_cb.isChecked())
+            self.settings.set('storage.cloud_backup_enabled', self.cloud_backup_cb.isChecked())
+        
+            cloud_type = self.cloud_type_combo.currentData()
+            self.settings.set('storage.cloud_type', cloud_type)
+        
+            # Save cloud config based on type
+            if cloud_type == 'aws_s3':
+                self.settings.set('storage.cloud_config.aws_s3.access_key', self.aws_access_key.text())
+                self.settings.set('storage.cloud_config.aws_s3.secret_key', self.aws_secret_key.text())
+                self.settings.set('storage.cloud_config.aws_s3.bucket_name', self.aws_bucket.text())
+                self.settings.set('storage.cloud_config.aws_s3.region', self.aws_region.text())
+            elif cloud_type == 'azure':
+                self.settings.set('storage.cloud_config.azure.account_name', self.azure_account.text())
+                self.settings.set('storage.cloud_config.azure.account_key', self.azure_key.text())
+                self.settings.set('storage.cloud_config.azure.container_name', self.azure_container.text())
+            elif cloud_type == 'google_cloud':
+                self.settings.set('storage.cloud_config.google_cloud.project_id', self.google_project.text())
+                self.settings.set('storage.cloud_config.google_cloud.bucket_name', self.google_bucket.text())
+                self.settings.set('storage.cloud_config.google_cloud.credentials_file', self.google_creds.text())
+            elif cloud_type == 'ftp':
+                self.settings.set('storage.cloud_config.ftp.host', self.ftp_host.text())
+                self.settings.set('storage.cloud_config.ftp.port', self.ftp_port.value())
+                self.settings.set('storage.cloud_config.ftp.username', self.ftp_user.text())
+                self.settings.set('storage.cloud_config.ftp.password', self.ftp_password.text())
+                self.settings.set('storage.cloud_config.ftp.remote_path', self.ftp_path.text())
+        
+            # Database
+            db_types = {0: 'sqlite', 1: 'postgresql', 2: 'mysql'}
+            new_db_type = db_types[self.db_type_combo.currentIndex()]
+            old_db_type = self.settings.get('database.type')
+        
+            if new_db_type != old_db_type:
+                db_changed = True
         
-        self.settings.set('database.type', new_db_type)
+            self.settings.set('database.type', new_db_type)
         
-        if new_db_type == 'sqlite':
-            new_path = self.db_path_input.text()
-            old_path = self.settings.get('database.path')
-            if new_path != old_path:
-                db_changed = True
-            self.settings.set('database.path', new_path)
-        else:
-            self.settings.set('database.host', self.db_host_input.text())
-            self.settings.set('database.port', self.db_port_input.value())
-            self.settings.set('database.user', self.db_user_input.text())
-            self.settings.set('database.password', self.db_password_input.text())
-            self.settings.set('database.database', self.db_name_input.text())
-            db_changed = True  # Toujours redémarrer pour les bases distantes
-        
-        # Permissions
-        self.settings.set('permissions.allow_file_deletion', 
-                        self.allow_deletion_cb.isChecked())
-        self.settings.set('permissions.allow_folder_deletion', 
-                        self.allow_folder_deletion_cb.isChecked())
-        self.settings.set('permissions.require_confirmation', 
-                        self.require_confirmation_cb.isChecked())
-        
-        # UI
-        lang_map = {0: 'fr', 1: 'en', 2: 'es'}
-        self.settings.set('ui.language', lang_map[self.language_combo.currentIndex()])
-        
-        theme_map = {0: 'light', 1: 'dark', 2: 'system'}
-        self.settings.set('ui.theme', theme_map[self.theme_combo.currentIndex()])
+            if new_db_type == 'sqlite':
+                new_path = self.db_path_input.text()
+                old_path = self.settings.get('database.path')
+                if new_path != old_path:
+                    db_changed = True
+                self.settings.set('database.path', new_path)
+            else:
+                self.settings.set('database.host', self.db_host_input.text())
+                self.settings.set('database.port', self.db_port_input.value())
+                self.settings.set('database.user', self.db_user_input.text())
+                self.settings.set('database.password', self.db_password_input.text())
+                self.settings.set('database.database', self.db_name_input.text())
+                db_changed = True  # Toujours redémarrer pour les bases distantes
+        
+            # Permissions
+            self.settings.set('permissions.allow_file_deletion', 
+                            self.allow_deletion_cb.isChecked())
+            self.settings.set('permissions.allow_folder_deletion', 
+                            self.allow_folder_deletion_cb.isChecked())
+            self.settings.set('permissions.require_confirmation', 
+                            self.require_confirmation_cb.isChecked())
+        
+            # UI
+            lang_map = {0: 'fr', 1: 'en', 2: 'es'}
+            self.settings.set('ui.language', lang_map[self.language_combo.currentIndex()])
+        
+            theme_map = {0: 'light', 1: 'dark', 2: 'system'}
+            self.settings.set('ui.theme', theme_map[self.theme_combo.currentIndex()])
         
         # Message de confirmation
         if db_changed:
@@ -785,7 +787,9 @@ class SettingsWindow(QDialog):
             
             if reply == True:
                 self.accept()
-                # Redémarrer l'application
+                # Redémarrer l'application (execl ne passe pas par atexit)
+                from database.audit_writer import AuditWriter
+                AuditWriter().close()
                 import os
                 os.execl(sys.executable, sys.executable, *sys.argv)
             else:
@@ -1,13 +1,28 @@
 # views/share_dialog.py
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-                               QComboBox, QPushButton, QMessageBox, QGroupBox)
-from PySide6.QtCore import Qt
+                               QComboBox, QPushButton, QMessageBox, QGroupBox,
+                               QLineEdit, QListWidget, QListWidgetItem)
+from PySide6.QtCore import Qt, QTimer
 from controllers.sharing_controller import SharingController
+from controllers.group_controller import GroupController
 from models.folder_share import SharePermission
-from models.user import User
+from utils.task_runner import TaskRunner
 
 class ShareDialog(QDialog):
-    """Dialogue pour partager un dossier avec un utilisateur"""
+    """
+    Dialogue pour partager un dossier avec des utilisateurs ou des groupes
+    
+    Les utilisateurs sont recherchés par préfixe du nom ou de l'email, page
+    par page, en arrière-plan: la liste complète n'est jamais chargée. Les
+    groupes correspondants sont proposés en tête de la première page. Les
+    éléments cochés restent sélectionnés d'une recherche à l'autre.
+    """
+    
+    PAGE_SIZE = 50
+    # Groupes proposés en tête des résultats
+    GROUP_LIMIT = 20
+    # Délai avant de lancer la recherche pendant la saisie (ms)
+    SEARCH_DELAY = 250
     
     def __init__(self, folder, current_user, db, parent=None):
         super().__init__(parent)
@@ -15,14 +30,23 @@ class ShareDialog(QDialog):
         self.current_user = current_user
         self.db = db
         self.sharing_controller = SharingController(current_user, db)
+        self.group_controller = GroupController(current_user, db)
+        self.runner = TaskRunner(self)
+        self.selected = {}  # ('user' | 'group', id) -> libellé
+        self.cursor = None
+        
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY)
+        self.search_timer.timeout.connect(self.search_users)
         
         self.init_ui()
-        self.load_users()
+        self.search_users()
     
     def init_ui(self):
         """Initialiser l'interface"""
         self.setWindowTitle(f"Partager: {self.folder.name}")
-        self.setGeometry(200, 200, 450, 250)
+        self.setGeometry(200, 200, 450, 520)
         
         layout = QVBoxLayout()
         
@@ -34,11 +58,28 @@ class ShareDialog(QDialog):
         layout.addSpacing(15)
         
         # Sélection utilisateur
-        user_group = QGroupBox("Utilisateur")
+        user_group = QGroupBox("Utilisateurs et groupes")
         user_layout = QVBoxLayout()
         
-        self.user_combo = QComboBox()
-        user_layout.addWidget(self.user_combo)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Rechercher un utilisateur (nom, email) ou un groupe...")
+        self.search_input.textChanged.connect(lambda _: self.search_timer.start())
+        user_layout.addWidget(self.search_input)
+        
+        self.user_list = QListWidget()
+        self.user_list.itemChanged.connect(self.on_user_toggled)
+        user_layout.addWidget(self.user_list)
+        
+        list_footer = QHBoxLayout()
+        self.selection_label = QLabel("Aucune sélection")
+        self.selection_label.setStyleSheet("color: #7f8c8d;")
+        list_footer.addWidget(self.selection_label)
+        list_footer.addStretch()
+        self.more_btn = QPushButton("Plus de résultats")
+        self.more_btn.setEnabled(False)
+        self.more_btn.clicked.connect(self.load_next_page)
+        list_footer.addWidget(self.more_btn)
+        user_layout.addLayout(list_footer)
         
         user_group.setLayout(user_layout)
         layout.addWidget(user_group)
@@ -107,45 +148,95 @@ class ShareDialog(QDialog):
         
         self.setLayout(layout)
     
-    def load_users(self):
-        """Charger la liste des utilisateurs"""
-        session = self.db.get_session()
-        try:
-            # Récupérer tous les utilisateurs sauf l'utilisateur actuel
-            users = session.query(User).filter(User.id != self.current_user.id).all()
-            
-            if not users:
-                self.user_combo.addItem("Aucun utilisateur disponible")
-                self.user_combo.setEnabled(False)
-                return
-            
-            for user in users:
-                self.user_combo.addItem(f"{user.username} ({user.email})", user.id)
-                
-        finally:
-            session.close()
+    def search_users(self):
+        """Relancer la recherche depuis la première page"""
+        self.cursor = None
+        self.user_list.clear()
+        self.load_next_page()
     
-    def share(self):
-        """Effectuer le partage"""
-        if not self.user_combo.isEnabled():
-            QMessageBox.warning(self, "Attention", "Aucun utilisateur disponible")
+    def load_next_page(self):
+        """Charger la page suivante des résultats correspondant à la saisie"""
+        self.more_btn.setEnabled(False)
+        self.runner.submit(
+            self.fetch_page,
+            self.search_input.text(),
+            self.cursor,
+            key='users',
+            on_result=self.append_results,
+            on_error=lambda message: QMessageBox.critical(
+                self, "Erreur", f"Recherche impossible:\n{message}")
+        )
+    
+    def fetch_page(self, prefix, cursor):
+        """Groupes (première page seulement) et page d'utilisateurs (thread de travail)"""
+        groups = []
+        if cursor is None:
+            groups = self.group_controller.get_groups(prefix, limit=self.GROUP_LIMIT)
+        users, cursor = self.sharing_controller.search_users(
+            prefix, after=cursor, limit=self.PAGE_SIZE)
+        return groups, users, cursor
+    
+    def append_results(self, result):
+        groups, users, self.cursor = result
+        
+        self.user_list.blockSignals(True)
+        for group in groups:
+            self.add_choice(('group', group.id),
+                            f"👥 {group.name} ({group.member_count} membre(s))")
+        for user in users:
+            self.add_choice(('user', user.id), f"{user.username} ({user.email})")
+        self.user_list.blockSignals(False)
+        
+        if self.user_list.count() == 0:
+            self.user_list.addItem("Aucun résultat")
+        self.more_btn.setEnabled(self.cursor is not None)
+    
+    def add_choice(self, key, label):
+        item = QListWidgetItem(label)
+        item.setData(Qt.UserRole, key)
+        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+        item.setCheckState(Qt.Checked if key in self.selected else Qt.Unchecked)
+        self.user_list.addItem(item)
+    
+    def on_user_toggled(self, item):
+        key = item.data(Qt.UserRole)
+        if key is None:
             return
+        if item.checkState() == Qt.Checked:
+            self.selected[key] = item.text()
+        else:
+            self.selected.pop(key, None)
         
-        user_id = self.user_combo.currentData()
-        permission = self.permission_combo.currentData()
-        
-        if user_id is None:
-            QMessageBox.warning(self, "Attention", "Veuillez sélectionner un utilisateur")
+        if self.selected:
+            self.selection_label.setText(f"{len(self.selected)} élément(s) sélectionné(s)")
+        else:
+            self.selection_label.setText("Aucune sélection")
+    
+    def share(self):
+        """Effectuer le partage (une seule transaction pour toute la sélection)"""
+        if not self.selected:
+            QMessageBox.warning(self, "Attention", "Veuillez sélectionner au moins un utilisateur ou un groupe")
             return
         
-        success, message = self.sharing_controller.share_folder(
-            self.folder.id,
-            user_id,
-            permission
+        permission = self.permission_combo.currentData()
+        success, result = self.sharing_controller.share_folders(
+            [self.folder.id],
+            [target_id for kind, target_id in self.selected if kind == 'user'],
+            permission,
+            group_ids=[target_id for kind, target_id in self.selected if kind == 'group']
         )
         
         if success:
+            if len(self.selected) == 1:
+                message = f"Dossier partagé avec {next(iter(self.selected.values()))}"
+            else:
+                message = f"Dossier partagé avec {len(self.selected)} utilisateurs et groupes"
             QMessageBox.information(self, "Succès", message)
             self.accept()
         else:
-            QMessageBox.critical(self, "Erreur", message)
\ No newline at end of file
+            QMessageBox.critical(self, "Erreur", result)
+    
+    def done(self, result):
+        self.search_timer.stop()
+        self.runner.cancel_all()
+        super().done(result)